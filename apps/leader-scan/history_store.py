@@ -0,0 +1,380 @@
+"""
+Leader Scan history store.
+
+Appends each run's full filtered universe to a compressed, columnar history
+on disk so leadership questions ("when did X first become a leader?", "how
+many consecutive weeks has X been in the top 2%?") can be answered locally
+for thousands of tickers across years, without a database round-trip per
+ticker.
+
+Layout of a history directory:
+
+    tickers.txt       dictionary — one listing per line ("EXCHANGE:TICKER"),
+                      line number = ticker id
+    2026-10-16.seg    one segment per scan date
+    groups/2026-10-16.json
+                      sector and industry group ranks of that scan, for the
+                      next run's rank changes (see group_ranks.GroupRankStore)
+
+A segment is a one-line JSON header followed by one zlib-compressed block per
+column. Rows inside a segment are sorted by ticker id, so a single ticker is
+located with a binary search instead of a scan. Re-running a scan for a date
+that already has a segment replaces it.
+
+Listings are keyed by their exchange-prefixed name, so two exchanges that
+list the same ticker (common across the European markets) keep separate
+histories. Queries take the full name, or a bare ticker when only one
+listing carries it.
+"""
+
+import argparse
+import json
+import os
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Iterable
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python-common"))
+
+from group_ranks import GroupRankStore
+from ranking_service import LEADER_PERCENTILE, LeaderRecord
+
+SEGMENT_SUFFIX = ".seg"
+TICKERS_FILE = "tickers.txt"
+GROUPS_DIR = "groups"
+FORMAT_VERSION = 1
+
+# Column name -> array typecode. Ticker ids are unsigned 32-bit. rs_score is
+# float64, the precision select_leaders() compares with LEADER_PERCENTILE;
+# everything else is float32: ranks live in [0, 1] and ADR / dollar volume do
+# not need more than ~7 significant digits.
+COLUMNS: dict[str, str] = {
+    "ticker_id": "I",
+    "rank_1m": "f",
+    "rank_3m": "f",
+    "rank_6m": "f",
+    "rs_score": "d",
+    "adr_20": "f",
+    "dollar_volume_20": "f",
+}
+VALUE_COLUMNS = [name for name in COLUMNS if name != "ticker_id"]
+
+
+@dataclass
+class Segment:
+    scan_date: str
+    columns: dict[str, array]
+
+    @property
+    def size(self) -> int:
+        return len(self.columns["ticker_id"])
+
+    def find(self, ticker_id: int) -> int | None:
+        """Return the row index of `ticker_id` in this segment, if present."""
+        ids = self.columns["ticker_id"]
+        idx = bisect_left(ids, ticker_id)
+        if idx < len(ids) and ids[idx] == ticker_id:
+            return idx
+        return None
+
+
+def _encode_column(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return zlib.compress(values.tobytes(), 6)
+
+
+def _decode_column(typecode: str, blob: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(zlib.decompress(blob))
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def listing_name(record: LeaderRecord) -> str:
+    """The dictionary key of a record: its exchange-prefixed name."""
+    return f"{record.exchange}:{record.ticker}" if record.exchange else record.ticker
+
+
+def _iso_week(scan_date: str) -> tuple[int, int]:
+    iso = date.fromisoformat(scan_date).isocalendar()
+    return iso[0], iso[1]
+
+
+def _weeks_are_consecutive(later: tuple[int, int], earlier: tuple[int, int]) -> bool:
+    later_monday = date.fromisocalendar(later[0], later[1], 1)
+    earlier_monday = date.fromisocalendar(earlier[0], earlier[1], 1)
+    return (later_monday - earlier_monday).days == 7
+
+
+class HistoryStore:
+    """Columnar, dictionary-encoded history of ranked Leader Scan universes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._tickers: list[str] | None = None
+        self._ticker_ids: dict[str, int] | None = None
+        self._segments: dict[str, Segment] = {}
+        self.group_ranks = GroupRankStore(os.path.join(path, GROUPS_DIR))
+
+    # -- dictionary ---------------------------------------------------------
+
+    def _load_dictionary(self) -> None:
+        if self._tickers is not None:
+            return
+        tickers_path = os.path.join(self.path, TICKERS_FILE)
+        tickers: list[str] = []
+        if os.path.exists(tickers_path):
+            with open(tickers_path, encoding="utf-8") as fh:
+                tickers = [line.rstrip("\n") for line in fh if line.strip()]
+        self._tickers = tickers
+        self._ticker_ids = {ticker: idx for idx, ticker in enumerate(tickers)}
+
+    def _save_dictionary(self) -> None:
+        self._write_atomic(TICKERS_FILE, "".join(f"{t}\n" for t in self._tickers).encode("utf-8"))
+
+    def _ticker_id(self, ticker: str) -> int | None:
+        """Id of a full listing name, or of the only listing of a bare ticker."""
+        self._load_dictionary()
+        ticker_id = self._ticker_ids.get(ticker)
+        if ticker_id is not None or ":" in ticker:
+            return ticker_id
+        listings = [name for name in self._tickers if name.endswith(f":{ticker}")]
+        if len(listings) > 1:
+            raise ValueError(f"{ticker} is listed on several exchanges, use one of {', '.join(listings)}")
+        return self._ticker_ids[listings[0]] if listings else None
+
+    @property
+    def tickers(self) -> list[str]:
+        self._load_dictionary()
+        return list(self._tickers)
+
+    # -- segments -----------------------------------------------------------
+
+    def scan_dates(self) -> list[str]:
+        """All scan dates in the store, oldest first."""
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(
+            name[: -len(SEGMENT_SUFFIX)]
+            for name in os.listdir(self.path)
+            if name.endswith(SEGMENT_SUFFIX)
+        )
+
+    def _segment(self, scan_date: str) -> Segment:
+        cached = self._segments.get(scan_date)
+        if cached is not None:
+            return cached
+
+        with open(os.path.join(self.path, scan_date + SEGMENT_SUFFIX), "rb") as fh:
+            header = json.loads(fh.readline())
+            body = fh.read()
+
+        columns: dict[str, array] = {}
+        offset = 0
+        for name, typecode, length in header["columns"]:
+            columns[name] = _decode_column(typecode, body[offset:offset + length])
+            offset += length
+
+        segment = Segment(scan_date=scan_date, columns=columns)
+        self._segments[scan_date] = segment
+        return segment
+
+    def _iter_segments(self, start: str | None = None, end: str | None = None) -> Iterable[Segment]:
+        for scan_date in self.scan_dates():
+            if start is not None and scan_date < start:
+                continue
+            if end is not None and scan_date > end:
+                continue
+            yield self._segment(scan_date)
+
+    def append(self, scan_date: str, records: list[LeaderRecord]) -> int:
+        """
+        Store the ranked universe of one scan. Returns the number of rows
+        written. An existing segment for the same date is replaced.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        self._load_dictionary()
+
+        dictionary_changed = False
+        rows: dict[int, LeaderRecord] = {}
+        for record in records:
+            name = listing_name(record)
+            ticker_id = self._ticker_ids.get(name)
+            if ticker_id is None:
+                ticker_id = len(self._tickers)
+                self._tickers.append(name)
+                self._ticker_ids[name] = ticker_id
+                dictionary_changed = True
+            rows[ticker_id] = record
+
+        if dictionary_changed:
+            self._save_dictionary()
+
+        ordered_ids = sorted(rows)
+        columns: dict[str, array] = {"ticker_id": array(COLUMNS["ticker_id"], ordered_ids)}
+        for name in VALUE_COLUMNS:
+            columns[name] = array(COLUMNS[name], (getattr(rows[i], name) for i in ordered_ids))
+
+        blobs = [(name, COLUMNS[name], _encode_column(values)) for name, values in columns.items()]
+        header = {
+            "version": FORMAT_VERSION,
+            "scan_date": scan_date,
+            "rows": len(ordered_ids),
+            "columns": [[name, typecode, len(blob)] for name, typecode, blob in blobs],
+        }
+        content = json.dumps(header).encode("utf-8") + b"\n" + b"".join(blob for _, _, blob in blobs)
+        self._write_atomic(scan_date + SEGMENT_SUFFIX, content)
+
+        self._segments[scan_date] = Segment(scan_date=scan_date, columns=columns)
+        return len(ordered_ids)
+
+    def _write_atomic(self, name: str, content: bytes) -> None:
+        target = os.path.join(self.path, name)
+        tmp = target + ".tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(content)
+        os.replace(tmp, target)
+
+    # -- queries ------------------------------------------------------------
+
+    def rank_trajectory(
+        self,
+        ticker: str,
+        start: str | None = None,
+        end: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Ranks of `ticker` on every scan date it was part of the universe."""
+        ticker_id = self._ticker_id(ticker)
+        if ticker_id is None:
+            return []
+
+        points: list[dict[str, Any]] = []
+        for segment in self._iter_segments(start, end):
+            idx = segment.find(ticker_id)
+            if idx is None:
+                continue
+            point: dict[str, Any] = {"scan_date": segment.scan_date}
+            for name in VALUE_COLUMNS:
+                point[name] = segment.columns[name][idx]
+            points.append(point)
+        return points
+
+    def first_leader_date(self, ticker: str, threshold: float = LEADER_PERCENTILE) -> str | None:
+        """First scan date on which `ticker` had rs_score >= threshold."""
+        ticker_id = self._ticker_id(ticker)
+        if ticker_id is None:
+            return None
+        for segment in self._iter_segments():
+            idx = segment.find(ticker_id)
+            scores = segment.columns["rs_score"]
+            if idx is not None and scores[idx] >= threshold:
+                return segment.scan_date
+        return None
+
+    def first_leader_dates(self, threshold: float = LEADER_PERCENTILE) -> dict[str, str]:
+        """`first_leader_date` for every ticker, computed in one pass."""
+        self._load_dictionary()
+        first: dict[int, str] = {}
+        for segment in self._iter_segments():
+            ids = segment.columns["ticker_id"]
+            scores = segment.columns["rs_score"]
+            for idx, score in enumerate(scores):
+                if score >= threshold and ids[idx] not in first:
+                    first[ids[idx]] = segment.scan_date
+        return {self._tickers[i]: d for i, d in first.items()}
+
+    def _weekly_leader_sets(self, threshold: float) -> list[tuple[tuple[int, int], set[int]]]:
+        """
+        Leaders of the last scan of each ISO week, most recent week first.
+        A week's membership is decided by its closing scan so intra-week
+        re-runs do not inflate streaks.
+        """
+        last_scan_of_week: dict[tuple[int, int], str] = {}
+        for scan_date in self.scan_dates():
+            last_scan_of_week[_iso_week(scan_date)] = scan_date
+
+        weeks: list[tuple[tuple[int, int], set[int]]] = []
+        for week in sorted(last_scan_of_week, reverse=True):
+            segment = self._segment(last_scan_of_week[week])
+            ids = segment.columns["ticker_id"]
+            scores = segment.columns["rs_score"]
+            leaders = {ids[i] for i, score in enumerate(scores) if score >= threshold}
+            weeks.append((week, leaders))
+        return weeks
+
+    def leader_streaks(self, threshold: float = LEADER_PERCENTILE) -> dict[str, int]:
+        """
+        Consecutive weeks in the top 2%, ending at the most recent week in
+        the store, for every current leader. A week without any scan breaks
+        the streak.
+        """
+        self._load_dictionary()
+        weeks = self._weekly_leader_sets(threshold)
+        if not weeks:
+            return {}
+
+        latest_week, active = weeks[0]
+        streaks = {ticker_id: 1 for ticker_id in active}
+        previous_week = latest_week
+        for week, leaders in weeks[1:]:
+            if not _weeks_are_consecutive(previous_week, week):
+                break
+            active = active & leaders
+            if not active:
+                break
+            for ticker_id in active:
+                streaks[ticker_id] += 1
+            previous_week = week
+
+        return {self._tickers[i]: n for i, n in streaks.items()}
+
+    def leader_streak(self, ticker: str, threshold: float = LEADER_PERCENTILE) -> int:
+        """Consecutive weeks `ticker` has been in the top 2% (0 if not a leader now)."""
+        ticker_id = self._ticker_id(ticker)
+        if ticker_id is None:
+            return 0
+        return self.leader_streaks(threshold).get(self._tickers[ticker_id], 0)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Leader Scan — query the ranked history")
+    parser.add_argument("--history-dir", required=True)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    first = sub.add_parser("first-leader", help="first date a ticker became a leader")
+    first.add_argument("ticker", nargs="?", help="EXCHANGE:TICKER, or a ticker listed on one exchange only")
+
+    sub.add_parser("streaks", help="consecutive weeks in the top 2% for current leaders")
+
+    trajectory = sub.add_parser("trajectory", help="rank trajectory of a ticker")
+    trajectory.add_argument("ticker", help="EXCHANGE:TICKER, or a ticker listed on one exchange only")
+    trajectory.add_argument("--start")
+    trajectory.add_argument("--end")
+
+    args = parser.parse_args()
+    store = HistoryStore(args.history_dir)
+
+    if args.command == "first-leader":
+        if args.ticker:
+            result: Any = {"ticker": args.ticker, "first_leader_date": store.first_leader_date(args.ticker)}
+        else:
+            result = store.first_leader_dates()
+    elif args.command == "streaks":
+        result = store.leader_streaks()
+    else:
+        result = store.rank_trajectory(args.ticker, args.start, args.end)
+
+    json.dump(result, sys.stdout)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,21 +8,62 @@ ranked by RS_score = max(percentile_rank_1M, percentile_rank_3M, percentile_rank
 Usage:
     python main.py --format json
     python main.py --format json --min-dollar-volume 10000000 --min-adr 5
+    python main.py --format json --markets america,canada,uk,europe --global
+
+With several --markets, universes are fetched concurrently and ranked within
+each market. The payload's top-level fields describe the first market, as for
+a single-market run; `markets` holds every market's result, and `global` (with
+--global) ranks all markets together. Liquidity thresholds apply in each
+market's own currency.
+
+Each market's payload also ranks its sector and industry groups (median
+RS_score, group RS, leader count; see python-common/group_ranks.py), with rank
+changes since the previous scan kept in the history directory.
+
+Every run also appends each market's full ranked universe to the columnar
+history in --history-dir (see history_store.py; markets other than america
+in a subdirectory of that name); pass --no-history to skip it.
+
+With --output leaders.csv (or .parquet) the leader rows of every ranking
+are written to that file for a bulk load, one row per (ranking, leader)
+where ranking is a market or "global", and stdout carries only a JSON
+manifest with the scan date and each ranking's counts (see
+python-common/bulk_export.py).
+
+Payloads are cached per US market session in --cache-dir (see
+python-common/result_cache.py): a rerun before the next close returns the
+stored payload without fetching. --refresh recomputes, --no-cache bypasses.
 """
 
 import argparse
 import json
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
+from typing import Any
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python-common"))
 
+import bulk_export
+import result_cache
+import run_report
+from history_store import HistoryStore
 from ranking_service import (
     DEFAULT_MIN_ADR,
     DEFAULT_MIN_DOLLAR_VOLUME,
+    LeaderRecord,
+    UniverseRow,
     filter_universe,
-    rank_and_select_leaders,
+    rank_groups,
+    rank_universe,
     record_to_dict,
+    select_leaders,
 )
-from tradingview_screener_client import fetch_universe
+from tradingview_screener_client import MARKETS, fetch_universe
+
+DEFAULT_HISTORY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "history")
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cache")
 
 
 def main() -> int:
@@ -30,44 +71,181 @@ def main() -> int:
     parser.add_argument("--format", choices=["json", "text"], default="json")
     parser.add_argument("--min-dollar-volume", type=float, default=DEFAULT_MIN_DOLLAR_VOLUME)
     parser.add_argument("--min-adr", type=float, default=DEFAULT_MIN_ADR)
+    parser.add_argument(
+        "--markets",
+        type=parse_markets,
+        default=["america"],
+        help=f"Comma separated markets to scan, ranked separately ({', '.join(MARKETS)}; default: america)",
+    )
+    parser.add_argument("--global", dest="global_rank", action="store_true", help="Also rank all markets together")
+    parser.add_argument("--history-dir", default=DEFAULT_HISTORY_DIR)
+    parser.add_argument("--no-history", action="store_true")
     parser.add_argument("--quiet", action="store_true")
+    bulk_export.add_arguments(parser)
+    result_cache.add_arguments(parser, DEFAULT_CACHE_DIR)
+    run_report.add_arguments(parser)
     args = parser.parse_args()
 
-    if not args.quiet:
-        print("Leader Scan starting…", file=sys.stderr)
+    with run_report.run("leader_scan", args):
+        return run(args)
+
+
+def parse_markets(value: str) -> list[str]:
+    markets = list(dict.fromkeys(m.strip() for m in value.split(",") if m.strip()))
+    unknown = [m for m in markets if m not in MARKETS]
+    if not markets or unknown:
+        raise argparse.ArgumentTypeError(f"unknown market(s): {', '.join(unknown) or value}; choose from {', '.join(MARKETS)}")
+    return markets
 
-    universe = fetch_universe()
-    if not args.quiet:
-        print(f"Fetched {len(universe)} tickers from TradingView", file=sys.stderr)
 
-    filtered = filter_universe(universe, args.min_dollar_volume, args.min_adr)
+def scan_market(market: str, args: argparse.Namespace) -> list[UniverseRow]:
+    """Fetch and filter one market's universe."""
+    with run_report.stage(f"fetch_universe.{market}"):
+        universe = fetch_universe(market)
     if not args.quiet:
-        print(f"Filtered universe: {len(filtered)} tickers", file=sys.stderr)
+        print(f"[{market}] Fetched {len(universe)} tickers from TradingView", file=sys.stderr)
 
-    leaders = rank_and_select_leaders(filtered)
+    with run_report.stage("filter"):
+        filtered = filter_universe(universe, args.min_dollar_volume, args.min_adr, MARKETS[market].price_scale)
     if not args.quiet:
-        print(f"Leaders: {len(leaders)}", file=sys.stderr)
+        print(f"[{market}] Filtered universe: {len(filtered)} tickers", file=sys.stderr)
+    return filtered
 
-    payload = {
-        "scan_date": date.today().isoformat(),
+
+def market_payload(
+    filtered: list[UniverseRow],
+    leaders: list[LeaderRecord],
+    groups: dict[str, list[dict[str, Any]]] | None = None,
+) -> dict[str, Any]:
+    return {
         "universe_size": len(filtered),
         "leader_count": len(leaders),
         "results": [record_to_dict(r) for r in leaders],
+        "groups": groups or {"sector": [], "industry": []},
+    }
+
+
+def run(args: argparse.Namespace) -> int:
+    if not args.quiet:
+        print("Leader Scan starting…", file=sys.stderr)
+
+    # Scanner data only moves with a new close: within a market session the
+    # stored payload is returned as is. Runs where a market failed are not kept.
+    cache = result_cache.ResultCache(args.cache_dir, "leader_scan")
+    params = {
+        "markets": args.markets,
+        "global": args.global_rank,
+        "min_dollar_volume": args.min_dollar_volume,
+        "min_adr": args.min_adr,
     }
+    payload, hit = cache.cached(
+        params,
+        lambda: build_payload(args),
+        args,
+        storable=lambda p: not any("error" in m for m in p["markets"].values()),
+    )
+    if hit and not args.quiet:
+        print(f"Using the cached result of this market session ({payload['scan_date']})", file=sys.stderr)
 
-    if args.format == "json":
+    if args.output:
+        with run_report.stage("export"):
+            manifest = export_payload(args.output, payload)
+        json.dump(manifest, sys.stdout)
+        sys.stdout.write("\n")
+    elif args.format == "json":
         json.dump(payload, sys.stdout)
         sys.stdout.write("\n")
     else:
-        for r in leaders:
-            print(
-                f"{r.ticker:<8} {r.sector:<24} rs={r.rs_score:.3f} "
-                f"1M={r.perf_1m:+.2%} 3M={r.perf_3m:+.2%} 6M={r.perf_6m:+.2%} "
-                f"ADR={r.adr_20:.2f}"
-            )
+        sections = [(m, payload["markets"][m]["results"]) for m in args.markets]
+        if args.global_rank:
+            sections.append(("global", payload["global"]["results"]))
+        for name, results in sections:
+            if len(sections) > 1:
+                print(f"== {name} ==")
+            for r in results:
+                print(
+                    f"{r['ticker']:<8} {r['sector']:<24} rs={r['rs_score']:.3f} "
+                    f"1M={r['perf_1m']:+.2%} 3M={r['perf_3m']:+.2%} 6M={r['perf_6m']:+.2%} "
+                    f"ADR={r['adr_20']:.2f}"
+                )
 
     return 0
 
 
+def export_payload(path: str, payload: dict[str, Any]) -> dict[str, Any]:
+    """Write every ranking's leaders to `path`; returns the manifest."""
+    rankings = {**payload["markets"], **({"global": payload["global"]} if "global" in payload else {})}
+    rows = []
+    for ranking, section in rankings.items():
+        for result in section["results"]:
+            rows.append({"ranking": ranking, "market": result.get("market", ranking), **result})
+    summary = {
+        ranking: {key: value for key, value in section.items() if key != "results"}
+        for ranking, section in rankings.items()
+    }
+    return bulk_export.export(path, rows, scan_date=payload["scan_date"], rankings=summary)
+
+
+def build_payload(args: argparse.Namespace) -> dict[str, Any]:
+    # Markets are fetched concurrently; a market that fails is reported in
+    # its own entry and does not stop the others.
+    universes: dict[str, list[UniverseRow]] = {}
+    errors: dict[str, str] = {}
+    with run_report.stage("fetch_universe"), ThreadPoolExecutor(max_workers=len(args.markets)) as pool:
+        futures = {market: pool.submit(scan_market, market, args) for market in args.markets}
+        for market, future in futures.items():
+            try:
+                universes[market] = future.result()
+            except Exception as error:
+                errors[market] = str(error)
+                if not args.quiet:
+                    print(f"[{market}] Failed: {error}", file=sys.stderr)
+    if not universes:
+        raise RuntimeError("; ".join(f"{m}: {e}" for m, e in errors.items()))
+
+    scan_date = date.today().isoformat()
+    markets: dict[str, dict[str, Any]] = {}
+    for market in args.markets:
+        if market in errors:
+            markets[market] = {"error": errors[market], **market_payload([], [])}
+            continue
+
+        filtered = universes[market]
+        # america keeps the history directory root used by single-market runs
+        history = None
+        if args.history_dir:
+            history = HistoryStore(args.history_dir if market == "america" else os.path.join(args.history_dir, market))
+        with run_report.stage("rank"):
+            ranked = rank_universe(filtered)
+            leaders = select_leaders(ranked)
+            groups = rank_groups(ranked, history.group_ranks.previous(scan_date) if history else None)
+        if not args.quiet:
+            print(f"[{market}] Leaders: {len(leaders)}", file=sys.stderr)
+
+        if history and not args.no_history:
+            with run_report.stage("history_append"):
+                written = history.append(scan_date, ranked)
+                history.group_ranks.save(scan_date, groups)
+            if not args.quiet:
+                print(f"[{market}] History: appended {written} rows for {scan_date}", file=sys.stderr)
+
+        markets[market] = market_payload(filtered, leaders, groups)
+
+    payload: dict[str, Any] = {"scan_date": scan_date, **markets[args.markets[0]], "markets": markets}
+
+    if args.global_rank:
+        combined = [row for rows in universes.values() for row in rows]
+        row_markets = [market for market, rows in universes.items() for _ in rows]
+        with run_report.stage("rank_global"):
+            ranked = rank_universe(combined)
+        market_of = {id(record): market for record, market in zip(ranked, row_markets)}
+        leaders = select_leaders(ranked)
+        payload["global"] = market_payload(combined, leaders, rank_groups(ranked))
+        for result, record in zip(payload["global"]["results"], leaders):
+            result["market"] = market_of[id(record)]
+
+    return payload
+
+
 if __name__ == "__main__":
     sys.exit(main())
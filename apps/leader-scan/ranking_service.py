@@ -7,18 +7,46 @@ top 2% by RS_score = max(rank_1M, rank_3M, rank_6M).
 
 The ranking window (`max` of three percentiles) is a deliberate choice
 inherited from Qullamaggie — see Leader-Scan-Spec.md for rationale.
+
+rank_groups() aggregates the same ranked universe by sector and industry
+(see python-common/group_ranks.py).
 """
 
+import os
+import sys
 from dataclasses import dataclass, asdict
 from typing import Any
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python-common"))
+
+import group_ranks
+
 SMALL_SIZE_PRICE_THRESHOLD = 5.0
 DEFAULT_MIN_DOLLAR_VOLUME = 5_000_000.0
 DEFAULT_MIN_ADR = 3.0
 LEADER_PERCENTILE = 0.98
 
 
-@dataclass
+@dataclass(slots=True)
+class UniverseRow:
+    """
+    The fields of a scanner row that ranking reads. Filtering keeps these
+    instead of the raw row dicts; exchange, sector and industry are interned,
+    so each distinct value is stored once across the universe.
+    """
+    ticker: str
+    exchange: str
+    sector: str
+    close: float
+    avg_volume: float
+    adr: float
+    perf_1m: float
+    perf_3m: float
+    perf_6m: float
+    industry: str = ""
+
+
+@dataclass(slots=True)
 class LeaderRecord:
     ticker: str
     exchange: str
@@ -36,6 +64,7 @@ class LeaderRecord:
     top_3m_flag: bool
     top_6m_flag: bool
     small_size_flag: bool
+    industry: str = ""
 
 
 def _as_float(value: Any) -> float | None:
@@ -74,14 +103,19 @@ def filter_universe(
     universe: list[dict[str, Any]],
     min_dollar_volume: float = DEFAULT_MIN_DOLLAR_VOLUME,
     min_adr: float = DEFAULT_MIN_ADR,
-) -> list[dict[str, Any]]:
+    price_scale: float = 1.0,
+) -> list[UniverseRow]:
     """
     Keep rows with liquidity >= min_dollar_volume, ADR >= min_adr, and all
     three performance windows present (excludes IPOs < 126 days).
+    Prices are multiplied by `price_scale` first, so liquidity is measured
+    in the market's major currency unit (0.01 for markets quoted in pence).
     """
-    kept: list[dict[str, Any]] = []
+    kept: list[UniverseRow] = []
     for row in universe:
         close = _as_float(row.get("close"))
+        if close is not None:
+            close *= price_scale
         avg_volume = _as_float(row.get("average_volume_10d_calc"))
         adr = _as_float(row.get("ADR"))
         perf_1m = _as_float(row.get("Perf.1M"))
@@ -95,61 +129,90 @@ def filter_universe(
         if close * avg_volume < min_dollar_volume:
             continue
 
-        row["_close"] = close
-        row["_avg_volume"] = avg_volume
-        row["_adr"] = adr
-        row["_perf_1m"] = perf_1m
-        row["_perf_3m"] = perf_3m
-        row["_perf_6m"] = perf_6m
-        kept.append(row)
+        kept.append(
+            UniverseRow(
+                ticker=row["ticker"],
+                exchange=sys.intern(row.get("exchange", "") or ""),
+                sector=sys.intern(row.get("sector", "") or ""),
+                close=close,
+                avg_volume=avg_volume,
+                adr=adr,
+                perf_1m=perf_1m,
+                perf_3m=perf_3m,
+                perf_6m=perf_6m,
+                industry=sys.intern(row.get("industry", "") or ""),
+            )
+        )
     return kept
 
 
-def rank_and_select_leaders(filtered: list[dict[str, Any]]) -> list[LeaderRecord]:
-    """Compute RS_score on the filtered universe and return the top 2%."""
+def rank_universe(filtered: list[UniverseRow]) -> list[LeaderRecord]:
+    """
+    Compute percentile ranks and RS_score for every row of the filtered
+    universe, in input order. Leaders are the subset with rs_score >= 0.98.
+    """
     if not filtered:
         return []
 
-    perf_1m = [r["_perf_1m"] for r in filtered]
-    perf_3m = [r["_perf_3m"] for r in filtered]
-    perf_6m = [r["_perf_6m"] for r in filtered]
-
-    rank_1m = _percentile_ranks(perf_1m)
-    rank_3m = _percentile_ranks(perf_3m)
-    rank_6m = _percentile_ranks(perf_6m)
+    rank_1m = _percentile_ranks([r.perf_1m for r in filtered])
+    rank_3m = _percentile_ranks([r.perf_3m for r in filtered])
+    rank_6m = _percentile_ranks([r.perf_6m for r in filtered])
 
     records: list[LeaderRecord] = []
     for idx, row in enumerate(filtered):
         r1, r3, r6 = rank_1m[idx], rank_3m[idx], rank_6m[idx]
         rs = max(r1, r3, r6)
-        if rs < LEADER_PERCENTILE:
-            continue
 
-        dollar_volume = row["_close"] * row["_avg_volume"]
         records.append(
             LeaderRecord(
-                ticker=row["ticker"],
-                exchange=row.get("exchange", "") or "",
-                sector=row.get("sector", "") or "",
-                perf_1m=row["_perf_1m"] / 100.0,
-                perf_3m=row["_perf_3m"] / 100.0,
-                perf_6m=row["_perf_6m"] / 100.0,
+                ticker=row.ticker,
+                exchange=row.exchange,
+                sector=row.sector,
+                perf_1m=row.perf_1m / 100.0,
+                perf_3m=row.perf_3m / 100.0,
+                perf_6m=row.perf_6m / 100.0,
                 rank_1m=r1,
                 rank_3m=r3,
                 rank_6m=r6,
                 rs_score=rs,
-                adr_20=row["_adr"],
-                dollar_volume_20=dollar_volume,
+                adr_20=row.adr,
+                dollar_volume_20=row.close * row.avg_volume,
                 top_1m_flag=r1 >= LEADER_PERCENTILE,
                 top_3m_flag=r3 >= LEADER_PERCENTILE,
                 top_6m_flag=r6 >= LEADER_PERCENTILE,
-                small_size_flag=row["_close"] < SMALL_SIZE_PRICE_THRESHOLD,
+                small_size_flag=row.close < SMALL_SIZE_PRICE_THRESHOLD,
+                industry=row.industry,
             )
         )
-
-    records.sort(key=lambda r: r.rs_score, reverse=True)
     return records
 
 
+def select_leaders(ranked: list[LeaderRecord]) -> list[LeaderRecord]:
+    """Keep the top 2% of an already-ranked universe, best RS_score first."""
+    leaders = [r for r in ranked if r.rs_score >= LEADER_PERCENTILE]
+    leaders.sort(key=lambda r: r.rs_score, reverse=True)
+    return leaders
+
+
+def rank_and_select_leaders(filtered: list[UniverseRow]) -> list[LeaderRecord]:
+    """Compute RS_score on the filtered universe and return the top 2%."""
+    return select_leaders(rank_universe(filtered))
+
+
+def rank_groups(
+    ranked: list[LeaderRecord],
+    previous: dict[str, dict[str, int]] | None = None,
+) -> dict[str, list[dict[str, Any]]]:
+    """
+    Sector and industry groups of a ranked universe, scored by rs_score,
+    with leaders as select_leaders() picks them. `previous` holds an earlier
+    run's ranks (see group_ranks.GroupRankStore).
+    """
+    return group_ranks.rank_groups(
+        (group_ranks.GroupMember(r.sector, r.industry, r.rs_score, r.rs_score >= LEADER_PERCENTILE) for r in ranked),
+        previous,
+    )
+
+
 def record_to_dict(record: LeaderRecord) -> dict[str, Any]:
     return asdict(record)
@@ -0,0 +1,124 @@
+"""Unit tests for history_store."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+
+from history_store import HistoryStore
+from ranking_service import LEADER_PERCENTILE, LeaderRecord, select_leaders
+
+
+def _record(ticker: str, rs_score: float, rank_1m: float = 0.5, adr: float = 5.0, exchange: str = "NASDAQ") -> LeaderRecord:
+    return LeaderRecord(
+        ticker=ticker,
+        exchange=exchange,
+        sector="Technology",
+        perf_1m=0.1,
+        perf_3m=0.2,
+        perf_6m=0.3,
+        rank_1m=rank_1m,
+        rank_3m=0.5,
+        rank_6m=0.5,
+        rs_score=rs_score,
+        adr_20=adr,
+        dollar_volume_20=25_000_000.0,
+        top_1m_flag=False,
+        top_3m_flag=False,
+        top_6m_flag=False,
+        small_size_flag=False,
+    )
+
+
+class TestAppend:
+    def test_roundtrip_through_a_fresh_store(self, tmp_path):
+        HistoryStore(str(tmp_path)).append("2026-01-05", [_record("AAA", 0.99, adr=7.5)])
+
+        points = HistoryStore(str(tmp_path)).rank_trajectory("AAA")
+        assert len(points) == 1
+        assert points[0]["scan_date"] == "2026-01-05"
+        assert abs(points[0]["rs_score"] - 0.99) < 1e-6
+        assert points[0]["adr_20"] == 7.5
+
+    def test_tickers_are_dictionary_encoded_once(self, tmp_path):
+        store = HistoryStore(str(tmp_path))
+        store.append("2026-01-05", [_record("AAA", 0.5), _record("BBB", 0.6)])
+        store.append("2026-01-06", [_record("BBB", 0.7), _record("CCC", 0.8)])
+        assert HistoryStore(str(tmp_path)).tickers == ["NASDAQ:AAA", "NASDAQ:BBB", "NASDAQ:CCC"]
+
+    def test_listings_sharing_a_ticker_keep_separate_histories(self, tmp_path):
+        store = HistoryStore(str(tmp_path))
+        store.append("2026-01-05", [_record("SAP", 0.99, exchange="XETR"), _record("SAP", 0.40, exchange="SIX")])
+
+        assert store.first_leader_dates() == {"XETR:SAP": "2026-01-05"}
+        assert store.rank_trajectory("SIX:SAP")[0]["rs_score"] == 0.40
+        with pytest.raises(ValueError):
+            store.rank_trajectory("SAP")
+
+    def test_same_date_replaces_segment(self, tmp_path):
+        store = HistoryStore(str(tmp_path))
+        store.append("2026-01-05", [_record("AAA", 0.5)])
+        store.append("2026-01-05", [_record("AAA", 0.9)])
+        points = HistoryStore(str(tmp_path)).rank_trajectory("AAA")
+        assert len(points) == 1
+        assert abs(points[0]["rs_score"] - 0.9) < 1e-6
+
+
+class TestQueries:
+    def test_first_leader_date(self, tmp_path):
+        store = HistoryStore(str(tmp_path))
+        store.append("2026-01-05", [_record("AAA", 0.5), _record("BBB", 0.99)])
+        store.append("2026-01-12", [_record("AAA", 0.985), _record("BBB", 0.99)])
+        assert store.first_leader_date("AAA") == "2026-01-12"
+        assert store.first_leader_date("BBB") == "2026-01-05"
+        assert store.first_leader_date("ZZZ") is None
+        assert store.first_leader_dates() == {"NASDAQ:AAA": "2026-01-12", "NASDAQ:BBB": "2026-01-05"}
+
+    def test_streak_counts_consecutive_weeks_ending_now(self, tmp_path):
+        store = HistoryStore(str(tmp_path))
+        store.append("2026-01-05", [_record("AAA", 0.99), _record("BBB", 0.99)])
+        store.append("2026-01-12", [_record("AAA", 0.50), _record("BBB", 0.99)])
+        store.append("2026-01-19", [_record("AAA", 0.99), _record("BBB", 0.99)])
+        assert store.leader_streaks() == {"NASDAQ:AAA": 1, "NASDAQ:BBB": 3}
+        assert store.leader_streak("BBB") == 3
+        assert store.leader_streak("NASDAQ:BBB") == 3
+
+    def test_leaders_match_select_leaders_at_the_threshold(self, tmp_path):
+        # Just below the threshold would round up to it in float32
+        records = [_record("AT", LEADER_PERCENTILE), _record("BELOW", LEADER_PERCENTILE - 1e-9)]
+        store = HistoryStore(str(tmp_path))
+        store.append("2026-01-05", records)
+
+        leaders = {f"NASDAQ:{r.ticker}" for r in select_leaders(records)}
+        assert set(HistoryStore(str(tmp_path)).first_leader_dates()) == leaders == {"NASDAQ:AT"}
+        assert set(store.leader_streaks()) == leaders
+
+    def test_streak_uses_last_scan_of_each_week(self, tmp_path):
+        store = HistoryStore(str(tmp_path))
+        store.append("2026-01-05", [_record("AAA", 0.99)])
+        store.append("2026-01-09", [_record("AAA", 0.50)])
+        store.append("2026-01-12", [_record("AAA", 0.99)])
+        assert store.leader_streak("AAA") == 1
+
+    def test_missing_week_breaks_streak(self, tmp_path):
+        store = HistoryStore(str(tmp_path))
+        store.append("2026-01-05", [_record("AAA", 0.99)])
+        store.append("2026-01-19", [_record("AAA", 0.99)])
+        assert store.leader_streak("AAA") == 1
+
+    def test_rank_trajectory_respects_date_bounds(self, tmp_path):
+        store = HistoryStore(str(tmp_path))
+        for day, rank in (("2026-01-05", 0.1), ("2026-01-06", 0.2), ("2026-01-07", 0.3)):
+            store.append(day, [_record("AAA", rank, rank_1m=rank)])
+        points = store.rank_trajectory("AAA", start="2026-01-06", end="2026-01-06")
+        assert [p["scan_date"] for p in points] == ["2026-01-06"]
+        assert abs(points[0]["rank_1m"] - 0.2) < 1e-6
+
+    def test_empty_store(self, tmp_path):
+        store = HistoryStore(str(tmp_path / "missing"))
+        assert store.scan_dates() == []
+        assert store.leader_streaks() == {}
+        assert store.rank_trajectory("AAA") == []
+
@@ -0,0 +1,164 @@
+"""Tests for the multi-market run in main."""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+
+import main
+from history_store import HistoryStore
+
+
+def _universe(prefix: str, size: int = 100, perf_offset: float = 0.0) -> list[dict]:
+    return [
+        {
+            "ticker": f"{prefix}{i}",
+            "exchange": prefix,
+            "sector": "Technology",
+            "close": 20.0,
+            "average_volume_10d_calc": 1_000_000,
+            "ADR": 5.0,
+            "Perf.1M": perf_offset + i,
+            "Perf.3M": 0.0,
+            "Perf.6M": 0.0,
+        }
+        for i in range(size)
+    ]
+
+
+def _args(
+    markets: list[str],
+    global_rank: bool = False,
+    cache_dir: str = "",
+    output: str | None = None,
+    history_dir: str = "",
+) -> argparse.Namespace:
+    return argparse.Namespace(
+        format="json",
+        min_dollar_volume=main.DEFAULT_MIN_DOLLAR_VOLUME,
+        min_adr=main.DEFAULT_MIN_ADR,
+        markets=markets,
+        global_rank=global_rank,
+        history_dir=history_dir,
+        no_history=not history_dir,
+        quiet=True,
+        cache_dir=cache_dir,
+        no_cache=not cache_dir,
+        refresh=False,
+        output=output,
+    )
+
+
+def _run(monkeypatch, capsys, args: argparse.Namespace, fetch) -> dict:
+    monkeypatch.setattr(main, "fetch_universe", fetch)
+    assert main.run(args) == 0
+    return json.loads(capsys.readouterr().out)
+
+
+def test_single_market_payload_keeps_top_level_fields(monkeypatch, capsys):
+    payload = _run(monkeypatch, capsys, _args(["america"]), lambda market: _universe("US"))
+    assert payload["universe_size"] == 100
+    assert payload["leader_count"] == len(payload["results"]) > 0
+    assert payload["markets"]["america"]["results"] == payload["results"]
+    assert "global" not in payload
+
+
+def test_markets_are_ranked_separately_and_globally(monkeypatch, capsys):
+    universes = {"america": _universe("AM", 100), "canada": _universe("CA", 50, perf_offset=49.5)}
+    payload = _run(monkeypatch, capsys, _args(["america", "canada"], global_rank=True), universes.get)
+    assert payload["markets"]["canada"]["universe_size"] == 50
+    assert payload["markets"]["canada"]["results"][0]["ticker"] == "CA49"
+    assert payload["global"]["universe_size"] == 150
+    markets = {r["ticker"]: r["market"] for r in payload["global"]["results"]}
+    assert markets == {"AM99": "america", "CA49": "canada", "AM98": "america"}
+
+
+def test_markets_are_fetched_concurrently(monkeypatch, capsys):
+    def slow_fetch(market):
+        time.sleep(0.3)
+        return _universe(market[:2].upper())
+
+    started = time.perf_counter()
+    payload = _run(monkeypatch, capsys, _args(["america", "canada", "uk", "europe"]), slow_fetch)
+    assert time.perf_counter() - started < 0.9
+    assert set(payload["markets"]) == {"america", "canada", "uk", "europe"}
+
+
+def test_failed_market_is_reported_without_stopping_others(monkeypatch, capsys):
+    def fetch(market):
+        if market == "uk":
+            raise RuntimeError("scanner down")
+        return _universe("US")
+
+    payload = _run(monkeypatch, capsys, _args(["america", "uk"]), fetch)
+    assert payload["markets"]["uk"]["error"] == "scanner down"
+    assert payload["markets"]["uk"]["results"] == []
+    assert payload["markets"]["america"]["leader_count"] > 0
+
+
+def test_same_session_reuses_cached_payload(monkeypatch, capsys, tmp_path):
+    calls = []
+
+    def fetch(market):
+        calls.append(market)
+        return _universe("US")
+
+    first = _run(monkeypatch, capsys, _args(["america"], cache_dir=str(tmp_path)), fetch)
+    second = _run(monkeypatch, capsys, _args(["america"], cache_dir=str(tmp_path)), fetch)
+    assert second == first
+    assert calls == ["america"]
+
+
+def test_partial_failure_is_not_cached(monkeypatch, capsys, tmp_path):
+    def fetch(market):
+        if market == "uk":
+            raise RuntimeError("scanner down")
+        return _universe("US")
+
+    _run(monkeypatch, capsys, _args(["america", "uk"], cache_dir=str(tmp_path)), fetch)
+    payload = _run(monkeypatch, capsys, _args(["america", "uk"], cache_dir=str(tmp_path)), lambda market: _universe("US"))
+    assert "error" not in payload["markets"]["uk"]
+
+
+def test_output_writes_rows_and_prints_a_manifest(monkeypatch, capsys, tmp_path):
+    universes = {"america": _universe("AM", 100), "canada": _universe("CA", 50)}
+    path = tmp_path / "leaders.csv"
+    manifest = _run(monkeypatch, capsys, _args(["america", "canada"], global_rank=True, output=str(path)), universes.get)
+
+    assert manifest["output"] == str(path)
+    assert manifest["rankings"]["america"]["leader_count"] == 2
+    assert "results" not in manifest["rankings"]["global"]
+    with open(path, encoding="utf-8") as fh:
+        lines = fh.read().splitlines()
+    assert lines[0].startswith("ranking,market,ticker,")
+    assert len(lines) - 1 == manifest["rows"] == sum(r["leader_count"] for r in manifest["rankings"].values())
+    assert sum(line.startswith('"global",') for line in lines) == manifest["rankings"]["global"]["leader_count"]
+
+
+def test_history_is_written_per_market_under_listing_names(monkeypatch, capsys, tmp_path):
+    # Two European exchanges list the same tickers
+    europe = [{**row, "exchange": exchange} for exchange in ("XETR", "SIX") for row in _universe("EU", 50)]
+    universes = {"america": _universe("AM", 100), "europe": europe}
+    payload = _run(monkeypatch, capsys, _args(["america", "europe"], history_dir=str(tmp_path)), universes.get)
+
+    america, europe_store = HistoryStore(str(tmp_path)), HistoryStore(str(tmp_path / "europe"))
+    assert len(america.tickers) == 100
+    assert len(europe_store.tickers) == 100
+    assert "XETR:EU7" in europe_store.tickers and "SIX:EU7" in europe_store.tickers
+
+    for store, market in ((america, "america"), (europe_store, "europe")):
+        scan_date = store.scan_dates()[-1]
+        assert scan_date == payload["scan_date"]
+        leaders = {f"{r['exchange']}:{r['ticker']}" for r in payload["markets"][market]["results"]}
+        assert set(store.leader_streaks()) == leaders
+        assert store.group_ranks.previous("9999-12-31")["sector"] == {"Technology": 1}
+
+
+def test_unknown_market_is_rejected():
+    with pytest.raises(argparse.ArgumentTypeError):
+        main.parse_markets("america,mars")
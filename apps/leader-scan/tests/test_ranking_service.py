@@ -11,6 +11,8 @@ from ranking_service import (
     LEADER_PERCENTILE,
     filter_universe,
     rank_and_select_leaders,
+    rank_groups,
+    rank_universe,
 )
 
 
@@ -24,11 +26,13 @@ def _row(
     perf_6m: float = 0.0,
     sector: str = "Technology",
     exchange: str = "NASDAQ",
+    industry: str = "",
 ) -> dict:
     return {
         "ticker": ticker,
         "exchange": exchange,
         "sector": sector,
+        "industry": industry,
         "close": close,
         "volume": avg_volume,
         "average_volume_10d_calc": avg_volume,
@@ -43,7 +47,7 @@ class TestFilterUniverse:
     def test_drops_rows_with_low_adr(self):
         rows = [_row("LOWADR", adr=2.0), _row("OKADR", adr=5.0)]
         filtered = filter_universe(rows)
-        assert [r["ticker"] for r in filtered] == ["OKADR"]
+        assert [r.ticker for r in filtered] == ["OKADR"]
 
     def test_drops_rows_with_low_dollar_volume(self):
         rows = [
@@ -51,7 +55,7 @@ class TestFilterUniverse:
             _row("LIQUID", close=20.0, avg_volume=1_000_000),  # $20M > $5M
         ]
         filtered = filter_universe(rows)
-        assert [r["ticker"] for r in filtered] == ["LIQUID"]
+        assert [r.ticker for r in filtered] == ["LIQUID"]
 
     def test_drops_rows_with_missing_performance(self):
         row = _row("NOPERF")
@@ -59,6 +63,13 @@ class TestFilterUniverse:
         filtered = filter_universe([row])
         assert filtered == []
 
+    def test_keeps_only_ranking_fields(self):
+        filtered = filter_universe([_row("OK", close=20.0, perf_1m=12.5)])
+        row = filtered[0]
+        assert (row.ticker, row.exchange, row.sector) == ("OK", "NASDAQ", "Technology")
+        assert (row.close, row.perf_1m) == (20.0, 12.5)
+        assert not hasattr(row, "__dict__")
+
     def test_custom_thresholds_are_respected(self):
         rows = [_row("MID", close=10.0, avg_volume=600_000, adr=4.0)]  # $6M, ADR 4
         assert len(filter_universe(rows, min_dollar_volume=5_000_000, min_adr=3.0)) == 1
@@ -122,6 +133,37 @@ class TestRankAndSelect:
         assert top.perf_1m == 9.9  # 990% / 100
 
 
+class TestRankGroups:
+    def _ranked(self):
+        rows = (
+            [_row(f"S{i}", perf_1m=50 + i, industry="Semiconductors") for i in range(5)]
+            + [_row(f"P{i}", perf_1m=i, sector="Health Technology", industry="Pharmaceuticals") for i in range(5)]
+            + [_row(f"O{i}", perf_1m=20 + i, industry="Packaged Software") for i in range(2)]
+        )
+        return rank_universe(filter_universe(rows))
+
+    def test_groups_ranked_by_median_rs_score(self):
+        groups = rank_groups(self._ranked())
+        industries = groups["industry"]
+        assert [g["name"] for g in industries] == ["Semiconductors", "Pharmaceuticals"]
+        assert [g["rank"] for g in industries] == [1, 2]
+        assert industries[0]["sector"] == "Technology"
+        assert industries[0]["members"] == 5
+        assert industries[0]["group_rs"] > industries[1]["group_rs"]
+        assert industries[0]["previous_rank"] is None and industries[0]["rank_change"] is None
+
+    def test_small_groups_are_left_out(self):
+        groups = rank_groups(self._ranked())
+        assert "Packaged Software" not in {g["name"] for g in groups["industry"]}
+        # Its members still count towards the sector
+        assert groups["sector"][0] == {**groups["sector"][0], "name": "Technology", "members": 7}
+
+    def test_rank_change_against_previous_ranks(self):
+        groups = rank_groups(self._ranked(), {"industry": {"Technology|Semiconductors": 2, "Health Technology|Pharmaceuticals": 1}})
+        changes = {g["name"]: g["rank_change"] for g in groups["industry"]}
+        assert changes == {"Semiconductors": 1, "Pharmaceuticals": -1}
+
+
 class TestDefaults:
     def test_defaults_match_spec(self):
         assert DEFAULT_MIN_DOLLAR_VOLUME == 5_000_000
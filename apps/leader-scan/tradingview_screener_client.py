@@ -1,21 +1,52 @@
 """
 TradingView Stock Screener client.
 
-Posts a scanner request to scanner.tradingview.com/america/scan and returns
-the full US universe with the columns needed to compute the Leader Scan:
-performance 1M/3M/6M, ADR, 20-day average volume, close, sector, exchange.
+Posts scanner requests to scanner.tradingview.com and returns a market's
+full universe with the columns needed to compute the Leader Scan:
+performance 1M/3M/6M, ADR, 20-day average volume, close, sector, industry,
+exchange.
+
+Markets are defined in MARKETS. A market may span several TradingView
+scanner markets (Europe is one per country); those are fetched with a
+single request to the global scanner.
 """
 
+from dataclasses import dataclass
 from typing import Any
-import requests
+
+from http_client import get_client
 
 SCANNER_URL = "https://scanner.tradingview.com/america/scan"
+GLOBAL_SCANNER_URL = "https://scanner.tradingview.com/global/scan"
+
+
+@dataclass(frozen=True)
+class Market:
+    name: str
+    scanner_markets: tuple[str, ...]
+    exchanges: tuple[str, ...] = ()  # empty: primary listings on any exchange
+    price_scale: float = 1.0  # to the major currency unit (LSE quotes in pence)
+
+
+MARKETS: dict[str, Market] = {
+    "america": Market("america", ("america",), exchanges=("NYSE", "NASDAQ", "AMEX")),
+    "canada": Market("canada", ("canada",), exchanges=("TSX", "TSXV")),
+    "uk": Market("uk", ("uk",), exchanges=("LSE",), price_scale=0.01),
+    "europe": Market(
+        "europe",
+        (
+            "germany", "france", "netherlands", "belgium", "spain", "portugal", "italy",
+            "switzerland", "austria", "ireland", "sweden", "norway", "denmark", "finland",
+        ),
+    ),
+}
 
 COLUMNS = [
     "name",
     "description",
     "exchange",
     "sector",
+    "industry",
     "close",
     "volume",
     "average_volume_10d_calc",
@@ -26,45 +57,58 @@ COLUMNS = [
 ]
 
 
-def fetch_universe(min_price: float = 5.0, page_size: int = 5000) -> list[dict[str, Any]]:
+def fetch_universe(market: str = "america", min_price: float = 5.0, page_size: int = 5000) -> list[dict[str, Any]]:
     """
-    Fetch the US common stock universe from TradingView Screener.
+    Fetch a market's common stock universe from TradingView Screener.
 
     Filters applied server-side:
       - Type = common stock (excludes ETFs, funds, preferred shares)
-      - Exchange in (NYSE, NASDAQ, AMEX)
+      - The market's exchanges (e.g. NYSE, NASDAQ, AMEX), or primary
+        listings only when the market does not name its exchanges
       - Close price > 0 (ensures we have a quote)
 
     Stocks below `min_price` are kept and tagged later as `small_size` — the
-    price filter is applied in the ranking stage, not here.
+    price filter is applied in the ranking stage, not here. Markets larger
+    than `page_size` are fetched page by page.
     """
-    payload = {
-        "filter": [
-            {"left": "type", "operation": "equal", "right": "stock"},
-            {"left": "subtype", "operation": "equal", "right": "common"},
-            {"left": "exchange", "operation": "in_range", "right": ["NYSE", "NASDAQ", "AMEX"]},
-            {"left": "close", "operation": "greater", "right": 0},
-        ],
-        "options": {"lang": "en"},
-        "markets": ["america"],
-        "symbols": {"query": {"types": []}, "tickers": []},
-        "columns": COLUMNS,
-        "sort": {"sortBy": "market_cap_basic", "sortOrder": "desc"},
-        "range": [0, page_size],
-    }
-
-    response = requests.post(SCANNER_URL, json=payload, timeout=60)
-    response.raise_for_status()
-    data = response.json()
-
-    rows = data.get("data", [])
+    spec = MARKETS[market]
+    filters: list[dict[str, Any]] = [
+        {"left": "type", "operation": "equal", "right": "stock"},
+        {"left": "subtype", "operation": "equal", "right": "common"},
+        {"left": "close", "operation": "greater", "right": 0},
+    ]
+    if spec.exchanges:
+        filters.insert(2, {"left": "exchange", "operation": "in_range", "right": list(spec.exchanges)})
+    else:
+        filters.append({"left": "is_primary", "operation": "equal", "right": True})
+
+    url = SCANNER_URL if spec.scanner_markets == ("america",) else GLOBAL_SCANNER_URL
     results: list[dict[str, Any]] = []
-    for row in rows:
-        values = row.get("d", [])
-        if len(values) != len(COLUMNS):
-            continue
-        record = dict(zip(COLUMNS, values))
-        record["ticker"] = record.pop("name")
-        results.append(record)
-
-    return results
+    start = 0
+    while True:
+        payload = {
+            "filter": filters,
+            "options": {"lang": "en"},
+            "markets": list(spec.scanner_markets),
+            "symbols": {"query": {"types": []}, "tickers": []},
+            "columns": COLUMNS,
+            "sort": {"sortBy": "market_cap_basic", "sortOrder": "desc"},
+            "range": [start, start + page_size],
+        }
+
+        response = get_client().post(url, json=payload)
+        response.raise_for_status()
+        data = response.json()
+
+        rows = data.get("data", [])
+        for row in rows:
+            values = row.get("d", [])
+            if len(values) != len(COLUMNS):
+                continue
+            record = dict(zip(COLUMNS, values))
+            record["ticker"] = record.pop("name")
+            results.append(record)
+
+        start += page_size
+        if not rows or start >= data.get("totalCount", 0):
+            return results
@@ -0,0 +1,138 @@
+"""
+Group Ranks — sector and industry groups of a scored universe.
+
+The RS rating pass (screener/rs_rating_service.py) and the leader scan
+(leader-scan/ranking_service.py) both rank the groups of the universe they
+score. Each maps its stocks to GroupMember (the stock's score and whether
+it is one of that tool's leaders) and gets the same aggregates back, best
+group first:
+
+    {"sector":   [{"name", "members", "median_score", "group_rs", "leaders",
+                   "rank", "previous_rank", "rank_change"}, ...],
+     "industry": [{"name", "sector", ...same fields}, ...]}
+
+Industries are grouped by (sector, industry), so an industry name used in
+two sectors is two groups. group_rs is the percentile rank of the group's
+median among the groups of its level (1-99, ties share the midpoint), rank
+counts the groups with a higher median (1 = best). Groups with fewer than
+MIN_GROUP_MEMBERS stocks are left unranked but their members still count
+towards their sector.
+
+GroupRankStore keeps each run's ranks, so the next run reports rank changes:
+
+    <dir>/<date>.json    {"sector": {key: rank}, "industry": {key: rank}}
+
+keyed by group_key(); the latest HISTORY_DAYS files are kept.
+"""
+
+import json
+import os
+import statistics
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+GROUP_LEVELS = ("sector", "industry")
+# Smaller groups are left unranked: one stock's move would swing their median
+MIN_GROUP_MEMBERS = 3
+# Runs of group ranks kept for rank changes
+HISTORY_DAYS = 60
+
+
+@dataclass(frozen=True, slots=True)
+class GroupMember:
+    sector: str
+    industry: str
+    score: float
+    leader: bool = False
+
+
+def group_key(level: str, entry: dict[str, Any]) -> str:
+    """How a group is keyed in stored ranks: its name, "sector|industry" for industries."""
+    return f"{entry['sector']}|{entry['name']}" if level == "industry" else entry["name"]
+
+
+def _midrank_percentiles(values: list[float]) -> list[float]:
+    """Percentile rank (0-100) of each value: the share below it plus half the share equal to it."""
+    ordered = sorted(values)
+    percentiles = []
+    for value in values:
+        below = bisect_left(ordered, value)
+        percentiles.append((below + 0.5 * (bisect_right(ordered, value) - below)) / len(ordered) * 100)
+    return percentiles
+
+
+def rank_groups(
+    members: Iterable[GroupMember],
+    previous: dict[str, dict[str, int]] | None = None,
+) -> dict[str, list[dict[str, Any]]]:
+    """
+    Rank the sector and industry groups of `members`. `previous` holds an
+    earlier run's ranks (GroupRankStore.previous()); rank_change is positive
+    for a group that moved up and None for one that was not ranked then.
+    """
+    members = list(members)
+    previous = previous or {}
+    groups: dict[str, list[dict[str, Any]]] = {}
+    for level in GROUP_LEVELS:
+        grouped: dict[tuple[str, ...], list[GroupMember]] = {}
+        for member in members:
+            if not getattr(member, level):
+                continue
+            key = (member.sector, member.industry) if level == "industry" else (member.sector,)
+            grouped.setdefault(key, []).append(member)
+
+        keys = [key for key, group in grouped.items() if len(group) >= MIN_GROUP_MEMBERS]
+        medians = [statistics.median(m.score for m in grouped[key]) for key in keys]
+        ascending = sorted(medians)
+
+        entries = []
+        for key, median, percentile in zip(keys, medians, _midrank_percentiles(medians)):
+            entry: dict[str, Any] = {"name": key[-1]}
+            if level == "industry":
+                entry["sector"] = key[0]
+            entry.update(
+                members=len(grouped[key]),
+                median_score=round(median, 4),
+                group_rs=max(1, min(99, round(percentile))),
+                leaders=sum(m.leader for m in grouped[key]),
+                rank=1 + len(ascending) - bisect_right(ascending, median),
+            )
+            before = previous.get(level, {}).get(group_key(level, entry))
+            entry["previous_rank"] = before
+            entry["rank_change"] = None if before is None else before - entry["rank"]
+            entries.append(entry)
+        entries.sort(key=lambda e: (e["rank"], e["name"], e.get("sector", "")))
+        groups[level] = entries
+    return groups
+
+
+class GroupRankStore:
+    """Group ranks of each run, one file per date (see the module docstring)."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def previous(self, day: str) -> dict[str, dict[str, int]]:
+        """Ranks of the latest run before `day` ({} when there is none)."""
+        try:
+            earlier = sorted(f for f in os.listdir(self.path) if f.endswith(".json") and f[:-5] < day)
+        except OSError:
+            return {}
+        if not earlier:
+            return {}
+        try:
+            with open(os.path.join(self.path, earlier[-1]), encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def save(self, day: str, groups: dict[str, list[dict[str, Any]]]) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        target = os.path.join(self.path, f"{day}.json")
+        tmp = f"{target}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({level: {group_key(level, g): g["rank"] for g in entries} for level, entries in groups.items()}, fh)
+        os.replace(tmp, target)
+        for stale in sorted(f for f in os.listdir(self.path) if f.endswith(".json"))[:-HISTORY_DAYS]:
+            os.remove(os.path.join(self.path, stale))
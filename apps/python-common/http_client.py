@@ -0,0 +1,203 @@
+"""
+HTTP Client — the one place external HTTP calls are configured.
+
+All Python apps (screener, leader scan, theme extractor) share a single
+pooled `requests.Session` per process through `get_client()`:
+
+  - connection pooling and HTTP keep-alive (one TLS handshake per host)
+  - response compression negotiated via Accept-Encoding (gzip/deflate, plus
+    br/zstd when the decoders are installed)
+  - retries on connection errors, timeouts and 429/5xx responses, with
+    jittered exponential backoff that honours Retry-After
+  - per-host concurrency limits, so parallel callers cannot stampede a host
+
+Per-host behaviour (concurrency, retries, backoff) lives in HOST_POLICIES.
+Timeouts and retry counts can be overridden with BLUESTAR_HTTP_* environment
+variables. Yahoo traffic is not routed through here: yfinance requires its
+own curl_cffi session (yahoo_finance_service redirects that session to a
+replay server itself, through HttpConfig.target()).
+
+BLUESTAR_HTTP_REPLAY=http://127.0.0.1:8800 sends every request to a local
+replay server (replay_server.py) instead: https://host/path?query becomes
+http://127.0.0.1:8800/host/path?query. Host policies still apply under the
+original host name, so concurrency limits and backoff behave as they would
+against the real upstream.
+"""
+
+import email.utils
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+
+import run_report
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+REPLAY_ENV = "BLUESTAR_HTTP_REPLAY"
+
+
+@dataclass(frozen=True)
+class HostPolicy:
+    max_concurrency: int = 8
+    max_retries: int = 3
+    backoff_base: float = 0.5   # seconds; doubled on every attempt
+    backoff_max: float = 30.0
+
+
+HOST_POLICIES: dict[str, HostPolicy] = {
+    # One scanner call returns the whole universe; a handful in flight is plenty.
+    "scanner.tradingview.com": HostPolicy(max_concurrency=4, max_retries=3, backoff_base=1.0),
+    # stocktitan rate-limits aggressively: one request at a time, long backoff.
+    "www.stocktitan.net": HostPolicy(max_concurrency=1, max_retries=4, backoff_base=10.0, backoff_max=120.0),
+}
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+def _env_optional_int(name: str) -> int | None:
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+
+@dataclass
+class HttpConfig:
+    connect_timeout: float = field(default_factory=lambda: _env_float("BLUESTAR_HTTP_CONNECT_TIMEOUT", 5.0))
+    read_timeout: float = field(default_factory=lambda: _env_float("BLUESTAR_HTTP_READ_TIMEOUT", 30.0))
+    max_retries: int | None = field(default_factory=lambda: _env_optional_int("BLUESTAR_HTTP_RETRIES"))  # overrides every host
+    max_retry_after: float = 120.0
+    pool_maxsize: int = 32
+    user_agent: str = USER_AGENT
+    default_policy: HostPolicy = field(default_factory=HostPolicy)
+    host_policies: dict[str, HostPolicy] = field(default_factory=lambda: dict(HOST_POLICIES))
+    replay_url: str | None = field(default_factory=lambda: os.environ.get(REPLAY_ENV) or None)
+
+    def policy_for(self, host: str) -> HostPolicy:
+        policy = self.host_policies.get(host, self.default_policy)
+        if self.max_retries is not None:
+            policy = HostPolicy(policy.max_concurrency, self.max_retries, policy.backoff_base, policy.backoff_max)
+        return policy
+
+    def target(self, url: str) -> str:
+        """`url`, or its address on the replay server when one is configured."""
+        if not self.replay_url:
+            return url
+        parts = urlsplit(url)
+        replay = urlsplit(self.replay_url)
+        return urlunsplit((replay.scheme, replay.netloc, f"{replay.path.rstrip('/')}/{parts.hostname}{parts.path}", parts.query, ""))
+
+
+def retry_after_seconds(response: requests.Response) -> float | None:
+    """Seconds to wait according to a Retry-After header (delta or HTTP date)."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def backoff_seconds(policy: HostPolicy, attempt: int) -> float:
+    """
+    Exponential backoff with equal jitter for retry number `attempt` (0-based):
+    a random wait in the upper half of the capped exponential ceiling, so
+    retries spread out but never come back immediately.
+    """
+    ceiling = min(policy.backoff_max, policy.backoff_base * (2 ** attempt))
+    return random.uniform(ceiling / 2, ceiling)
+
+
+class HttpClient:
+    def __init__(self, config: HttpConfig | None = None):
+        self.config = config or HttpConfig()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=self.config.pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(make_headers(accept_encoding=True))
+        self.session.headers["User-Agent"] = self.config.user_agent
+        self._limits: dict[str, threading.BoundedSemaphore] = {}
+        self._limits_lock = threading.Lock()
+
+    def _limit_for(self, host: str) -> threading.BoundedSemaphore:
+        with self._limits_lock:
+            limit = self._limits.get(host)
+            if limit is None:
+                limit = threading.BoundedSemaphore(self.config.policy_for(host).max_concurrency)
+                self._limits[host] = limit
+            return limit
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Send a request with retries. Returns the final response, which may
+        still carry a retryable status once retries are exhausted; callers
+        use raise_for_status() as with a plain session. All requests made
+        by these apps are read-only queries, so POSTs are retried as well.
+        """
+        host = urlsplit(url).hostname or ""
+        policy = self.config.policy_for(host)
+        url = self.config.target(url)
+        kwargs.setdefault("timeout", (self.config.connect_timeout, self.config.read_timeout))
+
+        attempt = 0
+        while True:
+            with self._limit_for(host):
+                try:
+                    response = self.session.request(method, url, **kwargs)
+                except (requests.ConnectionError, requests.Timeout):
+                    if attempt >= policy.max_retries:
+                        raise
+                    wait = backoff_seconds(policy, attempt)
+                else:
+                    if response.status_code not in RETRY_STATUSES or attempt >= policy.max_retries:
+                        return response
+                    wait = retry_after_seconds(response)
+                    if wait is None:
+                        wait = backoff_seconds(policy, attempt)
+                    wait = min(wait, self.config.max_retry_after)
+                    response.close()
+
+            # Sleep outside the host slot so other callers can use it.
+            run_report.count(f"http_retries.{host}")
+            with run_report.stage("http_backoff"):
+                time.sleep(wait)
+            attempt += 1
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+
+_client: HttpClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """The process-wide client; created on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
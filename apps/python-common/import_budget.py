@@ -0,0 +1,137 @@
+"""
+Import Budget — cold-start budgets for the exec-spawned Python CLIs.
+
+The backend starts a fresh interpreter for every chart view, classification
+and scan, so module import time is paid on each request. Every CLI has a
+budget for the imports its start-up path (`--help`) performs, and a list of
+heavy modules that must not be imported before the code path needing them.
+
+    python import_budget.py                     # report for every CLI
+    python import_budget.py ../screener/main.py  # report for one script
+
+The report is built from `python -X importtime`. Budgets can be scaled for
+slow machines with IMPORT_BUDGET_SCALE (e.g. 2.0 doubles every budget).
+"""
+
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+
+APPS_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+BUDGET_SCALE_ENV = "IMPORT_BUDGET_SCALE"
+
+HEAVY_MODULES = ("pandas", "numpy", "yfinance", "curl_cffi", "tradingview_scraper")
+
+
+@dataclass
+class CliBudget:
+    script: str               # relative to apps/
+    import_budget_ms: float   # cumulative top-level import time of `--help`
+    forbidden: tuple[str, ...] = HEAVY_MODULES
+    requires: tuple[str, ...] = ()  # third-party modules the start-up path needs
+
+
+CLI_BUDGETS: list[CliBudget] = [
+    CliBudget("screener/main.py", 350, requires=("requests",)),
+    CliBudget("screener/rs_rating_service.py", 350, requires=("requests",)),
+    CliBudget("screener/classifier.py", 150),
+    CliBudget("screener/tradingview_chart_service.py", 150),
+    CliBudget("leader-scan/main.py", 350, requires=("requests",)),
+    CliBudget("theme_extractor/main.py", 500, forbidden=("pandas", "numpy"), requires=("requests", "bs4")),
+]
+
+
+@dataclass
+class ImportProfile:
+    script: str
+    wall_ms: float
+    import_ms: float
+    cumulative_ms: dict[str, float] = field(default_factory=dict)
+
+    def imported(self, module: str) -> bool:
+        return module in self.cumulative_ms
+
+    def top(self, n: int = 15) -> list[tuple[str, float]]:
+        return sorted(self.cumulative_ms.items(), key=lambda item: item[1], reverse=True)[:n]
+
+
+def parse_importtime(stderr: str) -> tuple[float, dict[str, float]]:
+    """
+    Parse `-X importtime` output. Returns the summed cumulative time of the
+    top-level imports (ms) and the cumulative time of every module (ms).
+    """
+    rows: list[tuple[int, str, float]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # header line
+        name_column = parts[2].rstrip()
+        depth = len(name_column) - len(name_column.lstrip())
+        rows.append((depth, name_column.strip(), int(parts[1]) / 1000.0))
+
+    if not rows:
+        return 0.0, {}
+    top_depth = min(depth for depth, _, _ in rows)
+    total = sum(ms for depth, _, ms in rows if depth == top_depth)
+    return total, {name: ms for _, name, ms in rows}
+
+
+def measure(script: str, args: tuple[str, ...] = ("--help",)) -> ImportProfile:
+    """Profile `script`: a path that exists as given, else a path relative to apps/."""
+    path = os.path.abspath(script) if os.path.exists(script) else os.path.join(APPS_DIR, script)
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", path, *args],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(path),
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    import_ms, cumulative = parse_importtime(completed.stderr)
+    return ImportProfile(script=script, wall_ms=wall_ms, import_ms=import_ms, cumulative_ms=cumulative)
+
+
+def budget_scale() -> float:
+    return float(os.environ.get(BUDGET_SCALE_ENV, "1.0"))
+
+
+def check(budget: CliBudget, profile: ImportProfile, scale: float | None = None) -> list[str]:
+    """Budget violations for one CLI (empty when within budget); `scale` defaults to budget_scale()."""
+    problems = [f"imports {module} at start-up" for module in budget.forbidden if profile.imported(module)]
+    limit = budget.import_budget_ms * (budget_scale() if scale is None else scale)
+    if profile.import_ms > limit:
+        problems.append(f"imports take {profile.import_ms:.0f}ms (budget {limit:.0f}ms)")
+    return problems
+
+
+def _print_report(profile: ImportProfile, budget: CliBudget | None) -> None:
+    header = f"{profile.script}: imports {profile.import_ms:.0f}ms, wall {profile.wall_ms:.0f}ms"
+    if budget is not None:
+        header += f", budget {budget.import_budget_ms * budget_scale():.0f}ms"
+    print(header)
+    for module, ms in profile.top(10):
+        print(f"    {ms:8.1f}ms  {module}")
+    if budget is not None:
+        for problem in check(budget, profile):
+            print(f"    OVER BUDGET: {problem}")
+
+
+def main() -> int:
+    budgets = {b.script: b for b in CLI_BUDGETS}
+    scripts = sys.argv[1:] or list(budgets)
+    failed = False
+    for script in scripts:
+        key = os.path.relpath(os.path.abspath(script), APPS_DIR) if os.path.exists(script) else script
+        budget = budgets.get(key)
+        profile = measure(script)
+        _print_report(profile, budget)
+        failed = failed or bool(budget and check(budget, profile))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
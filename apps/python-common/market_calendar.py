@@ -0,0 +1,150 @@
+"""
+Market Calendar — US equity (NYSE/NASDAQ) trading sessions.
+
+Full-day holidays follow the NYSE rules:
+
+  New Year's Day, Martin Luther King Jr. Day, Washington's Birthday,
+  Good Friday, Memorial Day, Juneteenth (from 2022), Independence Day,
+  Labor Day, Thanksgiving Day and Christmas Day
+
+A holiday on a Saturday is observed the Friday before, on a Sunday the Monday
+after; New Year's Day is the exception, as NYSE does not close on the last
+trading day of the year. Markets close at 13:00 ET on the day before
+Independence Day, the day after Thanksgiving and Christmas Eve. Unscheduled
+closures (national days of mourning) are listed in SPECIAL_CLOSURES.
+
+A session runs from one close to the next: `session_for(now)` is the first
+trading day whose close is still ahead of `now`, so its value changes exactly
+when a close passes. Results cached under that key stay valid until then.
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+EXCHANGE_TZ = ZoneInfo("America/New_York")
+REGULAR_OPEN = time(9, 30)
+REGULAR_CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+
+SPECIAL_CLOSURES = frozenset({
+    date(2012, 10, 29), date(2012, 10, 30),  # Hurricane Sandy
+    date(2018, 12, 5),   # President George H. W. Bush
+    date(2025, 1, 9),    # President Jimmy Carter
+})
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """The n-th `weekday` (Mon=0) of the month; n=-1 is the last one."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + (month == 12), month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _observed(day: date) -> date:
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+@lru_cache(maxsize=None)
+def holidays(year: int) -> frozenset[date]:
+    days = {
+        _nth_weekday(year, 1, 0, 3),   # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),   # Washington's Birthday
+        _easter(year) - timedelta(days=2),  # Good Friday
+        _nth_weekday(year, 5, 0, -1),  # Memorial Day
+        _observed(date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),   # Labor Day
+        _nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        _observed(date(year, 12, 25)),
+    }
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:  # a Saturday New Year's Day is not observed
+        days.add(_observed(new_year))
+    if year >= 2022:
+        days.add(_observed(date(year, 6, 19)))
+    return frozenset(days)
+
+
+@lru_cache(maxsize=None)
+def early_closes(year: int) -> frozenset[date]:
+    candidates = {
+        date(year, 7, 3),
+        _nth_weekday(year, 11, 3, 4) + timedelta(days=1),  # day after Thanksgiving
+        date(year, 12, 24),
+    }
+    return frozenset(day for day in candidates if is_trading_day(day))
+
+
+def is_trading_day(day: date) -> bool:
+    return day.weekday() < 5 and day not in holidays(day.year) and day not in SPECIAL_CLOSURES
+
+
+def close_time(day: date) -> datetime:
+    """The exchange close of trading day `day`, timezone-aware."""
+    close = EARLY_CLOSE if day in early_closes(day.year) else REGULAR_CLOSE
+    return datetime.combine(day, close, tzinfo=EXCHANGE_TZ)
+
+
+def open_time(day: date) -> datetime:
+    """The regular-hours open of trading day `day`, timezone-aware."""
+    return datetime.combine(day, REGULAR_OPEN, tzinfo=EXCHANGE_TZ)
+
+
+def next_trading_day(day: date) -> date:
+    day += timedelta(days=1)
+    while not is_trading_day(day):
+        day += timedelta(days=1)
+    return day
+
+
+def previous_trading_day(day: date) -> date:
+    day -= timedelta(days=1)
+    while not is_trading_day(day):
+        day -= timedelta(days=1)
+    return day
+
+
+def session_for(now: datetime | None = None) -> date:
+    """The first trading day whose close is after `now` (default: the current time)."""
+    now = now or datetime.now(timezone.utc)
+    if now.tzinfo is None:
+        raise ValueError("session_for() needs a timezone-aware datetime")
+    day = now.astimezone(EXCHANGE_TZ).date()
+    if not is_trading_day(day):
+        day = next_trading_day(day)
+    while close_time(day) <= now:
+        day = next_trading_day(day)
+    return day
+
+
+def is_open(now: datetime | None = None) -> bool:
+    """Whether `now` falls within regular trading hours."""
+    now = now or datetime.now(timezone.utc)
+    session = session_for(now)
+    return open_time(session) <= now < close_time(session)
+
+
+def last_close(now: datetime | None = None) -> datetime:
+    """The most recent close at or before `now`."""
+    return close_time(previous_trading_day(session_for(now)))
@@ -0,0 +1,286 @@
+"""
+Precompute — warm every cache after the market close.
+
+The first request of a session would otherwise pay for a full scan. This runs
+the exec-spawned CLIs with --refresh once the close is in, in dependency
+order, so interactive requests find this session's data already cached:
+
+    scanner_snapshot   screener/scanner_snapshot.py
+    ohlcv_store        screener/ohlcv_store.py                   after scanner_snapshot
+    rs_rating          screener/rs_rating_service.py
+    rs_history         screener/rs_rating_service.py --backfill  after ohlcv_store
+    screen_daily       screener/main.py --type daily             after ohlcv_store
+    screen_weekly      screener/main.py --type weekly
+    leader_scan        leader-scan/main.py
+    charts             screener/tradingview_chart_service.py,    after leader_scan
+                       daily and weekly, for every leader
+
+Jobs run as soon as their dependencies succeeded; at most --jobs processes
+run at a time, and a job whose dependency failed is skipped. Each command
+runs in a fresh interpreter (the app's venv when there is one) with a
+timeout. The report lists every job's status, timing and, on failure, the
+error or the tail of stderr; it is printed as JSON and kept in
+<report-dir>/<session>.json.
+
+    python precompute.py                                # run once, now
+    python precompute.py --only rs_rating,screen_daily  # a subset; other dependencies count as done
+    python precompute.py --daemon --delay 20            # run 20 minutes after every close
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+import market_calendar
+import run_report
+
+APPS_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+DEFAULT_REPORT_DIR = os.path.join(APPS_DIR, "screener", "runs", "precompute")
+
+DEFAULT_WORKERS = 2
+DEFAULT_DELAY_MINUTES = 20
+STDERR_TAIL = 2000
+
+# Candles warmed per leader chart; requests for fewer bars are served from them
+CHART_BARS = 500
+CHART_INTERVALS = ("D", "W")
+
+# (returncode, stdout, stderr) of one command
+Runner = Callable[[list[str], float], tuple[int, str, str]]
+
+
+@dataclass
+class Job:
+    name: str
+    # outputs of finished jobs (name -> parsed JSON payload) -> argv lists, app-relative script first
+    commands: Callable[[dict[str, Any]], list[list[str]]]
+    after: tuple[str, ...] = ()
+    timeout: float = 1800
+
+
+@dataclass
+class JobResult:
+    name: str
+    status: str  # ok | failed | skipped
+    started_at: str | None = None
+    seconds: float = 0.0
+    commands: int = 0
+    failed_commands: int = 0
+    errors: list[str] = field(default_factory=list)
+
+
+def _command(*argv: str) -> Callable[[dict[str, Any]], list[list[str]]]:
+    return lambda outputs: [list(argv)]
+
+
+def _leader_charts(outputs: dict[str, Any]) -> list[list[str]]:
+    leaders = (outputs.get("leader_scan") or {}).get("results", [])
+    return [
+        ["screener/tradingview_chart_service.py", f"--symbol={leader['ticker']}", f"--exchange={leader['exchange']}",
+         f"--interval={interval}", f"--bars={CHART_BARS}", "--refresh", "--quiet"]
+        for leader in leaders
+        for interval in CHART_INTERVALS
+    ]
+
+
+JOBS: list[Job] = [
+    Job("scanner_snapshot", _command("screener/scanner_snapshot.py", "--refresh", "--quiet"), timeout=300),
+    Job("ohlcv_store", _command("screener/ohlcv_store.py", "--quiet"), after=("scanner_snapshot",)),
+    Job("rs_rating", _command("screener/rs_rating_service.py", "--format=json", "--refresh", "--quiet"), timeout=300),
+    Job("rs_history", _command("screener/rs_rating_service.py", "--backfill", "--format=json", "--quiet"), after=("ohlcv_store",), timeout=300),
+    Job("screen_daily", _command("screener/main.py", "--format=json", "--type=daily", "--refresh", "--quiet"), after=("ohlcv_store",)),
+    Job("screen_weekly", _command("screener/main.py", "--format=json", "--type=weekly", "--refresh", "--quiet")),
+    Job("leader_scan", _command("leader-scan/main.py", "--format=json", "--refresh", "--quiet"), timeout=600),
+    Job("charts", _leader_charts, after=("leader_scan",), timeout=60),
+]
+
+
+def python_for(script: str) -> str:
+    """The app's venv interpreter, as the backend picks it, else this one."""
+    app_dir = os.path.join(APPS_DIR, script.split("/")[0])
+    for candidate in (os.path.join(app_dir, "venv", "bin", "python3"), os.path.join(app_dir, "venv", "Scripts", "python.exe")):
+        if os.path.exists(candidate):
+            return candidate
+    return sys.executable
+
+
+def run_command(argv: list[str], timeout: float) -> tuple[int, str, str]:
+    path = os.path.join(APPS_DIR, argv[0])
+    completed = subprocess.run(
+        [python_for(argv[0]), path, *argv[1:]],
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+        cwd=os.path.dirname(path),
+        env={**os.environ, "PYTHONUNBUFFERED": "1"},
+    )
+    return completed.returncode, completed.stdout, completed.stderr
+
+
+def parse_output(stdout: str) -> Any:
+    """The JSON payload line of a CLI's stdout, as the backend finds it."""
+    for line in stdout.splitlines():
+        line = line.strip()
+        if line.startswith("{") and line.endswith("}"):
+            return json.loads(line)
+    return None
+
+
+def run_job(job: Job, outputs: dict[str, Any], slots: threading.Semaphore, workers: int, runner: Runner) -> tuple[JobResult, Any]:
+    result = JobResult(job.name, "ok", started_at=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+    start = time.perf_counter()
+    payloads: list[Any] = []
+    lock = threading.Lock()
+
+    def execute(argv: list[str]) -> None:
+        error = None
+        with slots:
+            try:
+                returncode, stdout, stderr = runner(argv, job.timeout)
+                payload = parse_output(stdout)
+                if isinstance(payload, dict) and "error" in payload:
+                    error = f"{argv[0]}: {payload['error']}"
+                elif returncode != 0:
+                    error = f"{argv[0]} exited with {returncode}: {stderr[-STDERR_TAIL:].strip()}"
+            except subprocess.TimeoutExpired:
+                error = f"{argv[0]} timed out after {job.timeout:.0f}s"
+            except Exception as exc:
+                error = f"{argv[0]}: {exc}"
+        with lock:
+            if error:
+                result.failed_commands += 1
+                result.errors.append(error)
+            else:
+                payloads.append(payload)
+
+    try:
+        commands = job.commands(outputs)
+    except Exception as exc:
+        commands = []
+        result.errors.append(f"could not build commands: {exc}")
+    result.commands = len(commands)
+
+    # A job's own commands (one per leader chart) share the same slots
+    with run_report.stage(f"job.{job.name}"):
+        if len(commands) == 1:
+            execute(commands[0])
+        elif commands:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(execute, commands))
+
+    result.seconds = round(time.perf_counter() - start, 3)
+    if result.errors:
+        result.status = "failed"
+    return result, payloads[0] if len(commands) == 1 and payloads else None
+
+
+def run_jobs(jobs: list[Job], workers: int = DEFAULT_WORKERS, runner: Runner = run_command) -> list[JobResult]:
+    """Run `jobs` in dependency order with at most `workers` commands at a time."""
+    names = {job.name for job in jobs}
+    pending = {job.name: job for job in jobs}
+    results: dict[str, JobResult] = {}
+    outputs: dict[str, Any] = {}
+    slots = threading.Semaphore(workers)
+
+    with ThreadPoolExecutor(max_workers=max(1, len(jobs))) as pool:
+        running = {}
+        while pending or running:
+            scheduled = True
+            while scheduled:
+                scheduled = False
+                for name, job in list(pending.items()):
+                    dependencies = [d for d in job.after if d in names]
+                    if any(d not in results for d in dependencies):
+                        continue
+                    del pending[name]
+                    scheduled = True
+                    failed = [d for d in dependencies if results[d].status != "ok"]
+                    if failed:
+                        results[name] = JobResult(name, "skipped", errors=[f"dependency failed: {', '.join(failed)}"])
+                        continue
+                    running[pool.submit(run_job, job, dict(outputs), slots, workers, runner)] = name
+
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name], outputs[name] = future.result()
+
+    return [results[job.name] for job in jobs if job.name in results]
+
+
+def precompute(args: argparse.Namespace) -> dict[str, Any]:
+    jobs = [job for job in JOBS if not args.only or job.name in args.only]
+    session = market_calendar.last_close().date().isoformat()
+    started = time.perf_counter()
+    if not args.quiet:
+        print(f"Precomputing {len(jobs)} jobs for the {session} close…", file=sys.stderr)
+
+    results = run_jobs(jobs, args.jobs)
+    report = {
+        "session": session,
+        "finished_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "seconds": round(time.perf_counter() - started, 3),
+        "ok": all(r.status == "ok" for r in results),
+        "jobs": [asdict(r) for r in results],
+    }
+    if not args.quiet:
+        for r in results:
+            print(f"  {r.name:<17} {r.status:<8} {r.seconds:8.1f}s  {'; '.join(r.errors)[:200]}", file=sys.stderr)
+
+    os.makedirs(args.report_dir, exist_ok=True)
+    with open(os.path.join(args.report_dir, f"{session}.json"), "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    return report
+
+
+def parse_jobs(value: str) -> list[str]:
+    names = [n.strip() for n in value.split(",") if n.strip()]
+    unknown = [n for n in names if n not in {job.name for job in JOBS}]
+    if not names or unknown:
+        raise argparse.ArgumentTypeError(f"unknown job(s): {', '.join(unknown) or value}; choose from {', '.join(j.name for j in JOBS)}")
+    return names
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Precompute — warm every cache after the market close")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_WORKERS, help=f"Commands run at once (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--only", type=parse_jobs, help="Comma separated jobs to run")
+    parser.add_argument("--report-dir", default=DEFAULT_REPORT_DIR, help="Directory of the per-session reports")
+    parser.add_argument("--daemon", action="store_true", help="Keep running, once after every close")
+    parser.add_argument("--delay", type=float, default=DEFAULT_DELAY_MINUTES,
+                        help=f"With --daemon, minutes to wait after the close (default: {DEFAULT_DELAY_MINUTES})")
+    parser.add_argument("--quiet", action="store_true")
+    run_report.add_arguments(parser)
+    args = parser.parse_args()
+
+    if not args.daemon:
+        with run_report.run("precompute", args):
+            report = precompute(args)
+        print(json.dumps(report))
+        return 0 if report["ok"] else 1
+
+    delay = timedelta(minutes=args.delay)
+    while True:
+        now = datetime.now(timezone.utc)
+        target = market_calendar.last_close(now) + delay
+        if target <= now:
+            target = market_calendar.close_time(market_calendar.session_for(now)) + delay
+        if not args.quiet:
+            print(f"Next precompute at {target.isoformat()}", file=sys.stderr)
+        time.sleep(max(0.0, (target - now).total_seconds()))
+        with run_report.run("precompute", args):
+            print(json.dumps(precompute(args)), flush=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
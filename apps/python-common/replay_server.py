@@ -0,0 +1,373 @@
+"""
+Replay Server — the external APIs, served locally for load tests.
+
+Every path of the Python apps talks to scanner.tradingview.com, Yahoo's
+chart API or www.stocktitan.net, so their concurrency and backoff cannot be
+measured offline. This server records real responses once and replays them
+with injected latency, rate limiting and failures.
+
+Clients reach it through the shared HTTP client: with
+BLUESTAR_HTTP_REPLAY=http://127.0.0.1:8800 every request to
+https://host/path?query goes to http://127.0.0.1:8800/host/path?query
+(see http_client). That covers ScreenerService, leader-scan's
+fetch_universe and the theme extractor's get_page_content. yfinance keeps
+its own curl_cffi session, so YahooFinanceService hands it one that
+rewrites URLs the same way; yfinance still parses the replayed responses.
+
+    python replay_server.py --record                 # proxy to the real hosts, keep every response
+    BLUESTAR_HTTP_REPLAY=http://127.0.0.1:8800 python ../screener/main.py --type daily --refresh
+    python replay_server.py --latency 250 --jitter 100 --rate-limit 0.1 --fail 0.02 --seed 7
+
+Recordings live in <dir>/<host>/<key>.json (--dir, $BLUESTAR_REPLAY_DIR or
+python-common/data/replay), keyed by method, host, path, query and body
+(JSON bodies in canonical form). Query parameters that change on every run
+(VOLATILE_PARAMS, e.g. Yahoo's period1/period2 and crumb) are left out of
+the key, so a later run finds the recording of an earlier one.
+
+Faults are drawn from a hash of the seed, the request key and how often that
+key was requested before, so the same sequence of requests meets the same
+faults on every run regardless of thread scheduling. --max-rps adds a
+per-host token bucket whose excess requests are answered 429, like the real
+rate limiters (that one depends on timing).
+
+    GET  /_replay/stats   per-host counters: requests, served, rate_limited, failed, dropped, missed, recorded
+    POST /_replay/reset   zero the counters and the fault sequence
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+# Recordings are data, not run output: they outlive any number of runs
+DEFAULT_CASSETTE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "replay")
+CASSETTE_DIR_ENV = "BLUESTAR_REPLAY_DIR"
+DEFAULT_PORT = 8800
+
+VOLATILE_PARAMS = frozenset({"period1", "period2", "crumb", "_"})
+CONTROL_PREFIX = "/_replay/"
+UPSTREAM_TIMEOUT = 60.0
+
+
+@dataclass(frozen=True)
+class Faults:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0          # latency is uniform in latency ± jitter
+    rate_limit: float = 0.0         # share of requests answered 429
+    retry_after: float | None = 1.0  # Retry-After of injected 429s; None sends none
+    failure: float = 0.0            # share answered 503
+    drop: float = 0.0               # share whose connection is closed without a response
+    max_rps: float | None = None    # per host; requests above it are answered 429
+    seed: int = 0
+
+
+@dataclass
+class Recording:
+    status: int
+    content_type: str
+    body: bytes
+
+    def to_dict(self, method: str, path: str) -> dict[str, Any]:
+        try:
+            body, encoding = self.body.decode("utf-8"), "utf-8"
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(self.body).decode("ascii"), "base64"
+        return {"method": method, "path": path, "status": self.status, "content_type": self.content_type,
+                "encoding": encoding, "body": body}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Recording":
+        body = data["body"].encode("utf-8") if data["encoding"] == "utf-8" else base64.b64decode(data["body"])
+        return cls(data["status"], data["content_type"], body)
+
+
+def _canonical_body(body: bytes) -> bytes:
+    try:
+        return json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        return body
+
+
+def request_key(method: str, host: str, path: str, query: str, body: bytes = b"") -> str:
+    """Recording key of a request; volatile query parameters and JSON key order do not count."""
+    params = sorted((k, v) for k, v in parse_qsl(query, keep_blank_values=True) if k not in VOLATILE_PARAMS)
+    digest = hashlib.sha256()
+    for part in (method.upper(), host.lower(), path, json.dumps(params)):
+        digest.update(part.encode("utf-8") + b"\0")
+    digest.update(_canonical_body(body))
+    return digest.hexdigest()[:24]
+
+
+class CassetteStore:
+    def __init__(self, path: str = DEFAULT_CASSETTE_DIR):
+        self.path = path
+        self._loaded: dict[tuple[str, str], Recording | None] = {}
+        self._lock = threading.Lock()
+
+    def _file(self, host: str, key: str) -> str:
+        return os.path.join(self.path, host, f"{key}.json")
+
+    def load(self, host: str, key: str) -> Recording | None:
+        with self._lock:
+            if (host, key) not in self._loaded:
+                try:
+                    with open(self._file(host, key), encoding="utf-8") as fh:
+                        self._loaded[host, key] = Recording.from_dict(json.load(fh))
+                except (OSError, ValueError, KeyError):
+                    self._loaded[host, key] = None
+            return self._loaded[host, key]
+
+    def save(self, host: str, key: str, method: str, path: str, recording: Recording) -> None:
+        target = self._file(host, key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp = f"{target}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(recording.to_dict(method, path), fh)
+        os.replace(tmp, target)
+        with self._lock:
+            self._loaded[host, key] = recording
+
+
+def draw(seed: int, key: str, nth: int, salt: str) -> float:
+    """A number in [0, 1) fixed by its arguments."""
+    digest = hashlib.sha256(f"{seed}:{key}:{nth}:{salt}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+
+@dataclass
+class HostStats:
+    requests: int = 0
+    served: int = 0
+    rate_limited: int = 0
+    failed: int = 0
+    dropped: int = 0
+    missed: int = 0
+    recorded: int = 0
+    delay_seconds: float = 0.0
+
+
+@dataclass
+class _Bucket:
+    tokens: float
+    updated: float = field(default_factory=time.monotonic)
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], store: CassetteStore, faults: Faults = Faults(), record: bool = False):
+        super().__init__(address, _Handler)
+        self.store = store
+        self.faults = faults
+        self.record = record
+        self.upstream = None
+        if record:
+            import requests
+
+            self.upstream = requests.Session()
+        self._lock = threading.Lock()
+        self.reset()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stats: dict[str, HostStats] = {}
+            self._seen: dict[str, int] = {}
+            self._buckets: dict[str, _Bucket] = {}
+
+    def admit(self, host: str, key: str) -> int:
+        """Count a request; returns how often its key was requested before."""
+        with self._lock:
+            nth = self._seen.get(key, 0)
+            self._seen[key] = nth + 1
+            self.stats.setdefault(host, HostStats()).requests += 1
+            return nth
+
+    def tally(self, host: str, counter: str, amount: float = 1) -> None:
+        with self._lock:
+            stats = self.stats.setdefault(host, HostStats())
+            setattr(stats, counter, getattr(stats, counter) + amount)
+
+    def over_rate(self, host: str) -> bool:
+        rate = self.faults.max_rps
+        if not rate:
+            return False
+        with self._lock:
+            bucket = self._buckets.setdefault(host, _Bucket(tokens=rate))
+            now = time.monotonic()
+            bucket.tokens = min(rate, bucket.tokens + (now - bucket.updated) * rate)
+            bucket.updated = now
+            if bucket.tokens < 1:
+                return True
+            bucket.tokens -= 1
+            return False
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "record": self.record,
+                "faults": asdict(self.faults),
+                "hosts": {host: {**asdict(stats), "delay_seconds": round(stats.delay_seconds, 3)}
+                          for host, stats in sorted(self.stats.items())},
+            }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, as the real hosts
+    server: ReplayServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json", headers: dict[str, str] | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str, headers: dict[str, str] | None = None) -> None:
+        self._send(status, json.dumps({"error": message}).encode("utf-8"), headers=headers)
+
+    def _handle(self, method: str) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        parts = urlsplit(self.path)
+        if parts.path.startswith(CONTROL_PREFIX):
+            return self._control(method, parts.path[len(CONTROL_PREFIX):])
+
+        host, _, rest = parts.path.lstrip("/").partition("/")
+        if not host:
+            return self._error(404, "expected /<host>/<path>")
+        path = "/" + rest
+        key = request_key(method, host, path, parts.query, body)
+        nth = self.server.admit(host, key)
+
+        if self.server.record:
+            return self._record(method, host, path, parts.query, body, key)
+
+        faults = self.server.faults
+        if draw(faults.seed, key, nth, "drop") < faults.drop:
+            self.server.tally(host, "dropped")
+            self.close_connection = True
+            return
+        delay = max(0.0, faults.latency_ms + faults.jitter_ms * (2 * draw(faults.seed, key, nth, "latency") - 1)) / 1000
+        if delay:
+            time.sleep(delay)
+            self.server.tally(host, "delay_seconds", delay)
+
+        if self.server.over_rate(host) or draw(faults.seed, key, nth, "rate_limit") < faults.rate_limit:
+            self.server.tally(host, "rate_limited")
+            retry_after = {} if faults.retry_after is None else {"Retry-After": f"{faults.retry_after:g}"}
+            return self._error(429, "rate limited", retry_after)
+        if draw(faults.seed, key, nth, "failure") < faults.failure:
+            self.server.tally(host, "failed")
+            return self._error(503, "injected failure")
+
+        recording = self.server.store.load(host, key)
+        if recording is None:
+            self.server.tally(host, "missed")
+            return self._error(404, f"no recording of {method} {host}{path}")
+        self.server.tally(host, "served")
+        self._send(recording.status, recording.body, recording.content_type)
+
+    def _record(self, method: str, host: str, path: str, query: str, body: bytes, key: str) -> None:
+        headers = {name: self.headers[name] for name in ("Content-Type", "User-Agent", "Accept") if self.headers.get(name)}
+        url = f"https://{host}{path}" + (f"?{query}" if query else "")
+        try:
+            response = self.server.upstream.request(method, url, data=body or None, headers=headers, timeout=UPSTREAM_TIMEOUT)
+        except Exception as exc:
+            self.server.tally(host, "failed")
+            return self._error(502, f"upstream {host}: {exc}")
+
+        recording = Recording(response.status_code, response.headers.get("Content-Type", "application/octet-stream"), response.content)
+        # Rate limits and server errors are the upstream's state, not data worth replaying
+        if response.status_code < 400 or response.status_code == 404:
+            self.server.store.save(host, key, method, path, recording)
+            self.server.tally(host, "recorded")
+        else:
+            self.server.tally(host, "failed")
+        self.server.tally(host, "served")
+        headers = {"Retry-After": response.headers["Retry-After"]} if "Retry-After" in response.headers else None
+        self._send(recording.status, recording.body, recording.content_type, headers)
+
+    def _control(self, method: str, command: str) -> None:
+        if command == "stats":
+            return self._send(200, json.dumps(self.server.snapshot()).encode("utf-8"))
+        if command == "reset" and method == "POST":
+            self.server.reset()
+            return self._send(200, b'{"reset": true}')
+        self._error(404, f"unknown control {method} {command}")
+
+
+def make_server(
+    store: CassetteStore,
+    faults: Faults = Faults(),
+    record: bool = False,
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+) -> ReplayServer:
+    return ReplayServer((host, port), store, faults, record)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay Server — record external API responses and replay them with faults")
+    parser.add_argument("--dir", default=os.environ.get(CASSETTE_DIR_ENV, DEFAULT_CASSETTE_DIR), help="Directory of the recordings")
+    parser.add_argument("--record", action="store_true", help="Proxy to the real hosts and keep every response")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument("--latency", type=float, default=0.0, help="Added latency per response, in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latency varies uniformly by ± this many ms")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Share of requests answered 429 (0-1)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds of injected 429s; negative sends none")
+    parser.add_argument("--fail", type=float, default=0.0, help="Share of requests answered 503 (0-1)")
+    parser.add_argument("--drop", type=float, default=0.0, help="Share of connections closed without a response (0-1)")
+    parser.add_argument("--max-rps", type=float, help="Requests per second per host before answering 429")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the fault sequence")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    faults = Faults(
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after if args.retry_after >= 0 else None,
+        failure=args.fail,
+        drop=args.drop,
+        max_rps=args.max_rps,
+        seed=args.seed,
+    )
+    server = make_server(CassetteStore(args.dir), faults, args.record, args.host, args.port)
+    if not args.quiet:
+        mode = "Recording into" if args.record else "Replaying"
+        print(f"{mode} {args.dir} on {server.url} (BLUESTAR_HTTP_REPLAY={server.url})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    print(json.dumps(server.snapshot()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
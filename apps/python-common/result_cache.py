@@ -0,0 +1,108 @@
+"""
+Result Cache — payloads keyed by US market session.
+
+Scanner-driven results (RS ratings, screens, leader scans) only change when a
+new close is in. A run stores its JSON payload under the current session
+(market_calendar.session_for) plus a hash of the parameters that shape it;
+later runs in the same session return the stored payload without touching the
+network. When the next close passes, the session key changes and the entry is
+no longer found; entries of past sessions are deleted on the next write.
+
+    <cache_dir>/<name>/<session>-<params hash>.json
+
+Error payloads are never stored. Each entry point exposes:
+
+    --no-cache   neither read nor write the cache
+    --refresh    recompute and overwrite this session's entry
+    --cache-dir  where entries live (default: <app>/cache)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from datetime import date, datetime
+from typing import Any, Callable
+
+import market_calendar
+import run_report
+
+CACHE_DIR_ENV = "BLUESTAR_RESULT_CACHE_DIR"
+
+
+def _params_hash(params: dict[str, Any]) -> str:
+    encoded = json.dumps(params, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+class ResultCache:
+    def __init__(self, cache_dir: str, name: str):
+        self.name = name
+        self.path = os.path.join(cache_dir, name)
+
+    def _entry(self, session: date, params: dict[str, Any]) -> str:
+        return os.path.join(self.path, f"{session.isoformat()}-{_params_hash(params)}.json")
+
+    def get(self, params: dict[str, Any], now: datetime | None = None) -> Any | None:
+        entry = self._entry(market_calendar.session_for(now), params)
+        try:
+            with open(entry, encoding="utf-8") as fh:
+                payload = json.load(fh)
+        except (OSError, json.JSONDecodeError):
+            run_report.record_cache(self.name, hit=False)
+            return None
+        run_report.record_cache(self.name, hit=True)
+        return payload
+
+    def put(self, params: dict[str, Any], payload: Any, now: datetime | None = None) -> None:
+        session = market_calendar.session_for(now)
+        os.makedirs(self.path, exist_ok=True)
+        target = self._entry(session, params)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh)
+        os.replace(tmp, target)
+        self._prune(session)
+
+    def _prune(self, session: date) -> None:
+        current = session.isoformat()
+        for filename in os.listdir(self.path):
+            if filename.endswith(".json") and filename[:10] < current:
+                try:
+                    os.remove(os.path.join(self.path, filename))
+                except OSError:
+                    pass
+
+    def cached(
+        self,
+        params: dict[str, Any],
+        compute: Callable[[], Any],
+        args: argparse.Namespace | None = None,
+        storable: Callable[[Any], bool] | None = None,
+    ) -> tuple[Any, bool]:
+        """
+        Return (payload, hit). `compute` runs on a miss, with --refresh or with
+        --no-cache; its payload is stored unless --no-cache is set, it carries
+        an "error" key or `storable(payload)` is false.
+        """
+        use_cache = not getattr(args, "no_cache", False)
+        if use_cache and not getattr(args, "refresh", False):
+            payload = self.get(params)
+            if payload is not None:
+                return payload, True
+
+        payload = compute()
+        failed = isinstance(payload, dict) and "error" in payload
+        if use_cache and not failed and (storable is None or storable(payload)):
+            self.put(params, payload)
+        return payload, False
+
+
+def add_arguments(parser: argparse.ArgumentParser, default_dir: str) -> None:
+    parser.add_argument(
+        "--cache-dir",
+        default=os.environ.get(CACHE_DIR_ENV, default_dir),
+        help="Directory of the per-session result cache",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the result cache")
+    parser.add_argument("--refresh", action="store_true", help="Recompute and replace this session's cached result")
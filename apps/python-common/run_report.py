@@ -0,0 +1,363 @@
+"""
+Run Report — stage timing, HTTP accounting and profiling for the Python CLIs.
+
+Every entry point (screener, RS ratings, leader scan, theme extractor, chart
+service, classifier) wraps its work in `run_report.run(...)`. The report
+collects:
+
+  - per-stage wall time (a stage entered many times is aggregated)
+  - per-host HTTP request counts, error counts, bytes and latency percentiles,
+    captured by wrapping `requests` and `curl_cffi` (used by yfinance) sessions
+  - cache hit/miss counters recorded by the caches themselves
+  - peak RSS of the process
+
+The report never touches stdout, which is reserved for the JSON payload the
+backend parses. It is written as one JSON line to the file given by
+`--timing-report` (or the BLUESTAR_TIMING_REPORT environment variable), or to
+stderr prefixed with "TIMING " when neither is set and the run is not quiet.
+`--profile PATH` additionally writes a cProfile dump to PATH and the top
+tracemalloc allocation sites to PATH + ".tracemalloc.txt".
+
+Entry points locate this module with:
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python-common"))
+"""
+
+import argparse
+import importlib.util
+import json
+import math
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+from urllib.parse import urlsplit
+
+TIMING_REPORT_ENV = "BLUESTAR_TIMING_REPORT"
+TRACEMALLOC_TOP = 30
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100.0 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process in MiB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+class RunReport:
+    """Collects timings and counters for one CLI run. Thread-safe."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._stages: dict[str, dict[str, float]] = {}
+        self._stage_order: list[str] = []
+        self._hosts: dict[str, dict[str, Any]] = {}
+        self._caches: dict[str, dict[str, int]] = {}
+        self._counters: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a block of work under `name`; repeated stages are aggregated."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(name, time.perf_counter() - start)
+
+    def record_stage(self, name: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._stages.get(name)
+            if entry is None:
+                entry = {"seconds": 0.0, "calls": 0, "max_seconds": 0.0}
+                self._stages[name] = entry
+                self._stage_order.append(name)
+            entry["seconds"] += seconds
+            entry["calls"] += 1
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+
+    def record_request(self, host: str, seconds: float, nbytes: int = 0, ok: bool = True) -> None:
+        with self._lock:
+            entry = self._hosts.setdefault(host, {"requests": 0, "errors": 0, "bytes": 0, "latencies": []})
+            entry["requests"] += 1
+            entry["bytes"] += nbytes
+            entry["latencies"].append(seconds)
+            if not ok:
+                entry["errors"] += 1
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        with self._lock:
+            entry = self._caches.setdefault(cache, {"hits": 0, "misses": 0})
+            entry["hits" if hit else "misses"] += 1
+
+    def count(self, name: str, value: float = 1) -> None:
+        """Free-form counter (e.g. symbols skipped, fetches avoided)."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            stages = [
+                {
+                    "name": name,
+                    "seconds": round(self._stages[name]["seconds"], 4),
+                    "calls": int(self._stages[name]["calls"]),
+                    "max_seconds": round(self._stages[name]["max_seconds"], 4),
+                }
+                for name in self._stage_order
+            ]
+            http = {}
+            for host, entry in sorted(self._hosts.items()):
+                latencies = sorted(entry["latencies"])
+                http[host] = {
+                    "requests": entry["requests"],
+                    "errors": entry["errors"],
+                    "bytes": entry["bytes"],
+                    "p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+                    "p90_ms": round(_percentile(latencies, 90) * 1000, 1),
+                    "p99_ms": round(_percentile(latencies, 99) * 1000, 1),
+                    "max_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+                }
+            caches = {
+                cache: {
+                    "hits": entry["hits"],
+                    "misses": entry["misses"],
+                    "hit_rate": round(entry["hits"] / (entry["hits"] + entry["misses"]), 4),
+                }
+                for cache, entry in sorted(self._caches.items())
+            }
+            counters = dict(sorted(self._counters.items()))
+
+        return {
+            "name": self.name,
+            "started_at": round(self.started_at, 3),
+            "total_seconds": round(time.perf_counter() - self._start, 4),
+            "stages": stages,
+            "http": http,
+            "caches": caches,
+            "counters": counters,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+
+# The report of the run in progress. Library code records into it through the
+# module-level helpers below so it does not need a report threaded through.
+_current = RunReport("default")
+
+
+def current() -> RunReport:
+    return _current
+
+
+def stage(name: str):
+    return _current.stage(name)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    _current.record_cache(cache, hit)
+
+
+def count(name: str, value: float = 1) -> None:
+    _current.count(name, value)
+
+
+# -- HTTP accounting ---------------------------------------------------------
+
+def _host_of(url: Any) -> str:
+    try:
+        return urlsplit(str(url)).hostname or "unknown"
+    except ValueError:
+        return "unknown"
+
+
+def _response_size(response: Any, streamed: bool) -> int:
+    if streamed:
+        length = response.headers.get("Content-Length") if response is not None else None
+        return int(length) if length and str(length).isdigit() else 0
+    try:
+        return len(response.content)
+    except Exception:
+        return 0
+
+
+def _patch_requests(module: Any) -> None:
+    session_cls = module.Session
+    if getattr(session_cls.send, "_run_report_wrapped", False):
+        return
+    original = session_cls.send
+
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = original(self, request, **kwargs)
+        except Exception:
+            _current.record_request(_host_of(request.url), time.perf_counter() - start, ok=False)
+            raise
+        _current.record_request(
+            _host_of(request.url),
+            time.perf_counter() - start,
+            _response_size(response, bool(kwargs.get("stream"))),
+            ok=response.status_code < 400,
+        )
+        return response
+
+    send._run_report_wrapped = True
+    session_cls.send = send
+
+
+def _patch_curl_cffi(module: Any) -> None:
+    session_cls = module.Session
+    if getattr(session_cls.request, "_run_report_wrapped", False):
+        return
+    original = session_cls.request
+
+    def request(self, method, url, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = original(self, method, url, *args, **kwargs)
+        except Exception:
+            _current.record_request(_host_of(url), time.perf_counter() - start, ok=False)
+            raise
+        _current.record_request(
+            _host_of(url),
+            time.perf_counter() - start,
+            _response_size(response, bool(kwargs.get("stream"))),
+            ok=response.status_code < 400,
+        )
+        return response
+
+    request._run_report_wrapped = True
+    session_cls.request = request
+
+
+class _PatchOnImport:
+    """
+    Meta-path hook that applies `patch` right after `module_name` is first
+    imported, so instrumenting a heavy client does not force importing it.
+    """
+
+    def __init__(self, module_name: str, patch):
+        self.module_name = module_name
+        self.patch = patch
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname != self.module_name:
+            return None
+        sys.meta_path.remove(self)
+        spec = importlib.util.find_spec(fullname)
+        if spec is None or spec.loader is None:
+            return spec
+        exec_module = spec.loader.exec_module
+        patch = self.patch
+
+        def exec_and_patch(module):
+            exec_module(module)
+            patch(module)
+
+        spec.loader.exec_module = exec_and_patch
+        return spec
+
+
+_HTTP_CLIENTS = {
+    "requests": _patch_requests,
+    "curl_cffi.requests": _patch_curl_cffi,
+}
+
+
+def install_http_accounting() -> None:
+    """Record every request made through `requests` or `curl_cffi` sessions."""
+    for module_name, patch in _HTTP_CLIENTS.items():
+        if module_name in sys.modules:
+            patch(sys.modules[module_name])
+        elif not any(isinstance(f, _PatchOnImport) and f.module_name == module_name for f in sys.meta_path):
+            sys.meta_path.insert(0, _PatchOnImport(module_name, patch))
+
+
+# -- CLI integration ---------------------------------------------------------
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--timing-report",
+        default=os.environ.get(TIMING_REPORT_ENV),
+        help="Write the JSON timing report to this file ('-' for stderr)",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="Write a cProfile dump to PATH and tracemalloc top sites to PATH.tracemalloc.txt",
+    )
+
+
+def _write_report(report: RunReport, destination: str | None, quiet: bool) -> None:
+    line = json.dumps(report.to_dict())
+    if destination and destination != "-":
+        with open(destination, "w", encoding="utf-8") as fh:
+            fh.write(line + "\n")
+    elif destination == "-" or not quiet:
+        print(f"TIMING {line}", file=sys.stderr)
+
+
+def _write_profile(profiler, snapshot, path: str) -> None:
+    profiler.dump_stats(path)
+    with open(path + ".tracemalloc.txt", "w", encoding="utf-8") as fh:
+        for stat in snapshot.statistics("lineno")[:TRACEMALLOC_TOP]:
+            fh.write(f"{stat}\n")
+
+
+@contextmanager
+def run(name: str, args: argparse.Namespace | None = None) -> Iterator[RunReport]:
+    """
+    Instrument one CLI run. The report is written when the block exits, also
+    when it exits through sys.exit() or an exception.
+    """
+    global _current
+    _current = RunReport(name)
+    install_http_accounting()
+
+    timing_report = getattr(args, "timing_report", None)
+    profile_path = getattr(args, "profile", None)
+    quiet = bool(getattr(args, "quiet", False))
+
+    profiler = None
+    if profile_path:
+        import cProfile
+        import tracemalloc
+
+        tracemalloc.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        yield _current
+    finally:
+        if profiler is not None:
+            import tracemalloc
+
+            profiler.disable()
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            try:
+                _write_profile(profiler, snapshot, profile_path)
+            except OSError as error:
+                print(f"Could not write profile to {profile_path}: {error}", file=sys.stderr)
+        try:
+            _write_report(_current, timing_report, quiet)
+        except OSError as error:
+            print(f"Could not write timing report to {timing_report}: {error}", file=sys.stderr)
@@ -0,0 +1,66 @@
+"""Unit tests for bulk_export."""
+
+import csv
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bulk_export import csv_field, export, output_format
+
+ROWS = [
+    {"symbol": "AAPL", "rs_rating": 91, "weighted_score": 12.5, "leader": True, "tags": ["a"]},
+    {"symbol": 'SAY "HI"', "rs_rating": 3, "weighted_score": None, "leader": False, "tags": []},
+    {"symbol": "", "rs_rating": 50, "weighted_score": float("nan"), "note": "late column"},
+]
+
+
+def test_format_follows_the_extension():
+    assert output_format("out/ratings.CSV") == "csv"
+    assert output_format("ratings.parquet") == "parquet"
+    with pytest.raises(ValueError):
+        output_format("ratings.json")
+
+
+def test_csv_fields_follow_copy_rules():
+    assert csv_field(None) == ""
+    assert csv_field("") == '""'
+    assert csv_field('a "b", c') == '"a ""b"", c"'
+    assert csv_field(True) == "true"
+    assert csv_field(7) == "7"
+    assert csv_field(float("nan")) == ""
+    assert csv_field({"k": 1}) == '"{""k"": 1}"'
+
+
+def test_csv_export_writes_rows_and_manifest(tmp_path):
+    path = tmp_path / "nested" / "ratings.csv"
+    manifest = export(str(path), ROWS, count=3, computed_at="2026-10-16")
+
+    assert manifest["rows"] == 3
+    assert manifest["format"] == "csv"
+    assert manifest["bytes"] == os.path.getsize(path)
+    assert manifest["computed_at"] == "2026-10-16"
+    assert [c["name"] for c in manifest["columns"]] == ["symbol", "rs_rating", "weighted_score", "leader", "tags", "note"]
+    assert {c["name"]: c["type"] for c in manifest["columns"]}["weighted_score"] == "double precision"
+    assert manifest["copy"].startswith("COPY {table} (symbol, rs_rating, weighted_score, leader, tags, note) FROM STDIN")
+    json.dumps(manifest)
+
+    with open(path, newline="", encoding="utf-8") as fh:
+        records = list(csv.reader(fh))
+    assert records[0] == ["symbol", "rs_rating", "weighted_score", "leader", "tags", "note"]
+    assert records[1] == ["AAPL", "91", "12.5", "true", '["a"]', ""]
+    assert records[2][0] == 'SAY "HI"'
+    assert not any(name.endswith(".tmp") for name in os.listdir(path.parent))
+
+
+def test_parquet_export_round_trips(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "ratings.parquet"
+    manifest = export(str(path), ROWS[:2])
+
+    assert manifest["format"] == "parquet"
+    assert "copy" not in manifest
+    assert pq.read_table(path).to_pylist()[0]["symbol"] == "AAPL"
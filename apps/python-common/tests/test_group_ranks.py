@@ -0,0 +1,110 @@
+"""Unit tests for group_ranks."""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import group_ranks
+from group_ranks import GroupMember, GroupRankStore, rank_groups
+
+APPS_DIR = os.path.join(os.path.dirname(__file__), "..", "..")
+
+# (sector, industry, members); every group and sector has an odd size, so
+# each median is one member's score whatever scale the score is on
+UNIVERSE = [
+    ("Technology", "Semiconductors", 9),
+    ("Technology", "Other", 5),
+    ("Technology", "", 1),
+    ("Finance", "Other", 5),
+    ("Finance", "Banks", 11),
+    ("Finance", "", 1),
+    ("Health Technology", "Pharmaceuticals", 3),
+    ("Health Technology", "Biotechnology", 13),
+    ("Health Technology", "", 1),
+    ("Energy Minerals", "Oil", 1),
+]
+
+
+def _members(scores):
+    members = []
+    for sector, industry, size in UNIVERSE:
+        members += [GroupMember(sector, industry, scores.pop()) for _ in range(size)]
+    return members
+
+
+def test_industries_are_keyed_by_sector_and_industry():
+    groups = rank_groups(_members(list(range(50))))
+    others = [g for g in groups["industry"] if g["name"] == "Other"]
+    assert sorted(g["sector"] for g in others) == ["Finance", "Technology"]
+    assert all(g["members"] == 5 for g in others)
+    # Too small to rank, but counted in its sector
+    assert "Oil" not in {g["name"] for g in groups["industry"]}
+    assert {g["name"]: g["members"] for g in groups["sector"]} == {
+        "Technology": 15, "Finance": 17, "Health Technology": 17,
+    }
+
+
+def test_ranks_and_group_rs_follow_the_median():
+    groups = rank_groups(_members(list(range(50))))["industry"]
+    assert [g["rank"] for g in groups] == list(range(1, len(groups) + 1))
+    medians = [g["median_score"] for g in groups]
+    assert medians == sorted(medians, reverse=True)
+    # Six ranked industries: the midranks of the best and worst are 5.5/6 and 0.5/6
+    assert len(groups) == 6
+    assert groups[0]["group_rs"] == 92 and groups[-1]["group_rs"] == 8
+
+
+def test_store_reports_rank_changes_per_sector_industry(tmp_path):
+    store = GroupRankStore(str(tmp_path))
+    first = rank_groups(_members(list(range(50))))
+    store.save("2026-01-05", first)
+    second = rank_groups(_members(list(range(50))[::-1]), store.previous("2026-01-06"))
+
+    for entry in second["industry"]:
+        before = next(g for g in first["industry"] if (g["sector"], g["name"]) == (entry["sector"], entry["name"]))
+        assert entry["previous_rank"] == before["rank"]
+        assert entry["rank_change"] == before["rank"] - entry["rank"]
+    assert store.previous("2026-01-05") == {}
+
+
+def test_store_keeps_the_latest_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(group_ranks, "HISTORY_DAYS", 2)
+    store = GroupRankStore(str(tmp_path))
+    for day in ("2026-01-05", "2026-01-06", "2026-01-07"):
+        store.save(day, {"sector": [{"name": "Technology", "rank": int(day[-1])}], "industry": []})
+
+    assert sorted(os.listdir(tmp_path)) == ["2026-01-06.json", "2026-01-07.json"]
+    assert store.previous("2026-01-08")["sector"] == {"Technology": 7}
+
+
+def test_rating_and_leader_scan_rank_the_same_groups_alike():
+    pytest.importorskip("requests")
+    sys.path.insert(0, os.path.join(APPS_DIR, "leader-scan"))
+    sys.path.insert(0, os.path.join(APPS_DIR, "screener"))
+    from ranking_service import filter_universe, rank_universe
+    from ranking_service import rank_groups as leader_scan_groups
+    from rs_rating_service import StockPerformance, rate_groups, rate_stocks
+
+    performances = list(range(50))
+    random.Random(3).shuffle(performances)
+    rows = [
+        {"ticker": f"T{i}", "sector": sector, "industry": industry, "close": 20.0, "average_volume_10d_calc": 1e6,
+         "ADR": 5.0, "Perf.1M": perf, "Perf.3M": perf, "Perf.6M": perf}
+        for i, ((sector, industry), perf) in enumerate(zip(
+            [(sector, industry) for sector, industry, size in UNIVERSE for _ in range(size)], performances))
+    ]
+    stocks = [StockPerformance(r["ticker"], r["Perf.3M"], r["Perf.6M"], r["Perf.3M"], r["sector"], r["industry"]) for r in rows]
+
+    leader_scan = leader_scan_groups(rank_universe(filter_universe(rows)))
+    rating = rate_groups(stocks, rate_stocks(stocks))
+
+    def comparable(groups):
+        return {level: [{k: v for k, v in g.items() if k != "median_score"} for g in entries]
+                for level, entries in groups.items()}
+
+    assert comparable(leader_scan) == comparable(rating)
+    assert sum(g["leaders"] for g in leader_scan["sector"]) == 1
@@ -0,0 +1,102 @@
+"""Unit tests for http_client."""
+
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+pytest.importorskip("requests")
+
+from http_client import HostPolicy, HttpClient, HttpConfig, backoff_seconds
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Responses to serve, in order; the last one repeats
+    script: list[tuple[int, dict]] = [(200, {})]
+    calls = 0
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            status, headers = cls.script[min(cls.calls, len(cls.script) - 1)]
+            cls.calls += 1
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        time.sleep(0.02)
+        body = b"ok"
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with cls.lock:
+            cls.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _Handler.calls = 0
+    _Handler.in_flight = 0
+    _Handler.max_in_flight = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/"
+    httpd.shutdown()
+
+
+def _client(**policy) -> HttpClient:
+    config = HttpConfig(max_retries=None, default_policy=HostPolicy(backoff_base=0.01, backoff_max=0.05, **policy))
+    return HttpClient(config)
+
+
+def test_retries_rate_limited_request_until_success(server):
+    _Handler.script = [(429, {"Retry-After": "0"}), (503, {}), (200, {})]
+    response = _client().get(server)
+    assert response.status_code == 200
+    assert _Handler.calls == 3
+
+
+def test_returns_last_response_when_retries_exhausted(server):
+    _Handler.script = [(503, {})]
+    response = _client(max_retries=2).get(server)
+    assert response.status_code == 503
+    assert _Handler.calls == 3
+
+
+def test_client_errors_are_not_retried(server):
+    _Handler.script = [(404, {})]
+    assert _client().get(server).status_code == 404
+    assert _Handler.calls == 1
+
+
+def test_per_host_concurrency_limit(server):
+    _Handler.script = [(200, {})]
+    client = _client(max_concurrency=2)
+    threads = [threading.Thread(target=client.get, args=(server,)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert _Handler.calls == 8
+    assert _Handler.max_in_flight <= 2
+
+
+def test_backoff_is_jittered_and_capped():
+    policy = HostPolicy(backoff_base=1.0, backoff_max=4.0)
+    for attempt in range(6):
+        wait = backoff_seconds(policy, attempt)
+        ceiling = min(4.0, 2 ** attempt)
+        assert ceiling / 2 <= wait <= ceiling
@@ -0,0 +1,47 @@
+"""Start-up budget checks for every exec-spawned CLI."""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from import_budget import CLI_BUDGETS, budget_scale, check, measure, parse_importtime
+
+# Import times swing with machine load; the suite only catches gross
+# regressions, `python import_budget.py` reports against the real budgets
+TEST_BUDGET_SCALE = 3.0
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   _io
+import time:        50 |         50 |     encodings.aliases
+import time:       200 |        250 |   encodings
+import time:      1000 |       3000 | requests
+"""
+
+
+def test_parse_importtime_sums_top_level_imports():
+    total, modules = parse_importtime(SAMPLE)
+    assert total == 3.0
+    assert modules["encodings.aliases"] == 0.05
+    assert modules["requests"] == 3.0
+
+
+@pytest.mark.parametrize("budget", CLI_BUDGETS, ids=lambda b: b.script)
+def test_cli_start_up_is_within_budget(budget):
+    missing = [m for m in budget.requires if importlib.util.find_spec(m) is None]
+    if missing:
+        pytest.skip(f"not installed: {', '.join(missing)}")
+
+    profile = measure(budget.script)
+    assert check(budget, profile, scale=TEST_BUDGET_SCALE * budget_scale()) == []
+
+
+def test_measure_accepts_a_path_relative_to_the_working_directory(tmp_path, monkeypatch):
+    (tmp_path / "start.py").write_text("import json\n")
+    monkeypatch.chdir(tmp_path)
+    profile = measure("start.py", args=())
+    assert profile.imported("json")
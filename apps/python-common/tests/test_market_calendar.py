@@ -0,0 +1,82 @@
+"""Unit tests for market_calendar."""
+
+import os
+import sys
+from datetime import date, datetime, time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from market_calendar import (
+    EXCHANGE_TZ,
+    close_time,
+    is_open,
+    is_trading_day,
+    last_close,
+    next_trading_day,
+    previous_trading_day,
+    session_for,
+)
+
+
+def _et(*args) -> datetime:
+    return datetime(*args, tzinfo=EXCHANGE_TZ)
+
+
+@pytest.mark.parametrize("day", [
+    date(2024, 1, 1),    # New Year's Day
+    date(2024, 1, 15),   # Martin Luther King Jr. Day
+    date(2024, 3, 29),   # Good Friday
+    date(2024, 6, 19),   # Juneteenth
+    date(2024, 11, 28),  # Thanksgiving
+    date(2022, 12, 26),  # Christmas on a Sunday, observed Monday
+    date(2021, 7, 5),    # Independence Day on a Sunday, observed Monday
+    date(2025, 1, 9),    # national day of mourning
+])
+def test_holidays_are_not_trading_days(day):
+    assert not is_trading_day(day)
+
+
+def test_saturday_new_year_is_not_observed_on_friday():
+    assert is_trading_day(date(2021, 12, 31))
+
+
+def test_juneteenth_before_2022_is_a_trading_day():
+    assert is_trading_day(date(2021, 6, 18))
+
+
+def test_early_and_regular_closes():
+    assert close_time(date(2024, 11, 29)).time() == time(13, 0)
+    assert close_time(date(2024, 7, 3)).time() == time(13, 0)
+    assert close_time(date(2024, 12, 24)).time() == time(13, 0)
+    assert close_time(date(2024, 11, 27)).time() == time(16, 0)
+
+
+def test_neighbouring_trading_days_skip_weekends_and_holidays():
+    assert next_trading_day(date(2024, 3, 28)) == date(2024, 4, 1)
+    assert previous_trading_day(date(2024, 4, 1)) == date(2024, 3, 28)
+
+
+def test_session_changes_at_the_close():
+    assert session_for(_et(2024, 6, 3, 15, 59)) == date(2024, 6, 3)
+    assert session_for(_et(2024, 6, 3, 16, 0)) == date(2024, 6, 4)
+    assert session_for(_et(2024, 11, 29, 13, 30)) == date(2024, 12, 2)
+
+
+def test_weekend_and_holiday_belong_to_the_next_session():
+    assert session_for(_et(2024, 6, 8, 12, 0)) == date(2024, 6, 10)
+    assert session_for(_et(2024, 3, 29, 12, 0)) == date(2024, 4, 1)
+    assert last_close(_et(2024, 6, 8, 12, 0)) == _et(2024, 6, 7, 16, 0)
+
+
+def test_session_for_requires_timezone():
+    with pytest.raises(ValueError):
+        session_for(datetime(2024, 6, 3, 12, 0))
+
+
+def test_is_open_during_regular_hours_only():
+    assert is_open(_et(2024, 6, 3, 9, 30))
+    assert not is_open(_et(2024, 6, 3, 9, 29))
+    assert not is_open(_et(2024, 11, 29, 13, 0))
+    assert not is_open(_et(2024, 6, 8, 12, 0))
@@ -0,0 +1,93 @@
+"""Unit tests for the precompute scheduler."""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from precompute import JOBS, Job, _command, _leader_charts, run_jobs
+
+
+class _Runner:
+    """Records command order and concurrency; scripts named fail*/slow* misbehave."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.order: list[str] = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, argv: list[str], timeout: float) -> tuple[int, str, str]:
+        with self.lock:
+            self.order.append(argv[0])
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if argv[0].startswith("slow"):
+                raise subprocess.TimeoutExpired(argv, timeout)
+            time.sleep(self.delay)
+            if argv[0].startswith("fail"):
+                return 1, "", "Traceback: boom"
+            return 0, json.dumps({"results": [{"ticker": "AAA", "exchange": "NASDAQ"}]}) + "\n", ""
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def test_dependencies_run_first():
+    runner = _Runner()
+    jobs = [
+        Job("b", _command("b"), after=("a",)),
+        Job("a", _command("a")),
+        Job("c", _command("c"), after=("b",)),
+    ]
+    results = run_jobs(jobs, workers=4, runner=runner)
+    assert runner.order == ["a", "b", "c"]
+    assert [r.status for r in results] == ["ok", "ok", "ok"]
+
+
+def test_failed_dependency_skips_dependents_only():
+    runner = _Runner()
+    jobs = [
+        Job("fail", _command("fail")),
+        Job("after_fail", _command("x"), after=("fail",)),
+        Job("slow", _command("slow"), timeout=1),
+        Job("other", _command("other")),
+    ]
+    results = {r.name: r for r in run_jobs(jobs, workers=2, runner=runner)}
+    assert results["fail"].status == "failed"
+    assert "boom" in results["fail"].errors[0]
+    assert results["after_fail"].status == "skipped"
+    assert results["slow"].status == "failed"
+    assert "timed out" in results["slow"].errors[0]
+    assert results["other"].status == "ok"
+    assert "x" not in runner.order
+
+
+def test_concurrency_is_bounded_across_fan_out():
+    runner = _Runner()
+    jobs = [
+        Job("leader_scan", _command("scan")),
+        Job("fan", lambda outputs: [["c"]] * 6, after=("leader_scan",)),
+        Job("solo", _command("solo")),
+    ]
+    results = run_jobs(jobs, workers=2, runner=runner)
+    assert runner.max_active == 2
+    assert results[1].commands == 6
+
+
+def test_leader_charts_follow_leader_scan_output():
+    commands = _leader_charts({"leader_scan": {"results": [{"ticker": "NVDA", "exchange": "NASDAQ"}]}})
+    assert [c[0] for c in commands] == ["screener/tradingview_chart_service.py"] * 2
+    assert "--symbol=NVDA" in commands[0] and "--refresh" in commands[0]
+    assert _leader_charts({}) == []
+
+
+def test_job_dependencies_exist():
+    names = {job.name for job in JOBS}
+    assert all(dependency in names for job in JOBS for dependency in job.after)
@@ -0,0 +1,74 @@
+"""Unit tests for replay_server."""
+
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+pytest.importorskip("requests")
+
+from http_client import HostPolicy, HttpClient, HttpConfig
+from replay_server import CassetteStore, Faults, Recording, make_server, request_key
+
+HOST = "scanner.example.com"
+QUERY = {"columns": ["close"], "markets": ["america"]}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CassetteStore(str(tmp_path))
+    key = request_key("POST", HOST, "/global/scan", "", json.dumps(QUERY).encode())
+    store.save(HOST, key, "POST", "/global/scan", Recording(200, "application/json", b'{"data": []}'))
+    return store
+
+
+def _serve(store, faults=Faults()):
+    server = make_server(store, faults, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _client(server) -> HttpClient:
+    policy = HostPolicy(max_retries=6, backoff_base=0.01, backoff_max=0.02)
+    return HttpClient(HttpConfig(max_retries=None, replay_url=server.url, host_policies={HOST: policy}))
+
+
+def test_key_ignores_volatile_params_and_json_key_order():
+    assert request_key("GET", "h", "/chart/AAPL", "period1=1&interval=1d") == request_key("GET", "h", "/chart/AAPL", "interval=1d&period1=2")
+    assert request_key("GET", "h", "/chart/AAPL", "interval=1d") != request_key("GET", "h", "/chart/AAPL", "interval=1wk")
+    assert request_key("POST", "h", "/", "", b'{"a": 1, "b": 2}') == request_key("POST", "h", "/", "", b'{"b":2,"a":1}')
+
+
+def test_client_requests_are_served_from_recordings(store):
+    server = _serve(store)
+    try:
+        client = _client(server)
+        assert client.post(f"https://{HOST}/global/scan", json=QUERY).json() == {"data": []}
+        assert client.get(f"https://{HOST}/unknown").status_code == 404
+
+        stats = server.snapshot()["hosts"][HOST]
+        assert (stats["requests"], stats["served"], stats["missed"]) == (2, 1, 1)
+    finally:
+        server.shutdown()
+
+
+def test_injected_faults_are_retried_and_repeat_after_reset(store):
+    server = _serve(store, Faults(rate_limit=0.4, failure=0.2, retry_after=0, seed=3))
+    try:
+        client = _client(server)
+        runs = []
+        for _ in range(2):
+            server.reset()
+            for _ in range(5):
+                assert client.post(f"https://{HOST}/global/scan", json=QUERY).status_code == 200
+            runs.append(server.snapshot()["hosts"][HOST])
+
+        assert runs[0] == runs[1]
+        assert runs[0]["served"] == 5
+        assert runs[0]["rate_limited"] + runs[0]["failed"] == runs[0]["requests"] - 5 > 0
+    finally:
+        server.shutdown()
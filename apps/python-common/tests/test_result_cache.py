@@ -0,0 +1,58 @@
+"""Unit tests for result_cache."""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from market_calendar import EXCHANGE_TZ
+from result_cache import ResultCache
+
+MONDAY_NOON = datetime(2024, 6, 3, 12, 0, tzinfo=EXCHANGE_TZ)
+MONDAY_AFTER_CLOSE = datetime(2024, 6, 3, 16, 5, tzinfo=EXCHANGE_TZ)
+TUESDAY_AFTER_CLOSE = datetime(2024, 6, 4, 16, 5, tzinfo=EXCHANGE_TZ)
+
+
+def _args(**overrides) -> argparse.Namespace:
+    return argparse.Namespace(**{"no_cache": False, "refresh": False, **overrides})
+
+
+def test_entry_is_valid_until_the_next_close(tmp_path):
+    cache = ResultCache(str(tmp_path), "screen")
+    cache.put({"type": "daily"}, {"count": 1}, now=MONDAY_NOON)
+    assert cache.get({"type": "daily"}, now=MONDAY_NOON.replace(hour=15)) == {"count": 1}
+    assert cache.get({"type": "weekly"}, now=MONDAY_NOON) is None
+    assert cache.get({"type": "daily"}, now=MONDAY_AFTER_CLOSE) is None
+
+
+def test_past_sessions_are_pruned_on_write(tmp_path):
+    cache = ResultCache(str(tmp_path), "screen")
+    cache.put({}, {"count": 1}, now=MONDAY_NOON)
+    cache.put({}, {"count": 2}, now=TUESDAY_AFTER_CLOSE)
+    assert [f[:10] for f in os.listdir(cache.path)] == ["2024-06-05"]
+
+
+def test_cached_computes_once(tmp_path):
+    cache = ResultCache(str(tmp_path), "screen")
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"count": len(calls)}
+
+    assert cache.cached({}, compute, _args()) == ({"count": 1}, False)
+    assert cache.cached({}, compute, _args()) == ({"count": 1}, True)
+    assert cache.cached({}, compute, _args(refresh=True)) == ({"count": 2}, False)
+    assert cache.cached({}, compute, _args()) == ({"count": 2}, True)
+    assert cache.cached({}, compute, _args(no_cache=True)) == ({"count": 3}, False)
+    assert cache.cached({}, compute, _args()) == ({"count": 2}, True)
+
+
+def test_failed_payloads_are_not_stored(tmp_path):
+    cache = ResultCache(str(tmp_path), "screen")
+    cache.cached({}, lambda: {"error": "boom"}, _args())
+    cache.cached({"v": 1}, lambda: {"partial": True}, _args(), storable=lambda p: not p["partial"])
+    assert cache.get({}) is None
+    assert cache.get({"v": 1}) is None
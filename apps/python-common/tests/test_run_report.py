@@ -0,0 +1,91 @@
+"""Unit tests for run_report."""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import run_report
+from run_report import RunReport, _percentile
+
+
+class TestRunReport:
+    def test_repeated_stages_are_aggregated(self):
+        report = RunReport("test")
+        report.record_stage("fetch", 0.5)
+        report.record_stage("fetch", 1.5)
+        report.record_stage("rank", 0.1)
+        stages = report.to_dict()["stages"]
+        assert [s["name"] for s in stages] == ["fetch", "rank"]
+        assert stages[0]["calls"] == 2
+        assert stages[0]["seconds"] == 2.0
+        assert stages[0]["max_seconds"] == 1.5
+
+    def test_http_accounting_per_host(self):
+        report = RunReport("test")
+        for ms in range(1, 101):
+            report.record_request("scanner.tradingview.com", ms / 1000, nbytes=10)
+        report.record_request("scanner.tradingview.com", 0.2, ok=False)
+        http = report.to_dict()["http"]["scanner.tradingview.com"]
+        assert http["requests"] == 101
+        assert http["errors"] == 1
+        assert http["bytes"] == 1000
+        assert http["p50_ms"] == 51.0
+        assert http["max_ms"] == 200.0
+
+    def test_cache_hit_rate(self):
+        report = RunReport("test")
+        report.record_cache("rs_ratings", True)
+        report.record_cache("rs_ratings", True)
+        report.record_cache("rs_ratings", False)
+        assert report.to_dict()["caches"]["rs_ratings"]["hit_rate"] == 0.6667
+
+    def test_percentile_nearest_rank(self):
+        assert _percentile([], 50) == 0.0
+        assert _percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0
+        assert _percentile([1.0, 2.0, 3.0, 4.0], 99) == 4.0
+
+
+class TestRun:
+    def test_report_written_to_file_and_not_stdout(self, tmp_path, capsys):
+        target = tmp_path / "timing.json"
+        args = argparse.Namespace(timing_report=str(target), profile=None, quiet=False)
+        with run_report.run("cli", args):
+            with run_report.stage("work"):
+                pass
+            run_report.count("symbols_skipped", 3)
+
+        assert capsys.readouterr().out == ""
+        report = json.loads(target.read_text())
+        assert report["name"] == "cli"
+        assert report["stages"][0]["name"] == "work"
+        assert report["counters"] == {"symbols_skipped": 3}
+
+    def test_report_goes_to_stderr_unless_quiet(self, capsys):
+        with run_report.run("cli", argparse.Namespace(timing_report=None, profile=None, quiet=False)):
+            pass
+        assert capsys.readouterr().err.startswith("TIMING ")
+
+        with run_report.run("cli", argparse.Namespace(timing_report=None, profile=None, quiet=True)):
+            pass
+        assert capsys.readouterr().err == ""
+
+    def test_report_written_when_run_exits(self, tmp_path):
+        target = tmp_path / "timing.json"
+        args = argparse.Namespace(timing_report=str(target), profile=None, quiet=True)
+        try:
+            with run_report.run("cli", args):
+                raise SystemExit(1)
+        except SystemExit:
+            pass
+        assert target.exists()
+
+    def test_profile_dump(self, tmp_path):
+        target = tmp_path / "run.prof"
+        args = argparse.Namespace(timing_report=None, profile=str(target), quiet=True)
+        with run_report.run("cli", args):
+            sum(range(1000))
+        assert target.exists()
+        assert (tmp_path / "run.prof.tracemalloc.txt").exists()
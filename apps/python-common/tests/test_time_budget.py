@@ -0,0 +1,39 @@
+"""Unit tests for time_budget."""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from time_budget import DeadlineExceeded, TimeBudget, call_with_deadline
+
+
+def test_call_returns_value_or_raises_its_error():
+    assert call_with_deadline(lambda a, b=0: a + b, 1.0, 2, b=3) == 5
+    with pytest.raises(ZeroDivisionError):
+        call_with_deadline(lambda: 1 / 0, 1.0)
+
+
+def test_hung_call_is_abandoned_at_its_deadline():
+    release = threading.Event()
+    start = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        call_with_deadline(release.wait, 0.05)
+    assert time.perf_counter() - start < 1.0
+    release.set()
+
+
+def test_budget_expires_on_its_clock():
+    now = [100.0]
+    budget = TimeBudget(10, clock=lambda: now[0])
+    assert budget.remaining() == 10 and not budget.expired()
+    now[0] = 110.0
+    assert budget.remaining() == 0 and budget.expired()
+
+    unlimited = TimeBudget(clock=lambda: now[0])
+    now[0] = 1e9
+    assert unlimited.remaining() is None and not unlimited.expired()
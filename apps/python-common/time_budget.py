@@ -0,0 +1,90 @@
+"""
+Time Budget — deadlines for single calls and for a whole run.
+
+Some calls have no timeout we control: yfinance's history and info requests
+go through its own curl_cffi session, and tradingview-scraper's Streamer
+reads a websocket until it is satisfied. One hung socket would stall a run
+until the backend kills the process, and nothing is returned.
+
+call_with_deadline() runs such a call in a daemon thread and gives up on it
+once its deadline passes; the call keeps running in the background and its
+result is discarded. TimeBudget tracks a run's overall allowance, so a scan
+can stop starting new work when it is used up and return what it has.
+Entry points expose:
+
+    --time-budget SECONDS      stop starting new work after this long (default: none)
+    --request-timeout SECONDS  deadline of each external call (default: 30)
+"""
+
+import argparse
+import threading
+import time
+from typing import Any, Callable, TypeVar
+
+DEFAULT_REQUEST_TIMEOUT = 30.0
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+def call_with_deadline(function: Callable[..., T], seconds: float | None, *args: Any, **kwargs: Any) -> T:
+    """`function(*args, **kwargs)`, or DeadlineExceeded after `seconds` (None waits forever)."""
+    if seconds is None:
+        return function(*args, **kwargs)
+
+    outcome: dict[str, Any] = {}
+    done = threading.Event()
+
+    def run() -> None:
+        try:
+            outcome["value"] = function(*args, **kwargs)
+        except BaseException as exc:
+            outcome["error"] = exc
+        finally:
+            done.set()
+
+    # A daemon thread, so an abandoned call cannot hold up interpreter exit
+    threading.Thread(target=run, name=f"deadline-{getattr(function, '__name__', 'call')}", daemon=True).start()
+    if not done.wait(seconds):
+        raise DeadlineExceeded(f"no answer within {seconds:g}s")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["value"]
+
+
+class TimeBudget:
+    def __init__(self, seconds: float | None = None, clock: Callable[[], float] = time.monotonic):
+        self.seconds = seconds
+        self._clock = clock
+        self.started = clock()
+
+    def elapsed(self) -> float:
+        return self._clock() - self.started
+
+    def remaining(self) -> float | None:
+        """Seconds left, None when there is no budget."""
+        if self.seconds is None:
+            return None
+        return max(0.0, self.seconds - self.elapsed())
+
+    def expired(self) -> bool:
+        return self.seconds is not None and self.elapsed() >= self.seconds
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        metavar="SECONDS",
+        help="Stop starting new work after SECONDS, finish what is in flight and return a partial result",
+    )
+    parser.add_argument(
+        "--request-timeout",
+        type=float,
+        default=DEFAULT_REQUEST_TIMEOUT,
+        metavar="SECONDS",
+        help=f"Deadline of each external request (default: {DEFAULT_REQUEST_TIMEOUT:g})",
+    )
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Chart Stream Server
+Keeps open charts current without re-spawning tradingview_chart_service.py
+in a polling loop. A long-running HTTP server pushes candles as
+Server-Sent Events:
+
+    GET /stream?symbol=AAPL&exchange=NASDAQ&interval=5&bars=300
+
+    event: snapshot   {"symbol", "exchange", "interval", "candles": [...]}
+    event: bar        {"symbol", "exchange", "interval", "candle": {...}, "new": true|false}
+    event: status     {"status": "connected" | "disconnected", "error"?, "retry_in"?}
+    event: error      {"error": ...}
+
+`new` is true for a bar that just opened and false for an update of the
+forming bar. Candles have the same shape as tradingview_chart_service.py
+output. A snapshot follows every (re)load of the history, so a client
+replaces its candles on snapshot and applies bars on top.
+
+Each (symbol, interval) has one upstream TradingView stream (a Channel),
+however many clients watch it; every update is fanned out to all of them.
+A channel without subscribers is closed after --idle-timeout seconds, and
+a client that falls SUBSCRIBER_QUEUE events behind is disconnected rather
+than holding up the others. GET /stats lists the open channels.
+
+Usage:
+    python chart_stream_server.py --port 8790
+    python chart_stream_server.py --port 8790 --bars 500 --idle-timeout 120
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python-common"))
+
+import run_report
+from tradingview_chart_service import INTERVAL_MAP, to_candle
+from tradingview_stream import RESOLUTIONS, StreamConnection
+
+# Suppress library logging so only our events reach clients
+logging.disable(logging.CRITICAL)
+
+DEFAULT_PORT = 8790
+DEFAULT_BARS = 500
+IDLE_TIMEOUT = 60.0
+REAP_INTERVAL = 5.0
+KEEPALIVE = 15.0
+SUBSCRIBER_QUEUE = 1000
+RECONNECT_BACKOFF = [1, 2, 5, 10, 30]  # seconds; the last value repeats
+
+Connect = Callable[[List[str], str, int], StreamConnection]
+
+
+class Subscriber:
+    def __init__(self, bars: int):
+        self.bars = bars
+        self.events: 'queue.Queue[Tuple[str, Dict[str, Any]]]' = queue.Queue(maxsize=SUBSCRIBER_QUEUE)
+        self.dropped = False
+
+    def send(self, kind: str, payload: Dict[str, Any]) -> None:
+        try:
+            self.events.put_nowait((kind, payload))
+        except queue.Full:
+            self.dropped = True
+
+
+class Channel:
+    """One upstream stream of (symbol, interval) and the clients watching it."""
+
+    def __init__(self, symbol: str, exchange: str, interval: str, bars: int, connect: Connect):
+        self.symbol = symbol
+        self.exchange = exchange
+        self.interval = interval
+        self.timeframe = INTERVAL_MAP.get(interval, '1d')
+        self.resolution = RESOLUTIONS[self.timeframe]
+        self.bars = bars
+        self.connect = connect
+
+        self.lock = threading.Lock()
+        self.subscribers: Set[Subscriber] = set()
+        self.idle_since: Optional[float] = time.monotonic()
+        self.times: List[int] = []
+        self.candles: List[Dict[str, Any]] = []
+        self.updates = 0
+        self.connects = 0
+        self.stopping = threading.Event()
+        self.connection: Optional[StreamConnection] = None
+        self.thread = threading.Thread(target=self._read, daemon=True)
+
+    @property
+    def ticker(self) -> str:
+        return f'{self.exchange}:{self.symbol}'
+
+    def _header(self) -> Dict[str, Any]:
+        return {'symbol': self.symbol, 'exchange': self.exchange, 'interval': self.interval}
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopping.set()
+        connection = self.connection
+        if connection is not None:
+            connection.close()
+
+    def subscribe(self, bars: int) -> Subscriber:
+        subscriber = Subscriber(bars)
+        with self.lock:
+            if self.candles:
+                self._snapshot(subscriber)
+            self.subscribers.add(subscriber)
+            self.idle_since = None
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self.lock:
+            self.subscribers.discard(subscriber)
+            if not self.subscribers:
+                self.idle_since = time.monotonic()
+
+    def _snapshot(self, subscriber: Subscriber) -> None:
+        subscriber.send('snapshot', {**self._header(), 'candles': self.candles[-subscriber.bars:]})
+
+    def _broadcast(self, kind: str, payload: Optional[Dict[str, Any]] = None) -> None:
+        # Called with the lock held; a snapshot is cut to each subscriber's bars
+        for subscriber in list(self.subscribers):
+            if kind == 'snapshot':
+                self._snapshot(subscriber)
+            else:
+                subscriber.send(kind, payload)
+            if subscriber.dropped:
+                self.subscribers.discard(subscriber)
+        if not self.subscribers and self.idle_since is None:
+            self.idle_since = time.monotonic()
+
+    # -- upstream -----------------------------------------------------------
+
+    def _read(self) -> None:
+        attempt = 0
+        while not self.stopping.is_set():
+            try:
+                self.connection = self.connect([self.ticker], self.resolution, self.bars)
+                self.connects += 1
+                with self.lock:
+                    self._broadcast('status', {**self._header(), 'status': 'connected'})
+                for packet in self.connection.packets():
+                    attempt = 0
+                    if self.stopping.is_set():
+                        return
+                    self._dispatch(packet)
+            except Exception as error:
+                if self.stopping.is_set():
+                    return
+                wait = RECONNECT_BACKOFF[min(attempt, len(RECONNECT_BACKOFF) - 1)]
+                attempt += 1
+                with self.lock:
+                    self._broadcast('status', {**self._header(), 'status': 'disconnected', 'error': str(error), 'retry_in': wait})
+                self.stopping.wait(wait)
+            finally:
+                if self.connection is not None:
+                    self.connection.close()
+                    self.connection = None
+
+    def _dispatch(self, packet: Dict[str, Any]) -> None:
+        kind = packet.get('m')
+        params = packet.get('p') or []
+        if kind in ('timescale_update', 'du') and len(params) > 1 and isinstance(params[1], dict):
+            for payload in params[1].values():
+                if isinstance(payload, dict) and payload.get('s'):
+                    self.apply(kind == 'timescale_update', [entry['v'] for entry in payload['s']])
+        elif kind in ('symbol_error', 'series_error'):
+            with self.lock:
+                self._broadcast('error', {**self._header(), 'error': str(params[2:] or kind)})
+        elif kind in ('critical_error', 'protocol_error'):
+            raise ConnectionError(f'{kind}: {params}')
+
+    def apply(self, reset: bool, rows: List[List[float]]) -> None:
+        """Apply [time, open, high, low, close, volume?] rows: a full load, new bars or forming-bar updates."""
+        with self.lock:
+            self.updates += 1
+            if reset:
+                rows = rows[-self.bars:]
+                self.times = [int(row[0]) for row in rows]
+                self.candles = [self._candle(row) for row in rows]
+                self._broadcast('snapshot')
+                return
+
+            for row in rows:
+                bar_time = int(row[0])
+                if self.times and bar_time < self.times[-1]:
+                    continue  # late revision of an older bar
+                candle = self._candle(row)
+                is_new = not self.times or bar_time > self.times[-1]
+                if is_new:
+                    self.times.append(bar_time)
+                    self.candles.append(candle)
+                    if len(self.candles) > self.bars:
+                        del self.times[0], self.candles[0]
+                else:
+                    self.candles[-1] = candle
+                self._broadcast('bar', {**self._header(), 'candle': candle, 'new': is_new})
+
+    def _candle(self, row: List[float]) -> Dict[str, Any]:
+        values = list(row) + [0] * (6 - len(row))
+        return to_candle({
+            'timestamp': values[0], 'open': values[1], 'high': values[2],
+            'low': values[3], 'close': values[4], 'volume': values[5] or 0,
+        }, self.timeframe)
+
+
+class ChartHub:
+    """Channels by (exchange:symbol, timeframe), opened on first subscribe and closed when idle."""
+
+    def __init__(self, connect: Connect = StreamConnection, bars: int = DEFAULT_BARS, idle_timeout: float = IDLE_TIMEOUT):
+        self.connect = connect
+        self.bars = bars
+        self.idle_timeout = idle_timeout
+        self.lock = threading.Lock()
+        self.channels: Dict[Tuple[str, str], Channel] = {}
+
+    def subscribe(self, symbol: str, exchange: str, interval: str, bars: int) -> Tuple[Channel, Subscriber]:
+        key = (f'{exchange}:{symbol}', INTERVAL_MAP.get(interval, '1d'))
+        with self.lock:
+            channel = self.channels.get(key)
+            if channel is None:
+                channel = Channel(symbol, exchange, interval, self.bars, self.connect)
+                self.channels[key] = channel
+                channel.start()
+                run_report.count('upstream_streams')
+            # Subscribe under the hub lock so reap() cannot close the channel in between
+            return channel, channel.subscribe(min(bars, self.bars))
+
+    def unsubscribe(self, channel: Channel, subscriber: Subscriber) -> None:
+        channel.unsubscribe(subscriber)
+
+    def reap(self, now: Optional[float] = None) -> List[str]:
+        """Close channels idle for idle_timeout; returns their tickers."""
+        now = time.monotonic() if now is None else now
+        closed = []
+        with self.lock:
+            for key, channel in list(self.channels.items()):
+                idle_since = channel.idle_since
+                if idle_since is not None and now - idle_since >= self.idle_timeout:
+                    del self.channels[key]
+                    channel.stop()
+                    closed.append(channel.ticker)
+        return closed
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self.lock:
+            channels = list(self.channels.values())
+        return {
+            'channels': len(channels),
+            'subscribers': sum(len(c.subscribers) for c in channels),
+            'streams': [{
+                'symbol': channel.ticker,
+                'interval': channel.interval,
+                'subscribers': len(channel.subscribers),
+                'candles': len(channel.candles),
+                'updates': channel.updates,
+                'connects': channel.connects,
+                'idle_seconds': None if channel.idle_since is None else round(now - channel.idle_since, 1),
+            } for channel in channels],
+        }
+
+    def close(self) -> None:
+        with self.lock:
+            for channel in self.channels.values():
+                channel.stop()
+            self.channels.clear()
+
+
+class StreamHandler(BaseHTTPRequestHandler):
+    hub: ChartHub
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        if url.path == '/stream':
+            self._stream(query)
+        elif url.path == '/stats':
+            self._json(200, self.hub.stats())
+        elif url.path == '/health':
+            self._json(200, {'status': 'ok'})
+        else:
+            self._json(404, {'error': f'unknown path {url.path}'})
+
+    def _json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, query: Dict[str, str]) -> None:
+        symbol, exchange = query.get('symbol'), query.get('exchange')
+        if not symbol or not exchange:
+            self._json(400, {'error': 'symbol and exchange are required'})
+            return
+        try:
+            bars = int(query.get('bars', DEFAULT_BARS))
+        except ValueError:
+            self._json(400, {'error': f"bars must be an integer, got {query['bars']!r}"})
+            return
+
+        channel, subscriber = self.hub.subscribe(symbol, exchange, query.get('interval', 'D'), bars)
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Connection', 'keep-alive')
+            self.end_headers()
+            while not subscriber.dropped:
+                try:
+                    kind, payload = subscriber.events.get(timeout=KEEPALIVE)
+                    message = f'event: {kind}\ndata: {json.dumps(payload)}\n\n'
+                except queue.Empty:
+                    message = ': keepalive\n\n'  # also notices clients that went away
+                self.wfile.write(message.encode())
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.hub.unsubscribe(channel, subscriber)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(host: str, port: int, hub: ChartHub, quiet: bool = False) -> None:
+    handler = type('Handler', (StreamHandler,), {'hub': hub})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+
+    def reap_loop():
+        while True:
+            time.sleep(REAP_INTERVAL)
+            for ticker in hub.reap():
+                if not quiet:
+                    print(f"💤 Released idle stream {ticker}", file=sys.stderr)
+
+    threading.Thread(target=reap_loop, daemon=True).start()
+    if not quiet:
+        print(f"📡 Chart stream server listening on http://{host}:{server.server_address[1]}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        hub.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Chart Stream Server - live candles pushed to many clients over one upstream stream each')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port (default: {DEFAULT_PORT})')
+    parser.add_argument('--bars', type=int, default=DEFAULT_BARS, help=f'Candles kept per stream (default: {DEFAULT_BARS})')
+    parser.add_argument('--idle-timeout', type=float, default=IDLE_TIMEOUT,
+                        help=f'Seconds a stream without clients stays open (default: {IDLE_TIMEOUT:.0f})')
+    parser.add_argument('--quiet', action='store_true', help='Suppress non-essential output')
+    run_report.add_arguments(parser)
+    args = parser.parse_args()
+
+    with run_report.run('chart_stream', args):
+        try:
+            serve(args.host, args.port, ChartHub(bars=args.bars, idle_timeout=args.idle_timeout), args.quiet)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -3,22 +3,32 @@
 Stock Classifier - Fetches GICS-relevant classification fields from yfinance.
 
 Usage:
-    python classifier.py <TICKER>
+    python classifier.py <TICKER> [--timing-report PATH] [--profile PATH]
 
 Output (stdout, single JSON line):
     {"ticker": "AAPL", "sector": "Technology", "industry": "Consumer Electronics", "industryKey": "consumer-electronics"}
 
 If yfinance has no data for the ticker, all fields except `ticker` are empty strings.
 """
+import argparse
 import json
+import os
 import sys
 
-import yfinance as yf
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python-common"))
+
+import run_report
 
 
 def classify(symbol: str) -> dict:
     try:
-        info = yf.Ticker(symbol).info
+        # Imported here so argument errors and --help do not pay for
+        # yfinance (and pandas) start-up.
+        with run_report.stage("import_yfinance"):
+            import yfinance as yf
+
+        with run_report.stage("yfinance_info"):
+            info = yf.Ticker(symbol).info
     except Exception:
         info = {}
 
@@ -31,11 +41,14 @@ def classify(symbol: str) -> dict:
 
 
 def main() -> int:
-    if len(sys.argv) != 2:
-        print("Usage: classifier.py <TICKER>", file=sys.stderr)
-        return 2
-
-    print(json.dumps(classify(sys.argv[1])))
+    parser = argparse.ArgumentParser(description="Stock Classifier - GICS-relevant fields from yfinance")
+    parser.add_argument("ticker")
+    parser.add_argument("--quiet", action="store_true", help="Suppress non-essential output")
+    run_report.add_arguments(parser)
+    args = parser.parse_args()
+
+    with run_report.run("classifier", args):
+        print(json.dumps(classify(args.ticker)))
     return 0
 
 
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Live Monitor
+Watches a setup's candidates during the session and reports signal changes
+as they happen, instead of waiting for the end-of-day batch.
+
+Usage:
+    python live_monitor.py --setup daily
+    python live_monitor.py --setup weekly --symbols NASDAQ:AAPL,NYSE:ANET
+
+A rule set is defined on the bars of its history interval (daily or weekly):
+ADR%, the 20-bar volume average and the moving-average crosses mean nothing
+on 5-minute bars. So the setup's own bars are streamed, and the intraday
+updates revise the forming daily (or weekly) bar in place; --interval only
+accepts that interval.
+
+Bars come from TradingView's chart WebSocket (tradingview_stream.py). Symbols
+are multiplexed SYMBOLS_PER_CONNECTION to a connection, each read by its own
+thread. The main thread drains every pending update, applies it to the
+symbol's bar buffer, and re-evaluates the setup's compiled rules
+(scan_rules.py) for the symbols that changed, as one panel. Each change of the
+setup's output signal is written to stdout as one NDJSON line:
+
+    {"event": "signal", "setup": "daily", "symbol": "NASDAQ:AAPL", "state": true,
+     "previous": false, "bar_time": 1760000000, "close": 231.4,
+     "conditions": {"basic_signal": true, ...}, "latency_ms": 4.2}
+
+`previous` is null for a symbol's first evaluation. Connection problems are
+reported as {"event": "status", ...} lines and the affected symbols are
+subscribed again with backoff.
+
+The rules are rolling and exponential series, so a new price for the forming
+bar can move every indicator's latest value; each evaluation recomputes the
+changed symbols' whole buffers (--bars rows each): about 10 ms for one symbol
+and 35 ms for fifty at 300 bars. Updates that arrive while an evaluation runs
+are batched into the next one, so the cost grows with the number of symbols
+that ticked, not with the number of packets.
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python-common"))
+
+import numpy as np
+
+import run_report
+from price_panel import PANEL_FIELDS, build_panel
+from scan_rules import RuleSet, available_rule_sets, compile_rule_set, evaluate, load_rule_set
+from screener_service import ScreenerService
+from tradingview_chart_service import INTERVAL_MAP
+from tradingview_stream import RESOLUTIONS, StreamConnection
+
+# Suppress library logging so only our events hit stdout
+logging.disable(logging.CRITICAL)
+
+SYMBOLS_PER_CONNECTION = 50
+RECONNECT_BACKOFF = [1, 2, 5, 10, 30]  # seconds; the last value repeats
+
+
+def stream_resolution(rule_set: RuleSet, interval: Optional[str] = None) -> str:
+    """The chart resolution of the rule set's bars; ValueError when `interval` asks for other bars."""
+    timeframe = INTERVAL_MAP[rule_set.history_interval]
+    if interval is not None and INTERVAL_MAP.get(interval) != timeframe:
+        raise ValueError(f'the {rule_set.name} rule set is defined on {rule_set.history_interval} bars, not {interval}')
+    return RESOLUTIONS[timeframe]
+
+
+class BarBuffer:
+    """The last `capacity` bars of one symbol, updated in place as bars stream in."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.count = 0
+        self.time = np.zeros(capacity, dtype=np.int64)
+        self.values = {field: np.full(capacity, np.nan) for field in PANEL_FIELDS}
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.values[field][:self.count]
+
+    @property
+    def last_time(self) -> Optional[int]:
+        return int(self.time[self.count - 1]) if self.count else None
+
+    def reset(self, rows: List[List[float]]) -> None:
+        """Replace the buffer with a full history load (oldest bar first)."""
+        rows = rows[-self.capacity:]
+        matrix = np.full((len(rows), len(PANEL_FIELDS) + 1), np.nan)
+        for index, row in enumerate(rows):
+            matrix[index, :len(row)] = [np.nan if v is None else v for v in row[:matrix.shape[1]]]
+        self.count = len(rows)
+        self.time[:self.count] = matrix[:, 0]
+        for offset, field in enumerate(PANEL_FIELDS, start=1):
+            self.values[field][:self.count] = matrix[:, offset]
+
+    def update(self, rows: List[List[float]]) -> None:
+        """Apply [time, open, high, low, close, volume?] rows: a new bar or a revision of the last one."""
+        for row in rows:
+            bar_time = int(row[0])
+            last_time = self.last_time
+            if last_time is not None and bar_time < last_time:
+                continue  # late revision of an older bar
+            if last_time is None or bar_time > last_time:
+                if self.count == self.capacity:
+                    self.time[:-1] = self.time[1:]
+                    for values in self.values.values():
+                        values[:-1] = values[1:]
+                    self.count -= 1
+                self.count += 1
+            index = self.count - 1
+            self.time[index] = bar_time
+            for offset, field in enumerate(PANEL_FIELDS, start=1):
+                self.values[field][index] = row[offset] if len(row) > offset and row[offset] is not None else np.nan
+
+
+class LiveMonitor:
+    def __init__(
+        self,
+        rule_set_name: str,
+        symbols: List[str],
+        interval: Optional[str] = None,
+        bars: int = 300,
+        emit: Callable[[Dict[str, Any]], None] = None,
+        connect: Callable[[List[str], str, int], StreamConnection] = StreamConnection,
+    ):
+        rule_set = load_rule_set(rule_set_name)
+        self.resolution = stream_resolution(rule_set, interval)
+        self.compiled = compile_rule_set(rule_set)
+        self.conditions = list(rule_set.signals)
+        self.symbols = symbols
+        self.bars = bars
+        self.emit = emit or _print_event
+        self.connect = connect
+
+        self.buffers = {symbol: BarBuffer(bars) for symbol in symbols}
+        self.states: Dict[str, bool] = {}
+        self.updates: 'queue.Queue[tuple]' = queue.Queue()
+        self.stopping = threading.Event()
+
+    # -- readers (one thread per connection) --------------------------------
+
+    def _read(self, symbols: List[str]) -> None:
+        attempt = 0
+        while not self.stopping.is_set():
+            connection = None
+            try:
+                connection = self.connect(symbols, self.resolution, self.bars)
+                self.updates.put(('event', {'event': 'status', 'status': 'connected', 'symbols': len(symbols)}))
+                for packet in connection.packets():
+                    attempt = 0
+                    self._dispatch(connection, packet)
+                    if self.stopping.is_set():
+                        return
+            except Exception as error:
+                if self.stopping.is_set():
+                    return
+                wait = RECONNECT_BACKOFF[min(attempt, len(RECONNECT_BACKOFF) - 1)]
+                attempt += 1
+                self.updates.put(('event', {'event': 'status', 'status': 'disconnected', 'symbols': len(symbols),
+                                            'error': str(error), 'retry_in': wait}))
+                self.stopping.wait(wait)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+    def _dispatch(self, connection: StreamConnection, packet: Dict[str, Any]) -> None:
+        kind = packet.get('m')
+        params = packet.get('p') or []
+        if kind in ('timescale_update', 'du') and len(params) > 1 and isinstance(params[1], dict):
+            received = time.perf_counter()
+            for series_id, payload in params[1].items():
+                symbol = connection.series.get(series_id)
+                if symbol is None or not isinstance(payload, dict) or not payload.get('s'):
+                    continue
+                rows = [entry['v'] for entry in payload['s']]
+                self.updates.put(('bars', (symbol, kind == 'timescale_update', rows, received)))
+        elif kind in ('symbol_error', 'series_error') and len(params) > 1:
+            symbol = connection.symbol_ids.get(params[1]) or connection.series.get(params[1])
+            self.updates.put(('event', {'event': 'error', 'symbol': symbol, 'error': str(params[2:] or kind)}))
+        elif kind in ('critical_error', 'protocol_error'):
+            raise ConnectionError(f'{kind}: {params}')
+
+    # -- main loop ----------------------------------------------------------
+
+    def run(self, duration: float = 0) -> None:
+        """Stream until interrupted, or for `duration` seconds when given."""
+        deadline = time.monotonic() + duration if duration else None
+        for start in range(0, len(self.symbols), SYMBOLS_PER_CONNECTION):
+            chunk = self.symbols[start:start + SYMBOLS_PER_CONNECTION]
+            threading.Thread(target=self._read, args=(chunk,), daemon=True).start()
+
+        try:
+            while deadline is None or time.monotonic() < deadline:
+                try:
+                    batch = [self.updates.get(timeout=1.0)]
+                except queue.Empty:
+                    continue
+                while True:
+                    try:
+                        batch.append(self.updates.get_nowait())
+                    except queue.Empty:
+                        break
+                self._apply(batch)
+        finally:
+            self.stopping.set()
+
+    def _apply(self, batch: List[tuple]) -> None:
+        received: Dict[str, float] = {}
+        for kind, payload in batch:
+            if kind == 'event':
+                self.emit(payload)
+                continue
+            symbol, reset, rows, at = payload
+            buffer = self.buffers[symbol]
+            if reset:
+                buffer.reset(rows)
+            else:
+                buffer.update(rows)
+            received[symbol] = min(received.get(symbol, at), at)
+
+        if received:
+            run_report.count('live_updates', len(received))
+            with run_report.stage('evaluate'):
+                self._evaluate(received)
+
+    def _evaluate(self, received: Dict[str, float]) -> None:
+        """Re-evaluate the setup over the full buffers of the symbols whose bars changed and emit state changes."""
+        symbols = [s for s in received if len(self.buffers[s])]
+        try:
+            panel = build_panel({s: self.buffers[s] for s in symbols})
+            series = evaluate([self.compiled], panel, names=self.conditions)[self.compiled.name]
+        except Exception as error:
+            self.emit({'event': 'error', 'symbols': symbols, 'error': str(error)})
+            return
+
+        output = series[self.compiled.rule_set.output]
+        for symbol in symbols:
+            state = bool(output[symbol].iloc[-1])
+            previous = self.states.get(symbol)
+            if state == previous:
+                continue
+            self.states[symbol] = state
+            buffer = self.buffers[symbol]
+            self.emit({
+                'event': 'signal',
+                'setup': self.compiled.name,
+                'symbol': symbol,
+                'state': state,
+                'previous': previous,
+                'bar_time': buffer.last_time,
+                'close': float(buffer['close'][-1]),
+                'conditions': {name: _json_value(series[name][symbol].iloc[-1]) for name in self.conditions},
+                'latency_ms': round((time.perf_counter() - received[symbol]) * 1000, 1),
+            })
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    value = float(value)
+    return None if math.isnan(value) else round(value, 4)
+
+
+def _print_event(event: Dict[str, Any]) -> None:
+    print(json.dumps(event), flush=True)
+
+
+def scan_symbols(rule_set_name: str) -> List[str]:
+    """The setup's current scanner candidates as EXCHANGE:SYMBOL."""
+    rule_set = load_rule_set(rule_set_name)
+    with run_report.stage('scanner'):
+        candidates = ScreenerService().scan(rule_set.scanner_parameters(), rule_set.candidate_mapper())
+    return [c['ticker_full_name'] for c in candidates]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream intraday bars and report setup signal changes as NDJSON')
+    parser.add_argument('--setup', choices=available_rule_sets(), default='daily', help='Rule set to evaluate (default: daily)')
+    parser.add_argument('--symbols', help='Comma separated EXCHANGE:SYMBOL list (default: the setup\'s scanner candidates)')
+    parser.add_argument('--interval', help='Bar interval; must be the rule set\'s own (default: D for daily, W for weekly)')
+    parser.add_argument('--bars', type=int, default=300, help='Bars of history kept per symbol (default: 300)')
+    parser.add_argument('--duration', type=float, default=0, help='Stop after this many seconds (default: run until interrupted)')
+    parser.add_argument('--quiet', action='store_true', help='Suppress non-essential output')
+    run_report.add_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        resolution = stream_resolution(load_rule_set(args.setup), args.interval)
+    except ValueError as error:
+        parser.error(str(error))
+
+    with run_report.run(f'live.{args.setup}', args):
+        symbols = [s.strip() for s in args.symbols.split(',') if s.strip()] if args.symbols else scan_symbols(args.setup)
+        if not args.quiet:
+            print(f"📡 Monitoring {len(symbols)} {args.setup} candidates on {resolution} bars", file=sys.stderr)
+        try:
+            LiveMonitor(args.setup, symbols, args.interval, args.bars).run(args.duration)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -2,29 +2,62 @@
 """
 Breakout Analysis - Main Entry Point
 A Python application for analyzing breakout patterns using TradingView and Yahoo Finance data
+
+Each Yahoo request is abandoned after --request-timeout seconds. With
+--time-budget the scan stops starting new symbols once the budget is used up,
+evaluates the histories already loaded and returns a payload marked
+"partial": true, with the candidates it did not evaluate per setup under
+"unevaluated" (null for a setup whose scanner never ran). A partial run is
+not cached and its checkpoint stays open for --resume.
+
+--symbols AAPL,NVDA skips the scan and evaluates just those symbols from
+stored history, reporting every intermediate condition (see symbol_check.py).
 """
 import json
+import os
 import sys
 import argparse
 import time
-from typing import Any, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
-import pandas as pd
-import numpy as np
-import yfinance as yf
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python-common"))
+
+import result_cache
+import run_report
+import time_budget
+from run_checkpoint import RunCheckpoint, STATUS_FAILED, STATUS_GREEN, STATUS_NO_SIGNAL
+from run_diff import build_snapshot, compact_snapshot, diff_snapshots, load_previous_snapshot, save_snapshot
+from scan_rules import available_rule_sets
 from screener_service import ScreenerService
-from yahoo_finance_service import YahooFinanceService
-from technical_analysis import calculate_sma, calculate_ema, calculate_adr_percentage
+from symbol_health import CircuitBreaker, SymbolHealth, is_symbol_error, to_yahoo_symbol
+from time_budget import DEFAULT_REQUEST_TIMEOUT, TimeBudget, call_with_deadline
+
+# pandas, numpy and yfinance take most of the start-up time, so they are
+# imported in the code paths that use them rather than at module level.
+if TYPE_CHECKING:
+    from ohlcv_store import OhlcvData
+    from scan_rules import CompiledRuleSet, RuleSet
+    from yahoo_finance_service import YahooFinanceService
 
+DEFAULT_RUNS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'runs')
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'ohlcv')
 
-def get_sector_info(symbol: str) -> Tuple[str, str]:
+# Symbols per vectorized evaluation; bounds the panel held in memory
+EVALUATION_BATCH = 50
+
+
+def get_sector_info(symbol: str, timeout: Optional[float] = DEFAULT_REQUEST_TIMEOUT) -> Tuple[str, str]:
     """
     Get sector and industry information for a stock symbol using yfinance.
-    Returns a tuple of (sector, industry). Returns empty strings if info is not available.
+    Returns a tuple of (sector, industry). Returns empty strings if info is not
+    available within `timeout` seconds.
     """
     try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
+        import yfinance as yf
+
+        ticker = yf.Ticker(to_yahoo_symbol(symbol))
+        info = call_with_deadline(lambda: ticker.info, timeout)
         sector = info.get('sector', '')
         industry = info.get('industry', '')
         return sector, industry
@@ -35,360 +68,420 @@ def get_sector_info(symbol: str) -> Tuple[str, str]:
 def main():
     parser = argparse.ArgumentParser(description='Breakout Analysis - Analyze breakout patterns')
     parser.add_argument('--format', choices=['json', 'text'], default='text', help='Output format (default: text)')
-    parser.add_argument('--type', choices=['daily', 'weekly'], required=True, help='Analysis type (required: daily or weekly)')
+    parser.add_argument('--type', type=parse_setups,
+                        help=f'Setups to analyse, comma separated (available: {", ".join(available_rule_sets())}); '
+                             'required unless --symbols is given, which defaults to all')
+    parser.add_argument('--symbols', type=parse_symbols,
+                        help='Evaluate these symbols (comma separated) from stored history instead of running the scan')
     parser.add_argument('--quiet', action='store_true', help='Suppress non-essential output')
+    parser.add_argument('--resume', action='store_true', help='Continue the checkpointed run with the same run ID and scan date')
+    parser.add_argument('--run-id', help='Checkpoint run ID (default: the analysis type)')
+    parser.add_argument('--runs-dir', default=DEFAULT_RUNS_DIR, help='Directory holding run checkpoints and result snapshots')
+    parser.add_argument('--emit', choices=['full', 'delta', 'snapshot'], default='full',
+                        help='JSON payload: full candidate lists (default), changes since the previous run, or compact rows')
+    parser.add_argument('--store-dir', default=DEFAULT_STORE_DIR,
+                        help='OHLCV store read for daily histories when it holds the last close (see ohlcv_store.py)')
+    parser.add_argument('--prefilter', action='store_true',
+                        help="Skip the history of candidates failing the setups' scanner-column prefilters "
+                             "(faster, but heuristic: a green symbol can be ruled out, see scan_rules.Prefilter)")
+    time_budget.add_arguments(parser)
+    result_cache.add_arguments(parser, DEFAULT_CACHE_DIR)
+    run_report.add_arguments(parser)
     
     args = parser.parse_args()
-    
+    if args.symbols:
+        args.type = args.type or available_rule_sets()
+        with run_report.run("screener.symbols", args):
+            run_symbol_check(args)
+        return
+    if not args.type:
+        parser.error('--type is required unless --symbols is given')
+
+    with run_report.run(f"screener.{'+'.join(args.type)}", args):
+        run_analysis(args)
+
+
+def parse_setups(value: str) -> List[str]:
+    setups = [s.strip() for s in value.split(',') if s.strip()]
+    unknown = [s for s in setups if s not in available_rule_sets()]
+    if not setups or unknown:
+        raise argparse.ArgumentTypeError(f"unknown setup(s) {', '.join(unknown) or value!r}; available: {', '.join(available_rule_sets())}")
+    return setups
+
+
+def parse_symbols(value: str) -> List[str]:
+    """Symbols as the scan names them; an exchange prefix (NASDAQ:AAPL) is dropped."""
+    symbols = [s.strip().split(':')[-1].upper() for s in value.split(',') if s.strip()]
+    if not symbols:
+        raise argparse.ArgumentTypeError(f'no symbols in {value!r}')
+    return list(dict.fromkeys(symbols))
+
+
+def run_symbol_check(args: argparse.Namespace):
+    from ohlcv_store import OhlcvStore
+    from scan_rules import load_rule_set
+    from symbol_check import check_symbols
+    from yahoo_finance_service import YahooFinanceService
+
+    try:
+        rule_sets = [load_rule_set(name) for name in args.type]
+        store = OhlcvStore(args.store_dir).load()
+        if store is not None and not store.is_current():
+            store = None
+        payload = check_symbols(args.symbols, rule_sets, store, YahooFinanceService(timeout=args.request_timeout))
+    except Exception as error:
+        if args.format == 'json':
+            print(json.dumps({'error': str(error)}))
+        else:
+            print(f"❌ Error checking symbols: {error}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.format == 'json':
+        print(json.dumps(payload))
+        return
+    for entry in payload['symbols']:
+        for setup, report in entry['setups'].items():
+            if 'error' in report:
+                print(f"❌ {entry['symbol']} {setup}: {report['error']}")
+            elif report['green']:
+                print(f"🟢 {entry['symbol']} {setup}{' (NEW)' if report['is_new'] else ''} as of {report['as_of']}")
+            else:
+                print(f"⚪ {entry['symbol']} {setup} as of {report['as_of']}: failed {', '.join(report['failed_conditions'])}")
+
+
+def format_payload(results: Dict[str, List[Any]], error: Optional[str] = None) -> Dict[str, Any]:
+    """{'daily': [...], 'dailyCount': n, ...}; daily and weekly are always present."""
+    payload: Dict[str, Any] = {'error': error} if error is not None else {}
+    for setup in ['daily', 'weekly'] + [s for s in results if s not in ('daily', 'weekly')]:
+        candidates = results.get(setup, [])
+        payload[setup] = candidates
+        payload[f'{setup}Count'] = len(candidates)
+    return payload
+
+
+def is_partial(unevaluated: Dict[str, Optional[List[str]]]) -> bool:
+    return any(symbols is None or symbols for symbols in unevaluated.values())
+
+
+def mark_partial(payload: Dict[str, Any], unevaluated: Dict[str, Optional[List[str]]]) -> Dict[str, Any]:
+    """`payload` with the partial-run fields when some candidates were not evaluated."""
+    if is_partial(unevaluated):
+        payload['partial'] = True
+        payload['unevaluated'] = unevaluated
+        payload['unevaluatedCount'] = sum(len(symbols or []) for symbols in unevaluated.values())
+    return payload
+
+
+def run_analysis(args: argparse.Namespace):
     if not args.quiet:
         print("🚀 Breakout Analysis started!", file=sys.stderr)
         print("📊 Ready to analyze breakout patterns using TradingView and Yahoo Finance data...", file=sys.stderr)
-    
-    screener_service = ScreenerService()
-    yahoo_finance_service = YahooFinanceService()
-    
-    try:
-        if not args.quiet:
-            print("\n🔍 Fetching breakout candidates from TradingView...", file=sys.stderr)
-
-        daily_candidates = []
-        weekly_candidates = []
-        
-        if args.type == 'daily':
-            daily_candidates = analyse_daily_setup(screener_service, yahoo_finance_service, args.quiet)
-        
-        if args.type == 'weekly':
-            weekly_candidates = analyse_weekly_setup(screener_service, yahoo_finance_service, args.quiet)
 
+    try:
         if args.format == 'json':
-            result = {
-                'daily': daily_candidates,
-                'weekly': weekly_candidates,
-                'dailyCount': len(daily_candidates),
-                'weeklyCount': len(weekly_candidates)
-            }
-            print(json.dumps(result))
+            # Screens only change with a new close: reuse this session's payload
+            cache = result_cache.ResultCache(args.cache_dir, 'screener')
+            payload, hit = cache.cached({'type': args.type, 'emit': args.emit, 'prefilter': args.prefilter},
+                                        lambda: json_payload(args, *run_setups(args)), args,
+                                        storable=lambda p: not p.get('partial'))
+            if hit and not args.quiet:
+                print("♻️  Using the cached result of this market session", file=sys.stderr)
+            print(json.dumps(payload))
         else:
-            print("\n✅ Analysis complete!")
-            print(f"Found {len(daily_candidates)} daily candidates")
-            for candidate in daily_candidates:
-                new_indicator = " (NEW)" if candidate['is_new'] else ""
-                print(f"{candidate['symbol']}{new_indicator}")
-            print("=========================")
-            print(f"Found {len(weekly_candidates)} weekly candidates")
-            for candidate in weekly_candidates:
-                new_indicator = " (NEW)" if candidate['is_new'] else ""
-                print(f"{candidate['symbol']}{new_indicator}")
+            results, _, _, unevaluated = run_setups(args)
+            if is_partial(unevaluated):
+                print(f"\n⏱️  Analysis stopped by the time budget; not evaluated: {format_unevaluated(unevaluated)}")
+            else:
+                print("\n✅ Analysis complete!")
+            for index, (setup, candidates) in enumerate(results.items()):
+                if index:
+                    print("=========================")
+                print(f"Found {len(candidates)} {setup} candidates")
+                for candidate in candidates:
+                    new_indicator = " (NEW)" if candidate['is_new'] else ""
+                    print(f"{candidate['symbol']}{new_indicator}")
         
     except Exception as error:
         if args.format == 'json':
-            error_result = {
-                'error': str(error),
-                'daily': [],
-                'weekly': [],
-                'dailyCount': 0,
-                'weeklyCount': 0
-            }
-            print(json.dumps(error_result))
+            print(json.dumps(format_payload({}, error=str(error))))
             sys.exit(1)
         else:
             print(f"❌ Error during analysis: {error}", file=sys.stderr)
             sys.exit(1)
 
 
-def analyse_daily_setup(screener_service: ScreenerService, yahoo_finance_service: YahooFinanceService, quiet: bool = False) -> list[Any]:
-    green_candidates = []
-    custom_filters = [
-        {"left": "close", "operation": "egreater", "right": 2},  # Price > $5
-        {"left": "market_cap_basic", "operation": "egreater", "right": 300000000},  # Market cap > $500M
-        {"left":"AvgValue.Traded_30d","operation":"greater","right":30000000}, # Average Dollar Volume > 30M
-        {"left": "average_volume_30d_calc", "operation": "greater", "right": 500000},  # Volume > 500K
-        {"left": "EMA10", "operation": "egreater", "right": "EMA20"},
-        {"left": "EMA20", "operation": "egreater", "right": "SMA50"},
-        {"left": "close", "operation": "egreater", "right": "EMA20"},
-        {"left": "is_primary", "operation": "equal", "right": True}
-    ]
-
-    # Create parameters using the helper method
-    parameters = ScreenerService.create_basic_parameters(
-        columns=["name", "close", "EMA10", "EMA20", "SMA50", "exchange"],
-        filters=custom_filters,
-        markets=["america"],  # Focus on US stocks
-        sort_by="Perf.6M",  # Sort by 6-month performance
-        sort_order="desc",
-        range_limit=[0, 5000]  # Limit to first 50 results
-    )
-
-    # Define a simple mapper lambda for breakout analysis
-    # Maps the raw data to a dictionary with the expected fields
-    breakout_mapper = lambda raw: {
-        'name': raw.data_fields[0] if len(raw.data_fields) > 0 else "Unknown",
-        'close': raw.data_fields[1] if len(raw.data_fields) > 1 else 0,
-        'ema10': raw.data_fields[2] if len(raw.data_fields) > 2 else 0,
-        'ema20': raw.data_fields[3] if len(raw.data_fields) > 3 else 0,
-        'sma50': raw.data_fields[4] if len(raw.data_fields) > 4 else 0,
-        'ticker_full_name': raw.symbol_full
-    }
-
-    candidates = screener_service.scan(parameters, breakout_mapper)
-    if not quiet:
-        print(f"Found {len(candidates)} candidates with custom filters", file=sys.stderr)
-
-    # Analyze first few candidates for testing
-    for i, candidate in enumerate(candidates):
-        try:
-            if i > 0:
-                time.sleep(0.5)
-            
-            historical_data = yahoo_finance_service.get_recent_data(candidate['name'], 300, interval="1d")
-
-            historical_data['sma_50'] = calculate_sma(historical_data['close'], 50)
-            historical_data['ema_10'] = calculate_ema(historical_data['close'], 10)
-            historical_data['ema_20'] = calculate_ema(historical_data['close'], 20)
-
-            # ADR Percentage
-            historical_data['adr_perc_20'] = calculate_adr_percentage(historical_data, 20)
-            historical_data['adr_perc_5'] = calculate_adr_percentage(historical_data, 5)
-
-
-            # Volume indicators
-            # FIXME utiliser dollar volume à la place
-            # Tu sélectionnes des phases de “dry-up”, c’est bien… mais sur le marché US, certains titres à 1M de volume moyen peuvent quand même avoir :
-            #
-            # spreads larges
-            #
-            # carnets fins
-            #
-            # slippage à l’exécution (surtout si tu tailles “portfolio-level”)
-            #
-            # ➡️ Ajoute un filtre dollar volume (bien plus robuste que volume brut) :
-            #
-            # ex : AvgDollarVolume20 = close * volume_sma_20 > seuil (ex. 20–50M$ selon ton confort)
-            historical_data['volume_sma_20'] = calculate_sma(historical_data['volume'], 20)
-            historical_data['low_volume'] = historical_data['volume'] < historical_data['volume_sma_20']
-
-            # Price vs EMA percentages
-            historical_data['price_vs_ema10_perc'] = abs(historical_data['close'] - historical_data['ema_10']) / historical_data['ema_10'] * 100
-            historical_data['price_vs_ema20_perc'] = abs(historical_data['close'] - historical_data['ema_20']) / historical_data['ema_20'] * 100
-
-            historical_data['basic_signal'] = (
-                    (historical_data['adr_perc_20'] > historical_data['price_vs_ema10_perc']) &
-                    (historical_data['ema_10'] > historical_data['ema_20'])
-            )
-
-            # Signal shifts (previous days)
-            historical_data['signal_shift'] = historical_data['basic_signal'].shift(1)
-            historical_data['signal_shift_2'] = historical_data['basic_signal'].shift(2)
-
-            # Consecutive signal for three days
-            historical_data['consecutive_signal_3_days'] = (
-                    historical_data['basic_signal'] &
-                    historical_data['signal_shift'] &
-                    historical_data['signal_shift_2']
-            )
-
-            # Find bearish condition (ema10 < ema20) - this is the "golden cross" reversal
-            bearish_condition = historical_data['ema_10'] < historical_data['ema_20']
-
-            # Create column with close price during bearish condition (EMA golden cross)
-            historical_data['price_during_ema_golden_cross'] = np.where(
-                bearish_condition,
-                historical_data['close'],
-                np.nan
-            )
-
-            # Forward fill to get the last bearish close price for each row
-            historical_data['price_during_last_ema_golden_cross'] = historical_data['price_during_ema_golden_cross'].ffill()
-
-            # Handle edge case: if no bearish condition (ema10 < ema20) in the entire dataframe,
-            # use the first close price as the reference point for performance calculation
-            if historical_data['price_during_last_ema_golden_cross'].isna().all():
-                historical_data['price_during_last_ema_golden_cross'] = historical_data['close'].iloc[0]
-
-            # Performance percentage from last bearish to signal
-            historical_data['perf_pct_from_bearish'] = np.where(
-                historical_data['basic_signal'] & historical_data['price_during_last_ema_golden_cross'].notna(),
-                (historical_data['close'] / historical_data['price_during_last_ema_golden_cross'] - 1.0) * 100.0,
-                np.nan
-            )
-
-            # Consecutive signal with minimum 30% performance
-            historical_data['consecutive_signal_with_30_perc'] = (
-                    historical_data['consecutive_signal_3_days'] &
-                    (historical_data['perf_pct_from_bearish'] > 30)
-            )
-
-            # Green signal (final signal)
-            historical_data['green_signal'] = (
-                    historical_data['consecutive_signal_with_30_perc'] &
-                    (historical_data['adr_perc_20'] > historical_data['adr_perc_5']) &
-                    historical_data['low_volume']
-            )
-
-            latest = historical_data.iloc[-1]
-            previous = historical_data.iloc[-2] if len(historical_data) > 1 else None
-
-            if latest['green_signal']:
-                # Check if this is a new signal (true now but not in previous row)
-                is_new = previous is None or not previous['green_signal']
-                
-                # Get sector and industry information
-                sector, industry = get_sector_info(candidate['name'])
-                
-                green_candidates.append({
-                    'symbol': candidate['name'],
-                    'ticker_full_name': candidate['ticker_full_name'],
-                    'is_new': is_new,
-                    'sector': sector,
-                    'industry': industry
-                })
+def format_unevaluated(unevaluated: Dict[str, Optional[List[str]]]) -> str:
+    return ', '.join(f"{setup} {'all (not scanned)' if symbols is None else len(symbols)}"
+                     for setup, symbols in unevaluated.items() if symbols is None or symbols)
 
-        except Exception as error:
+
+def unevaluated_symbols(checkpoint: RunCheckpoint, setups: List[str]) -> Dict[str, Optional[List[str]]]:
+    """Candidates of each setup without a recorded outcome; None for a setup whose scanner never ran."""
+    unevaluated: Dict[str, Optional[List[str]]] = {}
+    for setup in setups:
+        candidates = checkpoint.candidates(setup)
+        unevaluated[setup] = None if candidates is None else [
+            c['name'] for c in candidates if not checkpoint.is_recorded(setup, c['name'])
+        ]
+    return unevaluated
+
+
+def run_setups(args: argparse.Namespace) -> Tuple[Dict[str, List[Any]], Dict[str, Any], Dict[str, Any], Dict[str, Optional[List[str]]]]:
+    """
+    Run the checkpointed analysis; returns (results, snapshots, previous
+    snapshots) per setup and the candidates left unevaluated (see
+    unevaluated_symbols) when the time budget ran out.
+    """
+    from ohlcv_store import OhlcvStore
+    from scan_rules import load_rule_set
+    from yahoo_finance_service import YahooFinanceService
+
+    budget = TimeBudget(getattr(args, 'time_budget', None))
+    screener_service = ScreenerService()
+    yahoo_finance_service = YahooFinanceService(timeout=getattr(args, 'request_timeout', DEFAULT_REQUEST_TIMEOUT))
+    checkpoint = RunCheckpoint(args.runs_dir, args.run_id or '+'.join(args.type))
+    health = SymbolHealth()
+
+    try:
+        resumed = checkpoint.start(args.resume, {'type': ','.join(args.type)})
+        if resumed and not args.quiet:
+            print(f"♻️  Resuming run {checkpoint.run_id} ({len(checkpoint.progress)} results already recorded)", file=sys.stderr)
+
+        if not args.quiet:
+            print("\n🔍 Fetching breakout candidates from TradingView...", file=sys.stderr)
+
+        rule_sets = [load_rule_set(name) for name in args.type]
+        store = None
+        if any(rule_set.history_interval == '1d' for rule_set in rule_sets):
+            store = OhlcvStore(args.store_dir).load()
+            if store is not None and not store.is_current():
+                store = None
+        results = analyse_setups(rule_sets, screener_service, yahoo_finance_service, checkpoint, args.quiet, store, health,
+                                 prefilter=args.prefilter, budget=budget)
+
+        # A partial run keeps its checkpoint open for --resume and is not
+        # kept as the session's snapshot
+        unevaluated = unevaluated_symbols(checkpoint, args.type)
+        partial = is_partial(unevaluated)
+        if partial:
+            run_report.count("symbols_unevaluated", sum(len(s or []) for s in unevaluated.values()))
+            if not args.quiet:
+                print(f"⏱️  Time budget of {budget.seconds:g}s used up; not evaluated: {format_unevaluated(unevaluated)}"
+                      " (continue with --resume)", file=sys.stderr)
+        else:
+            checkpoint.complete()
+        snapshots, previous = {}, {}
+        for setup in args.type:
+            snapshots[setup] = build_snapshot(checkpoint, setup)
+            previous[setup] = load_previous_snapshot(args.runs_dir, setup, checkpoint.scan_date)
+            if not partial:
+                save_snapshot(args.runs_dir, snapshots[setup])
+        return results, snapshots, previous, unevaluated
+    finally:
+        health.save()
+        checkpoint.close()
+
+
+def json_payload(args: argparse.Namespace, results: Dict[str, List[Any]], snapshots: Dict[str, Any], previous: Dict[str, Any],
+                 unevaluated: Optional[Dict[str, Optional[List[str]]]] = None) -> Dict[str, Any]:
+    if args.emit == 'delta':
+        payload = {'mode': 'delta', **{setup: diff_snapshots(previous[setup], snapshot) for setup, snapshot in snapshots.items()}}
+    elif args.emit == 'snapshot':
+        payload = {'mode': 'snapshot', **{setup: compact_snapshot(snapshot) for setup, snapshot in snapshots.items()}}
+    else:
+        payload = format_payload(results)
+    return mark_partial(payload, unevaluated or {})
+
+
+def scan_candidates(screener_service: ScreenerService, rule_set: 'RuleSet', checkpoint: RunCheckpoint) -> List[Dict[str, Any]]:
+    """Scanner candidates of a setup for this run, reusing the checkpointed list when resuming."""
+    candidates = checkpoint.candidates(rule_set.name)
+    if candidates is not None:
+        return candidates
+
+    with run_report.stage("scanner"):
+        candidates = screener_service.scan(rule_set.scanner_parameters(), rule_set.candidate_mapper())
+    checkpoint.save_candidates(rule_set.name, candidates)
+    return candidates
+
+
+def analyse_setups(rule_sets: List['RuleSet'], screener_service: ScreenerService, yahoo_finance_service: 'YahooFinanceService', checkpoint: RunCheckpoint,
+                   quiet: bool = False, store: Optional['OhlcvData'] = None, health: Optional[SymbolHealth] = None,
+                   prefilter: bool = False, budget: Optional[TimeBudget] = None) -> Dict[str, List[Any]]:
+    """
+    Run several setups in one pass. Setups needing the same history share one
+    Yahoo download per symbol, and their compiled rules are evaluated together
+    over a price panel of EVALUATION_BATCH symbols at a time. Daily histories
+    come from `store` (an up-to-date OHLCV store) for the symbols it holds.
+    Symbols `health` is backing off from are not fetched, and fetching stops
+    while Yahoo's circuit breaker is open. With `prefilter`, candidates failing
+    a setup's scanner-column prefilter are recorded as no signal without
+    loading their history. Once `budget` has expired no further scanner
+    query or history load is started; histories already loaded are still
+    evaluated, and the symbols left over stay unrecorded in the checkpoint.
+    """
+    from scan_rules import Prefilter, compile_rule_set
+
+    groups: Dict[Tuple[int, str], List['RuleSet']] = {}
+    for rule_set in rule_sets:
+        groups.setdefault((rule_set.history_days, rule_set.history_interval), []).append(rule_set)
+
+    sectors: Dict[str, Tuple[str, str]] = {}
+    breaker = CircuitBreaker()
+    timeout = getattr(yahoo_finance_service, 'timeout', DEFAULT_REQUEST_TIMEOUT)
+    for (days, interval), group in groups.items():
+        if budget and budget.expired():
+            break
+        compiled = [compile_rule_set(rule_set) for rule_set in group]
+
+        # symbol -> {setup: candidate} for every (setup, symbol) still to evaluate
+        pending: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        considered = set()
+        for rule_set in group:
+            candidates = scan_candidates(screener_service, rule_set, checkpoint)
             if not quiet:
-                print(f"   ❌ Failed to analyze {candidate['name']}: {error}", file=sys.stderr)
-
-    return green_candidates
-
-def analyse_weekly_setup(screener_service: ScreenerService, yahoo_finance_service: YahooFinanceService, quiet: bool = False) -> list[Any]:
-    green_candidates = []
-    custom_filters = [
-        {"left": "close", "operation": "egreater", "right": 2},  # Price > $5
-        {"left": "market_cap_basic", "operation": "egreater", "right": 300000000},  # Market cap > $500M
-        {"left":"AvgValue.Traded_30d","operation":"greater","right":30000000}, # Average Dollar Volume > 30M
-        {"left": "average_volume_30d_calc", "operation": "greater", "right": 500000},  # Volume > 500K
-        {"left": "EMA10|1W", "operation": "egreater", "right": "EMA20|1W"},
-        {"left": "EMA20|1W", "operation": "egreater", "right": "SMA30|1W"},
-        {"left": "close", "operation": "egreater", "right": "EMA20|1W"},
-        {"left": "is_primary", "operation": "equal", "right": True}
-    ]
-
-    # Create parameters using the helper method
-    parameters = ScreenerService.create_basic_parameters(
-        columns=["name", "close", "EMA10|1W", "EMA20|1W", "SMA30|1W", "exchange"],
-        filters=custom_filters,
-        markets=["america"],  # Focus on US stocks
-        sort_by="Perf.6M",  # Sort by 6-month performance
-        sort_order="desc",
-        range_limit=[0, 5000]  # Limit to first 50 results
-    )
-
-    # Define a simple mapper lambda for breakout analysis
-    # Maps the raw data to a dictionary with the expected fields
-    breakout_mapper = lambda raw: {
-        'name': raw.data_fields[0] if len(raw.data_fields) > 0 else "Unknown",
-        'close': raw.data_fields[1] if len(raw.data_fields) > 1 else 0,
-        'ema10': raw.data_fields[2] if len(raw.data_fields) > 2 else 0,
-        'ema20': raw.data_fields[3] if len(raw.data_fields) > 3 else 0,
-        'sma30': raw.data_fields[4] if len(raw.data_fields) > 4 else 0,
-        'ticker_full_name': raw.symbol_full
-    }
-
-    candidates = screener_service.scan(parameters, breakout_mapper)
-    if not quiet:
-        print(f"Found {len(candidates)} candidates with custom filters", file=sys.stderr)
-
-    # Analyze first few candidates for testing
-    for i, candidate in enumerate(candidates):
+                print(f"Found {len(candidates)} {rule_set.name} candidates with custom filters", file=sys.stderr)
+            checks = Prefilter(rule_set) if prefilter else None
+            rejected = 0
+            for candidate in candidates:
+                symbol = candidate['name']
+                if checkpoint.is_processed(rule_set.name, symbol):
+                    continue
+                considered.add(symbol)
+                failed = checks.failed(candidate) if checks else []
+                if failed:
+                    rejected += 1
+                    checkpoint.record(rule_set.name, symbol, STATUS_NO_SIGNAL, result={
+                        'symbol': symbol,
+                        'failed_conditions': [f'prefilter.{name}' for name in failed],
+                    })
+                    continue
+                pending.setdefault(symbol, {})[rule_set.name] = candidate
+            if rejected:
+                run_report.count("prefilter_rejected", rejected)
+                if not quiet:
+                    print(f"   Prefilter ruled out {rejected} {rule_set.name} candidates from scanner columns", file=sys.stderr)
+
+        # Symbols every setup of the group ruled out never have their history loaded
+        avoided = len(considered) - len(pending)
+        if avoided:
+            run_report.count("fetches_avoided", avoided)
+            if not quiet:
+                print(f"   Skipping {avoided} history loads", file=sys.stderr)
+
+        frames = {}
+        fetched = 0
+        since = int(time.time()) - days * 86400
+        for symbol in pending:
+            if budget and budget.expired():
+                break
+            frame = None
+            if store is not None and interval == '1d' and symbol in store:
+                with run_report.stage("store_history"):
+                    frame = store.frame(symbol, since)
+                if len(frame):
+                    run_report.count("store_histories")
+                else:
+                    frame = None
+
+            if frame is None:
+                skipped = health.skip_reason(symbol) if health else None
+                if skipped is None:
+                    if breaker.open_until is not None and not breaker.exhausted and not quiet:
+                        print("   ⏸️  Yahoo is failing, pausing fetches...", file=sys.stderr)
+                    with run_report.stage("circuit_open"):
+                        if not breaker.before_call():
+                            skipped = 'Yahoo circuit breaker open after repeated errors'
+                if skipped:
+                    run_report.count("symbols_skipped")
+                    for setup in pending[symbol]:
+                        checkpoint.record(setup, symbol, STATUS_FAILED, error=skipped)
+                    continue
+
+                if fetched:
+                    with run_report.stage("throttle"):
+                        time.sleep(0.5)
+                fetched += 1
+                try:
+                    with run_report.stage("yahoo_history"):
+                        frame = yahoo_finance_service.get_recent_data(to_yahoo_symbol(symbol), days, interval=interval, lean=True)
+                except Exception as error:
+                    # A symbol Yahoo has no data for says nothing about Yahoo's health
+                    symbol_error = is_symbol_error(error)
+                    breaker.record(symbol_error)
+                    if health and symbol_error:
+                        health.record_failure(symbol, str(error))
+                    run_report.count("symbols_failed")
+                    for setup in pending[symbol]:
+                        checkpoint.record(setup, symbol, STATUS_FAILED, error=str(error))
+                    if not quiet:
+                        print(f"   ❌ Failed to analyze {symbol}: {error}", file=sys.stderr)
+                    continue
+                breaker.record(True)
+                if health:
+                    health.record_success(symbol)
+
+            frames[symbol] = frame
+            if len(frames) >= EVALUATION_BATCH:
+                evaluate_batch(compiled, frames, pending, sectors, checkpoint, quiet, timeout)
+                frames = {}
+        if frames:
+            evaluate_batch(compiled, frames, pending, sectors, checkpoint, quiet, timeout)
+
+    return {rule_set.name: checkpoint.results(rule_set.name, STATUS_GREEN) for rule_set in rule_sets}
+
+
+def evaluate_batch(compiled: List['CompiledRuleSet'], frames: Dict[str, Any], pending: Dict[str, Dict[str, Dict[str, Any]]],
+                   sectors: Dict[str, Tuple[str, str]], checkpoint: RunCheckpoint, quiet: bool,
+                   timeout: Optional[float] = DEFAULT_REQUEST_TIMEOUT) -> None:
+    """Evaluate every setup over one batch of histories and record the outcome per (setup, symbol)."""
+    from price_panel import build_panel
+    from scan_rules import evaluate
+
+    conditions = [name for rule_set in compiled for name in rule_set.rule_set.signals]
+    with run_report.stage("indicators"):
         try:
-            if i > 0:
-                time.sleep(0.5)
-            
-            historical_data = yahoo_finance_service.get_recent_data(candidate['name'], 365, interval="1wk")
-
-            historical_data['sma_30'] = calculate_sma(historical_data['close'], 30)
-            historical_data['ema_10'] = calculate_ema(historical_data['close'], 10)
-            historical_data['ema_20'] = calculate_ema(historical_data['close'], 20)
-
-            # ADR Percentage
-            historical_data['adr_perc_20'] = calculate_adr_percentage(historical_data, 20)
-            historical_data['adr_perc_5'] = calculate_adr_percentage(historical_data, 5)
-
-
-            # Volume indicators
-            historical_data['volume_sma_20'] = calculate_sma(historical_data['volume'], 20)
-            historical_data['low_volume'] = historical_data['volume'] < historical_data['volume_sma_20']
-
-            # Price vs EMA percentages
-            historical_data['price_vs_ema10_perc'] = abs(historical_data['close'] - historical_data['ema_10']) / historical_data['ema_10'] * 100
-            historical_data['price_vs_ema20_perc'] = abs(historical_data['close'] - historical_data['ema_20']) / historical_data['ema_20'] * 100
-
-            historical_data['basic_signal'] = (
-                    (historical_data['adr_perc_20'] > historical_data['price_vs_ema10_perc']) &
-                    (historical_data['ema_10'] > historical_data['ema_20'])
-            )
-
-            # Signal shifts (previous days)
-            historical_data['signal_shift'] = historical_data['basic_signal'].shift(1)
-            historical_data['signal_shift_2'] = historical_data['basic_signal'].shift(2)
-
-            # Consecutive signal for three days
-            historical_data['consecutive_signal_3_days'] = (
-                    historical_data['basic_signal'] &
-                    historical_data['signal_shift'] &
-                    historical_data['signal_shift_2']
-            )
-
-            # Find bearish condition (ema10 < ema20) - this is the "golden cross" reversal
-            bearish_condition = historical_data['ema_10'] < historical_data['ema_20']
-
-            # Create column with close price during bearish condition (EMA golden cross)
-            historical_data['price_during_ema_golden_cross'] = np.where(
-                bearish_condition,
-                historical_data['close'],
-                np.nan
-            )
-
-            # Forward fill to get the last bearish close price for each row
-            historical_data['price_during_last_ema_golden_cross'] = historical_data['price_during_ema_golden_cross'].ffill()
-
-            # Handle edge case: if no bearish condition (ema10 < ema20) in the entire dataframe,
-            # use the first close price as the reference point for performance calculation
-            if historical_data['price_during_last_ema_golden_cross'].isna().all():
-                historical_data['price_during_last_ema_golden_cross'] = historical_data['close'].iloc[0]
-
-            # Performance percentage from last bearish to signal
-            historical_data['perf_pct_from_bearish'] = np.where(
-                historical_data['basic_signal'] & historical_data['price_during_last_ema_golden_cross'].notna(),
-                (historical_data['close'] / historical_data['price_during_last_ema_golden_cross'] - 1.0) * 100.0,
-                np.nan
-            )
-
-            # Consecutive signal with minimum 30% performance
-            historical_data['consecutive_signal_with_30_perc'] = (
-                    historical_data['consecutive_signal_3_days'] &
-                    (historical_data['perf_pct_from_bearish'] > 30)
-            )
-
-            # Green signal (final signal)
-            historical_data['green_signal'] = (
-                    (historical_data['adr_perc_20'] > historical_data['adr_perc_5']) &
-                    historical_data['consecutive_signal_with_30_perc'] &
-                    historical_data['low_volume']
-            )
-
-            latest = historical_data.iloc[-1]
-            previous = historical_data.iloc[-2] if len(historical_data) > 1 else None
-
-            if latest['green_signal']:
-                # Check if this is a new signal (true now but not in previous row)
-                is_new = previous is None or not previous['green_signal']
-                
-                # Get sector and industry information
-                sector, industry = get_sector_info(candidate['name'])
-                
-                green_candidates.append({
-                    'symbol': candidate['name'],
-                    'ticker_full_name': candidate['ticker_full_name'],
-                    'is_new': is_new,
-                    'sector': sector,
-                    'industry': industry
-                })
-
+            outputs = evaluate(compiled, build_panel(frames), names=conditions)
         except Exception as error:
+            run_report.count("symbols_failed", len(frames))
+            for symbol in frames:
+                for setup in pending[symbol]:
+                    checkpoint.record(setup, symbol, STATUS_FAILED, error=str(error))
             if not quiet:
-                print(f"   ❌ Failed to analyze {candidate['name']}: {error}", file=sys.stderr)
-
-    return green_candidates
+                print(f"   ❌ Failed to evaluate {len(frames)} symbols: {error}", file=sys.stderr)
+            return
+
+    for rule_set in compiled:
+        output = rule_set.rule_set.output
+        signal = outputs[rule_set.name][output]
+        # Boolean conditions on the last bar, to say why a symbol is not green
+        last_bar = {
+            name: series.iloc[-1]
+            for name, series in outputs[rule_set.name].items()
+            if name != output and (series.dtypes == bool).all()
+        }
+        for symbol, frame in frames.items():
+            candidate = pending[symbol].get(rule_set.name)
+            if candidate is None:
+                continue
+            if not signal[symbol].iloc[-1]:
+                failed = [name for name, values in last_bar.items() if not values[symbol]]
+                checkpoint.record(rule_set.name, symbol, STATUS_NO_SIGNAL, result={'symbol': symbol, 'failed_conditions': failed})
+                continue
+
+            # New signal: true now but not on the previous bar
+            is_new = len(frame) < 2 or not signal[symbol].iloc[-2]
+            if symbol not in sectors:
+                with run_report.stage("sector_info"):
+                    sectors[symbol] = get_sector_info(symbol, timeout)
+            sector, industry = sectors[symbol]
+            checkpoint.record(rule_set.name, symbol, STATUS_GREEN, result={
+                'symbol': symbol,
+                'ticker_full_name': candidate['ticker_full_name'],
+                'is_new': bool(is_new),
+                'sector': sector,
+                'industry': industry
+            })
 
 
 if __name__ == "__main__":
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Memory Report
+Peak RSS of ingesting, stacking and evaluating a full-universe price panel,
+for frames as yfinance returns them ("default"), for compact lean frames
+(yahoo_finance_service.to_lean_frame(compact=True) with a float32 panel),
+and for a compact panel in shared memory evaluated by --workers processes
+("shared", see price_panel.SharedPanel). The shared mode reports each worker's private
+memory: the panel is mapped once, so adding workers adds only their own
+indicator frames.
+
+Usage:
+    python memory_report.py                            # 10,000 tickers x 2 years
+    python memory_report.py --tickers 2000 --bars 252 --setup weekly --workers 8
+
+Each mode runs in its own interpreter so their peaks do not mix. Prices are
+synthetic random walks; only shapes and dtypes matter. Prints one JSON report.
+"""
+import argparse
+import functools
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python-common"))
+
+import run_report
+
+MODES = ['default', 'lean', 'shared']
+DEFAULT_WORKERS = 4
+
+
+def synthetic_history(rng, bars: int, dates):
+    """A frame shaped like YahooFinanceService.get_historical_data() output."""
+    import numpy as np
+    import pandas as pd
+
+    close = 20 * np.cumprod(1 + rng.normal(0.0005, 0.02, bars))
+    spread = close * rng.uniform(0.005, 0.05, bars)
+    return pd.DataFrame({
+        'Date': dates,
+        'open': close + rng.uniform(-0.5, 0.5, bars) * spread,
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': rng.integers(100_000, 20_000_000, bars),
+        'dividends': 0.0,
+        'stock splits': 0.0,
+    })
+
+
+def private_mb() -> float:
+    """Memory this process does not share with others (Linux; 0 elsewhere)."""
+    try:
+        with open('/proc/self/smaps_rollup', encoding='ascii') as fh:
+            kib = sum(int(line.split()[1]) for line in fh if line.startswith(('Private_Clean', 'Private_Dirty')))
+    except OSError:
+        return 0.0
+    return round(kib / 1024, 1)
+
+
+def evaluate_slice(setup: str, panel) -> dict:
+    """One worker's share of the shared mode: evaluate `setup` over its ticker slice."""
+    from scan_rules import compile_rule_set, evaluate, load_rule_set
+
+    compiled = compile_rule_set(load_rule_set(setup))
+    signal = evaluate([compiled], panel)[compiled.name][compiled.rule_set.output]
+    return {'green': int(signal.iloc[-1].sum()), 'peak_rss_mb': run_report.peak_rss_mb(), 'private_mb': private_mb()}
+
+
+def measure(mode: str, tickers: int, bars: int, setup: str, workers: int = DEFAULT_WORKERS) -> dict:
+    import numpy as np
+    import pandas as pd
+
+    from price_panel import SharedPanel, build_panel, map_slices
+    from scan_rules import compile_rule_set, evaluate, load_rule_set
+    from yahoo_finance_service import to_lean_frame
+
+    lean = mode in ('lean', 'shared')
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range(end='2025-12-31', periods=bars, tz='America/New_York')
+    result = {'mode': mode, 'tickers': tickers, 'bars': bars, 'baseline_rss_mb': run_report.peak_rss_mb()}
+
+    started = time.perf_counter()
+    frames = {}
+    for index in range(tickers):
+        frame = synthetic_history(rng, bars, dates)
+        frames[f'T{index:05d}'] = to_lean_frame(frame, compact=True) if lean else frame
+    result['frames_mb'] = round(sum(f.memory_usage(deep=True).sum() for f in frames.values()) / 2 ** 20, 1)
+    result['ingest_seconds'] = round(time.perf_counter() - started, 2)
+    result['peak_rss_after_ingest_mb'] = run_report.peak_rss_mb()
+
+    if mode == 'shared':
+        started = time.perf_counter()
+        with SharedPanel.create(frames, dtype='float32') as shared:
+            frames.clear()
+            result['panel_mb'] = round(shared.shm.size / 2 ** 20, 1)
+            result['panel_seconds'] = round(time.perf_counter() - started, 2)
+            result['peak_rss_after_panel_mb'] = run_report.peak_rss_mb()
+
+            started = time.perf_counter()
+            slices = map_slices(shared, functools.partial(evaluate_slice, setup), workers)
+        result['workers'] = workers
+        result['green'] = sum(s['green'] for s in slices)
+        result['evaluate_seconds'] = round(time.perf_counter() - started, 2)
+        result['worker_peak_rss_mb'] = [s['peak_rss_mb'] for s in slices]
+        result['worker_private_mb'] = [s['private_mb'] for s in slices]
+        result['peak_rss_mb'] = run_report.peak_rss_mb()
+        return result
+
+    started = time.perf_counter()
+    panel = build_panel(frames, dtype='float32' if lean else 'float64')
+    if lean:
+        frames.clear()  # the panel is the only copy a lean run keeps
+    result['panel_mb'] = round(sum(p.memory_usage().sum() for p in panel.values()) / 2 ** 20, 1)
+    result['panel_seconds'] = round(time.perf_counter() - started, 2)
+    result['peak_rss_after_panel_mb'] = run_report.peak_rss_mb()
+
+    started = time.perf_counter()
+    compiled = compile_rule_set(load_rule_set(setup))
+    signal = evaluate([compiled], panel)[compiled.name][compiled.rule_set.output]
+    result['green'] = int(signal.iloc[-1].sum())
+    result['evaluate_seconds'] = round(time.perf_counter() - started, 2)
+    result['peak_rss_mb'] = run_report.peak_rss_mb()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Peak RSS of default vs lean price panels')
+    parser.add_argument('--tickers', type=int, default=10_000, help='Number of tickers (default: 10000)')
+    parser.add_argument('--bars', type=int, default=504, help='Bars per ticker (default: 504, two years of daily bars)')
+    parser.add_argument('--setup', default='daily', help='Rule set evaluated over the panel (default: daily)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Processes evaluating the shared panel (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)  # one measurement, in this process
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(measure(args.mode, args.tickers, args.bars, args.setup, args.workers)))
+        return
+
+    results = {}
+    for mode in MODES:
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--mode', mode,
+             '--tickers', str(args.tickers), '--bars', str(args.bars), '--setup', args.setup,
+             '--workers', str(args.workers)],
+            capture_output=True, text=True, check=True,
+        )
+        results[mode] = json.loads(completed.stdout)
+
+    report = {
+        'tickers': args.tickers,
+        'bars': args.bars,
+        'modes': results,
+        'peak_rss_saved_mb': round(results['default']['peak_rss_mb'] - results['lean']['peak_rss_mb'], 1),
+        'signals_match': results['default']['green'] == results['lean']['green'] == results['shared']['green'],
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+OHLCV Store
+Daily bars of the scanner universe on local disk, so screens and ratings
+read history without a Yahoo round trip per symbol.
+
+    <store_dir>/meta.json    tickers (column order), session, updated_at
+    <store_dir>/dates.npy    int64 epoch seconds, midnight UTC of each trading date
+    <store_dir>/<field>.npy  float64 [date, ticker] matrices, one per FIELDS entry
+
+Missing bars (before a listing, or for a ticker Yahoo did not return) are
+NaN. Matrices are loaded memory-mapped. An update downloads only the bars
+since the stored session plus OVERLAP_DAYS; a ticker whose overlapping bars
+no longer match (a split or dividend re-adjusted its history) and a ticker
+new to the universe get their whole window. Bars of a session that has not
+closed yet are never stored, and the store is rewritten atomically.
+
+Usage:
+    python ohlcv_store.py                        # update from this session's scanner snapshot
+    python ohlcv_store.py --symbols AAPL,NVDA    # update, adding these tickers to the stored ones
+    python ohlcv_store.py --info                 # describe the store
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python-common"))
+
+import market_calendar
+import run_report
+from symbol_health import to_yahoo_symbol
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    from yahoo_finance_service import YahooFinanceService
+
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'ohlcv')
+
+FIELDS = ['open', 'high', 'low', 'close', 'volume']
+
+# Always stored alongside the universe, as the relative strength benchmark
+BENCHMARKS = ['SPY']
+
+# Two years of daily bars: a 52-week lookback over a year of history
+HISTORY_DAYS = 730
+OVERLAP_DAYS = 7
+# Relative close difference on overlapping bars that means history was re-adjusted
+ADJUSTMENT_TOLERANCE = 1e-3
+
+
+def completed_session(now: Optional[datetime] = None) -> date:
+    """The latest trading day whose close has passed."""
+    return market_calendar.last_close(now).date()
+
+
+def _epoch(day: date) -> int:
+    return int(datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc).timestamp())
+
+
+@dataclass
+class OhlcvData:
+    tickers: List[str]
+    dates: 'np.ndarray'
+    fields: Dict[str, 'np.ndarray']
+    session: Optional[str] = None
+    index: Dict[str, int] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.index = {ticker: column for column, ticker in enumerate(self.tickers)}
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.index
+
+    def is_current(self, now: Optional[datetime] = None) -> bool:
+        """Holds the latest completed session and no session is trading now."""
+        return self.session == completed_session(now).isoformat() and not market_calendar.is_open(now)
+
+    def frame(self, symbol: str, since: Optional[int] = None) -> 'pd.DataFrame':
+        """A lean history frame (see yahoo_finance_service.to_lean_frame) of `symbol` from epoch `since`."""
+        import numpy as np
+        import pandas as pd
+
+        column = self.index[symbol]
+        rows = ~np.isnan(self.fields['close'][:, column])
+        if since is not None:
+            rows &= self.dates >= since
+        return pd.DataFrame({
+            'Date': np.asarray(self.dates[rows]),
+            **{name: np.asarray(self.fields[name][rows, column]) for name in FIELDS},
+        })
+
+
+def from_download(frame: 'pd.DataFrame', names: Optional[Dict[str, str]] = None) -> OhlcvData:
+    """OhlcvData of a YahooFinanceService.get_bulk_daily_data() frame; `names` maps Yahoo tickers back."""
+    import numpy as np
+    import pandas as pd
+
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    symbols = list(frame['close'].columns)
+    names = names or {}
+    return OhlcvData(
+        tickers=[names.get(symbol, symbol) for symbol in symbols],
+        dates=index.normalize().to_numpy(dtype='datetime64[s]').astype(np.int64),
+        fields={name: frame[name].reindex(columns=symbols).to_numpy(dtype=np.float64) for name in FIELDS},
+    )
+
+
+def readjusted(old: OhlcvData, update: OhlcvData) -> List[str]:
+    """Tickers whose overlapping closes differ between the store and `update`."""
+    import numpy as np
+
+    shared_dates, old_rows, new_rows = np.intersect1d(old.dates, update.dates, return_indices=True)
+    tickers = [t for t in update.tickers if t in old]
+    if not len(shared_dates) or not tickers:
+        return []
+    before = old.fields['close'][np.ix_(old_rows, [old.index[t] for t in tickers])]
+    after = update.fields['close'][np.ix_(new_rows, [update.index[t] for t in tickers])]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        drift = np.abs(after / before - 1)
+    moved = np.nanmax(np.where(np.isnan(drift), 0, drift), axis=0) > ADJUSTMENT_TOLERANCE
+    return [ticker for ticker, flag in zip(tickers, moved) if flag]
+
+
+def merge(old: Optional[OhlcvData], updates: List[OhlcvData], tickers: List[str], start: int, end: int,
+          replaced: frozenset = frozenset()) -> OhlcvData:
+    """
+    Matrices for `tickers` over the union of dates in [start, end]: the old
+    store's bars (except for `replaced` tickers), overwritten by non-NaN bars
+    of each update in turn.
+    """
+    import numpy as np
+
+    sources = ([old] if old is not None else []) + updates
+    dates = np.unique(np.concatenate([s.dates for s in sources]) if sources else np.empty(0, np.int64))
+    dates = dates[(dates >= start) & (dates <= end)]
+    columns = {ticker: column for column, ticker in enumerate(tickers)}
+    fields = {name: np.full((len(dates), len(tickers)), np.nan) for name in FIELDS}
+
+    def place(source: OhlcvData, keep: List[str], overwrite_nan: bool):
+        in_window = (source.dates >= start) & (source.dates <= end)
+        rows = np.searchsorted(dates, source.dates[in_window])
+        source_columns = [source.index[t] for t in keep]
+        target_columns = [columns[t] for t in keep]
+        if not keep or not len(rows):
+            return
+        for name in FIELDS:
+            values = source.fields[name][np.ix_(np.flatnonzero(in_window), source_columns)]
+            target = np.ix_(rows, target_columns)
+            fields[name][target] = values if overwrite_nan else np.where(np.isnan(values), fields[name][target], values)
+
+    if old is not None:
+        place(old, [t for t in tickers if t in old and t not in replaced], overwrite_nan=True)
+    for update in updates:
+        place(update, [t for t in tickers if t in update], overwrite_nan=False)
+    return OhlcvData(tickers=list(tickers), dates=dates, fields=fields)
+
+
+class OhlcvStore:
+    def __init__(self, path: str = DEFAULT_STORE_DIR):
+        self.path = path
+
+    def load(self, mmap: bool = True) -> Optional[OhlcvData]:
+        import numpy as np
+
+        try:
+            with open(os.path.join(self.path, 'meta.json'), encoding='utf-8') as fh:
+                meta = json.load(fh)
+        except (OSError, json.JSONDecodeError):
+            return None
+        mode = 'r' if mmap else None
+        return OhlcvData(
+            tickers=meta['tickers'],
+            dates=np.load(os.path.join(self.path, 'dates.npy')),
+            fields={name: np.load(os.path.join(self.path, f'{name}.npy'), mmap_mode=mode) for name in FIELDS},
+            session=meta['session'],
+        )
+
+    def save(self, data: OhlcvData) -> None:
+        import numpy as np
+
+        staging = f'{self.path}.{os.getpid()}.tmp'
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        np.save(os.path.join(staging, 'dates.npy'), data.dates)
+        for name in FIELDS:
+            np.save(os.path.join(staging, f'{name}.npy'), np.ascontiguousarray(data.fields[name]))
+        with open(os.path.join(staging, 'meta.json'), 'w', encoding='utf-8') as fh:
+            json.dump({
+                'tickers': data.tickers,
+                'session': data.session,
+                'updated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            }, fh)
+
+        # Swap directories; readers holding memory maps keep the old files
+        retired = f'{self.path}.{os.getpid()}.old'
+        if os.path.exists(self.path):
+            os.replace(self.path, retired)
+        os.replace(staging, self.path)
+        shutil.rmtree(retired, ignore_errors=True)
+
+    def update(self, symbols: List[str], yahoo_finance_service: 'YahooFinanceService',
+               now: Optional[datetime] = None, days: int = HISTORY_DAYS) -> Dict[str, Any]:
+        """Bring the store up to the latest completed session for `symbols`; returns counts."""
+        import numpy as np
+
+        session = completed_session(now)
+        start, end = _epoch(session - timedelta(days=days)), _epoch(session)
+        old = self.load(mmap=False)
+
+        known = [s for s in symbols if old is not None and s in old]
+        new = [s for s in symbols if old is None or s not in old]
+        updates: List[OhlcvData] = []
+        replaced: List[str] = []
+        recent = known if old is not None and old.session != session.isoformat() else []
+        def download(tickers: List[str], since: date) -> OhlcvData:
+            yahoo = {to_yahoo_symbol(t): t for t in tickers}
+            frame = yahoo_finance_service.get_bulk_daily_data(list(yahoo), datetime.combine(since, datetime.min.time()))
+            return from_download(frame, yahoo)
+
+        if recent:
+            with run_report.stage("download_recent"):
+                update = download(recent, date.fromisoformat(old.session) - timedelta(days=OVERLAP_DAYS))
+            updates.append(update)
+            replaced = readjusted(old, update)
+        full = new + replaced
+        if full:
+            with run_report.stage("download_full"):
+                updates.append(download(full, session - timedelta(days=days)))
+
+        with run_report.stage("merge"):
+            data = merge(old, updates, symbols, start, end, replaced=frozenset(replaced))
+        has_bars = ~np.isnan(data.fields['close']).all(axis=0)
+        data.session = datetime.fromtimestamp(int(data.dates[-1]), tz=timezone.utc).date().isoformat() if len(data.dates) else None
+        with run_report.stage("save"):
+            self.save(data)
+
+        return {
+            'session': data.session,
+            'tickers': len(data.tickers),
+            'dates': len(data.dates),
+            'updated': len(recent),
+            'full_history': len(full),
+            'readjusted': len(replaced),
+            'without_bars': int((~has_bars).sum()),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='OHLCV Store - daily bars of the scanner universe on disk')
+    parser.add_argument('--store-dir', default=DEFAULT_STORE_DIR, help='Store directory')
+    parser.add_argument('--symbols', help='Comma separated tickers to update (default: the scanner snapshot universe)')
+    parser.add_argument('--days', type=int, default=HISTORY_DAYS, help=f'Calendar days of history kept (default: {HISTORY_DAYS})')
+    parser.add_argument('--cache-dir', help='Result cache holding the scanner snapshot (default: the screener cache)')
+    parser.add_argument('--info', action='store_true', help='Describe the store without updating it')
+    parser.add_argument('--quiet', action='store_true', help='Suppress non-essential output')
+    run_report.add_arguments(parser)
+    args = parser.parse_args()
+
+    with run_report.run("ohlcv_store", args):
+        try:
+            store = OhlcvStore(args.store_dir)
+            if args.info:
+                data = store.load()
+                print(json.dumps({'session': data.session, 'tickers': len(data.tickers), 'dates': len(data.dates),
+                                  'current': data.is_current()} if data else {'error': 'store is empty'}))
+                return
+
+            if args.symbols:
+                symbols = [s.strip() for s in args.symbols.split(',') if s.strip()]
+                # Keep the rest of the stored universe
+                current = store.load()
+                if current is not None:
+                    symbols = current.tickers + [s for s in symbols if s not in current]
+            else:
+                from scanner_snapshot import DEFAULT_CACHE_DIR, load_snapshot, snapshot_records
+                symbols = [row['name'] for row in snapshot_records(load_snapshot(args.cache_dir or DEFAULT_CACHE_DIR))]
+            symbols += [b for b in BENCHMARKS if b not in symbols]
+
+            from yahoo_finance_service import YahooFinanceService
+            if not args.quiet:
+                print(f"📦 Updating daily bars of {len(symbols)} tickers...", file=sys.stderr)
+            stats = store.update(symbols, YahooFinanceService(), days=args.days)
+            if not args.quiet:
+                print(f"✅ Store holds {stats['tickers']} tickers through {stats['session']}", file=sys.stderr)
+            print(json.dumps(stats))
+        except Exception as error:
+            print(json.dumps({'error': str(error)}))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""
+Price Panel
+Stacks per-symbol OHLCV frames into wide (bar x symbol) frames so indicators
+and signals are computed for every symbol in one vectorized pass.
+
+Frames are right-aligned on bar position, not on calendar date: the last row
+of the panel is every symbol's latest bar and shorter histories are padded
+with leading NaNs. All screener logic is bar-based (rolling windows, shifts,
+forward fills), so each column evaluates exactly as the symbol's own frame
+would, even when a symbol has a halt day or a shorter history.
+
+SharedPanel holds the same layout in shared memory for worker processes
+(see map_slices). Only memory_report.py's shared mode uses it, to measure a
+parallel full-universe evaluation. The screener itself evaluates in-process:
+it evaluates EVALUATION_BATCH symbols at a time, in tens of milliseconds,
+between throttled history downloads of half a second each. Worker
+processes would add start-up and copying without shortening a run.
+"""
+
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+PANEL_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def build_panel(frames: Dict[str, 'pd.DataFrame'], fields: Iterable[str] = PANEL_FIELDS, dtype: str = 'float64') -> Dict[str, 'pd.DataFrame']:
+    """
+    Return {field: DataFrame[bars, symbols]} right-aligned on the latest bar.
+    A float32 panel halves the memory of the raw fields; indicators computed
+    from it (rolling, ewm) still come out as float64, but from rounded
+    prices, so the screener itself evaluates float64 panels.
+    """
+    import numpy as np
+    import pandas as pd
+
+    symbols = list(frames)
+    length = max((len(frame) for frame in frames.values()), default=0)
+
+    panel = {}
+    for field in fields:
+        values = np.full((length, len(symbols)), np.nan, dtype=dtype)
+        for col, symbol in enumerate(symbols):
+            column = np.asarray(frames[symbol][field], dtype=dtype)
+            values[length - len(column):, col] = column
+        panel[field] = pd.DataFrame(values, columns=symbols)
+    return panel
+
+
+HEADER_BYTES = 8
+ALIGNMENT = 64
+
+
+class SharedPanel:
+    """
+    A price panel in one shared memory block that worker processes attach to
+    by name, so parallel evaluation reads the same pages instead of each
+    worker unpickling its own copy of the frames.
+
+    The block holds a JSON header (tickers, fields, bars, dtype, each
+    ticker's bar count) followed by one contiguous [ticker, bar] array per
+    field, right-aligned like build_panel(). A ticker's series is one
+    contiguous row and a ticker range [start, stop) is a view of each
+    field, so panel() and series() never copy. Only the creating process
+    unlinks the block; attached panels just close it.
+    """
+
+    def __init__(self, shm, owner: bool):
+        import json
+
+        import numpy as np
+
+        self.shm = shm
+        self.owner = owner
+        size = int.from_bytes(shm.buf[:HEADER_BYTES], 'little')
+        header = json.loads(bytes(shm.buf[HEADER_BYTES:HEADER_BYTES + size]))
+        self.tickers: List[str] = header['tickers']
+        self.fields: List[str] = header['fields']
+        self.lengths: List[int] = header['lengths']
+        self.bars: int = header['bars']
+        self.index = {ticker: row for row, ticker in enumerate(self.tickers)}
+        values = np.ndarray((len(self.fields), len(self.tickers), self.bars), dtype=header['dtype'],
+                            buffer=shm.buf, offset=header['offset'])
+        if not owner:
+            values.flags.writeable = False
+        self.values = values
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @classmethod
+    def create(cls, frames: Dict[str, 'pd.DataFrame'], fields: Iterable[str] = PANEL_FIELDS, dtype: str = 'float64',
+               name: Optional[str] = None) -> 'SharedPanel':
+        """Copy `frames` into a new shared block; the caller must unlink() it when done."""
+        import json
+        from multiprocessing import shared_memory
+
+        import numpy as np
+
+        fields = list(fields)
+        tickers = list(frames)
+        lengths = [len(frames[ticker]) for ticker in tickers]
+        bars = max(lengths, default=0)
+        itemsize = np.dtype(dtype).itemsize
+
+        header = {'tickers': tickers, 'fields': fields, 'lengths': lengths, 'bars': bars, 'dtype': np.dtype(dtype).str}
+        encoded = json.dumps(header).encode()
+        # The offset is part of the header, so leave room for its digits
+        offset = -(-(HEADER_BYTES + len(encoded) + 32) // ALIGNMENT) * ALIGNMENT
+        header['offset'] = offset
+        encoded = json.dumps(header).encode()
+
+        size = offset + len(fields) * len(tickers) * bars * itemsize
+        shm = shared_memory.SharedMemory(name=name, create=True, size=max(size, 1))
+        shm.buf[:HEADER_BYTES] = len(encoded).to_bytes(HEADER_BYTES, 'little')
+        shm.buf[HEADER_BYTES:HEADER_BYTES + len(encoded)] = encoded
+
+        panel = cls(shm, owner=True)
+        for f, field in enumerate(fields):
+            rows = panel.values[f]
+            rows[:] = np.nan
+            for row, ticker in enumerate(tickers):
+                column = np.asarray(frames[ticker][field], dtype=dtype)
+                rows[row, bars - len(column):] = column
+        return panel
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedPanel':
+        """A read-only view of the panel another process created."""
+        import sys
+        from multiprocessing import shared_memory
+
+        # Python < 3.13 has no track=False; attaching there registers the
+        # block with the creator's resource tracker, which is harmless
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, owner=False)
+
+    def series(self, symbol: str, field: str = 'close') -> 'np.ndarray':
+        """`symbol`'s bars of `field`, without the leading padding."""
+        row = self.index[symbol]
+        return self.values[self.fields.index(field), row, self.bars - self.lengths[row]:]
+
+    def panel(self, start: int = 0, stop: Optional[int] = None) -> Dict[str, 'pd.DataFrame']:
+        """build_panel() output for tickers[start:stop], as views of the shared block."""
+        import pandas as pd
+
+        symbols = self.tickers[start:stop]
+        return {
+            field: pd.DataFrame(self.values[f, start:stop].T, columns=symbols, copy=False)
+            for f, field in enumerate(self.fields)
+        }
+
+    def slices(self, size: int) -> List[Tuple[int, int]]:
+        """[start, stop) ticker ranges of at most `size` tickers covering the panel."""
+        return [(start, min(start + size, len(self.tickers))) for start in range(0, len(self.tickers), size)]
+
+    def close(self) -> None:
+        self.values = None
+        self.shm.close()
+
+    def unlink(self) -> None:
+        """Close and free the block (creator only)."""
+        self.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self) -> 'SharedPanel':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self.owner:
+            self.unlink()
+        else:
+            self.close()
+
+
+def _run_slice(function: Callable[[Dict[str, 'pd.DataFrame']], Any], name: str, start: int, stop: int) -> Any:
+    with SharedPanel.attach(name) as shared:
+        return function(shared.panel(start, stop))
+
+
+def map_slices(shared: SharedPanel, function: Callable[[Dict[str, 'pd.DataFrame']], Any], workers: int,
+               size: Optional[int] = None) -> List[Any]:
+    """
+    `function(panel)` over ticker slices of `shared` in `workers` processes,
+    in slice order. Workers receive only the block name and a range;
+    `function` must be a module-level callable and should return small
+    results (per-symbol values, not frames), since results are pickled back.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    size = size or max(1, -(-len(shared.tickers) // workers))
+    ranges = shared.slices(size)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_slice, function, shared.name, start, stop) for start, stop in ranges]
+        return [future.result() for future in futures]
@@ -0,0 +1,152 @@
+"""
+RS History
+RS ratings (1-99) for every trading day in the OHLCV store, so RS trend
+charts and "RS rising" filters read a stored matrix instead of rescanning.
+
+The weighted score is the one rs_rating_service uses,
+0.4 * Q1 + 0.2 * Q2 + 0.2 * H2, with TradingView's Perf.3M/6M/Y taken as
+63/126/252-bar returns of the stored closes. Every date is ranked across the
+tickers with a full year of history in one vectorized pass, with the same
+percentile rank and clamping as rate_stocks().
+
+    <dir>/meta.json   tickers (column order), session
+    <dir>/dates.npy   int64 epoch seconds, as in the OHLCV store
+    <dir>/rating.npy  int8 [date, ticker]; 0 where a ticker has no rating
+"""
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from ohlcv_store import BENCHMARKS, OhlcvData
+
+if TYPE_CHECKING:
+    import numpy as np
+
+DEFAULT_HISTORY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'rs_history')
+
+QUARTER, HALF, YEAR = 63, 126, 252
+
+
+def weighted_scores(close: 'np.ndarray') -> 'np.ndarray':
+    """[date, ticker] weighted scores; NaN until a ticker has YEAR bars of history."""
+    import numpy as np
+
+    def perf(bars: int) -> 'np.ndarray':
+        result = np.full(close.shape, np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result[bars:] = (close[bars:] / close[:-bars] - 1) * 100
+        return result
+
+    perf_3m, perf_6m, perf_y = perf(QUARTER), perf(HALF), perf(YEAR)
+    q1 = perf_3m
+    q2 = perf_6m - perf_3m
+    h2 = perf_y - perf_6m
+    scores = 0.4 * q1 + 0.2 * q2 + 0.2 * h2
+    scores[~np.isfinite(scores)] = np.nan
+    return scores
+
+
+def ratings_from_scores(scores: 'np.ndarray') -> 'np.ndarray':
+    """Per-date percentile ranks as int8 ratings in 1-99 (0 for NaN scores)."""
+    import numpy as np
+    import pandas as pd
+
+    # Average rank - 0.5 = count below + half the count equal (ties included)
+    ranks = pd.DataFrame(scores).rank(axis=1, method='average').to_numpy()
+    counts = np.isfinite(scores).sum(axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pct = (ranks - 0.5) / counts * 100
+    ratings = np.clip(np.rint(pct), 1, 99)
+    return np.where(np.isnan(pct), 0, ratings).astype(np.int8)
+
+
+@dataclass
+class RatingHistory:
+    tickers: List[str]
+    dates: 'np.ndarray'
+    rating: 'np.ndarray'
+    session: Optional[str] = None
+
+    def series(self, symbol: str, bars: int) -> Dict[str, Any]:
+        import numpy as np
+
+        column = self.tickers.index(symbol)
+        rows = np.flatnonzero(self.rating[:, column] > 0)[-bars:]
+        return {
+            'symbol': symbol,
+            'series': [{'time': _day(self.dates[row]), 'rs_rating': int(self.rating[row, column])} for row in rows],
+        }
+
+    def rising(self, days: int, min_change: int = 1) -> List[Dict[str, Any]]:
+        """Tickers whose rating rose by at least `min_change` over the last `days` bars."""
+        import numpy as np
+
+        if len(self.dates) <= days:
+            return []
+        now = self.rating[-1].astype(np.int16)
+        then = self.rating[-1 - days].astype(np.int16)
+        change = now - then
+        columns = np.flatnonzero((now > 0) & (then > 0) & (change >= min_change))
+        columns = columns[np.argsort(-change[columns], kind='stable')]
+        return [
+            {'symbol': self.tickers[c], 'rs_rating': int(now[c]), 'previous': int(then[c]), 'change': int(change[c])}
+            for c in columns
+        ]
+
+
+def _day(epoch: int) -> str:
+    return datetime.fromtimestamp(int(epoch), tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+def backfill(data: OhlcvData) -> RatingHistory:
+    """Ratings of every stored ticker except the benchmarks, for every stored date."""
+    import numpy as np
+
+    columns = [c for c, ticker in enumerate(data.tickers) if ticker not in BENCHMARKS]
+    close = np.asarray(data.fields['close'])[:, columns]
+    return RatingHistory(
+        tickers=[data.tickers[c] for c in columns],
+        dates=np.asarray(data.dates),
+        rating=ratings_from_scores(weighted_scores(close)),
+        session=data.session,
+    )
+
+
+class RatingHistoryStore:
+    def __init__(self, path: str = DEFAULT_HISTORY_DIR):
+        self.path = path
+
+    def load(self) -> Optional[RatingHistory]:
+        import numpy as np
+
+        try:
+            with open(os.path.join(self.path, 'meta.json'), encoding='utf-8') as fh:
+                meta = json.load(fh)
+        except (OSError, json.JSONDecodeError):
+            return None
+        return RatingHistory(
+            tickers=meta['tickers'],
+            dates=np.load(os.path.join(self.path, 'dates.npy')),
+            rating=np.load(os.path.join(self.path, 'rating.npy'), mmap_mode='r'),
+            session=meta['session'],
+        )
+
+    def save(self, history: RatingHistory) -> None:
+        import numpy as np
+
+        staging = f'{self.path}.{os.getpid()}.tmp'
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        np.save(os.path.join(staging, 'dates.npy'), history.dates)
+        np.save(os.path.join(staging, 'rating.npy'), np.ascontiguousarray(history.rating, dtype=np.int8))
+        with open(os.path.join(staging, 'meta.json'), 'w', encoding='utf-8') as fh:
+            json.dump({'tickers': history.tickers, 'session': history.session}, fh)
+
+        retired = f'{self.path}.{os.getpid()}.old'
+        if os.path.exists(self.path):
+            os.replace(self.path, retired)
+        os.replace(staging, self.path)
+        shutil.rmtree(retired, ignore_errors=True)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+RS Line
+The relative strength line (close / benchmark close) of every ticker in the
+OHLCV store, computed in one vectorized pass over the date x ticker closes,
+with its 52-week highs and lead flags:
+
+    rs_line          close / SPY close on the same date
+    rs_high          highest RS line of the last WINDOW bars
+    rs_new_high      RS line at its 52-week high
+    price_new_high   close at its 52-week high
+    rs_lead          RS line at a 52-week high while price is not: the stock
+                     is outperforming before price breaks out
+
+Highs need MIN_BARS of history; newer listings have no flags until then.
+Nothing is downloaded at request time; run ohlcv_store.py to update the
+closes.
+
+Usage:
+    python rs_line.py --format json                 # last bar of every ticker
+    python rs_line.py --format json --leads         # only tickers with an RS lead
+    python rs_line.py --format json --symbol NVDA   # daily series of one ticker
+"""
+import argparse
+import json
+import os
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python-common"))
+
+import run_report
+from ohlcv_store import BENCHMARKS, DEFAULT_STORE_DIR, OhlcvData, OhlcvStore
+
+if TYPE_CHECKING:
+    import numpy as np
+
+WINDOW = 252
+MIN_BARS = 60
+
+
+@dataclass
+class RsLines:
+    tickers: List[str]
+    dates: 'np.ndarray'
+    benchmark: str
+    line: 'np.ndarray'            # [date, ticker] float64, NaN without a close
+    high: 'np.ndarray'            # rolling WINDOW max of line
+    new_high: 'np.ndarray'        # [date, ticker] bool
+    price_new_high: 'np.ndarray'
+    lead: 'np.ndarray'
+
+    def column(self, symbol: str) -> int:
+        return self.tickers.index(symbol)
+
+
+def _rolling_max(values: 'np.ndarray', window: int, min_bars: int) -> 'np.ndarray':
+    import pandas as pd
+
+    return pd.DataFrame(values).rolling(window, min_periods=min_bars).max().to_numpy()
+
+
+def compute_rs_lines(data: OhlcvData, benchmark: str = BENCHMARKS[0], window: int = WINDOW, min_bars: int = MIN_BARS) -> RsLines:
+    import numpy as np
+
+    if benchmark not in data:
+        raise ValueError(f"Benchmark {benchmark} is not in the OHLCV store")
+    close = np.asarray(data.fields['close'])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        line = close / close[:, [data.index[benchmark]]]
+    line[~np.isfinite(line)] = np.nan
+
+    high = _rolling_max(line, window, min_bars)
+    price_high = _rolling_max(close, window, min_bars)
+    with np.errstate(invalid='ignore'):
+        new_high = line >= high
+        price_new_high = close >= price_high
+    return RsLines(
+        tickers=list(data.tickers),
+        dates=np.asarray(data.dates),
+        benchmark=benchmark,
+        line=line,
+        high=high,
+        new_high=new_high,
+        price_new_high=price_new_high,
+        lead=new_high & ~price_new_high,
+    )
+
+
+def _day(epoch: int) -> str:
+    return datetime.fromtimestamp(int(epoch), tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+def _value(x: float) -> Optional[float]:
+    return None if x != x else round(float(x), 6)
+
+
+def latest(lines: RsLines, leads_only: bool = False) -> List[Dict[str, Any]]:
+    """Every ticker's last bar with a close, in store order."""
+    import numpy as np
+
+    valid = ~np.isnan(lines.line)
+    # Row of each ticker's last bar with a close (-1 when it has none)
+    rows = len(lines.dates) - 1 - np.argmax(valid[::-1], axis=0)
+    rows[~valid.any(axis=0)] = -1
+
+    results = []
+    for column, ticker in enumerate(lines.tickers):
+        row = rows[column]
+        if row < 0 or ticker == lines.benchmark:
+            continue
+        if leads_only and not lines.lead[row, column]:
+            continue
+        value, high = lines.line[row, column], lines.high[row, column]
+        results.append({
+            'symbol': ticker,
+            'date': _day(lines.dates[row]),
+            'rs_line': _value(value),
+            'rs_high_52w': _value(high),
+            'pct_from_high': _value((value / high - 1) * 100) if high == high else None,
+            'rs_new_high': bool(lines.new_high[row, column]),
+            'price_new_high': bool(lines.price_new_high[row, column]),
+            'rs_lead': bool(lines.lead[row, column]),
+        })
+    return results
+
+
+def series(lines: RsLines, symbol: str, bars: int) -> Dict[str, Any]:
+    """The last `bars` bars of one ticker's RS line, for charting."""
+    import numpy as np
+
+    column = lines.column(symbol)
+    rows = np.flatnonzero(~np.isnan(lines.line[:, column]))[-bars:]
+    return {
+        'symbol': symbol,
+        'benchmark': lines.benchmark,
+        'series': [{
+            'time': _day(lines.dates[row]),
+            'rs_line': _value(lines.line[row, column]),
+            'rs_new_high': bool(lines.new_high[row, column]),
+            'rs_lead': bool(lines.lead[row, column]),
+        } for row in rows],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RS Line - relative strength lines and new-high flags from the OHLCV store')
+    parser.add_argument('--format', choices=['json', 'text'], default='text', help='Output format (default: text)')
+    parser.add_argument('--symbol', help='Daily RS line series of one ticker')
+    parser.add_argument('--bars', type=int, default=WINDOW, help=f'Bars of the --symbol series (default: {WINDOW})')
+    parser.add_argument('--leads', action='store_true', help='Only tickers whose RS line leads price to a new high')
+    parser.add_argument('--benchmark', default=BENCHMARKS[0], help=f'Benchmark ticker (default: {BENCHMARKS[0]})')
+    parser.add_argument('--store-dir', default=DEFAULT_STORE_DIR, help='OHLCV store directory')
+    parser.add_argument('--quiet', action='store_true', help='Suppress non-essential output')
+    run_report.add_arguments(parser)
+    args = parser.parse_args()
+
+    with run_report.run("rs_line", args):
+        try:
+            with run_report.stage("load"):
+                data = OhlcvStore(args.store_dir).load()
+            if data is None:
+                raise ValueError("The OHLCV store is empty; run ohlcv_store.py first")
+            if args.symbol and args.symbol not in data:
+                raise ValueError(f"{args.symbol} is not in the OHLCV store")
+            with run_report.stage("rs_lines"):
+                lines = compute_rs_lines(data, args.benchmark)
+
+            if args.symbol:
+                payload = series(lines, args.symbol, args.bars)
+            else:
+                results = latest(lines, args.leads)
+                payload = {'session': data.session, 'benchmark': lines.benchmark, 'count': len(results), 'results': results}
+        except Exception as error:
+            if args.format == 'json':
+                print(json.dumps({'error': str(error)}))
+            else:
+                print(f"❌ {error}", file=sys.stderr)
+            sys.exit(1)
+
+        if args.format == 'json':
+            print(json.dumps(payload))
+        elif args.symbol:
+            for point in payload['series']:
+                flag = ' LEAD' if point['rs_lead'] else (' HIGH' if point['rs_new_high'] else '')
+                print(f"{point['time']}  {point['rs_line']:.6f}{flag}")
+        else:
+            for result in payload['results']:
+                flag = ' LEAD' if result['rs_lead'] else (' HIGH' if result['rs_new_high'] else '')
+                print(f"{result['symbol']:<8} {result['rs_line']:.6f}  {result['pct_from_high'] or 0:+.1f}% from high{flag}")
+
+
+if __name__ == '__main__':
+    main()
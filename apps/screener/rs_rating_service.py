@@ -3,14 +3,41 @@
 RS Rating Service
 Computes IBD-style Relative Strength ratings (1-99) for US stocks
 using TradingView scanner performance data.
+
+With --backfill, ratings are instead reconstructed for every trading day of
+the OHLCV store and saved as a date x ticker matrix (see rs_history.py);
+--history SYMBOL and --rising DAYS then read that matrix.
+
+The same pass ranks sector and industry groups (see rate_groups and
+python-common/group_ranks.py): median weighted score, group RS rating 1-99,
+leader count and rank change since the previous day's run, kept in
+data/rs_groups.
+
+With --output ratings.csv (or .parquet) the ratings are written to that file
+for a bulk load and stdout carries only a JSON manifest (see
+python-common/bulk_export.py).
 """
 import json
+import os
 import sys
 import argparse
 from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python-common"))
+
+import bulk_export
+import result_cache
+import run_report
+from group_ranks import GroupMember, GroupRankStore, rank_groups
 from screener_service import ScreenerService, RawScreenerEntry
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, List, Optional
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+DEFAULT_GROUPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'rs_groups')
+
+# RS rating of a leader: the top 2%, as in leader-scan
+LEADER_RATING = 98
 
 
 @dataclass
@@ -19,11 +46,13 @@ class StockPerformance:
     perf_3m: float
     perf_6m: float
     perf_y: float
+    sector: str = ''
+    industry: str = ''
 
 
 def map_entry(entry: RawScreenerEntry) -> StockPerformance | None:
     fields = entry.data_fields
-    # columns: name, close, market_cap_basic, Perf.3M, Perf.6M, Perf.Y
+    # columns: name, close, market_cap_basic, Perf.3M, Perf.6M, Perf.Y, sector, industry
     name = fields[0]
     perf_3m = fields[3]
     perf_6m = fields[4]
@@ -40,6 +69,8 @@ def map_entry(entry: RawScreenerEntry) -> StockPerformance | None:
         perf_3m=perf_3m,
         perf_6m=perf_6m,
         perf_y=perf_y,
+        sector=fields[6] or '',
+        industry=fields[7] or '',
     )
 
 
@@ -64,7 +95,7 @@ def percentile_rank(values: List[float], value: float) -> float:
     return (count_below + 0.5 * count_equal) / len(values) * 100
 
 
-def compute_rs_ratings(quiet: bool = False) -> dict:
+def compute_rs_ratings(quiet: bool = False, groups_dir: str = DEFAULT_GROUPS_DIR) -> dict:
     screener = ScreenerService()
 
     columns = [
@@ -74,6 +105,8 @@ def compute_rs_ratings(quiet: bool = False) -> dict:
         "Perf.3M",
         "Perf.6M",
         "Perf.Y",
+        "sector",
+        "industry",
     ]
 
     filters = [
@@ -96,7 +129,8 @@ def compute_rs_ratings(quiet: bool = False) -> dict:
     if not quiet:
         print("Fetching performance data from TradingView...", file=sys.stderr)
 
-    raw_entries = screener.scan(parameters, map_entry)
+    with run_report.stage("scanner"):
+        raw_entries = screener.scan(parameters, map_entry)
 
     # Filter out None entries (stocks missing performance data)
     stocks = [s for s in raw_entries if s is not None]
@@ -104,6 +138,24 @@ def compute_rs_ratings(quiet: bool = False) -> dict:
     if not quiet:
         print(f"Found {len(stocks)} stocks with complete performance data", file=sys.stderr)
 
+    with run_report.stage("rating"):
+        ratings = rate_stocks(stocks)
+
+    computed_at = date.today().isoformat()
+    with run_report.stage("groups"):
+        store = GroupRankStore(groups_dir)
+        groups = rate_groups(stocks, ratings, store.previous(computed_at))
+        store.save(computed_at, groups)
+
+    return {
+        "ratings": ratings,
+        "count": len(ratings),
+        "computed_at": computed_at,
+        "groups": groups,
+    }
+
+
+def rate_stocks(stocks: List[StockPerformance]) -> List[dict]:
     # Compute weighted scores
     scored = []
     for stock in stocks:
@@ -126,25 +178,112 @@ def compute_rs_ratings(quiet: bool = False) -> dict:
 
     # Sort by rs_rating descending
     ratings.sort(key=lambda x: x["rs_rating"], reverse=True)
+    return ratings
 
-    return {
-        "ratings": ratings,
-        "count": len(ratings),
-        "computed_at": date.today().isoformat(),
-    }
+
+def rate_groups(stocks: List[StockPerformance], ratings: List[dict],
+                previous: Optional[Dict[str, Dict[str, int]]] = None) -> Dict[str, List[dict]]:
+    """
+    Sector and industry groups of rated stocks (see python-common/group_ranks.py),
+    scored by weighted score, with stocks rated LEADER_RATING or more as leaders.
+    """
+    rated = {r['symbol']: r for r in ratings}
+    return rank_groups((GroupMember(
+        sector=s.sector,
+        industry=s.industry,
+        score=rated[s.symbol]['weighted_score'],
+        leader=rated[s.symbol]['rs_rating'] >= LEADER_RATING,
+    ) for s in stocks), previous)
 
 
 def main():
     parser = argparse.ArgumentParser(description='RS Rating - Relative Strength ratings for US stocks')
     parser.add_argument('--format', choices=['json', 'text'], default='text', help='Output format (default: text)')
     parser.add_argument('--quiet', action='store_true', help='Suppress non-essential output')
+    history = parser.add_mutually_exclusive_group()
+    history.add_argument('--backfill', action='store_true', help='Rebuild the daily rating history from the OHLCV store')
+    history.add_argument('--history', metavar='SYMBOL', help='Daily rating history of one symbol')
+    history.add_argument('--rising', type=int, metavar='DAYS', help='Symbols whose rating rose over the last DAYS trading days')
+    parser.add_argument('--bars', type=int, default=252, help='Days of --history (default: 252)')
+    parser.add_argument('--store-dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'ohlcv'),
+                        help='OHLCV store read by --backfill')
+    parser.add_argument('--history-dir', help='Rating history directory (default: data/rs_history)')
+    parser.add_argument('--groups-dir', default=DEFAULT_GROUPS_DIR, help='Directory of the daily group ranks (default: data/rs_groups)')
+    bulk_export.add_arguments(parser)
+    result_cache.add_arguments(parser, DEFAULT_CACHE_DIR)
+    run_report.add_arguments(parser)
 
     args = parser.parse_args()
+    if args.output and (args.backfill or args.history or args.rising):
+        parser.error('--output only applies to the current ratings')
+
+    with run_report.run("rs_rating", args):
+        run(args)
+
+
+def run_history(args: argparse.Namespace) -> dict:
+    from rs_history import DEFAULT_HISTORY_DIR, RatingHistoryStore, backfill
+
+    history_store = RatingHistoryStore(args.history_dir or DEFAULT_HISTORY_DIR)
+    if args.backfill:
+        from ohlcv_store import OhlcvStore
+
+        with run_report.stage("load"):
+            data = OhlcvStore(args.store_dir).load()
+        if data is None:
+            raise ValueError('The OHLCV store is empty; run ohlcv_store.py first')
+        with run_report.stage("backfill"):
+            history = backfill(data)
+        with run_report.stage("save"):
+            history_store.save(history)
+        return {'session': history.session, 'tickers': len(history.tickers), 'dates': len(history.dates)}
+
+    history = history_store.load()
+    if history is None:
+        raise ValueError('No rating history; run rs_rating_service.py --backfill first')
+    if args.history:
+        if args.history not in history.tickers:
+            raise ValueError(f'{args.history} has no rating history')
+        return {'session': history.session, **history.series(args.history, args.bars)}
+    rising = history.rising(args.rising)
+    return {'session': history.session, 'days': args.rising, 'count': len(rising), 'results': rising}
+
+
+def run(args: argparse.Namespace):
+    if args.backfill or args.history or args.rising:
+        try:
+            result = run_history(args)
+        except Exception as error:
+            if args.format == 'json':
+                print(json.dumps({'error': str(error)}))
+            else:
+                print(f"Error reading the RS rating history: {error}", file=sys.stderr)
+            sys.exit(1)
+        if args.format == 'json':
+            print(json.dumps(result))
+        elif 'series' in result:
+            for point in result['series']:
+                print(f"  {point['time']}  RS: {point['rs_rating']:3d}")
+        elif 'results' in result:
+            for r in result['results']:
+                print(f"  {r['symbol']:>8s}  RS: {r['previous']:3d} -> {r['rs_rating']:3d}  ({r['change']:+d})")
+        else:
+            print(f"RS history: {result['tickers']} stocks x {result['dates']} days through {result['session']}")
+        return
 
     try:
-        result = compute_rs_ratings(quiet=args.quiet)
-
-        if args.format == 'json':
+        # Ratings only change with a new close: reuse this session's result
+        cache = result_cache.ResultCache(args.cache_dir, 'rs_rating')
+        result, hit = cache.cached({}, lambda: compute_rs_ratings(quiet=args.quiet, groups_dir=args.groups_dir), args)
+        if hit and not args.quiet:
+            print(f"♻️  Using cached ratings computed {result['computed_at']}", file=sys.stderr)
+
+        if args.output:
+            with run_report.stage("export"):
+                manifest = bulk_export.export(args.output, result['ratings'], count=result['count'], computed_at=result['computed_at'],
+                                            groups=result.get('groups'))
+            print(json.dumps(manifest))
+        elif args.format == 'json':
             print(json.dumps(result))
         else:
             print(f"\nRS Ratings ({result['count']} stocks, computed {result['computed_at']})")
@@ -153,6 +292,13 @@ def main():
                 print(f"  {r['symbol']:>8s}  RS: {r['rs_rating']:3d}  Score: {r['weighted_score']:8.4f}")
             if result['count'] > 20:
                 print(f"  ... and {result['count'] - 20} more")
+            industries = result.get('groups', {}).get('industry', [])
+            if industries:
+                print(f"\nTop industry groups ({len(industries)} ranked)")
+                print("-" * 60)
+                for g in industries[:10]:
+                    change = '  new' if g['rank_change'] is None else f"{g['rank_change']:+5d}"
+                    print(f"  {g['rank']:3d}. {g['name'][:32]:<32s} RS: {g['group_rs']:2d}  leaders: {g['leaders']:2d} {change}")
 
     except Exception as error:
         if args.format == 'json':
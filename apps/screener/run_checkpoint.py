@@ -0,0 +1,181 @@
+"""
+Run Checkpoint
+Persists the progress of a screener run so an interrupted run (crash, or the
+backend's exec timeout) can be resumed instead of restarted.
+
+A run lives in <runs_dir>/<scan_date>/<run_id>/:
+
+    manifest.json     run metadata, the scanner candidates of each setup and the status
+    progress.ndjson   one line per processed (setup, symbol) (green / no_signal / failed)
+
+Progress lines are appended and flushed as each symbol completes, so at most
+the symbol in flight is lost when the process is killed. A partially written
+last line is cut off on load, so the next record starts on a line of its own.
+
+Starting a run keeps the run directories of the last RUN_HISTORY_DAYS scan
+dates and removes older ones.
+"""
+
+import json
+import os
+import shutil
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+MANIFEST_FILE = 'manifest.json'
+PROGRESS_FILE = 'progress.ndjson'
+RUN_HISTORY_DAYS = 14
+
+STATUS_GREEN = 'green'
+STATUS_NO_SIGNAL = 'no_signal'
+STATUS_FAILED = 'failed'
+
+
+def _progress_key(setup: str, symbol: str) -> str:
+    return f'{setup}:{symbol}'
+
+
+def _is_scan_date(name: str) -> bool:
+    try:
+        date.fromisoformat(name)
+    except ValueError:
+        return False
+    return True
+
+
+def prune_runs(runs_dir: str, keep: int = RUN_HISTORY_DAYS) -> List[str]:
+    """Remove the run directories of all but the latest `keep` scan dates; returns the dates removed."""
+    if not os.path.isdir(runs_dir):
+        return []
+    scan_dates = sorted(name for name in os.listdir(runs_dir) if _is_scan_date(name))
+    stale = scan_dates[:-keep] if keep > 0 else scan_dates
+    for scan_date in stale:
+        shutil.rmtree(os.path.join(runs_dir, scan_date), ignore_errors=True)
+    return stale
+
+
+class RunCheckpoint:
+    def __init__(self, runs_dir: str, run_id: str, scan_date: Optional[str] = None):
+        self.runs_dir = runs_dir
+        self.run_id = run_id
+        self.scan_date = scan_date or date.today().isoformat()
+        self.path = os.path.join(runs_dir, self.scan_date, run_id)
+        self.manifest: Dict[str, Any] = {}
+        self.progress: Dict[str, Dict[str, Any]] = {}
+        self._progress_file = None
+
+    @property
+    def exists(self) -> bool:
+        return os.path.exists(os.path.join(self.path, MANIFEST_FILE))
+
+    def start(self, resume: bool, metadata: Dict[str, Any]) -> bool:
+        """
+        Open the run directory. With `resume`, previous progress is loaded and
+        True is returned if there was any; otherwise the directory is reset.
+        """
+        if resume and self.exists:
+            self._load()
+            resumed = True
+        else:
+            shutil.rmtree(self.path, ignore_errors=True)
+            os.makedirs(self.path, exist_ok=True)
+            self.manifest = {
+                'run_id': self.run_id,
+                'scan_date': self.scan_date,
+                'status': 'running',
+                'candidates': None,
+                **metadata,
+            }
+            self._save_manifest()
+            resumed = False
+        prune_runs(self.runs_dir)
+
+        self._progress_file = open(os.path.join(self.path, PROGRESS_FILE), 'a', encoding='utf-8')
+        return resumed
+
+    def close(self) -> None:
+        if self._progress_file is not None:
+            self._progress_file.close()
+            self._progress_file = None
+
+    def _load(self) -> None:
+        with open(os.path.join(self.path, MANIFEST_FILE), encoding='utf-8') as fh:
+            self.manifest = json.load(fh)
+
+        self.progress = {}
+        progress_path = os.path.join(self.path, PROGRESS_FILE)
+        if not os.path.exists(progress_path):
+            return
+        with open(progress_path, 'rb') as fh:
+            content = fh.read()
+
+        # A last line cut short by a kill is dropped from the file, or the next
+        # record would be appended to it and lost with it; the symbol is redone
+        complete = content.rfind(b'\n') + 1
+        if complete < len(content):
+            os.truncate(progress_path, complete)
+        for line in content[:complete].splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            self.progress[_progress_key(entry['setup'], entry['symbol'])] = entry
+
+    def _save_manifest(self) -> None:
+        target = os.path.join(self.path, MANIFEST_FILE)
+        tmp = target + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            json.dump(self.manifest, fh)
+        os.replace(tmp, target)
+
+    # -- candidates ---------------------------------------------------------
+
+    def candidates(self, setup: str) -> Optional[List[Dict[str, Any]]]:
+        """Scanner candidates of `setup` saved by a previous attempt of this run, if any."""
+        return (self.manifest.get('candidates') or {}).get(setup)
+
+    def save_candidates(self, setup: str, candidates: List[Dict[str, Any]]) -> None:
+        self.manifest['candidates'] = {**(self.manifest.get('candidates') or {}), setup: candidates}
+        self._save_manifest()
+
+    # -- progress -----------------------------------------------------------
+
+    def is_processed(self, setup: str, symbol: str) -> bool:
+        """True once `symbol` has a result for `setup`; failed symbols are retried on resume."""
+        entry = self.progress.get(_progress_key(setup, symbol))
+        return entry is not None and entry['status'] != STATUS_FAILED
+
+    def is_recorded(self, setup: str, symbol: str) -> bool:
+        """True once `symbol` has any outcome for `setup`, failures included."""
+        return _progress_key(setup, symbol) in self.progress
+
+    def record(self, setup: str, symbol: str, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        entry: Dict[str, Any] = {'setup': setup, 'symbol': symbol, 'status': status}
+        if result is not None:
+            entry['result'] = result
+        if error is not None:
+            entry['error'] = error
+        self.progress[_progress_key(setup, symbol)] = entry
+        self._progress_file.write(json.dumps(entry) + '\n')
+        self._progress_file.flush()
+
+    def entries(self, setup: str) -> List[Dict[str, Any]]:
+        """Progress entries of `setup`, in scanner candidate order."""
+        order = [c['name'] for c in (self.candidates(setup) or [])]
+        known = set(order)
+        order += [e['symbol'] for e in self.progress.values() if e['setup'] == setup and e['symbol'] not in known]
+        entries = [self.progress.get(_progress_key(setup, s)) for s in order]
+        return [e for e in entries if e is not None]
+
+    def results(self, setup: str, status: str = STATUS_GREEN) -> List[Dict[str, Any]]:
+        """Recorded results of `setup` with `status`, in scanner candidate order."""
+        return [
+            e.get('result') or {'symbol': e['symbol'], 'error': e.get('error')}
+            for e in self.entries(setup)
+            if e['status'] == status
+        ]
+
+    def complete(self) -> None:
+        self.manifest['status'] = 'complete'
+        self.manifest['processed'] = len(self.progress)
+        self._save_manifest()
@@ -0,0 +1,121 @@
+"""
+Run Diff
+Keeps a snapshot of every completed screener run per setup and compares a
+run with the previous one, so consumers only touch what changed.
+
+Snapshots live in <runs_dir>/snapshots/<setup>/<scan_date>.json and hold the
+run's green results, the scanner candidate names, and for every other
+candidate why it is not green (the conditions that failed, or the fetch
+error). A rerun on the same scan date replaces that date's snapshot, and
+saving keeps the snapshots of the last RUN_HISTORY_DAYS scan dates, like the
+run directories (see run_checkpoint.prune_runs).
+
+A delta lists, against the latest snapshot from an earlier scan date:
+
+    added      green now, not green before (full result)
+    removed    green before, not now, with the reason:
+                 signal_off     still a scanner candidate; failed_conditions
+                                names the rule conditions false on the last bar
+                 left_scanner   no longer passes the TradingView filters
+                 fetch_failed   history could not be fetched; error has why
+    unchanged  green in both (symbols only)
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from run_checkpoint import RUN_HISTORY_DAYS, STATUS_FAILED, STATUS_GREEN, STATUS_NO_SIGNAL, RunCheckpoint
+
+SNAPSHOTS_DIR = 'snapshots'
+
+# Column order of the compact snapshot output
+SNAPSHOT_COLUMNS = ['symbol', 'ticker_full_name', 'is_new', 'sector', 'industry']
+
+
+def build_snapshot(checkpoint: RunCheckpoint, setup: str) -> Dict[str, Any]:
+    green: Dict[str, Any] = {}
+    no_signal: Dict[str, List[str]] = {}
+    failed: Dict[str, Optional[str]] = {}
+    for entry in checkpoint.entries(setup):
+        if entry['status'] == STATUS_GREEN:
+            green[entry['symbol']] = entry['result']
+        elif entry['status'] == STATUS_NO_SIGNAL:
+            no_signal[entry['symbol']] = (entry.get('result') or {}).get('failed_conditions', [])
+        elif entry['status'] == STATUS_FAILED:
+            failed[entry['symbol']] = entry.get('error')
+
+    return {
+        'setup': setup,
+        'scan_date': checkpoint.scan_date,
+        'run_id': checkpoint.run_id,
+        'candidates': [c['name'] for c in (checkpoint.candidates(setup) or [])],
+        'green': green,
+        'no_signal': no_signal,
+        'failed': failed,
+    }
+
+
+def save_snapshot(runs_dir: str, snapshot: Dict[str, Any], keep: int = RUN_HISTORY_DAYS) -> str:
+    """Write `snapshot` and remove the setup's snapshots older than the latest `keep` scan dates."""
+    directory = os.path.join(runs_dir, SNAPSHOTS_DIR, snapshot['setup'])
+    os.makedirs(directory, exist_ok=True)
+    target = os.path.join(directory, f"{snapshot['scan_date']}.json")
+    tmp = target + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(snapshot, fh)
+    os.replace(tmp, target)
+
+    dates = sorted(f[:-len('.json')] for f in os.listdir(directory) if f.endswith('.json'))
+    for stale in dates[:-keep]:
+        os.remove(os.path.join(directory, f'{stale}.json'))
+    return target
+
+
+def load_previous_snapshot(runs_dir: str, setup: str, scan_date: str) -> Optional[Dict[str, Any]]:
+    """The latest snapshot of `setup` from a scan date before `scan_date`."""
+    directory = os.path.join(runs_dir, SNAPSHOTS_DIR, setup)
+    if not os.path.isdir(directory):
+        return None
+    dates = sorted(f[:-len('.json')] for f in os.listdir(directory) if f.endswith('.json'))
+    earlier = [d for d in dates if d < scan_date]
+    if not earlier:
+        return None
+    with open(os.path.join(directory, f'{earlier[-1]}.json'), encoding='utf-8') as fh:
+        return json.load(fh)
+
+
+def diff_snapshots(previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> Dict[str, Any]:
+    before = (previous or {}).get('green', {})
+    now = current['green']
+    candidates = set(current['candidates'])
+
+    removed = []
+    for symbol in before:
+        if symbol in now:
+            continue
+        if symbol in current['failed']:
+            removed.append({'symbol': symbol, 'reason': 'fetch_failed', 'error': current['failed'][symbol]})
+        elif symbol in candidates:
+            removed.append({'symbol': symbol, 'reason': 'signal_off',
+                            'failed_conditions': current['no_signal'].get(symbol, [])})
+        else:
+            removed.append({'symbol': symbol, 'reason': 'left_scanner'})
+
+    return {
+        'scan_date': current['scan_date'],
+        'previous_scan_date': previous['scan_date'] if previous else None,
+        'added': [result for symbol, result in now.items() if symbol not in before],
+        'removed': removed,
+        'unchanged': [symbol for symbol in now if symbol in before],
+        'count': len(now),
+    }
+
+
+def compact_snapshot(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Green results as column names plus one value array per row."""
+    return {
+        'scan_date': snapshot['scan_date'],
+        'columns': SNAPSHOT_COLUMNS,
+        'rows': [[result.get(column) for column in SNAPSHOT_COLUMNS] for result in snapshot['green'].values()],
+    }
@@ -0,0 +1,533 @@
+"""
+Scan Rules
+Declarative setup definitions (rules/*.json) and the compiler that turns
+them into vectorized evaluations over a price panel (see price_panel.py).
+
+A rule set has four parts, and an optional fifth:
+
+    scanner     TradingView scanner columns/filters/sort (server-side stage)
+    prefilter   conditions on scanner columns a candidate must meet to be
+                worth a history fetch, with --prefilter (see Prefilter)
+    history     how much Yahoo history the local stage needs
+    indicators  named series: {"fn": "sma" | "ema" | "adr_pct" | "pct_distance", ...}
+    signals     named boolean/numeric series, either an expression such as
+                "adr_perc_20 > price_vs_ema10_perc and ema_10 > ema_20"
+                or a function: {"fn": "consecutive" | "perf_since_last" | "rising", ...}
+
+`output` names the signal that makes a symbol a candidate. Expressions may use
+the raw panel fields (open, high, low, close, volume), indicators and signals
+defined earlier, numbers, comparisons, arithmetic, and/or/not.
+
+Every named series compiles to a node keyed by what it computes, not by its
+name, so evaluating several rule sets over the same panel computes shared
+indicators (e.g. EMA10 of close) once.
+"""
+
+import ast
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from price_panel import PANEL_FIELDS
+from screener_service import RawScreenerEntry, ScreenerService
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+RULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rules')
+
+
+class RuleError(ValueError):
+    pass
+
+
+@dataclass
+class RuleSet:
+    name: str
+    description: str
+    history_days: int
+    history_interval: str
+    scanner: Dict[str, Any]
+    indicators: Dict[str, Dict[str, Any]]
+    signals: Dict[str, Any]
+    output: str
+    prefilter: Dict[str, Any] = field(default_factory=dict)
+
+    def scanner_columns(self) -> List[str]:
+        """The scanner's columns plus those only the prefilter reads."""
+        columns = list(self.scanner['columns'])
+        return columns + [c for c in self.prefilter.get('columns', []) if c not in columns]
+
+    def scanner_parameters(self) -> Dict[str, Any]:
+        return ScreenerService.create_basic_parameters(
+            columns=self.scanner_columns(),
+            filters=self.scanner['filters'],
+            markets=self.scanner.get('markets', ['america']),
+            sort_by=self.scanner['sort']['by'],
+            sort_order=self.scanner['sort'].get('order', 'desc'),
+            range_limit=self.scanner.get('range', [0, 5000]),
+        )
+
+    def candidate_mapper(self) -> Callable[[RawScreenerEntry], Dict[str, Any]]:
+        """Map a scanner row to {column: value, ..., 'ticker_full_name': ...}."""
+        columns = self.scanner_columns()
+
+        def mapper(raw: RawScreenerEntry) -> Dict[str, Any]:
+            candidate = dict(zip(columns, raw.data_fields))
+            candidate.setdefault('name', 'Unknown')
+            candidate['ticker_full_name'] = raw.symbol_full
+            return candidate
+
+        return mapper
+
+
+def available_rule_sets() -> List[str]:
+    return sorted(f[:-len('.json')] for f in os.listdir(RULES_DIR) if f.endswith('.json'))
+
+
+def load_rule_set(name_or_path: str) -> RuleSet:
+    """Load a rule set by name (rules/<name>.json) or by file path."""
+    path = name_or_path if name_or_path.endswith('.json') else os.path.join(RULES_DIR, f'{name_or_path}.json')
+    try:
+        with open(path, encoding='utf-8') as fh:
+            spec = json.load(fh)
+    except (OSError, json.JSONDecodeError) as e:
+        raise RuleError(f'Cannot load rule set {name_or_path}: {e}')
+
+    try:
+        return RuleSet(
+            name=spec['name'],
+            description=spec.get('description', ''),
+            history_days=int(spec['history']['days']),
+            history_interval=spec['history']['interval'],
+            scanner=spec['scanner'],
+            indicators=spec.get('indicators', {}),
+            signals=spec['signals'],
+            output=spec['output'],
+            prefilter=spec.get('prefilter', {}),
+        )
+    except KeyError as e:
+        raise RuleError(f'Rule set {name_or_path} is missing {e}')
+
+
+# -- compiled graph ------------------------------------------------------------
+
+@dataclass
+class Node:
+    key: str
+    compute: Callable[[List['pd.DataFrame']], 'pd.DataFrame']
+    inputs: List['Node']
+
+
+class EvaluationContext:
+    """Evaluates nodes over one panel, computing each distinct node once."""
+
+    def __init__(self, panel: Dict[str, 'pd.DataFrame']):
+        self.panel = panel
+        self.cache: Dict[str, 'pd.DataFrame'] = {}
+
+    def value(self, node: Node) -> 'pd.DataFrame':
+        cached = self.cache.get(node.key)
+        if cached is None:
+            cached = node.compute([self.value(i) for i in node.inputs])
+            self.cache[node.key] = cached
+        return cached
+
+
+def _field_node(field: str) -> Node:
+    # Raw fields are seeded into the context cache by evaluate()
+    def missing(_):
+        raise RuleError(f'Panel has no {field} field')
+    return Node(f'field:{field}', missing, [])
+
+
+def _sma(inputs, period):
+    return inputs[0].rolling(window=period).mean()
+
+
+def _ema(inputs, period):
+    return inputs[0].ewm(span=period).mean()
+
+
+def _adr_pct(inputs, period):
+    high, low, close = inputs
+    return ((high - low) / close).rolling(window=period).mean() * 100
+
+
+def _pct_distance(inputs):
+    source, reference = inputs
+    return (source - reference).abs() / reference * 100
+
+
+def _mask(value):
+    """Boolean frame with NaN (warm-up bars, padding) treated as False."""
+    if isinstance(value, (bool, int, float)):
+        return bool(value)
+    return value.fillna(False).astype(bool)
+
+
+def _not(inputs):
+    value = _mask(inputs[0])
+    return (not value) if isinstance(value, bool) else ~value
+
+
+def _consecutive(inputs, bars):
+    signal = _mask(inputs[0])
+    result = signal
+    for shift in range(1, bars):
+        result = result & signal.shift(shift, fill_value=False)
+    return result
+
+
+def _rising(inputs):
+    series = inputs[0]
+    return series > series.shift(1)
+
+
+def _perf_since_last(inputs):
+    """
+    % change of `source` since its value on the last bar where `when` held,
+    reported only where `only_where` holds. A symbol where `when` never held
+    is measured from its first bar.
+    """
+    when, source, only_where = inputs
+    last = source.where(_mask(when)).ffill()
+    never = last.isna().all()
+    if never.any():
+        first = source.bfill().iloc[0]
+        for column in never[never].index:
+            last[column] = first[column]
+    perf = (source / last - 1.0) * 100.0
+    return perf.where(last.notna() & _mask(only_where))
+
+
+_COMPARATORS = {
+    ast.Gt: lambda a, b: a > b,
+    ast.GtE: lambda a, b: a >= b,
+    ast.Lt: lambda a, b: a < b,
+    ast.LtE: lambda a, b: a <= b,
+    ast.Eq: lambda a, b: a == b,
+    ast.NotEq: lambda a, b: a != b,
+}
+_ARITHMETIC = {
+    ast.Add: lambda a, b: a + b,
+    ast.Sub: lambda a, b: a - b,
+    ast.Mult: lambda a, b: a * b,
+    ast.Div: lambda a, b: a / b,
+}
+
+
+class CompiledRuleSet:
+    def __init__(self, rule_set: RuleSet):
+        self.rule_set = rule_set
+        self.nodes: Dict[str, Node] = {field: _field_node(field) for field in PANEL_FIELDS}
+        self.named: List[str] = []
+
+        for name, spec in rule_set.indicators.items():
+            self._define(name, self._compile_indicator(name, spec))
+        for name, spec in rule_set.signals.items():
+            node = self._compile_expression(name, spec) if isinstance(spec, str) else self._compile_signal_fn(name, spec)
+            self._define(name, node)
+
+        if rule_set.output not in self.nodes:
+            raise RuleError(f'{rule_set.name}: output {rule_set.output!r} is not defined')
+
+    @property
+    def name(self) -> str:
+        return self.rule_set.name
+
+    def _define(self, name: str, node: Node) -> None:
+        if name in self.nodes:
+            raise RuleError(f'{self.rule_set.name}: {name!r} is defined twice')
+        self.nodes[name] = node
+        self.named.append(name)
+
+    def _ref(self, owner: str, name: str) -> Node:
+        node = self.nodes.get(name)
+        if node is None:
+            raise RuleError(f'{self.rule_set.name}.{owner}: unknown name {name!r}')
+        return node
+
+    def _compile_indicator(self, name: str, spec: Dict[str, Any]) -> Node:
+        fn = spec.get('fn')
+        if fn == 'sma' or fn == 'ema':
+            period = int(spec['period'])
+            source = self._ref(name, spec.get('source', 'close'))
+            compute = _sma if fn == 'sma' else _ema
+            return Node(f'{fn}({source.key},{period})', lambda i, p=period, c=compute: c(i, p), [source])
+        if fn == 'adr_pct':
+            period = int(spec['period'])
+            inputs = [self.nodes['high'], self.nodes['low'], self.nodes['close']]
+            return Node(f'adr_pct({period})', lambda i, p=period: _adr_pct(i, p), inputs)
+        if fn == 'pct_distance':
+            source = self._ref(name, spec.get('source', 'close'))
+            reference = self._ref(name, spec['reference'])
+            return Node(f'pct_distance({source.key},{reference.key})', _pct_distance, [source, reference])
+        raise RuleError(f'{self.rule_set.name}.{name}: unknown indicator fn {fn!r}')
+
+    def _compile_signal_fn(self, name: str, spec: Dict[str, Any]) -> Node:
+        fn = spec.get('fn')
+        if fn == 'consecutive':
+            bars = int(spec['bars'])
+            of = self._operand(name, spec['of'])
+            return Node(f'consecutive({of.key},{bars})', lambda i, b=bars: _consecutive(i, b), [of])
+        if fn == 'perf_since_last':
+            when = self._operand(name, spec['when'])
+            source = self._operand(name, spec.get('source', 'close'))
+            only_where = self._operand(name, spec.get('only_where', 'True'))
+            return Node(f'perf_since_last({when.key},{source.key},{only_where.key})', _perf_since_last, [when, source, only_where])
+        if fn == 'rising':
+            of = self._operand(name, spec['of'])
+            return Node(f'rising({of.key})', _rising, [of])
+        raise RuleError(f'{self.rule_set.name}.{name}: unknown signal fn {fn!r}')
+
+    def _operand(self, owner: str, text: str) -> Node:
+        """A name or an inline expression used as a function argument."""
+        if text in self.nodes:
+            return self.nodes[text]
+        return self._compile_expression(owner, text)
+
+    def _compile_expression(self, owner: str, text: str) -> Node:
+        try:
+            tree = ast.parse(text, mode='eval').body
+        except SyntaxError as e:
+            raise RuleError(f'{self.rule_set.name}.{owner}: cannot parse {text!r}: {e.msg}')
+        return self._compile_ast(owner, tree)
+
+    def _compile_ast(self, owner: str, tree: ast.AST) -> Node:
+        if isinstance(tree, ast.Name):
+            return self._ref(owner, tree.id)
+
+        if isinstance(tree, ast.Constant) and isinstance(tree.value, (int, float, bool)):
+            value = tree.value
+            return Node(f'const({value!r})', lambda _i, v=value: v, [])
+
+        if isinstance(tree, ast.BoolOp):
+            operands = [self._compile_ast(owner, v) for v in tree.values]
+            is_and = isinstance(tree.op, ast.And)
+            symbol = '&' if is_and else '|'
+
+            def combine(inputs, is_and=is_and):
+                result = inputs[0]
+                for operand in inputs[1:]:
+                    result = (result & operand) if is_and else (result | operand)
+                return result
+
+            return Node('(' + f' {symbol} '.join(o.key for o in operands) + ')', combine, operands)
+
+        if isinstance(tree, ast.UnaryOp) and isinstance(tree.op, (ast.Not, ast.USub)):
+            operand = self._compile_ast(owner, tree.operand)
+            if isinstance(tree.op, ast.Not):
+                return Node(f'~{operand.key}', _not, [operand])
+            return Node(f'-{operand.key}', lambda i: -i[0], [operand])
+
+        if isinstance(tree, ast.Compare):
+            operands = [self._compile_ast(owner, tree.left)] + [self._compile_ast(owner, c) for c in tree.comparators]
+            comparators = []
+            for op in tree.ops:
+                if type(op) not in _COMPARATORS:
+                    raise RuleError(f'{self.rule_set.name}.{owner}: unsupported comparison {type(op).__name__}')
+                comparators.append(_COMPARATORS[type(op)])
+            key = operands[0].key + ''.join(f' {type(op).__name__} {o.key}' for op, o in zip(tree.ops, operands[1:]))
+
+            def compare(inputs, comparators=comparators):
+                result = None
+                for idx, comparator in enumerate(comparators):
+                    step = comparator(inputs[idx], inputs[idx + 1])
+                    result = step if result is None else (result & step)
+                return result
+
+            return Node(f'({key})', compare, operands)
+
+        if isinstance(tree, ast.BinOp) and type(tree.op) in _ARITHMETIC:
+            left = self._compile_ast(owner, tree.left)
+            right = self._compile_ast(owner, tree.right)
+            op = _ARITHMETIC[type(tree.op)]
+            return Node(f'({left.key} {type(tree.op).__name__} {right.key})', lambda i, op=op: op(i[0], i[1]), [left, right])
+
+        raise RuleError(f'{self.rule_set.name}.{owner}: unsupported expression {ast.dump(tree)}')
+
+    def output_node(self) -> Node:
+        return self.nodes[self.rule_set.output]
+
+
+def compile_rule_set(rule_set: RuleSet) -> CompiledRuleSet:
+    return CompiledRuleSet(rule_set)
+
+
+# -- prefilter -----------------------------------------------------------------
+
+def column_name(column: str) -> str:
+    """How a prefilter expression refers to a scanner column: Perf.3M -> Perf_3M, EMA10|1W -> EMA10_1W."""
+    return re.sub(r'\W', '_', column)
+
+
+class Prefilter:
+    """
+    Cheap per-candidate checks on scanner columns, run before any history is
+    fetched. The conditions are heuristics: they read TradingView's columns,
+    not the Yahoo bars the signals are computed from, and during a session
+    the scanner's volume is the live session's while Yahoo's last bar may
+    lag it. A condition can therefore be false for a symbol whose history
+    is green, and that signal is lost. The prefilter is therefore opt-in:
+    only runs that trade completeness for speed pass --prefilter.
+
+    Keep each condition implied by the output signal when both sources
+    agree, and loosen it well past that bound. The daily rules show both
+    kinds:
+
+      quiet_volume  volume < 1.6 * average_volume_30d_calc. low_volume means
+                    the volume is below its 20-bar mean. That mean is at most
+                    1.5 times a 30-day average that counts the last bar, and
+                    30/19 times one that does not. So low_volume implies
+                    quiet_volume.
+      near_ema10    abs(close - EMA10) / EMA10 < 3 * ADR / close, where the
+                    signal bounds the distance by adr_pct(20) and
+                    TradingView's ADR is a 14-day range. There is no exact
+                    bound between the two, so the factor of 3 leaves room for
+                    ranges contracting into the signal.
+
+        "prefilter": {
+          "columns": ["ADR", "average_volume_30d_calc"],
+          "conditions": {"near_ema10": "abs(close - EMA10) / EMA10 < 3 * ADR / close"}
+        }
+
+    Expressions use scanner columns (see column_name), numbers, abs/min/max,
+    arithmetic, comparisons and and/or/not. A condition that reads a
+    missing (null) column passes, so missing data never rejects a candidate.
+    """
+
+    FUNCTIONS = {'abs': abs, 'min': min, 'max': max}
+
+    def __init__(self, rule_set: RuleSet):
+        self.rule_set = rule_set
+        self.names = {column_name(c): c for c in rule_set.scanner_columns()}
+        self.conditions = {
+            name: self._compile(name, text) for name, text in rule_set.prefilter.get('conditions', {}).items()
+        }
+
+    def failed(self, candidate: Dict[str, Any]) -> List[str]:
+        """Names of the conditions `candidate` does not meet."""
+        failed = []
+        for name, condition in self.conditions.items():
+            if condition(candidate) is False:
+                failed.append(name)
+        return failed
+
+    def _compile(self, owner: str, text: str) -> Callable[[Dict[str, Any]], Any]:
+        try:
+            tree = ast.parse(text, mode='eval').body
+        except SyntaxError as e:
+            raise RuleError(f'{self.rule_set.name}.prefilter.{owner}: cannot parse {text!r}: {e.msg}')
+        return self._compile_ast(owner, tree)
+
+    def _compile_ast(self, owner: str, tree: ast.AST) -> Callable[[Dict[str, Any]], Any]:
+        # Every operator yields None when an operand is None
+        if isinstance(tree, ast.Name):
+            if tree.id not in self.names:
+                raise RuleError(f'{self.rule_set.name}.prefilter.{owner}: unknown column {tree.id!r}')
+            column = self.names[tree.id]
+            return lambda row: row.get(column)
+
+        if isinstance(tree, ast.Constant) and isinstance(tree.value, (int, float, bool)):
+            value = tree.value
+            return lambda _row: value
+
+        if isinstance(tree, ast.BoolOp):
+            operands = [self._compile_ast(owner, v) for v in tree.values]
+            is_and = isinstance(tree.op, ast.And)
+
+            def combine(row):
+                values = [operand(row) for operand in operands]
+                if None in values:
+                    return None
+                return all(values) if is_and else any(values)
+
+            return combine
+
+        if isinstance(tree, ast.UnaryOp) and isinstance(tree.op, (ast.Not, ast.USub)):
+            operand = self._compile_ast(owner, tree.operand)
+            negate = isinstance(tree.op, ast.Not)
+
+            def unary(row):
+                value = operand(row)
+                return None if value is None else (not value if negate else -value)
+
+            return unary
+
+        if isinstance(tree, ast.Compare):
+            operands = [self._compile_ast(owner, tree.left)] + [self._compile_ast(owner, c) for c in tree.comparators]
+            comparators = []
+            for op in tree.ops:
+                if type(op) not in _COMPARATORS:
+                    raise RuleError(f'{self.rule_set.name}.prefilter.{owner}: unsupported comparison {type(op).__name__}')
+                comparators.append(_COMPARATORS[type(op)])
+
+            def compare(row):
+                values = [operand(row) for operand in operands]
+                if None in values:
+                    return None
+                return all(c(values[i], values[i + 1]) for i, c in enumerate(comparators))
+
+            return compare
+
+        if isinstance(tree, ast.BinOp) and type(tree.op) in _ARITHMETIC:
+            left = self._compile_ast(owner, tree.left)
+            right = self._compile_ast(owner, tree.right)
+            op = _ARITHMETIC[type(tree.op)]
+
+            def arithmetic(row):
+                a, b = left(row), right(row)
+                if a is None or b is None:
+                    return None
+                try:
+                    return op(a, b)
+                except ZeroDivisionError:
+                    return None
+
+            return arithmetic
+
+        if (isinstance(tree, ast.Call) and isinstance(tree.func, ast.Name) and tree.func.id in self.FUNCTIONS
+                and not tree.keywords):
+            fn = self.FUNCTIONS[tree.func.id]
+            arguments = [self._compile_ast(owner, a) for a in tree.args]
+
+            def call(row):
+                values = [argument(row) for argument in arguments]
+                return None if None in values else fn(*values)
+
+            return call
+
+        raise RuleError(f'{self.rule_set.name}.prefilter.{owner}: unsupported expression {ast.dump(tree)}')
+
+
+def evaluate(
+    compiled: List[CompiledRuleSet],
+    panel: Dict[str, 'pd.DataFrame'],
+    names: Optional[List[str]] = None,
+) -> Dict[str, Dict[str, 'pd.DataFrame']]:
+    """
+    Evaluate several compiled rule sets over one panel in a single pass.
+    Returns {rule_set_name: {series_name: DataFrame[bars, symbols]}} with the
+    output signal always included; `names` selects extra named series.
+    """
+    import numpy as np
+    import pandas as pd
+
+    context = EvaluationContext(panel)
+    for field, frame in panel.items():
+        context.cache[f'field:{field}'] = frame
+
+    results: Dict[str, Dict[str, 'pd.DataFrame']] = {}
+    for rule_set in compiled:
+        wanted = [rule_set.rule_set.output] + [n for n in (names or []) if n in rule_set.nodes]
+        series = {}
+        for name in wanted:
+            value = context.value(rule_set.nodes[name])
+            if not isinstance(value, pd.DataFrame):  # bare constant
+                value = pd.DataFrame(np.full(panel['close'].shape, value), columns=panel['close'].columns)
+            series[name] = value
+        results[rule_set.name] = series
+    return results
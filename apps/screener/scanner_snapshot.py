@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Scanner Snapshot
+One TradingView scan of the liquid US universe per market session, with the
+columns later stages read (liquidity, trend, performance, sector). The OHLCV
+store takes its tickers from here. Snapshots are kept in the per-session
+result cache, so every consumer in a session shares one scan.
+
+Usage:
+    python scanner_snapshot.py            # scan (or reuse this session's scan) and print a summary
+    python scanner_snapshot.py --refresh  # force a new scan
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python-common"))
+
+import result_cache
+import run_report
+from screener_service import RawScreenerEntry, ScreenerService
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+
+SNAPSHOT_COLUMNS = [
+    'name', 'exchange', 'close', 'volume', 'average_volume_10d_calc', 'average_volume_30d_calc',
+    'market_cap_basic', 'ADR', 'EMA10', 'EMA20', 'SMA50',
+    'Perf.W', 'Perf.1M', 'Perf.3M', 'Perf.6M', 'Perf.Y', 'sector', 'industry',
+]
+
+# The RS rating universe: every screen's candidates fall inside it
+UNIVERSE_FILTERS = [
+    {'left': 'close', 'operation': 'greater', 'right': 1},
+    {'left': 'market_cap_basic', 'operation': 'greater', 'right': 300000000},
+    {'left': 'AvgValue.Traded_30d', 'operation': 'greater', 'right': 5000000},
+    {'left': 'is_primary', 'operation': 'equal', 'right': True},
+    {'left': 'type', 'operation': 'equal', 'right': 'stock'},
+]
+
+
+def fetch_snapshot(screener_service: Optional[ScreenerService] = None) -> Dict[str, Any]:
+    """Scan the universe; rows hold the full ticker name followed by SNAPSHOT_COLUMNS."""
+    screener_service = screener_service or ScreenerService()
+    parameters = ScreenerService.create_basic_parameters(
+        columns=SNAPSHOT_COLUMNS,
+        filters=UNIVERSE_FILTERS,
+        markets=['america'],
+        sort_by='market_cap_basic',
+        sort_order='desc',
+        range_limit=[0, 10000],
+    )
+
+    def to_row(entry: RawScreenerEntry) -> List[Any]:
+        return [entry.symbol_full, *entry.data_fields]
+
+    with run_report.stage("scanner"):
+        rows = screener_service.scan(parameters, to_row)
+
+    return {
+        'scan_date': date.today().isoformat(),
+        'columns': ['ticker_full_name', *SNAPSHOT_COLUMNS],
+        'rows': rows,
+    }
+
+
+def load_snapshot(cache_dir: str = DEFAULT_CACHE_DIR, args: Optional[argparse.Namespace] = None) -> Dict[str, Any]:
+    """This session's snapshot, scanning only when there is none yet (or with --refresh)."""
+    cache = result_cache.ResultCache(cache_dir, 'scanner_snapshot')
+    snapshot, _ = cache.cached({'columns': SNAPSHOT_COLUMNS, 'filters': UNIVERSE_FILTERS}, fetch_snapshot, args)
+    return snapshot
+
+
+def snapshot_records(snapshot: Dict[str, Any]) -> List[Dict[str, Any]]:
+    columns = snapshot['columns']
+    return [dict(zip(columns, row)) for row in snapshot['rows']]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scanner Snapshot - one TradingView scan of the US universe per session')
+    parser.add_argument('--quiet', action='store_true', help='Suppress non-essential output')
+    result_cache.add_arguments(parser, DEFAULT_CACHE_DIR)
+    run_report.add_arguments(parser)
+    args = parser.parse_args()
+
+    with run_report.run("scanner_snapshot", args):
+        try:
+            snapshot = load_snapshot(args.cache_dir, args)
+            if not args.quiet:
+                print(f"📸 {len(snapshot['rows'])} tickers in the {snapshot['scan_date']} snapshot", file=sys.stderr)
+            print(json.dumps({'scan_date': snapshot['scan_date'], 'count': len(snapshot['rows'])}))
+        except Exception as error:
+            print(json.dumps({'error': str(error)}))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -7,6 +7,8 @@ import requests
 from dataclasses import dataclass
 from typing import List, Dict, Any, Callable, TypeVar, Generic
 
+from http_client import HttpClient, get_client
+
 T = TypeVar('T')
 
 @dataclass
@@ -16,20 +18,15 @@ class RawScreenerEntry:
 
 
 class ScreenerService:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Content-Type': 'application/json',
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        self.timeout = 10
+    def __init__(self, client: HttpClient = None):
+        # Pooling, retries, timeouts and compression come from the shared client
+        self.client = client or get_client()
 
     def scan(self, parameters: Dict[str, Any], mapper: Callable[[RawScreenerEntry], T]) -> List[T]:
         try:
-            response = self.session.post(
+            response = self.client.post(
                 'https://scanner.tradingview.com/global/scan',
                 json=parameters,
-                timeout=self.timeout
             )
             response.raise_for_status()
 
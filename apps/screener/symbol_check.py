@@ -0,0 +1,147 @@
+"""
+Symbol Check
+Evaluates given symbols against the setups directly, without the TradingView
+scan, so a watchlist check does not wait for a full screening run.
+
+Daily histories come from the OHLCV store when it holds the latest close,
+and weekly bars are built from the same stored days (Monday to Friday
+weeks, the current week included as Yahoo's weekly bars do). Symbols the
+store does not hold, or any symbol while the store is stale, are fetched
+from Yahoo.
+
+Every setup reports the last bar of each named series, so a symbol that is
+not green shows how far it is from the setup:
+
+    {"symbol": "NVDA", "setups": {"daily": {
+        "green": false, "is_new": false, "as_of": "2026-10-16", "bars": 207, "source": "store",
+        "failed_conditions": ["low_volume"],
+        "signals": {"low_volume": false, "basic_signal": true, "perf_pct_from_bearish": 41.2, ...},
+        "streaks": {"basic_signal": 5, ...},
+        "indicators": {"adr_perc_20": 3.9, "price_vs_ema10_perc": 1.7, ...}}}}
+
+Streaks count the consecutive bars, up to the last one, on which a boolean
+signal held.
+"""
+
+import time
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import run_report
+from symbol_health import to_yahoo_symbol
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from ohlcv_store import OhlcvData
+    from scan_rules import CompiledRuleSet, RuleSet
+    from yahoo_finance_service import YahooFinanceService
+
+# Intervals the store's daily bars can serve
+STORE_INTERVALS = ('1d', '1wk')
+
+
+def weekly_frame(daily: 'pd.DataFrame') -> 'pd.DataFrame':
+    """Weekly bars (Monday to Friday) of a lean daily frame, dated by their first day."""
+    import pandas as pd
+
+    weeks = pd.to_datetime(daily['Date'], unit='s').dt.to_period('W')
+    grouped = daily.groupby(weeks.to_numpy(), sort=True)
+    frame = grouped.agg({'Date': 'first', 'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
+    return frame.reset_index(drop=True)
+
+
+def load_history(symbol: str, days: int, interval: str, store: Optional['OhlcvData'],
+                 yahoo_finance_service: 'YahooFinanceService') -> Tuple['pd.DataFrame', str]:
+    """A lean history frame of `symbol` and where it came from ('store' or 'yahoo')."""
+    if store is not None and interval in STORE_INTERVALS and symbol in store:
+        with run_report.stage("store_history"):
+            frame = store.frame(symbol, int(time.time()) - days * 86400)
+        if len(frame):
+            return (weekly_frame(frame) if interval == '1wk' else frame), 'store'
+
+    with run_report.stage("yahoo_history"):
+        frame = yahoo_finance_service.get_recent_data(to_yahoo_symbol(symbol), days, interval=interval, lean=True)
+    return frame, 'yahoo'
+
+
+def _plain(value: Any) -> Any:
+    """A last-bar value as JSON: bools, rounded floats, None for NaN."""
+    import numpy as np
+
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    value = float(value)
+    return None if np.isnan(value) else round(value, 4)
+
+
+def _streak(values: 'pd.Series') -> int:
+    import numpy as np
+
+    held = values.to_numpy(dtype=bool)
+    misses = np.flatnonzero(~held)
+    return int(len(held) - 1 - misses[-1]) if len(misses) else len(held)
+
+
+def _setup_report(rule_set: 'CompiledRuleSet', outputs: Dict[str, 'pd.DataFrame'], symbol: str, frame: 'pd.DataFrame',
+                  source: str) -> Dict[str, Any]:
+    output = rule_set.rule_set.output
+    signal = outputs[output][symbol]
+    indicators, signals, streaks = {}, {}, {}
+    for name in rule_set.named:
+        series = outputs[name][symbol]
+        if name in rule_set.rule_set.indicators:
+            indicators[name] = _plain(series.iloc[-1])
+            continue
+        signals[name] = _plain(series.iloc[-1])
+        if series.dtype == bool:
+            streaks[name] = _streak(series)
+
+    green = bool(signal.iloc[-1])
+    return {
+        'green': green,
+        'is_new': green and (len(frame) < 2 or not signal.iloc[-2]),
+        'as_of': datetime.fromtimestamp(int(frame['Date'].iloc[-1]), tz=timezone.utc).strftime('%Y-%m-%d'),
+        'bars': len(frame),
+        'source': source,
+        'failed_conditions': [name for name, value in signals.items() if value is False and name != output],
+        'signals': signals,
+        'streaks': streaks,
+        'indicators': indicators,
+    }
+
+
+def check_symbols(symbols: List[str], rule_sets: List['RuleSet'], store: Optional['OhlcvData'],
+                  yahoo_finance_service: 'YahooFinanceService') -> Dict[str, Any]:
+    """
+    Evaluate `symbols` against every rule set. Returns {'symbols': [...]}
+    in the order given; a symbol whose history could not be loaded carries
+    the error for the setups needing that history.
+    """
+    from price_panel import build_panel
+    from scan_rules import compile_rule_set, evaluate
+
+    groups: Dict[Tuple[int, str], List['CompiledRuleSet']] = {}
+    for rule_set in rule_sets:
+        groups.setdefault((rule_set.history_days, rule_set.history_interval), []).append(compile_rule_set(rule_set))
+
+    reports: Dict[str, Dict[str, Any]] = {symbol: {} for symbol in symbols}
+    for (days, interval), compiled in groups.items():
+        frames, sources = {}, {}
+        for symbol in symbols:
+            try:
+                frame, source = load_history(symbol, days, interval, store, yahoo_finance_service)
+            except Exception as error:
+                for rule_set in compiled:
+                    reports[symbol][rule_set.name] = {'error': str(error)}
+                continue
+            frames[symbol], sources[symbol] = frame, source
+        if not frames:
+            continue
+
+        with run_report.stage("indicators"):
+            outputs = evaluate(compiled, build_panel(frames), names=[n for rule_set in compiled for n in rule_set.named])
+        for rule_set in compiled:
+            for symbol, frame in frames.items():
+                reports[symbol][rule_set.name] = _setup_report(rule_set, outputs[rule_set.name], symbol, frame, sources[symbol])
+
+    return {'symbols': [{'symbol': symbol, 'setups': reports[symbol]} for symbol in symbols]}
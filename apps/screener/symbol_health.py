@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Symbol Health
+Keeps Yahoo history fetches from paying for the same broken symbols every run.
+
+  - to_yahoo_symbol() maps TradingView names to Yahoo tickers (BRK.B -> BRK-B).
+  - SymbolHealth remembers symbols Yahoo has no data for (delisted, renamed,
+    unmappable). From the FAILURE_THRESHOLD-th consecutive failure a symbol
+    is skipped for a backoff that doubles with every further failure, from
+    BACKOFF_BASE up to BACKOFF_MAX; one success clears it. Kept in
+    data/symbol_health.json across runs.
+  - CircuitBreaker pauses all fetching when Yahoo itself is failing
+    (timeouts, connection errors, rate limits). Once ERROR_RATE of the last
+    WINDOW calls failed it waits COOL_DOWN seconds, doubled on each trip,
+    then lets one call through; after MAX_TRIPS trips without a success it
+    stays open and callers stop fetching.
+
+Only symbol errors (see is_symbol_error) count against a symbol; service
+errors only feed the breaker, so an outage does not bench healthy symbols.
+
+Usage:
+    python symbol_health.py                    # list symbols being skipped
+    python symbol_health.py --forget BRK.B,XYZ
+"""
+import argparse
+import json
+import os
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+DEFAULT_HEALTH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'symbol_health.json')
+
+# TradingView names Yahoo lists under a different ticker, beyond the
+# share-class rule in to_yahoo_symbol()
+YAHOO_SYMBOL_OVERRIDES: Dict[str, str] = {}
+
+FAILURE_THRESHOLD = 2
+BACKOFF_BASE = 24 * 3600
+BACKOFF_MAX = 30 * 24 * 3600
+
+# Messages of errors caused by the symbol rather than by Yahoo
+SYMBOL_ERROR_MARKERS = ('no data found', 'delisted', 'no timezone found', 'not found', '404')
+
+WINDOW = 20
+MIN_CALLS = 10
+ERROR_RATE = 0.5
+COOL_DOWN = 30.0
+MAX_TRIPS = 3
+
+
+def to_yahoo_symbol(symbol: str) -> str:
+    """Yahoo ticker of a TradingView name: share classes use '-' (BRK.B -> BRK-B)."""
+    if symbol in YAHOO_SYMBOL_OVERRIDES:
+        return YAHOO_SYMBOL_OVERRIDES[symbol]
+    return symbol.replace('.', '-').replace('/', '-')
+
+
+def is_symbol_error(error: BaseException) -> bool:
+    message = str(error).lower()
+    return any(marker in message for marker in SYMBOL_ERROR_MARKERS)
+
+
+class SymbolHealth:
+    def __init__(self, path: str = DEFAULT_HEALTH_PATH, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.clock = clock
+        self.entries: Dict[str, Dict[str, Any]] = self._read()
+        self.changed: Dict[str, Optional[Dict[str, Any]]] = {}
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, encoding='utf-8') as fh:
+                return json.load(fh)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def skip_reason(self, symbol: str) -> Optional[str]:
+        """Why `symbol` should not be fetched now, or None."""
+        entry = self.entries.get(symbol)
+        if not entry or entry.get('retry_after', 0) <= self.clock():
+            return None
+        until = datetime.fromtimestamp(entry['retry_after'], tz=timezone.utc).isoformat(timespec='minutes')
+        return f"skipped until {until} after {entry['failures']} failures: {entry['last_error']}"
+
+    def record_failure(self, symbol: str, error: str) -> None:
+        now = self.clock()
+        failures = self.entries.get(symbol, {}).get('failures', 0) + 1
+        entry = {'failures': failures, 'last_error': error[:300], 'last_failure': now}
+        if failures >= FAILURE_THRESHOLD:
+            entry['retry_after'] = now + min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (failures - FAILURE_THRESHOLD))
+        self.entries[symbol] = entry
+        self.changed[symbol] = entry
+
+    def record_success(self, symbol: str) -> None:
+        if symbol in self.entries:
+            del self.entries[symbol]
+            self.changed[symbol] = None
+
+    def save(self) -> None:
+        """Write this run's changes over the file's current content (other runs may have saved meanwhile)."""
+        if not self.changed:
+            return
+        entries = self._read()
+        for symbol, entry in self.changed.items():
+            if entry is None:
+                entries.pop(symbol, None)
+            else:
+                entries[symbol] = entry
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            json.dump(entries, fh, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+        self.entries = entries
+        self.changed = {}
+
+
+class CircuitBreaker:
+    def __init__(self, clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.clock = clock
+        self.sleep = sleep
+        self.outcomes: Deque[bool] = deque(maxlen=WINDOW)
+        self.trips = 0
+        self.open_until: Optional[float] = None
+        self.half_open = False
+
+    @property
+    def exhausted(self) -> bool:
+        return self.trips >= MAX_TRIPS and self.open_until is not None
+
+    def before_call(self) -> bool:
+        """Wait out an open circuit; False once MAX_TRIPS trips passed without a success."""
+        if self.open_until is None:
+            return True
+        if self.exhausted:
+            return False
+        self.sleep(max(0.0, self.open_until - self.clock()))
+        self.open_until = None
+        self.half_open = True
+        return True
+
+    def record(self, ok: bool) -> None:
+        if self.half_open:
+            self.half_open = False
+            if ok:
+                self.trips = 0
+                self.outcomes.clear()
+            else:
+                self._trip()
+            return
+        self.outcomes.append(ok)
+        failures = self.outcomes.count(False)
+        if len(self.outcomes) >= MIN_CALLS and failures / len(self.outcomes) >= ERROR_RATE:
+            self._trip()
+
+    def _trip(self) -> None:
+        self.trips += 1
+        self.outcomes.clear()
+        self.open_until = self.clock() + COOL_DOWN * 2 ** (self.trips - 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Symbol Health - symbols skipped after repeated Yahoo failures')
+    parser.add_argument('--path', default=DEFAULT_HEALTH_PATH, help='Registry file')
+    parser.add_argument('--forget', help='Comma separated symbols to clear')
+    args = parser.parse_args()
+
+    health = SymbolHealth(args.path)
+    if args.forget:
+        for symbol in args.forget.split(','):
+            health.record_success(symbol.strip())
+        health.save()
+
+    skipped: List[Dict[str, Any]] = []
+    for symbol in sorted(health.entries):
+        reason = health.skip_reason(symbol)
+        if reason:
+            skipped.append({'symbol': symbol, 'yahoo_symbol': to_yahoo_symbol(symbol), 'reason': reason})
+    print(json.dumps({'tracked': len(health.entries), 'skipped': skipped}))
+
+
+if __name__ == '__main__':
+    main()
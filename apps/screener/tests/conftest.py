@@ -0,0 +1,54 @@
+"""Synthetic price histories shared by the screener tests."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'python-common'))
+
+BARS = 260
+
+
+def history(rng, bars: int = BARS, drift: float = 0.004, volatility: float = 0.02):
+    """A frame shaped like YahooFinanceService.get_historical_data() output (not lean)."""
+    import numpy as np
+    import pandas as pd
+
+    close = 20 * np.cumprod(1 + rng.normal(drift, volatility, bars))
+    spread = close * (0.01 + np.abs(rng.normal(0, 0.02, bars)))
+    high = close + spread * rng.uniform(0.2, 0.8, bars)
+    low = high - spread
+    return pd.DataFrame({
+        'Date': pd.bdate_range(end='2026-10-16', periods=bars, tz='America/New_York'),
+        'open': low + (high - low) * rng.uniform(0, 1, bars),
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': rng.lognormal(14, 0.5, bars).round(),
+        'dividends': 0.0,
+        'stock splits': 0.0,
+    })
+
+
+@pytest.fixture(scope='session')
+def histories():
+    """
+    Forty random walks, most of them with green daily bars, plus edge cases:
+    a steady climb whose EMA10 never crosses below EMA20 (perf measured from
+    the first close), a history with missing volume bars, and 1- and 2-bar
+    histories.
+    """
+    np = pytest.importorskip('numpy')
+    pytest.importorskip('pandas')
+
+    rng = np.random.default_rng(7)
+    frames = {f'S{i:02d}': history(rng, drift=(0.0, 0.004, 0.008)[i % 3]) for i in range(40)}
+    frames['CLIMB'] = history(rng, drift=0.003, volatility=0.002)
+    gaps = history(rng, drift=0.008)
+    gaps.loc[gaps.index[-30::7], 'volume'] = np.nan
+    frames['GAPS'] = gaps
+    frames['ONE'] = history(rng, bars=1)
+    frames['TWO'] = history(rng, bars=2)
+    return frames
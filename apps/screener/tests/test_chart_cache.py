@@ -0,0 +1,62 @@
+"""Unit tests for the per-session chart cache in tradingview_chart_service."""
+
+import argparse
+from datetime import datetime
+
+import pytest
+
+import tradingview_chart_service
+from market_calendar import EXCHANGE_TZ
+from tradingview_chart_service import cached_chart_data
+
+MONDAY_BEFORE_OPEN = datetime(2024, 6, 3, 8, 0, tzinfo=EXCHANGE_TZ)
+MONDAY_NOON = datetime(2024, 6, 3, 12, 0, tzinfo=EXCHANGE_TZ)
+MONDAY_AFTER_CLOSE = datetime(2024, 6, 3, 16, 5, tzinfo=EXCHANGE_TZ)
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    calls = []
+
+    def fetch(symbol, exchange, interval, bars, timeout):
+        calls.append((interval, bars))
+        return {'symbol': symbol, 'exchange': exchange, 'interval': interval,
+                'candles': [{'time': i, 'close': float(len(calls))} for i in range(bars)]}
+
+    monkeypatch.setattr(tradingview_chart_service, 'fetch_chart_data', fetch)
+    return calls
+
+
+def _args(tmp_path, **overrides):
+    return argparse.Namespace(**{'cache_dir': str(tmp_path), 'no_cache': False, 'refresh': False, **overrides})
+
+
+def test_closed_market_serves_the_cached_tail(tmp_path, fetches):
+    args = _args(tmp_path)
+    cached_chart_data('AAPL', 'NASDAQ', 'D', 10, args, MONDAY_BEFORE_OPEN)
+    data = cached_chart_data('AAPL', 'NASDAQ', '1d', 4, args, MONDAY_BEFORE_OPEN)
+    assert fetches == [('D', 10)]
+    assert [c['time'] for c in data['candles']] == [6, 7, 8, 9]
+
+    # More bars than cached, a refresh, or an intraday interval fetch again
+    cached_chart_data('AAPL', 'NASDAQ', 'D', 20, args, MONDAY_BEFORE_OPEN)
+    cached_chart_data('AAPL', 'NASDAQ', 'D', 5, _args(tmp_path, refresh=True), MONDAY_BEFORE_OPEN)
+    cached_chart_data('AAPL', 'NASDAQ', '5', 5, args, MONDAY_BEFORE_OPEN)
+    assert fetches == [('D', 10), ('D', 20), ('D', 5), ('5', 5)]
+
+
+def test_open_market_fetches_the_forming_bar_live(tmp_path, fetches):
+    args = _args(tmp_path)
+    cached_chart_data('AAPL', 'NASDAQ', 'D', 10, args, MONDAY_BEFORE_OPEN)
+
+    # Neither served from nor written to the cache while trading
+    for _ in range(2):
+        data = cached_chart_data('AAPL', 'NASDAQ', 'W', 5, args, MONDAY_NOON)
+        data = cached_chart_data('AAPL', 'NASDAQ', 'D', 5, args, MONDAY_NOON)
+    assert fetches == [('D', 10), ('W', 5), ('D', 5), ('W', 5), ('D', 5)]
+    assert data['candles'][-1]['close'] == 5.0
+
+    # After the close, a new session starts with a fresh fetch
+    cached_chart_data('AAPL', 'NASDAQ', 'D', 5, args, MONDAY_AFTER_CLOSE)
+    cached_chart_data('AAPL', 'NASDAQ', 'D', 5, args, MONDAY_AFTER_CLOSE)
+    assert len(fetches) == 6
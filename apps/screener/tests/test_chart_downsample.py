@@ -0,0 +1,88 @@
+"""Unit tests for --max-points downsampling in tradingview_chart_service."""
+
+import json
+import math
+import sys
+
+import pytest
+
+import tradingview_chart_service
+from tradingview_chart_service import downsample, lttb, merge_candles, ohlc_buckets
+
+
+def _candles(count):
+    """Daily candles with a spike and a crash, so the extremes land inside buckets."""
+    candles = []
+    for i in range(count):
+        close = 100 + 10 * math.sin(i / 7)
+        candles.append({'time': i, 'open': close - 0.5, 'high': close + 1, 'low': close - 1,
+                        'close': close, 'volume': 1000 + i})
+    candles[count // 3]['high'] = 500.0
+    candles[2 * count // 3]['low'] = 5.0
+    return candles
+
+
+@pytest.mark.parametrize('count, max_points', [(250, 50), (251, 50), (1000, 7), (100, 99)])
+def test_ohlc_buckets_keep_the_envelope_and_endpoints(count, max_points):
+    candles = _candles(count)
+    merged, size = ohlc_buckets(candles, max_points)
+    assert len(merged) <= max_points
+    assert size == math.ceil(count / max_points)
+
+    assert merged[0]['time'] == candles[0]['time'] and merged[0]['open'] == candles[0]['open']
+    assert merged[-1]['close'] == candles[-1]['close']
+    assert max(c['high'] for c in merged) == 500.0
+    assert min(c['low'] for c in merged) == 5.0
+    assert sum(c['volume'] for c in merged) == sum(c['volume'] for c in candles)
+
+    # Full buckets from the latest bar back; only the oldest may be short
+    assert merged[-1] == merge_candles(candles[-size:])
+    assert merged[1]['time'] - merged[0]['time'] <= size
+    assert all(b['time'] - a['time'] == size for a, b in zip(merged[1:], merged[2:]))
+
+
+def test_lttb_keeps_the_endpoints_and_the_extremes():
+    candles = _candles(500)
+    candles[200]['close'] = 300.0
+    candles[350]['close'] = 1.0
+    picked = lttb(candles, 40)
+
+    assert len(picked) == 40
+    assert picked[0] is candles[0] and picked[-1] is candles[-1]
+    assert all(c in candles for c in picked)
+    assert [c['time'] for c in picked] == sorted({c['time'] for c in picked})
+    assert candles[200] in picked and candles[350] in picked
+
+
+def test_lttb_with_too_few_points():
+    candles = _candles(10)
+    assert lttb(candles, 10) == candles
+    assert lttb(candles, 2) == [candles[0], candles[-1]]
+    assert lttb(candles, 1) == [candles[0]]
+
+
+def test_downsample_reports_what_it_did():
+    data = {'symbol': 'AAPL', 'candles': _candles(120)}
+    assert downsample(data, 200) == {**data, 'original_bars': 120}
+
+    thinned = downsample(data, 50)
+    assert thinned['original_bars'] == 120 and len(data['candles']) == 120
+    assert thinned['downsample'] == {'method': 'ohlc', 'points': 40, 'bucket_bars': 3}
+
+    thinned = downsample(data, 50, 'lttb')
+    assert thinned['downsample'] == {'method': 'lttb', 'points': 50, 'bucket_bars': None}
+
+
+def test_max_points_flag(monkeypatch, capsys):
+    monkeypatch.setattr(tradingview_chart_service, 'cached_chart_data',
+                        lambda symbol, exchange, interval, bars, args: {'symbol': symbol, 'candles': _candles(bars)})
+    monkeypatch.setattr(sys, 'argv', ['tradingview_chart_service.py', '--symbol', 'AAPL', '--exchange', 'NASDAQ',
+                                      '--bars', '1000', '--max-points', '300', '--quiet'])
+    tradingview_chart_service.main()
+    data = json.loads(capsys.readouterr().out)
+    assert (data['original_bars'], len(data['candles'])) == (1000, 250)
+    assert data['downsample'] == {'method': 'ohlc', 'points': 250, 'bucket_bars': 4}
+
+    monkeypatch.setattr(sys, 'argv', sys.argv[:-3] + ['--max-points', '0'])
+    with pytest.raises(SystemExit):
+        tradingview_chart_service.main()
@@ -0,0 +1,197 @@
+"""Unit tests for chart_stream_server, against a stand-in upstream stream."""
+
+import http.client
+import json
+import queue
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip('numpy')
+pytest.importorskip('requests')
+
+import chart_stream_server
+from chart_stream_server import ChartHub, StreamHandler
+
+DAY = 86400
+# Monday 2026-10-05, midnight UTC
+START = 1791158400
+
+
+def _row(day, close):
+    return [START + day * DAY, close, close + 1, close - 1, close, 1000 * close]
+
+
+def _packet(rows, full=False):
+    return {'m': 'timescale_update' if full else 'du',
+            'p': ['cs_1', {'sds_0': {'s': [{'i': i, 'v': row} for i, row in enumerate(rows)]}}]}
+
+
+class _Connection:
+    def __init__(self, symbols, resolution, bars):
+        self.symbols, self.resolution, self.bars = symbols, resolution, bars
+        self.queue = queue.Queue()
+        self.closed = False
+
+    def packets(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def close(self):
+        self.closed = True
+        self.queue.put(None)
+
+
+class _Upstream:
+    """The hub's connect(): a _Connection per call, fed by the test."""
+
+    def __init__(self):
+        self.connections = []
+
+    def __call__(self, symbols, resolution, bars):
+        connection = _Connection(symbols, resolution, bars)
+        self.connections.append(connection)
+        return connection
+
+    def send(self, packet, connection=-1):
+        _wait(lambda: len(self.connections) > (connection if connection >= 0 else 0))
+        self.connections[connection].queue.put(packet)
+
+
+def _wait(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def _next(subscriber, skip=('status',)):
+    while True:
+        kind, payload = subscriber.events.get(timeout=5)
+        if kind not in skip:
+            return kind, payload
+
+
+@pytest.fixture
+def upstream():
+    return _Upstream()
+
+
+@pytest.fixture
+def hub(upstream):
+    hub = ChartHub(connect=upstream, bars=5, idle_timeout=10)
+    yield hub
+    hub.close()
+
+
+def test_clients_share_one_upstream_stream(hub, upstream):
+    channel, first = hub.subscribe('AAPL', 'NASDAQ', 'D', 10)
+    same, second = hub.subscribe('AAPL', 'NASDAQ', '1D', 3)
+    assert same is channel
+
+    upstream.send(_packet([_row(day, 10 + day) for day in range(7)], full=True))
+    kind, snapshot = _next(first)
+    assert kind == 'snapshot'
+    assert [c['time'] for c in snapshot['candles']] == ['2026-10-07', '2026-10-08', '2026-10-09', '2026-10-10', '2026-10-11']
+    assert [c['close'] for c in _next(second)[1]['candles']] == [14, 15, 16]
+
+    # A later client gets the candles so far at once
+    _, third = hub.subscribe('AAPL', 'NASDAQ', 'D', 2)
+    assert [c['close'] for c in _next(third)[1]['candles']] == [15, 16]
+
+    assert len(upstream.connections) == 1
+    assert (upstream.connections[0].symbols, upstream.connections[0].resolution) == (['NASDAQ:AAPL'], '1D')
+    assert hub.stats()['subscribers'] == 3
+
+
+def test_bars_update_the_forming_candle_or_open_a_new_one(hub, upstream):
+    channel, subscriber = hub.subscribe('AAPL', 'NASDAQ', 'D', 5)
+    upstream.send(_packet([_row(day, 10 + day) for day in range(5)], full=True))
+    _next(subscriber)
+
+    upstream.send(_packet([_row(4, 20)]))
+    kind, update = _next(subscriber)
+    assert (kind, update['new'], update['candle']['close']) == ('bar', False, 20)
+
+    # A late revision of an older bar is ignored
+    upstream.send(_packet([_row(2, 99), _row(5, 21)]))
+    kind, update = _next(subscriber)
+    assert (kind, update['new'], update['candle']['time']) == ('bar', True, '2026-10-10')
+    assert [c['close'] for c in channel.candles] == [11, 12, 13, 20, 21]
+
+
+def test_idle_channels_are_closed_after_the_timeout(hub, upstream):
+    channel, subscriber = hub.subscribe('AAPL', 'NASDAQ', 'D', 5)
+    _wait(lambda: upstream.connections)
+    hub.unsubscribe(channel, subscriber)
+
+    assert hub.reap(channel.idle_since + 9) == []
+    assert hub.reap(channel.idle_since + 10) == ['NASDAQ:AAPL']
+    assert hub.stats()['channels'] == 0
+    _wait(lambda: upstream.connections[0].closed)
+
+
+def test_a_client_that_falls_behind_is_dropped(hub, upstream, monkeypatch):
+    monkeypatch.setattr(chart_stream_server, 'SUBSCRIBER_QUEUE', 3)
+    channel, slow = hub.subscribe('AAPL', 'NASDAQ', 'D', 5)
+    upstream.send(_packet([_row(day, 10 + day) for day in range(5)], full=True))
+    for day in range(5, 10):
+        upstream.send(_packet([_row(day, 10 + day)]))
+
+    _wait(lambda: slow.dropped)
+    assert slow not in channel.subscribers
+    assert channel.idle_since is not None
+
+
+def test_upstream_errors_reconnect_and_reload(hub, upstream, monkeypatch):
+    monkeypatch.setattr(chart_stream_server, 'RECONNECT_BACKOFF', [0])
+    channel, subscriber = hub.subscribe('AAPL', 'NASDAQ', 'D', 5)
+    upstream.send(ConnectionError('connection closed'))
+
+    kind, status = _next(subscriber, skip=())
+    while status.get('status') != 'disconnected':
+        kind, status = _next(subscriber, skip=())
+    assert (status['error'], status['retry_in']) == ('connection closed', 0)
+    assert _next(subscriber, skip=())[1]['status'] == 'connected'
+
+    upstream.send(_packet([_row(0, 10)], full=True), connection=1)
+    assert _next(subscriber)[0] == 'snapshot'
+    assert channel.connects == 2 and upstream.connections[0].closed
+
+
+def test_http_stream_and_stats(hub, upstream):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), type('Handler', (StreamHandler,), {'hub': hub}))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+        connection.request('GET', '/stream?symbol=AAPL')
+        assert connection.getresponse().status == 400
+
+        stream = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+        stream.request('GET', '/stream?symbol=AAPL&exchange=NASDAQ&interval=D&bars=2')
+        response = stream.getresponse()
+        assert response.getheader('Content-Type') == 'text/event-stream'
+        upstream.send(_packet([_row(day, 10 + day) for day in range(5)], full=True))
+
+        event = None
+        while event != 'event: snapshot':
+            event = response.readline().decode().strip()
+        data = json.loads(response.readline().decode()[len('data: '):])
+        assert [c['close'] for c in data['candles']] == [13, 14]
+
+        connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+        connection.request('GET', '/stats')
+        stats = json.loads(connection.getresponse().read())
+        assert stats['channels'] == 1 and stats['streams'][0]['symbol'] == 'NASDAQ:AAPL'
+        stream.close()
+    finally:
+        server.shutdown()
+        server.server_close()
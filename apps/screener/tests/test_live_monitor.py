@@ -0,0 +1,179 @@
+"""Unit tests for live_monitor, against a stand-in upstream stream."""
+
+import queue
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+pytest.importorskip('requests')
+
+import live_monitor
+from live_monitor import BarBuffer, LiveMonitor, stream_resolution
+from price_panel import build_panel
+from scan_rules import compile_rule_set, evaluate, load_rule_set
+
+
+class _Connection:
+    def __init__(self, symbols, resolution, bars):
+        self.symbols, self.resolution, self.bars = symbols, resolution, bars
+        self.series = {f'sds_{i}': symbol for i, symbol in enumerate(symbols)}
+        self.symbol_ids = {f'sds_sym_{i}': symbol for i, symbol in enumerate(symbols)}
+        self.queue = queue.Queue()
+        self.closed = False
+
+    def packets(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def close(self):
+        self.closed = True
+        self.queue.put(None)
+
+
+class _Upstream:
+    """The monitor's connect(): a _Connection per call."""
+
+    def __init__(self):
+        self.connections = []
+
+    def __call__(self, symbols, resolution, bars):
+        connection = _Connection(symbols, resolution, bars)
+        self.connections.append(connection)
+        return connection
+
+
+def _wait(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def _rows(frame):
+    times = frame['Date'].to_numpy(dtype='datetime64[s]').astype(np.int64)
+    values = frame[['open', 'high', 'low', 'close', 'volume']].to_numpy()
+    return [[int(t), *v] for t, v in zip(times, values)]
+
+
+def _packet(rows, full=False, series='sds_0'):
+    return {'m': 'timescale_update' if full else 'du',
+            'p': ['cs_1', {series: {'s': [{'i': i, 'v': row} for i, row in enumerate(rows)]}}]}
+
+
+def _feed(monitor, connection, *packets):
+    """Dispatch packets as a reader thread would, then apply them as one batch."""
+    for packet in packets:
+        monitor._dispatch(connection, packet)
+    batch = []
+    while not monitor.updates.empty():
+        batch.append(monitor.updates.get_nowait())
+    monitor._apply(batch)
+
+
+@pytest.fixture(scope='module')
+def flip(histories):
+    """A symbol and bar whose daily green signal turns on and off again with the next bar."""
+    compiled = compile_rule_set(load_rule_set('daily'))
+    green = evaluate([compiled], build_panel(histories))['daily']['green_signal']
+    for symbol in histories:
+        values = green[symbol].to_numpy()
+        for bar in range(60, len(values) - 1):
+            if values[bar] and not values[bar - 1] and not values[bar + 1]:
+                return symbol, bar
+    pytest.fail('no green signal that lasts one bar')
+
+
+def test_only_the_rule_sets_own_bars_are_streamed():
+    assert stream_resolution(load_rule_set('daily')) == '1D'
+    assert stream_resolution(load_rule_set('daily'), 'D') == '1D'
+    assert stream_resolution(load_rule_set('weekly'), '1wk') == '1W'
+    for interval in ('5', '60', 'W'):
+        with pytest.raises(ValueError, match='1d bars'):
+            LiveMonitor('daily', ['NASDAQ:AAPL'], interval, connect=_Upstream())
+
+
+def test_bar_buffer_revises_the_forming_bar_and_rolls_over():
+    buffer = BarBuffer(3)
+    buffer.reset([[1, 1, 2, 0, 1, 10], [2, 2, 3, 1, 2, 20]])
+    buffer.update([[2, 2, 4, 1, 3, 25]])
+    assert (len(buffer), buffer.last_time, list(buffer['close']), list(buffer['volume'])) == (2, 2, [1, 3], [10, 25])
+
+    buffer.update([[1, 9, 9, 9, 9, 9], [3, 3, 4, 2, 4, None], [4, 4, 5, 3, 5, 40]])
+    assert list(buffer.time) == [2, 3, 4] and list(buffer['close']) == [3, 4, 5]
+    assert np.isnan(buffer['volume'][1])
+
+
+def test_signal_flips_are_emitted_once(histories, flip):
+    symbol, bar = flip
+    rows = _rows(histories[symbol])
+    events = []
+    monitor = LiveMonitor('daily', [f'NASDAQ:{symbol}', 'NYSE:S00'], emit=events.append, connect=_Upstream())
+    connection = _Connection(monitor.symbols, monitor.resolution, monitor.bars)
+
+    _feed(monitor, connection, _packet(rows[:bar], full=True), _packet(_rows(histories['S00']), full=True, series='sds_1'))
+    assert [(e['symbol'], e['state'], e['previous']) for e in events] == [(f'NASDAQ:{symbol}', False, None), ('NYSE:S00', False, None)]
+
+    # The forming bar reaches its close: the signal turns on
+    partial = rows[bar][:4] + [rows[bar - 1][4], rows[bar][5] / 2]
+    _feed(monitor, connection, _packet([partial]), _packet([rows[bar]]))
+    event = events[-1]
+    assert len(events) == 3
+    assert (event['state'], event['previous'], event['bar_time'], event['close']) == (True, False, rows[bar][0], rows[bar][4])
+    assert event['setup'] == 'daily' and event['latency_ms'] >= 0
+    assert list(event['conditions']) == list(load_rule_set('daily').signals)
+    assert event['conditions']['green_signal'] is True
+    assert len(monitor.buffers[f'NASDAQ:{symbol}']) == bar + 1
+
+    # The same bar again changes nothing; the next bar turns it off
+    _feed(monitor, connection, _packet([rows[bar]]))
+    assert len(events) == 3
+    _feed(monitor, connection, _packet([rows[bar + 1]]))
+    assert (events[-1]['state'], events[-1]['previous']) == (False, True)
+
+
+def test_errors_from_the_stream(histories):
+    events = []
+    monitor = LiveMonitor('daily', ['NASDAQ:AAPL'], emit=events.append, connect=_Upstream())
+    connection = _Connection(monitor.symbols, monitor.resolution, monitor.bars)
+
+    _feed(monitor, connection, {'m': 'symbol_error', 'p': ['cs_1', 'sds_sym_0', 'invalid symbol']},
+          {'m': 'qsd', 'p': ['qs_1', {}]}, _packet([[1, 1, 1, 1, 1, 1]], series='sds_9'))
+    assert events == [{'event': 'error', 'symbol': 'NASDAQ:AAPL', 'error': "['invalid symbol']"}]
+    with pytest.raises(ConnectionError, match='critical_error'):
+        monitor._dispatch(connection, {'m': 'critical_error', 'p': ['cs_1', 'boom']})
+
+
+def test_readers_reconnect_with_backoff(histories, monkeypatch):
+    monkeypatch.setattr(live_monitor, 'RECONNECT_BACKOFF', [0])
+    monkeypatch.setattr(live_monitor, 'SYMBOLS_PER_CONNECTION', 1)
+    upstream, events = _Upstream(), []
+    monitor = LiveMonitor('daily', ['NASDAQ:S01', 'NASDAQ:S02'], emit=events.append, connect=upstream)
+    runner = threading.Thread(target=monitor.run, args=(3,))
+    runner.start()
+    try:
+        _wait(lambda: len(upstream.connections) == 2)
+        assert sorted(c.symbols for c in upstream.connections) == [['NASDAQ:S01'], ['NASDAQ:S02']]
+        assert {c.resolution for c in upstream.connections} == {'1D'}
+        first = next(c for c in upstream.connections if c.symbols == ['NASDAQ:S01'])
+        first.queue.put(ConnectionError('connection closed'))
+
+        _wait(lambda: len(upstream.connections) == 3)
+        assert first.closed and upstream.connections[2].symbols == ['NASDAQ:S01']
+        upstream.connections[2].queue.put(_packet(_rows(histories['S01']), full=True))
+        _wait(lambda: any(e['event'] == 'signal' for e in events))
+    finally:
+        runner.join(5)
+
+    statuses = [(e['status'], e.get('error')) for e in events if e['event'] == 'status']
+    assert statuses.count(('connected', None)) == 3
+    assert ('disconnected', 'connection closed') in statuses
+    assert [e['symbol'] for e in events if e['event'] == 'signal'] == ['NASDAQ:S01']
+    assert monitor.stopping.is_set()
@@ -0,0 +1,111 @@
+"""Unit tests for ohlcv_store."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+from ohlcv_store import FIELDS, OhlcvData, OhlcvStore, from_download, merge, readjusted
+
+# After the close of Friday 2026-10-16 and of Monday 2026-10-19
+FRIDAY = datetime(2026, 10, 16, 22, tzinfo=timezone.utc)
+MONDAY = datetime(2026, 10, 19, 22, tzinfo=timezone.utc)
+
+
+def _data(closes, dates):
+    """OhlcvData whose every field is the close, from {ticker: closes}."""
+    epochs = pd.DatetimeIndex(dates).to_numpy(dtype='datetime64[s]').astype(np.int64)
+    matrix = np.array(list(closes.values()), dtype=np.float64).T
+    return OhlcvData(tickers=list(closes), dates=epochs, fields={name: matrix.copy() for name in FIELDS})
+
+
+DAYS = pd.bdate_range('2026-10-05', '2026-10-16')
+
+
+def test_readjusted_flags_a_split_only():
+    old = _data({'AAA': np.arange(10.0, 20.0), 'BBB': np.arange(10.0, 20.0), 'GAP': np.arange(10.0, 20.0)}, DAYS)
+    # The last five stored bars again, from a download after AAA split 2-for-1
+    # and with a bar missing from GAP's download
+    gap = np.arange(15.0, 20.0)
+    gap[2] = np.nan
+    update = _data({'AAA': np.arange(15.0, 20.0) / 2, 'BBB': np.arange(15.0, 20.0), 'GAP': gap, 'NEW': np.ones(5)}, DAYS[5:])
+
+    assert readjusted(old, update) == ['AAA']
+    assert readjusted(old, _data({'AAA': [1.0]}, pd.bdate_range('2026-10-19', periods=1))) == []
+
+
+def test_merge_replaces_readjusted_history_and_keeps_old_bars_over_gaps():
+    start, end = (int(pd.Timestamp(d).timestamp()) for d in ('2026-10-06', '2026-10-19'))
+    old = _data({'AAA': np.arange(10.0, 20.0), 'GAP': np.arange(10.0, 20.0)}, DAYS)
+    days = pd.bdate_range('2026-10-14', '2026-10-19')
+    recent = _data({'AAA': [7.0, 8.0, 9.0, 10.0], 'GAP': [17.0, np.nan, 19.0, 20.0]}, days)
+    full = _data({'AAA': np.arange(5.0, 10.5, 0.5), 'NEW': [np.nan] * 8 + [1.0, 2.0, 3.0]},
+                 pd.bdate_range('2026-10-05', '2026-10-19'))
+
+    data = merge(old, [recent, full], ['AAA', 'GAP', 'NEW'], start, end, replaced=frozenset({'AAA'}))
+
+    # The window starts on 10-06; 10-19 is new
+    assert list(pd.to_datetime(data.dates, unit='s').strftime('%m-%d')) == [d.strftime('%m-%d') for d in DAYS[1:]] + ['10-19']
+    close = data.fields['close']
+    np.testing.assert_array_equal(close[:, 0], np.arange(5.5, 10.5, 0.5))
+    np.testing.assert_array_equal(close[:, 1], list(np.arange(11.0, 20.0)) + [20.0])
+    np.testing.assert_array_equal(close[:, 2], [np.nan] * 7 + [1.0, 2.0, 3.0])
+    assert list(data.frame('NEW')['close']) == [1.0, 2.0, 3.0]
+
+
+class _Yahoo:
+    """get_bulk_daily_data() over fixed histories, up to the completed session."""
+
+    def __init__(self, closes, session):
+        self.closes = closes
+        self.session = session
+        self.calls = []
+
+    def get_bulk_daily_data(self, symbols, period1):
+        self.calls.append((sorted(symbols), period1.date().isoformat()))
+        closes = self.closes.loc[period1:self.session, symbols]
+        return pd.concat({name: closes for name in FIELDS}, axis=1)
+
+
+def _history(tickers, end):
+    days = pd.bdate_range(end=end, periods=400)
+    return pd.DataFrame({t: np.linspace(10.0, 20.0, len(days)) * (i + 1) for i, t in enumerate(tickers)}, index=days)
+
+
+def test_update_downloads_only_what_changed(tmp_path):
+    store = OhlcvStore(str(tmp_path / 'ohlcv'))
+    closes = _history(['AAA', 'BBB', 'BRK.B', 'SPY'], '2026-10-19').rename(columns={'BRK.B': 'BRK-B'})
+
+    first = store.update(['AAA', 'BBB', 'BRK.B'], _Yahoo(closes, '2026-10-16'), now=FRIDAY)
+    assert (first['session'], first['full_history'], first['updated']) == ('2026-10-16', 3, 0)
+    data = store.load()
+    assert data.tickers == ['AAA', 'BBB', 'BRK.B'] and data.is_current(FRIDAY)
+    assert data.frame('BRK.B')['close'].iloc[-1] == closes.loc['2026-10-16', 'BRK-B']
+
+    # Over the weekend AAA splits 2-for-1 and SPY joins the universe
+    closes['AAA'] /= 2
+    yahoo = _Yahoo(closes, '2026-10-19')
+    second = store.update(['AAA', 'BBB', 'BRK.B', 'SPY'], yahoo, now=MONDAY)
+    assert second == {'session': '2026-10-19', 'tickers': 4, 'dates': first['dates'] + 1, 'updated': 3,
+                      'full_history': 2, 'readjusted': 1, 'without_bars': 0}
+    assert yahoo.calls == [(['AAA', 'BBB', 'BRK-B'], '2026-10-09'), (['AAA', 'SPY'], '2024-10-19')]
+
+    data = store.load()
+    for ticker, column in (('AAA', 'AAA'), ('BBB', 'BBB'), ('SPY', 'SPY')):
+        frame = data.frame(ticker)
+        expected = closes.loc[pd.Timestamp(frame['Date'].iloc[0], unit='s'):'2026-10-19', column]
+        np.testing.assert_allclose(frame['close'], expected.to_numpy())
+
+    # Nothing to fetch once the store holds the session
+    again = _Yahoo(closes, '2026-10-19')
+    assert store.update(data.tickers, again, now=MONDAY)['updated'] == 0
+    assert again.calls == []
+
+
+def test_from_download_maps_yahoo_tickers_back():
+    closes = _history(['BRK-B'], '2026-10-16').tz_localize('America/New_York')
+    data = from_download(pd.concat({name: closes for name in FIELDS}, axis=1), {'BRK-B': 'BRK.B'})
+    assert data.tickers == ['BRK.B']
+    assert data.dates[-1] == int(pd.Timestamp('2026-10-16').timestamp())
@@ -0,0 +1,61 @@
+"""Unit tests for price_panel: build_panel and SharedPanel."""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+from price_panel import PANEL_FIELDS, SharedPanel, build_panel, map_slices
+
+
+def last_closes(panel):
+    """Worker function of map_slices: each symbol's latest close."""
+    return {symbol: float(panel['close'][symbol].iloc[-1]) for symbol in panel['close'].columns}
+
+
+def test_build_panel_right_aligns_histories(histories):
+    frames = {symbol: histories[symbol] for symbol in ('S00', 'ONE', 'TWO')}
+    panel = build_panel(frames)
+    assert list(panel) == list(PANEL_FIELDS)
+    close = panel['close']
+    assert close.shape == (len(histories['S00']), 3)
+    np.testing.assert_array_equal(close['S00'], histories['S00']['close'])
+    assert close['TWO'].iloc[:-2].isna().all()
+    np.testing.assert_array_equal(close['TWO'].iloc[-2:], histories['TWO']['close'])
+
+
+def test_shared_panel_matches_build_panel(histories):
+    with SharedPanel.create(histories) as shared:
+        expected = build_panel(histories)
+        panel = shared.panel()
+        for field in PANEL_FIELDS:
+            pd.testing.assert_frame_equal(panel[field], expected[field])
+
+        # Slices are views of ticker ranges
+        part = shared.panel(3, 6)
+        assert list(part['close'].columns) == list(histories)[3:6]
+        assert np.shares_memory(part['close'].to_numpy(), shared.values)
+
+        np.testing.assert_array_equal(shared.series('TWO'), histories['TWO']['close'])
+        np.testing.assert_array_equal(shared.series('GAPS', 'volume'), histories['GAPS']['volume'])
+        assert shared.slices(20) == [(0, 20), (20, 40), (40, len(histories))]
+
+
+def test_attached_panel_is_read_only(histories):
+    frames = {symbol: histories[symbol] for symbol in ('S00', 'S01')}
+    with SharedPanel.create(frames, dtype='float32') as shared:
+        with SharedPanel.attach(shared.name) as attached:
+            assert attached.tickers == ['S00', 'S01']
+            assert attached.values.dtype == np.float32
+            np.testing.assert_array_equal(attached.series('S01'), histories['S01']['close'].to_numpy(dtype=np.float32))
+            with pytest.raises(ValueError):
+                attached.values[0, 0, 0] = 1.0
+
+
+def test_map_slices_runs_every_slice_in_order(histories):
+    with SharedPanel.create(histories) as shared:
+        results = map_slices(shared, last_closes, workers=2, size=10)
+    assert len(results) == 5
+    merged = {symbol: close for part in results for symbol, close in part.items()}
+    assert list(merged) == list(histories)
+    assert merged == {symbol: float(frame['close'].iloc[-1]) for symbol, frame in histories.items()}
@@ -0,0 +1,74 @@
+"""Unit tests for rs_history."""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+from ohlcv_store import FIELDS, OhlcvData
+from rs_history import HALF, QUARTER, YEAR, RatingHistory, RatingHistoryStore, backfill
+
+BARS = 300
+
+
+@pytest.fixture(scope='module')
+def data():
+    """Forty random walks, SPY, and LATE, listed too recently for a rating."""
+    rng = np.random.default_rng(11)
+    closes = {f'S{i:02d}': 20 * np.cumprod(1 + rng.normal(0.001, 0.02, BARS)) for i in range(40)}
+    closes['SPY'] = np.linspace(400.0, 500.0, BARS)
+    late = 20 * np.cumprod(1 + rng.normal(0.001, 0.02, BARS))
+    late[:100] = np.nan
+    closes['LATE'] = late
+    matrix = np.array(list(closes.values())).T
+    dates = pd.bdate_range(end='2026-10-16', periods=BARS).to_numpy(dtype='datetime64[s]').astype(np.int64)
+    return OhlcvData(tickers=list(closes), dates=dates, fields={name: matrix.copy() for name in FIELDS}, session='2026-10-16')
+
+
+def test_backfill_matches_rate_stocks_on_every_date(data):
+    pytest.importorskip('requests')
+    from rs_rating_service import StockPerformance, rate_stocks
+
+    history = backfill(data)
+    assert history.tickers == [t for t in data.tickers if t != 'SPY']
+    assert history.rating.dtype == np.int8
+
+    close = data.fields['close']
+    for row in (YEAR, YEAR + 20, BARS - 1):
+        def perf(bars, column):
+            return (close[row, column] / close[row - bars, column] - 1) * 100
+        stocks = [StockPerformance(t, perf(QUARTER, c), perf(HALF, c), perf(YEAR, c))
+                  for c, t in enumerate(data.tickers) if t.startswith('S') and t != 'SPY']
+        expected = {r['symbol']: r['rs_rating'] for r in rate_stocks(stocks)}
+        assert {t: int(history.rating[row, history.tickers.index(t)]) for t in expected} == expected
+
+
+def test_no_rating_without_a_year_of_history(data):
+    history = backfill(data)
+    assert not history.rating[:YEAR].any()
+    assert not history.rating[:, history.tickers.index('LATE')].any()
+    assert (history.rating[YEAR:, :40] >= 1).all()
+
+
+def test_rising_sorts_by_change_and_skips_unrated():
+    rating = np.array([[10, 50, 0, 90], [20, 60, 30, 80], [40, 55, 70, 70]], dtype=np.int8)
+    history = RatingHistory(tickers=['A', 'B', 'C', 'D'], dates=np.arange(3), rating=rating)
+    assert history.rising(2) == [{'symbol': 'A', 'rs_rating': 40, 'previous': 10, 'change': 30},
+                                 {'symbol': 'B', 'rs_rating': 55, 'previous': 50, 'change': 5}]
+    assert [r['symbol'] for r in history.rising(1)] == ['C', 'A']
+    assert [r['symbol'] for r in history.rising(1, min_change=25)] == ['C']
+    assert history.rising(3) == []
+
+
+def test_store_round_trip_and_series(data, tmp_path):
+    store = RatingHistoryStore(str(tmp_path / 'rs_history'))
+    assert store.load() is None
+    store.save(backfill(data))
+
+    history = store.load()
+    assert history.session == '2026-10-16'
+    np.testing.assert_array_equal(history.rating, backfill(data).rating)
+    chart = history.series('S00', 10)
+    assert len(chart['series']) == 10
+    assert chart['series'][-1]['time'] == '2026-10-16'
+    assert len(history.series('S00', 1000)['series']) == BARS - YEAR
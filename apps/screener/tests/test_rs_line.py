@@ -0,0 +1,71 @@
+"""Unit tests for rs_line."""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+from ohlcv_store import FIELDS, OhlcvData
+from rs_line import MIN_BARS, compute_rs_lines, latest, series
+
+BARS = 100
+
+
+@pytest.fixture
+def data():
+    """SPY falls steadily; LEAD holds flat after an early peak, CLIMB rises, NEW lists late, GONE has no bars."""
+    spy = np.linspace(100.0, 50.0, BARS)
+    lead = np.full(BARS, 10.0)
+    lead[10] = 12.0
+    new = np.full(BARS, np.nan)
+    new[-30:] = np.linspace(5.0, 8.0, 30)
+    closes = {'SPY': spy, 'LEAD': lead, 'CLIMB': np.linspace(10.0, 30.0, BARS), 'NEW': new, 'GONE': np.full(BARS, np.nan)}
+    matrix = np.array(list(closes.values())).T
+    dates = pd.bdate_range(end='2026-10-16', periods=BARS).to_numpy(dtype='datetime64[s]').astype(np.int64)
+    return OhlcvData(tickers=list(closes), dates=dates, fields={name: matrix.copy() for name in FIELDS}, session='2026-10-16')
+
+
+def test_rs_line_is_close_over_the_benchmark(data):
+    lines = compute_rs_lines(data)
+    close = data.fields['close']
+    np.testing.assert_allclose(lines.line[:, lines.column('CLIMB')], close[:, 2] / close[:, 0])
+    assert np.isnan(lines.line[:-30, lines.column('NEW')]).all()
+
+    # No flags before MIN_BARS bars of history
+    assert not lines.new_high[:MIN_BARS - 1].any()
+    assert lines.new_high[MIN_BARS - 1:, lines.column('CLIMB')].all()
+
+
+def test_lead_is_an_rs_high_without_a_price_high(data):
+    lines = compute_rs_lines(data)
+    lead, climb = lines.column('LEAD'), lines.column('CLIMB')
+    assert lines.lead[MIN_BARS - 1:, lead].all()
+    assert not lines.price_new_high[MIN_BARS - 1:, lead].any()
+    assert lines.price_new_high[MIN_BARS - 1:, climb].all()
+    assert not lines.lead[:, climb].any()
+
+
+def test_latest_reports_each_ticker_with_bars(data):
+    results = {r['symbol']: r for r in latest(compute_rs_lines(data))}
+    assert list(results) == ['LEAD', 'CLIMB', 'NEW']
+    assert results['LEAD'] == {'symbol': 'LEAD', 'date': '2026-10-16', 'rs_line': 0.2, 'rs_high_52w': 0.2,
+                               'pct_from_high': 0.0, 'rs_new_high': True, 'price_new_high': False, 'rs_lead': True}
+    # Too new for a 52-week high
+    assert results['NEW']['rs_high_52w'] is None and results['NEW']['pct_from_high'] is None
+    assert not results['NEW']['rs_new_high']
+
+    assert [r['symbol'] for r in latest(compute_rs_lines(data), leads_only=True)] == ['LEAD']
+
+
+def test_series_has_the_last_bars_with_a_close(data):
+    lines = compute_rs_lines(data)
+    chart = series(lines, 'NEW', 50)
+    assert chart['benchmark'] == 'SPY'
+    assert len(chart['series']) == 30
+    assert chart['series'][-1] == {'time': '2026-10-16', 'rs_line': 0.16, 'rs_new_high': False, 'rs_lead': False}
+    assert len(series(lines, 'CLIMB', 10)['series']) == 10
+
+
+def test_missing_benchmark_is_an_error(data):
+    with pytest.raises(ValueError, match='QQQ'):
+        compute_rs_lines(data, benchmark='QQQ')
@@ -0,0 +1,86 @@
+"""Unit tests for run_checkpoint."""
+
+import os
+import signal
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from run_checkpoint import PROGRESS_FILE, STATUS_FAILED, STATUS_GREEN, STATUS_NO_SIGNAL, RunCheckpoint, prune_runs
+
+SCAN_DATE = '2026-10-16'
+
+# Records one symbol, then dies halfway through writing the next line
+KILLED_RUN = '''
+import os, signal, sys
+sys.path.insert(0, {screener!r})
+from run_checkpoint import RunCheckpoint
+checkpoint = RunCheckpoint({runs_dir!r}, 'daily', {scan_date!r})
+checkpoint.start(False, {{'type': 'daily'}})
+checkpoint.save_candidates('daily', [{{'name': 'AAA'}}, {{'name': 'BBB'}}, {{'name': 'CCC'}}])
+checkpoint.record('daily', 'AAA', 'green', result={{'symbol': 'AAA'}})
+checkpoint._progress_file.write('{{"setup": "daily", "symb')
+checkpoint._progress_file.flush()
+os.kill(os.getpid(), signal.SIGKILL)
+'''
+
+
+def _resume(runs_dir) -> RunCheckpoint:
+    checkpoint = RunCheckpoint(str(runs_dir), 'daily', SCAN_DATE)
+    assert checkpoint.start(True, {'type': 'daily'})
+    return checkpoint
+
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGKILL'), reason='needs SIGKILL')
+def test_resume_after_kill_redoes_only_the_symbol_in_flight(tmp_path):
+    screener = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+    script = KILLED_RUN.format(screener=screener, runs_dir=str(tmp_path), scan_date=SCAN_DATE)
+    assert subprocess.run([sys.executable, '-c', script]).returncode == -signal.SIGKILL
+
+    checkpoint = _resume(tmp_path)
+    assert checkpoint.is_processed('daily', 'AAA')
+    assert not checkpoint.is_recorded('daily', 'BBB')
+    checkpoint.record('daily', 'BBB', STATUS_NO_SIGNAL, result={'symbol': 'BBB'})
+    checkpoint.record('daily', 'CCC', STATUS_GREEN, result={'symbol': 'CCC'})
+    checkpoint.close()
+
+    checkpoint = _resume(tmp_path)
+    assert [e['symbol'] for e in checkpoint.entries('daily')] == ['AAA', 'BBB', 'CCC']
+    assert checkpoint.results('daily') == [{'symbol': 'AAA'}, {'symbol': 'CCC'}]
+    checkpoint.close()
+
+
+def test_record_after_a_torn_line_is_kept(tmp_path):
+    checkpoint = RunCheckpoint(str(tmp_path), 'daily', SCAN_DATE)
+    checkpoint.start(False, {'type': 'daily'})
+    checkpoint.record('daily', 'AAA', STATUS_GREEN, result={'symbol': 'AAA'})
+    checkpoint.close()
+    with open(os.path.join(checkpoint.path, PROGRESS_FILE), 'a', encoding='utf-8') as fh:
+        fh.write('{"setup": "daily", "symbol": "BB')
+
+    checkpoint = _resume(tmp_path)
+    checkpoint.record('daily', 'BBB', STATUS_FAILED, error='timeout')
+    checkpoint.close()
+
+    checkpoint = _resume(tmp_path)
+    assert checkpoint.is_processed('daily', 'AAA')
+    assert checkpoint.is_recorded('daily', 'BBB') and not checkpoint.is_processed('daily', 'BBB')
+    checkpoint.close()
+
+
+def test_starting_a_run_prunes_old_scan_dates(tmp_path):
+    for day in ('2026-10-01', '2026-10-02', '2026-10-03'):
+        os.makedirs(tmp_path / day / 'daily')
+    os.makedirs(tmp_path / 'snapshots' / 'daily')
+
+    assert prune_runs(str(tmp_path), keep=2) == ['2026-10-01']
+    assert sorted(os.listdir(tmp_path)) == ['2026-10-02', '2026-10-03', 'snapshots']
+
+    checkpoint = RunCheckpoint(str(tmp_path), 'daily', SCAN_DATE)
+    checkpoint.start(False, {'type': 'daily'})
+    checkpoint.close()
+    assert os.path.isdir(checkpoint.path)
+    assert os.path.isdir(tmp_path / 'snapshots')
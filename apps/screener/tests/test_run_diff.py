@@ -0,0 +1,110 @@
+"""Unit tests for run_diff and --emit delta."""
+
+import argparse
+import os
+
+import pytest
+
+from run_checkpoint import RUN_HISTORY_DAYS, STATUS_FAILED, STATUS_GREEN, STATUS_NO_SIGNAL, RunCheckpoint
+from run_diff import SNAPSHOT_COLUMNS, build_snapshot, compact_snapshot, diff_snapshots, load_previous_snapshot, save_snapshot
+
+
+def _result(symbol):
+    return {'symbol': symbol, 'ticker_full_name': f'NASDAQ:{symbol}', 'is_new': False, 'sector': 'Technology',
+            'industry': 'Semiconductors', 'close': 10.0}
+
+
+def _run(runs_dir, scan_date, candidates, outcomes):
+    """Snapshot of a completed daily run; outcomes maps symbols to (status, failed conditions or error)."""
+    checkpoint = RunCheckpoint(str(runs_dir), 'daily', scan_date)
+    checkpoint.start(False, {'type': 'daily'})
+    checkpoint.save_candidates('daily', [{'name': name} for name in candidates])
+    for symbol, (status, detail) in outcomes.items():
+        if status == STATUS_GREEN:
+            checkpoint.record('daily', symbol, status, result=_result(symbol))
+        elif status == STATUS_NO_SIGNAL:
+            checkpoint.record('daily', symbol, status, result={'symbol': symbol, 'failed_conditions': detail})
+        else:
+            checkpoint.record('daily', symbol, status, error=detail)
+    checkpoint.complete()
+    checkpoint.close()
+    snapshot = build_snapshot(checkpoint, 'daily')
+    save_snapshot(str(runs_dir), snapshot)
+    return snapshot
+
+
+@pytest.fixture
+def runs(tmp_path):
+    green = (STATUS_GREEN, None)
+    first = _run(tmp_path, '2026-10-15', ['AAA', 'BBB', 'CCC', 'DDD', 'EEE'],
+                 {'AAA': green, 'BBB': green, 'CCC': green, 'DDD': green, 'EEE': (STATUS_NO_SIGNAL, ['low_volume'])})
+    second = _run(tmp_path, '2026-10-16', ['AAA', 'BBB', 'DDD', 'EEE'],
+                  {'AAA': green, 'BBB': (STATUS_NO_SIGNAL, ['low_volume', 'adr_contracting']),
+                   'DDD': (STATUS_FAILED, 'No data found for symbol DDD'), 'EEE': green})
+    return tmp_path, first, second
+
+
+def test_delta_reports_added_removed_and_unchanged(runs):
+    runs_dir, first, second = runs
+    previous = load_previous_snapshot(str(runs_dir), 'daily', second['scan_date'])
+    assert previous == first
+
+    delta = diff_snapshots(previous, second)
+    assert delta['previous_scan_date'] == '2026-10-15'
+    assert delta['added'] == [_result('EEE')]
+    assert delta['unchanged'] == ['AAA']
+    assert delta['count'] == 2
+    assert {r['symbol']: r for r in delta['removed']} == {
+        'BBB': {'symbol': 'BBB', 'reason': 'signal_off', 'failed_conditions': ['low_volume', 'adr_contracting']},
+        'CCC': {'symbol': 'CCC', 'reason': 'left_scanner'},
+        'DDD': {'symbol': 'DDD', 'reason': 'fetch_failed', 'error': 'No data found for symbol DDD'},
+    }
+
+
+def test_first_run_and_reruns_compare_with_an_earlier_date(runs):
+    runs_dir, first, second = runs
+    assert load_previous_snapshot(str(runs_dir), 'daily', first['scan_date']) is None
+    assert load_previous_snapshot(str(runs_dir), 'weekly', second['scan_date']) is None
+
+    delta = diff_snapshots(None, first)
+    assert delta['previous_scan_date'] is None
+    assert [r['symbol'] for r in delta['added']] == ['AAA', 'BBB', 'CCC', 'DDD']
+    assert delta['removed'] == [] and delta['unchanged'] == []
+
+    # A rerun of the same scan date replaces its snapshot and still compares with the day before
+    rerun = _run(runs_dir, '2026-10-16', ['AAA'], {'AAA': (STATUS_GREEN, None)})
+    assert load_previous_snapshot(str(runs_dir), 'daily', '2026-10-17') == rerun
+    assert load_previous_snapshot(str(runs_dir), 'daily', rerun['scan_date']) == first
+
+
+def test_saving_keeps_the_latest_scan_dates(runs):
+    runs_dir, _, second = runs
+    directory = runs_dir / 'snapshots' / 'daily'
+    dates = [f'2026-09-{day:02d}' for day in range(1, RUN_HISTORY_DAYS + 3)] + ['2026-10-15', '2026-10-16']
+    for scan_date in dates[:-2]:
+        save_snapshot(str(runs_dir), {**second, 'scan_date': scan_date})
+    assert sorted(os.listdir(directory)) == [f'{d}.json' for d in dates[-RUN_HISTORY_DAYS:]]
+
+    save_snapshot(str(runs_dir), {**second, 'scan_date': '2026-10-17'}, keep=3)
+    assert sorted(os.listdir(directory)) == ['2026-10-15.json', '2026-10-16.json', '2026-10-17.json']
+
+
+def test_compact_snapshot_has_one_row_per_green_result(runs):
+    _, _, second = runs
+    compact = compact_snapshot(second)
+    assert compact['columns'] == SNAPSHOT_COLUMNS
+    assert compact['rows'] == [['AAA', 'NASDAQ:AAA', False, 'Technology', 'Semiconductors'],
+                               ['EEE', 'NASDAQ:EEE', False, 'Technology', 'Semiconductors']]
+
+
+def test_emit_delta_payload(runs):
+    pytest.importorskip('requests')
+    from main import json_payload
+
+    runs_dir, first, second = runs
+    args = argparse.Namespace(emit='delta')
+    payload = json_payload(args, {'daily': [_result('AAA'), _result('EEE')]}, {'daily': second}, {'daily': first})
+    assert payload == {'mode': 'delta', 'daily': diff_snapshots(first, second)}
+
+    partial = json_payload(args, {}, {'daily': second}, {'daily': first}, {'daily': ['FFF']})
+    assert partial['partial'] is True and partial['unevaluated'] == {'daily': ['FFF']}
@@ -0,0 +1,118 @@
+"""Unit tests for scan_rules: parity with technical_analysis and the prefilter."""
+
+import dataclasses
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('pandas')
+
+import technical_analysis
+from price_panel import build_panel
+from scan_rules import Prefilter, available_rule_sets, compile_rule_set, evaluate, load_rule_set
+
+SHARED_SIGNALS = ['low_volume', 'basic_signal', 'consecutive_signal_3_days', 'perf_pct_from_bearish',
+                  'consecutive_signal_with_30_perc']
+
+
+def _reference(frame):
+    return technical_analysis.calculate_signal_conditions(technical_analysis.add_technical_indicators(frame))
+
+
+def _evaluate(rule_set, frames, names):
+    """{name: {symbol: values}}, each symbol cut to its own bars."""
+    outputs = evaluate([compile_rule_set(rule_set)], build_panel(frames), names=names)[rule_set.name]
+    return {
+        name: {symbol: outputs[name][symbol].to_numpy()[len(outputs[name]) - len(frame):] for symbol, frame in frames.items()}
+        for name in outputs
+    }
+
+
+def _technical_analysis_rule_set():
+    """The daily setup closed the way calculate_signal_conditions closes it: rising EMAs, no ADR contraction."""
+    daily = load_rule_set('daily')
+    signals = {name: spec for name, spec in daily.signals.items() if name != 'green_signal'}
+    signals['ema10_rising'] = {'fn': 'rising', 'of': 'ema_10'}
+    signals['ema20_rising'] = {'fn': 'rising', 'of': 'ema_20'}
+    signals['green_signal'] = 'consecutive_signal_with_30_perc and low_volume and ema10_rising and ema20_rising'
+    return dataclasses.replace(daily, name='technical_analysis', signals=signals)
+
+
+def test_daily_rules_match_technical_analysis(histories):
+    rules = _evaluate(load_rule_set('daily'), histories, SHARED_SIGNALS)
+    for symbol, frame in histories.items():
+        reference = _reference(frame)
+        for name in SHARED_SIGNALS:
+            np.testing.assert_array_equal(rules[name][symbol], reference[name].to_numpy(dtype=float), err_msg=f'{symbol} {name}')
+
+        # The setups close on ADR contraction, as the per-ticker code in main.py did
+        contracting = (technical_analysis.calculate_adr_percentage(frame, 20)
+                       > technical_analysis.calculate_adr_percentage(frame, 5))
+        green = reference['consecutive_signal_with_30_perc'] & contracting & reference['low_volume']
+        np.testing.assert_array_equal(rules['green_signal'][symbol], green.to_numpy(dtype=bool), err_msg=symbol)
+
+    assert sum(values.sum() for values in rules['green_signal'].values()) > 100
+
+
+def test_green_signal_matches_calculate_signal_conditions(histories):
+    rules = _evaluate(_technical_analysis_rule_set(), histories, [])
+    for symbol, frame in histories.items():
+        expected = _reference(frame)['green_signal'].to_numpy(dtype=bool)
+        np.testing.assert_array_equal(rules['green_signal'][symbol], expected, err_msg=symbol)
+
+    assert rules['green_signal']['CLIMB'].any()
+
+
+def test_no_bearish_cross_measures_from_the_first_close(histories):
+    frame = histories['CLIMB']
+    reference = _reference(frame)
+    assert reference['price_during_ema_golden_cross'].isna().all()
+
+    perf = _evaluate(load_rule_set('daily'), {'CLIMB': frame}, ['perf_pct_from_bearish'])['perf_pct_from_bearish']['CLIMB']
+    signal = reference['basic_signal'].to_numpy()
+    expected = (frame['close'] / frame['close'].iloc[0] - 1.0).to_numpy() * 100.0
+    np.testing.assert_array_equal(perf[signal], expected[signal])
+    np.testing.assert_array_equal(perf, reference['perf_pct_from_bearish'].to_numpy())
+
+
+def _scanner_rows(frame):
+    """Every bar's scanner columns as TradingView computes them from the same bars."""
+    close, volume = frame['close'], frame['volume']
+    columns = {
+        'close': close,
+        'EMA10': close.ewm(span=10, adjust=False).mean(),
+        'EMA20': close.ewm(span=20, adjust=False).mean(),
+        'ADR': (frame['high'] - frame['low']).rolling(14).mean(),
+        'volume': volume,
+        # Over the bars there are, for a listing younger than 30 days
+        'average_volume_30d_calc': volume.rolling(30, min_periods=1).mean(),
+    }
+    return [{name: float(values.iloc[bar]) for name, values in columns.items()} for bar in range(len(frame))]
+
+
+@pytest.mark.parametrize('setup', [s for s in available_rule_sets() if load_rule_set(s).prefilter])
+def test_no_green_bar_is_prefiltered_out(histories, setup):
+    rule_set = load_rule_set(setup)
+    checks = Prefilter(rule_set)
+    green = _evaluate(rule_set, histories, [])['green_signal']
+    checked = 0
+    for symbol, frame in histories.items():
+        rows = _scanner_rows(frame)
+        for bar in np.flatnonzero(green[symbol]):
+            assert checks.failed(rows[bar]) == [], f'{symbol} bar {bar}'
+            checked += 1
+    assert checked > 100
+
+
+def test_low_volume_implies_quiet_volume(histories):
+    checks = Prefilter(load_rule_set('daily'))
+    quiet = checks.conditions['quiet_volume']
+    low = _evaluate(load_rule_set('daily'), histories, ['low_volume'])['low_volume']
+    for symbol, frame in histories.items():
+        rows = _scanner_rows(frame)
+        volume = frame['volume']
+        for bar in np.flatnonzero(low[symbol]):
+            assert quiet(rows[bar]) is not False, f'{symbol} bar {bar}'
+            # The scanner's 30-day average may also leave the last bar out
+            previous = {**rows[bar], 'average_volume_30d_calc': float(volume.iloc[max(0, bar - 30):bar].mean())}
+            assert quiet(previous) is not False, f'{symbol} bar {bar}'
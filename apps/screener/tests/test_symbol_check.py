@@ -0,0 +1,116 @@
+"""Unit tests for symbol_check and --symbols."""
+
+import argparse
+import time
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+from ohlcv_store import FIELDS, OhlcvData
+from price_panel import build_panel
+from scan_rules import compile_rule_set, evaluate, load_rule_set
+from symbol_check import _streak, check_symbols, weekly_frame
+from yahoo_finance_service import to_lean_frame
+
+STORED = ['S00', 'S01', 'S02', 'S03', 'S04', 'S05']
+
+
+def _lean(frame):
+    """A history's lean frame, re-dated so its last bar is today."""
+    lean = to_lean_frame(frame)
+    today = int(time.time()) // 86400 * 86400
+    lean['Date'] += today - int(lean['Date'].iloc[-1])
+    return lean
+
+
+@pytest.fixture
+def store(histories):
+    frames = {symbol: _lean(histories[symbol]) for symbol in STORED}
+    dates = frames['S00']['Date'].to_numpy()
+    return OhlcvData(tickers=STORED, dates=dates,
+                     fields={name: np.column_stack([frames[s][name] for s in STORED]) for name in FIELDS})
+
+
+class _Yahoo:
+    def __init__(self, histories):
+        self.histories = histories
+        self.requested = []
+
+    def get_recent_data(self, symbol, days, interval, lean=False):
+        self.requested.append((symbol, interval))
+        if symbol not in self.histories:
+            raise Exception(f'Failed to fetch historical data for {symbol}: No data found for symbol {symbol}')
+        return _lean(self.histories[symbol])
+
+
+def _green(frame, setup='daily'):
+    compiled = compile_rule_set(load_rule_set(setup))
+    return evaluate([compiled], build_panel({'X': frame}))[setup]['green_signal']['X']
+
+
+def test_reports_match_the_rule_engine(histories, store):
+    yahoo = _Yahoo(histories)
+    payload = check_symbols(STORED, [load_rule_set('daily')], store, yahoo)
+    assert [entry['symbol'] for entry in payload['symbols']] == STORED
+    assert yahoo.requested == []
+
+    for entry in payload['symbols']:
+        report = entry['setups']['daily']
+        assert report['source'] == 'store'
+        green = _green(store.frame(entry['symbol']).tail(report['bars']).reset_index(drop=True))
+        assert report['green'] == bool(green.iloc[-1])
+        assert report['is_new'] == (report['green'] and not green.iloc[-2])
+        assert report['streaks']['green_signal'] == _streak(green)
+        if report['green']:
+            assert report['failed_conditions'] == []
+        else:
+            assert report['failed_conditions'] == [n for n, v in report['signals'].items() if v is False and n != 'green_signal']
+        assert set(report['signals']) >= {'low_volume', 'basic_signal', 'perf_pct_from_bearish'}
+
+
+def test_symbols_outside_the_store_come_from_yahoo(histories, store):
+    yahoo = _Yahoo(histories)
+    payload = check_symbols(['S00', 'BRK.B', 'S10'], [load_rule_set('daily'), load_rule_set('weekly')], store, yahoo)
+    reports = {entry['symbol']: entry['setups'] for entry in payload['symbols']}
+
+    assert reports['S00']['daily']['source'] == reports['S00']['weekly']['source'] == 'store'
+    assert reports['S10']['daily']['source'] == 'yahoo'
+    assert 'No data found for symbol BRK-B' in reports['BRK.B']['daily']['error']
+    assert sorted(yahoo.requested) == [('BRK-B', '1d'), ('BRK-B', '1wk'), ('S10', '1d'), ('S10', '1wk')]
+
+    # Without a current store everything is fetched
+    yahoo = _Yahoo(histories)
+    check_symbols(['S00'], [load_rule_set('daily')], None, yahoo)
+    assert yahoo.requested == [('S00', '1d')]
+
+
+def test_weekly_bars_span_monday_to_friday():
+    days = pd.bdate_range('2026-10-05', '2026-10-14')
+    daily = pd.DataFrame({
+        'Date': days.to_numpy(dtype='datetime64[s]').astype(np.int64),
+        'open': np.arange(8.0), 'high': np.arange(8.0) + 10, 'low': np.arange(8.0) - 10,
+        'close': np.arange(8.0) + 0.5, 'volume': np.full(8, 100.0),
+    })
+    weekly = weekly_frame(daily)
+    assert list(pd.to_datetime(weekly['Date'], unit='s').dt.strftime('%m-%d')) == ['10-05', '10-12']
+    assert weekly.to_dict('list') == {
+        'Date': [int(daily['Date'][0]), int(daily['Date'][5])],
+        'open': [0.0, 5.0], 'high': [14.0, 17.0], 'low': [-10.0, -5.0], 'close': [4.5, 7.5], 'volume': [500.0, 300.0],
+    }
+
+
+def test_streak_counts_the_last_consecutive_bars():
+    assert _streak(pd.Series([True, False, True, True])) == 2
+    assert _streak(pd.Series([True, True])) == 2
+    assert _streak(pd.Series([True, False])) == 0
+
+
+def test_parse_symbols():
+    pytest.importorskip('requests')
+    from main import parse_symbols
+
+    assert parse_symbols('nasdaq:aapl, NVDA,AAPL,') == ['AAPL', 'NVDA']
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_symbols(' , ')
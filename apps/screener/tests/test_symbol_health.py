@@ -0,0 +1,101 @@
+"""Unit tests for symbol_health."""
+
+import pytest
+
+import symbol_health
+from symbol_health import (BACKOFF_BASE, BACKOFF_MAX, COOL_DOWN, MAX_TRIPS, MIN_CALLS, CircuitBreaker, SymbolHealth,
+                           is_symbol_error, to_yahoo_symbol)
+
+
+class _Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def test_yahoo_symbols(monkeypatch):
+    assert to_yahoo_symbol('BRK.B') == 'BRK-B'
+    assert to_yahoo_symbol('AAPL') == 'AAPL'
+    monkeypatch.setitem(symbol_health.YAHOO_SYMBOL_OVERRIDES, 'FB', 'META')
+    assert to_yahoo_symbol('FB') == 'META'
+
+
+@pytest.mark.parametrize('message, symbol_error', [
+    ('No data found for symbol XYZ', True),
+    ('XYZ: possibly delisted; no price data found', True),
+    ('HTTP Error 404: Not Found', True),
+    ('Timed out after 10s', False),
+    ('Too Many Requests. Rate limited. Try after a while.', False),
+])
+def test_symbol_errors_are_told_from_service_errors(message, symbol_error):
+    assert is_symbol_error(Exception(message)) is symbol_error
+
+
+def test_failing_symbol_backs_off_and_recovers(tmp_path):
+    clock = _Clock()
+    path = str(tmp_path / 'health.json')
+    health = SymbolHealth(path, clock=clock)
+
+    health.record_failure('XYZ', 'No data found')
+    assert health.skip_reason('XYZ') is None
+    health.record_failure('XYZ', 'No data found')
+    assert 'after 2 failures: No data found' in health.skip_reason('XYZ')
+
+    clock.now += BACKOFF_BASE
+    assert health.skip_reason('XYZ') is None
+    health.record_failure('XYZ', 'No data found')
+    assert health.entries['XYZ']['retry_after'] == clock.now + 2 * BACKOFF_BASE
+    for _ in range(10):
+        health.record_failure('XYZ', 'No data found')
+    assert health.entries['XYZ']['retry_after'] == clock.now + BACKOFF_MAX
+
+    health.save()
+    assert SymbolHealth(path, clock=clock).skip_reason('XYZ') is not None
+    health.record_success('XYZ')
+    health.save()
+    assert SymbolHealth(path, clock=clock).entries == {}
+
+
+def test_save_keeps_entries_saved_by_another_run(tmp_path):
+    path = str(tmp_path / 'health.json')
+    first, second = SymbolHealth(path), SymbolHealth(path)
+    first.record_failure('AAA', 'No data found')
+    first.save()
+    second.record_failure('BBB', 'No data found')
+    second.save()
+    assert sorted(SymbolHealth(path).entries) == ['AAA', 'BBB']
+
+
+def test_breaker_trips_cools_down_and_resets_on_success():
+    clock = _Clock()
+    breaker = CircuitBreaker(clock=clock, sleep=clock.sleep)
+    for ok in [True, False] * (MIN_CALLS // 2 - 1) + [True]:
+        breaker.record(ok)
+    assert breaker.open_until is None
+    breaker.record(False)
+    assert breaker.open_until == clock.now + COOL_DOWN
+
+    assert breaker.before_call()
+    assert clock.slept == [COOL_DOWN]
+    breaker.record(True)
+    assert (breaker.trips, breaker.open_until) == (0, None)
+
+
+def test_breaker_gives_up_after_max_trips():
+    clock = _Clock()
+    breaker = CircuitBreaker(clock=clock, sleep=clock.sleep)
+    for _ in range(MIN_CALLS):
+        breaker.record(False)
+    for _ in range(MAX_TRIPS - 1):
+        assert breaker.before_call()
+        breaker.record(False)
+    assert clock.slept == [COOL_DOWN * 2 ** trip for trip in range(MAX_TRIPS - 1)]
+    assert breaker.exhausted
+    assert not breaker.before_call()
@@ -0,0 +1,57 @@
+"""Unit tests for tradingview_stream, against a stand-in chart socket."""
+
+import json
+
+import pytest
+
+from tradingview_stream import StreamConnection
+
+
+class _Socket:
+    chart_session = 'cs_test'
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.sent, self.echoed = [], []
+        self.closed = False
+
+    def send_message(self, method, params):
+        self.sent.append((method, params))
+
+    def recv(self):
+        return self.frames.pop(0) if self.frames else ''
+
+    def send_frame(self, frame):
+        self.echoed.append(frame)
+
+    def close(self):
+        self.closed = True
+        raise OSError('already closed')
+
+
+def _frame(*packets):
+    return ''.join(f'~m~{len(text)}~m~{text}' for text in map(json.dumps, packets))
+
+
+def test_each_symbol_gets_its_own_series():
+    socket = _Socket([])
+    connection = StreamConnection(['NASDAQ:AAPL', 'NYSE:ANET'], '1D', 300, socket=lambda: socket)
+    assert connection.series == {'sds_0': 'NASDAQ:AAPL', 'sds_1': 'NYSE:ANET'}
+    assert connection.symbol_ids == {'sds_sym_0': 'NASDAQ:AAPL', 'sds_sym_1': 'NYSE:ANET'}
+    assert [method for method, _ in socket.sent] == ['resolve_symbol', 'create_series'] * 2
+    assert socket.sent[1][1] == ['cs_test', 'sds_0', 's0', 'sds_sym_0', '1D', 300, '']
+    assert json.loads(socket.sent[2][1][2][1:]) == {'adjustment': 'splits', 'symbol': 'NYSE:ANET'}
+
+    # A failing close is ignored
+    connection.close()
+    assert socket.closed
+
+
+def test_packets_split_frames_and_answer_heartbeats():
+    first, second = {'m': 'du', 'p': ['cs_test', {}]}, {'m': 'qsd', 'p': ['qs_1', {}]}
+    socket = _Socket([_frame(first, second), '~m~4~m~~h~7', _frame(first)])
+    packets = StreamConnection(['NASDAQ:AAPL'], '1D', 10, socket=lambda: socket).packets()
+    assert [next(packets) for _ in range(3)] == [first, second, first]
+    assert socket.echoed == ['~m~4~m~~h~7']
+    with pytest.raises(ConnectionError, match='connection closed'):
+        next(packets)
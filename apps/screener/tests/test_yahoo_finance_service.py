@@ -0,0 +1,133 @@
+"""Unit tests for yahoo_finance_service."""
+
+import json
+import threading
+from datetime import datetime
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('pandas')
+
+from price_panel import build_panel
+from scan_rules import compile_rule_set, evaluate, load_rule_set
+from yahoo_finance_service import YahooFinanceService, to_lean_frame
+
+
+class _Ticker:
+    """yf.Ticker stand-in serving a fixture history in yfinance's shape."""
+
+    def __init__(self, frame):
+        self.frame = frame
+
+    def history(self, **_kwargs):
+        return self.frame.set_index('Date').rename(columns=str.title)
+
+
+def _green(frames):
+    compiled = compile_rule_set(load_rule_set('daily'))
+    return evaluate([compiled], build_panel(frames))['daily']['green_signal']
+
+
+def _missing_volume(histories):
+    """A fixture history whose volume is missing on the bars that are green but for their volume."""
+    compiled = compile_rule_set(load_rule_set('daily'))
+    outputs = evaluate([compiled], build_panel({'S01': histories['S01']}),
+                       names=['consecutive_signal_with_30_perc', 'low_volume'])['daily']
+    almost = (outputs['consecutive_signal_with_30_perc'] & ~outputs['low_volume'])['S01'].to_numpy()
+    frame = histories['S01'].copy()
+    frame.loc[almost, 'volume'] = np.nan
+    assert almost.any()
+    return frame
+
+
+def test_lean_path_matches_the_float64_path(histories, monkeypatch):
+    yf = pytest.importorskip('yfinance')
+    frames = {**histories, 'MISSING': _missing_volume(histories)}
+    monkeypatch.setattr(yf, 'Ticker', lambda symbol, session=None: _Ticker(frames[symbol]))
+    service = YahooFinanceService(timeout=None)
+    lean = {symbol: service.get_recent_data(symbol, 400, interval='1d', lean=True) for symbol in frames}
+
+    green = _green(lean)
+    assert green.to_numpy().sum() > 100
+    np.testing.assert_array_equal(green.to_numpy(), _green(frames).to_numpy())
+
+
+def test_lean_frame_keeps_prices_and_missing_volume(histories):
+    frame = histories['GAPS']
+    lean = to_lean_frame(frame)
+
+    assert list(lean.columns) == ['Date', 'open', 'high', 'low', 'close', 'volume']
+    assert lean['Date'].dtype == np.int64
+    np.testing.assert_array_equal(lean['close'].to_numpy(), frame['close'].to_numpy())
+    np.testing.assert_array_equal(lean['volume'].to_numpy(), frame['volume'].to_numpy())
+    assert lean['volume'].isna().sum() == 5
+
+
+def test_compact_frame_narrows_only_what_it_can_hold(histories):
+    compact = to_lean_frame(histories['S00'], compact=True)
+    assert compact['close'].dtype == np.float32
+    assert compact['volume'].dtype == np.uint32
+
+    gaps = to_lean_frame(histories['GAPS'], compact=True)
+    assert gaps['volume'].dtype == np.float64
+    assert gaps['volume'].isna().sum() == 5
+
+
+YAHOO_HOSTS = ('fc.yahoo.com', 'query1.finance.yahoo.com', 'query2.finance.yahoo.com')
+
+
+def _chart(bars):
+    """A recorded chart API response in Yahoo's shape; the third bar is missing."""
+    import pandas as pd
+
+    days = pd.bdate_range(end='2026-10-16', periods=bars, tz='America/New_York')
+    close = [10.0 + i if i != 2 else None for i in range(bars)]
+    return {'chart': {'error': None, 'result': [{
+        'meta': {'currency': 'USD', 'symbol': 'AAPL', 'exchangeName': 'NMS', 'instrumentType': 'EQUITY',
+                 'exchangeTimezoneName': 'America/New_York', 'timezone': 'EDT', 'gmtoffset': -14400,
+                 'dataGranularity': '1d', 'regularMarketPrice': close[-1], 'priceHint': 2},
+        'timestamp': [int(day.timestamp()) + 34200 for day in days],
+        'indicators': {
+            'quote': [{'open': close, 'high': [c and c + 1 for c in close], 'low': [c and c - 1 for c in close],
+                       'close': close, 'volume': [c and 100 * c for c in close]}],
+            'adjclose': [{'adjclose': close}],
+        },
+    }]}}
+
+
+def test_yfinance_parses_replayed_responses():
+    pytest.importorskip('requests')
+    yf = pytest.importorskip('yfinance')
+    from http_client import HttpClient, HttpConfig
+    from replay_server import CassetteStore, Recording, make_server
+
+    chart = json.dumps(_chart(6)).encode()
+
+    class YahooStore(CassetteStore):
+        """Serves each Yahoo host's recording whatever the request key."""
+
+        def load(self, host, key):
+            return {
+                'query1.finance.yahoo.com': Recording(200, 'text/plain', b'crumb'),
+                'query2.finance.yahoo.com': Recording(200, 'application/json', chart),
+            }.get(host, Recording(404, 'text/html', b''))
+
+    session = yf.data.YfData()._session
+    server = make_server(YahooStore(''), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        service = YahooFinanceService(HttpClient(HttpConfig(replay_url=server.url)), timeout=None)
+        data = service.get_historical_data('AAPL', datetime(2026, 10, 1), datetime(2026, 10, 17))
+        bulk = service.get_bulk_daily_data(['AAPL'], datetime(2026, 10, 1))
+        hosts = server.snapshot()['hosts']
+    finally:
+        server.shutdown()
+        yf.data.YfData(session=session)
+
+    assert list(data['close']) == [10.0, 11.0, 13.0, 14.0, 15.0]
+    assert list(data['volume']) == [1000, 1100, 1300, 1400, 1500]
+    assert list(bulk['close', 'AAPL']) == list(data['close'])
+    # Every request, cookie and crumb included, reached the replay server
+    assert set(hosts) <= set(YAHOO_HOSTS)
+    assert hosts['query2.finance.yahoo.com']['served'] >= 2
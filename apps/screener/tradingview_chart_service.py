@@ -5,15 +5,50 @@ Outputs JSON to stdout for consumption by the Node.js backend.
 
 Usage:
     python tradingview_chart_service.py --symbol AAPL --exchange NASDAQ --interval D --bars 200
+
+Daily, weekly and monthly candles are kept in the per-session result cache
+(python-common/result_cache.py): a request is served from the cached candles
+of this session when they cover the bars asked for. During regular trading
+hours the latest bar is still forming, so charts are fetched live then and not
+cached; intraday charts are always fetched. The stream is abandoned after --timeout seconds (default 30), so a
+hung websocket ends in an error payload instead of a stalled process.
+
+--max-points N thins long histories server-side to at most N candles, since
+the chart is only a few hundred pixels wide:
+
+    --downsample ohlc   (default) merge runs of adjacent bars into one candle:
+                        first open, highest high, lowest low, last close,
+                        summed volume; every high and low stays visible
+    --downsample lttb   keep N of the original candles, picked by
+                        Largest-Triangle-Three-Buckets on the close, for line
+                        charts
+
+The payload then carries "original_bars" and, when candles were thinned,
+"downsample": {"method", "points", "bucket_bars"}. The cache always holds
+the full candles.
 """
 
 import argparse
 import json
 import logging
+import math
+import os
 import sys
 from datetime import datetime, timezone
 
-from tradingview_scraper.symbols.stream import Streamer
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python-common"))
+
+import market_calendar
+import result_cache
+import run_report
+from time_budget import DEFAULT_REQUEST_TIMEOUT, DeadlineExceeded, call_with_deadline
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+
+# Timeframes whose candles only change with a new close
+CACHED_TIMEFRAMES = ("1d", "1w", "1M")
+
+DOWNSAMPLE_METHODS = ("ohlc", "lttb")
 
 # Suppress library logging so only our JSON hits stdout
 logging.disable(logging.CRITICAL)
@@ -40,17 +75,26 @@ INTERVAL_MAP = {
 }
 
 
-def fetch_chart_data(symbol: str, exchange: str, interval: str, bars: int) -> dict:
-    """Fetch OHLCV data from TradingView WebSocket using Streamer."""
+def fetch_chart_data(symbol: str, exchange: str, interval: str, bars: int, timeout: float | None = DEFAULT_REQUEST_TIMEOUT) -> dict:
+    """Fetch OHLCV data from TradingView WebSocket using Streamer, giving up after `timeout` seconds."""
     tv_timeframe = INTERVAL_MAP.get(interval, "1d")
 
-    streamer = Streamer(export_result=True, export_type="json")
-    result = streamer.stream(
-        exchange=exchange,
-        symbol=symbol,
-        timeframe=tv_timeframe,
-        numb_price_candles=bars,
-    )
+    with run_report.stage("import_streamer"):
+        from tradingview_scraper.symbols.stream import Streamer
+
+    with run_report.stage("stream"):
+        streamer = Streamer(export_result=True, export_type="json")
+        try:
+            result = call_with_deadline(
+                streamer.stream,
+                timeout,
+                exchange=exchange,
+                symbol=symbol,
+                timeframe=tv_timeframe,
+                numb_price_candles=bars,
+            )
+        except DeadlineExceeded:
+            raise TimeoutError(f"TradingView sent no data for {exchange}:{symbol} within {timeout:g}s")
 
     if not result or "ohlc" not in result:
         raise ValueError(f"TradingView returned no data for {exchange}:{symbol}")
@@ -59,48 +103,165 @@ def fetch_chart_data(symbol: str, exchange: str, interval: str, bars: int) -> di
     if not ohlc_rows:
         raise ValueError(f"TradingView returned empty OHLC data for {exchange}:{symbol}")
 
-    candles = []
-    for row in ohlc_rows:
-        ts = row["timestamp"]
-        dt = datetime.fromtimestamp(ts, tz=timezone.utc)
+    with run_report.stage("serialize"):
+        candles = _to_candles(ohlc_rows, tv_timeframe)
 
-        # For daily/weekly/monthly, use date string; for intraday use unix timestamp
-        if tv_timeframe in ("1d", "1w", "1M"):
-            time_value = dt.strftime("%Y-%m-%d")
-        else:
-            time_value = int(ts)
+    return {
+        "symbol": symbol,
+        "exchange": exchange,
+        "interval": interval,
+        "candles": candles,
+    }
 
-        candles.append({
-            "time": time_value,
-            "open": round(float(row["open"]), 4),
-            "high": round(float(row["high"]), 4),
-            "low": round(float(row["low"]), 4),
-            "close": round(float(row["close"]), 4),
-            "volume": int(float(row["volume"])),
-        })
+
+def cached_chart_data(
+    symbol: str, exchange: str, interval: str, bars: int, args: argparse.Namespace, now: datetime | None = None
+) -> dict:
+    """fetch_chart_data() through the result cache for CACHED_TIMEFRAMES, outside trading hours."""
+    tv_timeframe = INTERVAL_MAP.get(interval, "1d")
+    timeout = getattr(args, "timeout", DEFAULT_REQUEST_TIMEOUT)
+    if tv_timeframe not in CACHED_TIMEFRAMES or args.no_cache or market_calendar.is_open(now):
+        return fetch_chart_data(symbol, exchange, interval, bars, timeout)
+
+    cache = result_cache.ResultCache(args.cache_dir, "chart")
+    params = {"symbol": symbol, "exchange": exchange, "timeframe": tv_timeframe}
+    entry = None if args.refresh else cache.get(params, now)
+    if entry is None or entry["bars"] < bars:
+        data = fetch_chart_data(symbol, exchange, interval, bars, timeout)
+        cache.put(params, {"bars": bars, "candles": data["candles"]}, now)
+        return data
 
     return {
         "symbol": symbol,
         "exchange": exchange,
         "interval": interval,
-        "candles": candles,
+        "candles": entry["candles"][-bars:],
+    }
+
+
+def _to_candles(ohlc_rows: list, tv_timeframe: str) -> list:
+    return [to_candle(row, tv_timeframe) for row in ohlc_rows]
+
+
+def to_candle(row: dict, tv_timeframe: str) -> dict:
+    """One candle as the backend expects it, from a {timestamp, open, high, low, close, volume} row."""
+    ts = row["timestamp"]
+    dt = datetime.fromtimestamp(ts, tz=timezone.utc)
+
+    # For daily/weekly/monthly, use date string; for intraday use unix timestamp
+    if tv_timeframe in ("1d", "1w", "1M"):
+        time_value = dt.strftime("%Y-%m-%d")
+    else:
+        time_value = int(ts)
+
+    return {
+        "time": time_value,
+        "open": round(float(row["open"]), 4),
+        "high": round(float(row["high"]), 4),
+        "low": round(float(row["low"]), 4),
+        "close": round(float(row["close"]), 4),
+        "volume": int(float(row["volume"])),
     }
 
 
+def merge_candles(candles: list) -> dict:
+    """One candle spanning `candles`, dated by the first."""
+    return {
+        "time": candles[0]["time"],
+        "open": candles[0]["open"],
+        "high": max(c["high"] for c in candles),
+        "low": min(c["low"] for c in candles),
+        "close": candles[-1]["close"],
+        "volume": sum(c["volume"] for c in candles),
+    }
+
+
+def ohlc_buckets(candles: list, max_points: int) -> tuple[list, int]:
+    """
+    At most `max_points` candles, each merging the same number of adjacent
+    bars; buckets are counted back from the latest bar, so only the oldest
+    may be short. Returns (candles, bars per bucket).
+    """
+    size = math.ceil(len(candles) / max_points)
+    first = len(candles) % size or size
+    starts = [0] + list(range(first, len(candles), size))
+    ends = starts[1:] + [len(candles)]
+    return [merge_candles(candles[a:b]) for a, b in zip(starts, ends)], size
+
+
+def lttb(candles: list, max_points: int) -> list:
+    """Largest-Triangle-Three-Buckets over the closes; keeps the first and last candle."""
+    if len(candles) <= max_points or max_points < 3:
+        return candles if len(candles) <= max_points else [candles[0], candles[-1]][:max_points]
+
+    closes = [c["close"] for c in candles]
+    every = (len(candles) - 2) / (max_points - 2)
+    selected = [candles[0]]
+    anchor = 0
+    for bucket in range(max_points - 2):
+        start, end = int(bucket * every) + 1, int((bucket + 1) * every) + 1
+        # The next bucket's average point; the last candle for the final bucket
+        next_end = min(int((bucket + 2) * every) + 1, len(candles))
+        avg_x = (end + next_end - 1) / 2
+        avg_y = sum(closes[end:next_end]) / (next_end - end)
+
+        ax, ay = anchor, closes[anchor]
+        anchor = max(range(start, end), key=lambda i: abs((ax - avg_x) * (closes[i] - ay) - (ax - i) * (avg_y - ay)))
+        selected.append(candles[anchor])
+    selected.append(candles[-1])
+    return selected
+
+
+def downsample(data: dict, max_points: int, method: str = "ohlc") -> dict:
+    """`data` with its candles thinned to at most `max_points` (see the module docstring)."""
+    candles = data["candles"]
+    data = {**data, "original_bars": len(candles)}
+    if len(candles) <= max_points:
+        return data
+
+    with run_report.stage("downsample"):
+        if method == "lttb":
+            thinned, bucket_bars = lttb(candles, max_points), None
+        else:
+            thinned, bucket_bars = ohlc_buckets(candles, max_points)
+    data["candles"] = thinned
+    data["downsample"] = {"method": method, "points": len(thinned), "bucket_bars": bucket_bars}
+    return data
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(description="Fetch TradingView OHLCV data")
     parser.add_argument("--symbol", required=True, help="Stock symbol (e.g. AAPL)")
     parser.add_argument("--exchange", required=True, help="Exchange (e.g. NASDAQ)")
     parser.add_argument("--interval", default="D", help="Interval: 1,5,15,60,D,W,M")
     parser.add_argument("--bars", type=int, default=200, help="Number of bars to fetch")
+    parser.add_argument("--max-points", type=positive_int,
+                        help="Downsample to at most this many candles (default: every bar)")
+    parser.add_argument("--downsample", choices=DOWNSAMPLE_METHODS, default="ohlc",
+                        help="With --max-points: merge bars into OHLC buckets (default) or pick bars by LTTB")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_REQUEST_TIMEOUT,
+                        help=f"Seconds to wait for TradingView before giving up (default: {DEFAULT_REQUEST_TIMEOUT:g})")
+    parser.add_argument("--quiet", action="store_true", help="Suppress non-essential output")
+    result_cache.add_arguments(parser, DEFAULT_CACHE_DIR)
+    run_report.add_arguments(parser)
     args = parser.parse_args()
 
-    try:
-        data = fetch_chart_data(args.symbol, args.exchange, args.interval, args.bars)
-        print(json.dumps(data))
-    except Exception as e:
-        print(json.dumps({"error": str(e)}))
-        sys.exit(1)
+    with run_report.run("chart", args):
+        try:
+            data = cached_chart_data(args.symbol, args.exchange, args.interval, args.bars, args)
+            if args.max_points:
+                data = downsample(data, args.max_points, args.downsample)
+            print(json.dumps(data))
+        except Exception as e:
+            print(json.dumps({"error": str(e)}))
+            sys.exit(1)
 
 
 if __name__ == "__main__":
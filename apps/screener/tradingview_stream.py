@@ -0,0 +1,85 @@
+"""
+TradingView Chart Streams
+One chart WebSocket carrying a bar series per symbol, shared by
+live_monitor.py and chart_stream_server.py.
+
+tradingview_scraper's Streamer subscribes one fixed series per connection and
+its get_data() sleeps a second per frame, so only its connection set-up is
+used: ChartSocket is the one place that touches the Streamer internals (the
+chart session id, send_message and the raw websocket). StreamConnection sends
+a resolve_symbol/create_series pair per symbol on it and parses the frames:
+
+    for packet in StreamConnection(['NASDAQ:AAPL'], '1D', 300).packets():
+        ...  # {"m": "timescale_update" | "du" | ..., "p": [...]}
+
+Heartbeats are answered in packets(); a closed socket raises ConnectionError.
+"""
+import json
+import re
+from typing import Any, Callable, Dict, Iterator, List
+
+# tradingview-scraper timeframe keys -> chart resolutions
+RESOLUTIONS = {
+    '1m': '1', '5m': '5', '15m': '15', '30m': '30',
+    '1h': '60', '4h': '240', '1d': '1D', '1w': '1W', '1M': '1M',
+}
+
+FRAME_SPLIT = re.compile(r'~m~\d+~m~')
+HEARTBEAT = re.compile(r'~m~\d+~m~~h~\d+$')
+
+
+class ChartSocket:
+    """A connected chart session of tradingview_scraper's Streamer."""
+
+    def __init__(self):
+        from tradingview_scraper.symbols.stream import Streamer
+
+        self._handler = Streamer().stream_obj
+        self.chart_session = self._handler.chart_session
+
+    def send_message(self, method: str, params: List[Any]) -> None:
+        self._handler.send_message(method, params)
+
+    def recv(self) -> str:
+        return self._handler.ws.recv()
+
+    def send_frame(self, frame: str) -> None:
+        self._handler.ws.send(frame)
+
+    def close(self) -> None:
+        self._handler.ws.close()
+
+
+class StreamConnection:
+    """One chart WebSocket carrying a series per symbol."""
+
+    def __init__(self, symbols: List[str], resolution: str, bars: int, socket: Callable[[], ChartSocket] = ChartSocket):
+        self.socket = socket()
+        self.series: Dict[str, str] = {}
+        self.symbol_ids: Dict[str, str] = {}
+        for index, symbol in enumerate(symbols):
+            resolve = json.dumps({'adjustment': 'splits', 'symbol': symbol})
+            self.socket.send_message('resolve_symbol', [self.socket.chart_session, f'sds_sym_{index}', f'={resolve}'])
+            self.socket.send_message('create_series', [self.socket.chart_session, f'sds_{index}', f's{index}',
+                                                       f'sds_sym_{index}', resolution, bars, ''])
+            self.series[f'sds_{index}'] = symbol
+            self.symbol_ids[f'sds_sym_{index}'] = symbol
+
+    def packets(self) -> Iterator[Dict[str, Any]]:
+        """Parsed packets until the connection drops."""
+        while True:
+            frame = self.socket.recv()
+            if not frame:
+                raise ConnectionError('connection closed')
+            if HEARTBEAT.match(frame):
+                self.socket.send_frame(frame)
+                continue
+            for item in FRAME_SPLIT.split(frame):
+                if item:
+                    yield json.loads(item)
+
+    def close(self) -> None:
+        try:
+            self.socket.close()
+        except Exception:
+            pass
@@ -1,28 +1,108 @@
 """
 Yahoo Finance Service
 Handles fetching OHLC price history and other financial data
+
+When BLUESTAR_HTTP_REPLAY points the shared HTTP client at a replay server
+(python-common/replay_server.py), yfinance is handed a curl_cffi session
+whose requests go to that server (see replay_session()). yfinance still
+builds every request and parses every response, so a replayed run takes
+the same code path as a live one.
 """
 
-import yfinance as yf
-import pandas as pd
-from typing import Optional, Dict, Any
+from typing import TYPE_CHECKING, Optional, Dict, Any, List
 from datetime import datetime, timedelta
 
+from time_budget import DEFAULT_REQUEST_TIMEOUT, call_with_deadline
+
+# yfinance pulls in pandas and curl_cffi; both are imported on first fetch so
+# creating the service stays cheap for runs that never reach Yahoo.
+if TYPE_CHECKING:
+    import pandas as pd
+    from http_client import HttpClient, HttpConfig
+
+# Columns kept by lean frames. yfinance also returns dividends and stock
+# splits (capital gains for funds), which no screen reads.
+LEAN_COLUMNS = ['Date', 'open', 'high', 'low', 'close', 'volume']
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+
+# Below this price float32 resolves better than $0.002, well inside a tick
+FLOAT32_PRICE_LIMIT = 2 ** 15
+
+# Symbols per yf.download call of a bulk fetch
+BULK_CHUNK = 200
+
+
+def to_lean_frame(data: 'pd.DataFrame', compact: bool = False) -> 'pd.DataFrame':
+    """
+    Lean copy of a history frame: LEAN_COLUMNS only, Date as int64 epoch
+    seconds, float64 prices and volume with missing bars left NaN (the
+    layout of OhlcvData.frame()). Signals computed from it match those of
+    the full frame.
+
+    `compact` also narrows the values: prices to float32 when every price is
+    below FLOAT32_PRICE_LIMIT, and volume to the smallest unsigned integer
+    type that holds it when no bar is missing. Rounded prices can flip a
+    comparison sitting on its threshold, so compact frames are for memory
+    measurements (memory_report.py), not for screening.
+    """
+    import numpy as np
+    import pandas as pd
+
+    prices = data[PRICE_COLUMNS].to_numpy(dtype=np.float64)
+    volume = data['volume'].to_numpy(dtype=np.float64)
+    price_dtype = volume_dtype = np.float64
+    if compact:
+        if np.nanmax(np.abs(prices), initial=0) < FLOAT32_PRICE_LIMIT:
+            price_dtype = np.float32
+        if not np.isnan(volume).any():
+            volume_dtype = np.uint32 if volume.max(initial=0) < 2 ** 32 else np.uint64
+
+    # tz-aware dates convert to UTC instants; naive ones are taken as UTC
+    columns = {'Date': data['Date'].to_numpy(dtype='datetime64[s]').astype(np.int64)}
+    for index, column in enumerate(PRICE_COLUMNS):
+        columns[column] = prices[:, index].astype(price_dtype)
+    columns['volume'] = volume.astype(volume_dtype)
+    return pd.DataFrame(columns)
+
+
+def replay_session(config: 'HttpConfig'):
+    """
+    A curl_cffi session (the only kind yfinance accepts) that sends each
+    request where config.target() maps its URL: https://host/path becomes
+    <replay>/host/path. Cookie and crumb requests are redirected as well.
+    """
+    from curl_cffi import requests as curl_requests
+
+    class ReplaySession(curl_requests.Session):
+        def request(self, method, url, *args, **kwargs):
+            return super().request(method, config.target(url), *args, **kwargs)
+
+    return ReplaySession(impersonate='chrome')
+
 
 class YahooFinanceService:
-    def __init__(self):
-        pass
+    def __init__(self, client: 'HttpClient' = None, timeout: Optional[float] = DEFAULT_REQUEST_TIMEOUT):
+        from http_client import get_client
 
-    def get_historical_data(self, symbol: str, period1: datetime, period2: datetime = None, interval: str = '1d') -> pd.DataFrame:
+        # Deadline of each history request; yfinance's own session has none we control
+        self.timeout = timeout
+
+        # None lets yfinance use its own session
+        client = client or get_client()
+        self.session = replay_session(client.config) if client.config.replay_url else None
+
+    def get_historical_data(self, symbol: str, period1: datetime, period2: datetime = None, interval: str = '1d', lean: bool = False) -> 'pd.DataFrame':
         """
-        Get historical OHLC data for a symbol
+        Get historical OHLC data for a symbol. With `lean`, see to_lean_frame().
         """
         if period2 is None:
             period2 = datetime.now()
         
         try:
-            ticker = yf.Ticker(symbol)
-            data = ticker.history(start=period1, end=period2, interval=interval)
+            import yfinance as yf
+
+            ticker = yf.Ticker(symbol, session=self.session)
+            data = call_with_deadline(ticker.history, self.timeout, start=period1, end=period2, interval=interval)
             
             if data.empty:
                 raise ValueError(f"No data found for symbol {symbol}")
@@ -34,7 +114,11 @@ class YahooFinanceService:
             data.columns = data.columns.str.lower()
             if 'date' in data.columns:
                 data = data.rename(columns={'date': 'Date'})
-            
+            if 'datetime' in data.columns:  # intraday intervals
+                data = data.rename(columns={'datetime': 'Date'})
+
+            if lean:
+                data = to_lean_frame(data)
             return data
             
         except Exception as e:
@@ -42,9 +126,38 @@ class YahooFinanceService:
             print(f"Error fetching historical data for {symbol}: {e}", file=sys.stderr)
             raise Exception(f"Failed to fetch historical data for {symbol}: {e}")
 
-    def get_recent_data(self, symbol: str, days: int, interval: str) -> pd.DataFrame:
+    def get_recent_data(self, symbol: str, days: int, interval: str, lean: bool = False) -> 'pd.DataFrame':
         """
         Get recent historical data for a symbol
         """
         period1 = datetime.now() - timedelta(days=days)
-        return self.get_historical_data(symbol, period1, interval=interval)
+        return self.get_historical_data(symbol, period1, interval=interval, lean=lean)
+
+    def get_bulk_daily_data(self, symbols: List[str], period1: datetime, chunk_size: int = BULK_CHUNK) -> 'pd.DataFrame':
+        """
+        Daily OHLCV of many symbols since `period1`, one yf.download per chunk.
+        Columns are (field, symbol) with lowercase fields; symbols Yahoo has no
+        data for are missing or all-NaN rather than an error.
+        """
+        try:
+            import pandas as pd
+            import yfinance as yf
+
+            parts = []
+            for start in range(0, len(symbols), chunk_size):
+                data = yf.download(symbols[start:start + chunk_size], start=period1, interval='1d',
+                                   auto_adjust=True, actions=False, group_by='column',
+                                   multi_level_index=True, progress=False, threads=True, session=self.session)
+                if data.empty:
+                    continue
+                data.columns = data.columns.set_levels(data.columns.levels[0].str.lower(), level=0)
+                parts.append(data)
+
+            if not parts:
+                raise ValueError(f"No data found for {len(symbols)} symbols")
+            return pd.concat(parts, axis=1)
+
+        except Exception as e:
+            import sys
+            print(f"Error fetching bulk daily data: {e}", file=sys.stderr)
+            raise Exception(f"Failed to fetch bulk daily data: {e}")
@@ -2,41 +2,52 @@
 """
 Theme Extractor - Stock Themes and Tickers Scraper
 Scrapes stocktitan.net to extract themes and their associated tickers
+
+--format json (default) prints every theme as one JSON array at the end.
+--format ndjson prints one compact line per theme as soon as it is scraped,
+then a summary line, so consumers can ingest progressively and keep what
+arrived before a failure:
+
+    {"type": "theme", "index": 1, "total": 120, "theme": "...", "tickers": [...]}
+    {"type": "theme", "index": 2, "total": 120, "theme": "...", "tickers": [], "error": "..."}
+    {"type": "summary", "complete": true, "themes": 120, "failed": ["..."], "tickers": 1834}
+
+A run that stops early ends with a summary line with "complete": false and
+the error, also when it is interrupted (Ctrl-C) or sent SIGTERM.
 """
+import argparse
 import json
+import os
+import signal
 import sys
 import time
 from typing import List, Dict
 import requests
 from bs4 import BeautifulSoup
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python-common"))
+
+import run_report
+from http_client import get_client
+
 
 THEMES_URL = "https://www.stocktitan.net/stocks/themes"
 BASE_URL = "https://www.stocktitan.net"
 
 
-def get_page_content(url: str, retries: int = 4, base_delay: float = 10.0) -> BeautifulSoup:
-    """Fetch and parse HTML content from a URL with exponential backoff retry."""
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    for attempt in range(retries):
-        try:
-            response = requests.get(url, headers=headers, timeout=30)
-            if response.status_code == 429:
-                wait = base_delay * (2 ** attempt)
-                print(f"   ⏳ Rate limited, waiting {wait:.0f}s before retry {attempt + 1}/{retries}...", file=sys.stderr)
-                time.sleep(wait)
-                continue
-            response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
-        except requests.RequestException as e:
-            if attempt == retries - 1:
-                raise Exception(f"Failed to fetch {url}: {str(e)}")
-            wait = base_delay * (2 ** attempt)
-            print(f"   ⏳ Request error, waiting {wait:.0f}s before retry {attempt + 1}/{retries}...", file=sys.stderr)
-            time.sleep(wait)
-    raise Exception(f"Failed to fetch {url} after {retries} retries")
+def get_page_content(url: str) -> BeautifulSoup:
+    """
+    Fetch and parse HTML content from a URL. Keep-alive, rate-limit backoff
+    (honouring Retry-After) and one-at-a-time access to stocktitan.net come
+    from the shared HTTP client.
+    """
+    try:
+        response = get_client().get(url)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        raise Exception(f"Failed to fetch {url}: {str(e)}")
+    with run_report.stage("parse_html"):
+        return BeautifulSoup(response.content, 'html.parser')
 
 
 def extract_themes() -> List[Dict[str, str]]:
@@ -120,8 +131,81 @@ def extract_tickers_from_theme(theme_url: str) -> List[str]:
 
 def main():
     """Main entry point for the theme extractor."""
+    parser = argparse.ArgumentParser(description="Theme Extractor - stocktitan.net themes and tickers")
+    parser.add_argument("--format", choices=["json", "ndjson"], default="json",
+                        help="One JSON array at the end (default), or one line per theme as it is scraped")
+    parser.add_argument("--quiet", action="store_true", help="Suppress the timing report on stderr")
+    run_report.add_arguments(parser)
+    args = parser.parse_args()
+
+    with run_report.run("theme_extractor", args):
+        if args.format == "ndjson":
+            run_streaming()
+        else:
+            run()
+
+
+def emit(line: Dict) -> None:
+    sys.stdout.write(json.dumps(line, separators=(",", ":")) + "\n")
+    sys.stdout.flush()
+
+
+class Terminated(BaseException):
+    """
+    Raised where the run was when SIGTERM arrived, so it can still report what
+    it finished. Like KeyboardInterrupt, it is not caught as a theme failure.
+    """
+
+
+def _raise_terminated(signum, frame):
+    raise Terminated(f"terminated by {signal.Signals(signum).name}")
+
+
+def run_streaming():
+    emitted = 0
+    failed: List[str] = []
+    tickers_seen = set()
+    previous_handler = signal.signal(signal.SIGTERM, _raise_terminated)
+    try:
+        with run_report.stage("themes_index"):
+            themes = extract_themes()
+        if not themes:
+            raise Exception("No themes found")
+
+        for i, theme in enumerate(themes, 1):
+            print(f"📊 Processing theme {i}/{len(themes)}: {theme['name']}...", file=sys.stderr)
+            line = {'type': 'theme', 'index': i, 'total': len(themes), 'theme': theme['name']}
+            try:
+                with run_report.stage("theme_page"):
+                    line['tickers'] = extract_tickers_from_theme(theme['url'])
+                tickers_seen.update(line['tickers'])
+                print(f"   ✅ Found {len(line['tickers'])} tickers", file=sys.stderr)
+            except Exception as e:
+                print(f"   ❌ Error extracting tickers for {theme['name']}: {str(e)}", file=sys.stderr)
+                line['tickers'] = []
+                line['error'] = str(e)
+                failed.append(theme['name'])
+            emit(line)
+            emitted += 1
+
+            if i < len(themes):
+                with run_report.stage("throttle"):
+                    time.sleep(5)
+
+        emit({'type': 'summary', 'complete': True, 'themes': emitted, 'failed': failed, 'tickers': len(tickers_seen)})
+
+    except (Exception, KeyboardInterrupt, Terminated) as e:
+        emit({'type': 'summary', 'complete': False, 'themes': emitted, 'failed': failed,
+              'tickers': len(tickers_seen), 'error': str(e) or type(e).__name__})
+        sys.exit(1)
+    finally:
+        signal.signal(signal.SIGTERM, previous_handler)
+
+
+def run():
     try:
-        themes = extract_themes()
+        with run_report.stage("themes_index"):
+            themes = extract_themes()
         
         if not themes:
             print("❌ No themes found", file=sys.stderr)
@@ -133,7 +217,8 @@ def main():
             print(f"📊 Processing theme {i}/{len(themes)}: {theme['name']}...", file=sys.stderr)
             
             try:
-                tickers = extract_tickers_from_theme(theme['url'])
+                with run_report.stage("theme_page"):
+                    tickers = extract_tickers_from_theme(theme['url'])
                 result.append({
                     'theme': theme['name'],
                     'tickers': tickers
@@ -147,7 +232,8 @@ def main():
                 })
             
             if i < len(themes):
-                time.sleep(5)
+                with run_report.stage("throttle"):
+                    time.sleep(5)
         
         print(json.dumps(result, indent=2))
         
@@ -0,0 +1,92 @@
+"""Tests for the streaming (--format ndjson) run in main."""
+
+import json
+import os
+import signal
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+
+import main
+
+THEMES = [
+    {"name": "Cybersecurity", "slug": "cybersecurity", "url": "https://example.test/cybersecurity"},
+    {"name": "Robotics", "slug": "robotics", "url": "https://example.test/robotics"},
+    {"name": "Solar", "slug": "solar", "url": "https://example.test/solar"},
+]
+
+TICKERS = {
+    "https://example.test/cybersecurity": ["CRWD", "FTNT", "PANW"],
+    "https://example.test/solar": ["ENPH", "FSLR", "PANW"],
+}
+
+
+@pytest.fixture(autouse=True)
+def no_throttle(monkeypatch):
+    monkeypatch.setattr(main.time, "sleep", lambda seconds: None)
+
+
+def _scrape(url: str) -> list[str]:
+    if url not in TICKERS:
+        raise Exception(f"Failed to fetch {url}: 503 Server Error")
+    return TICKERS[url]
+
+
+def _interrupt():
+    raise KeyboardInterrupt
+
+
+def _lines(capsys) -> list[dict]:
+    out = capsys.readouterr().out
+    assert all(line == json.dumps(json.loads(line), separators=(",", ":")) for line in out.splitlines())
+    return [json.loads(line) for line in out.splitlines()]
+
+
+def test_one_line_per_theme_then_the_summary(monkeypatch, capsys):
+    monkeypatch.setattr(main, "extract_themes", lambda: THEMES)
+    monkeypatch.setattr(main, "extract_tickers_from_theme", _scrape)
+    main.run_streaming()
+
+    lines = _lines(capsys)
+    assert lines[0] == {"type": "theme", "index": 1, "total": 3, "theme": "Cybersecurity", "tickers": ["CRWD", "FTNT", "PANW"]}
+    assert lines[1] == {"type": "theme", "index": 2, "total": 3, "theme": "Robotics", "tickers": [],
+                        "error": "Failed to fetch https://example.test/robotics: 503 Server Error"}
+    assert [line["theme"] for line in lines[:3]] == ["Cybersecurity", "Robotics", "Solar"]
+    assert lines[3] == {"type": "summary", "complete": True, "themes": 3, "failed": ["Robotics"], "tickers": 5}
+
+
+def test_index_failure_ends_with_an_incomplete_summary(monkeypatch, capsys):
+    def fail():
+        raise Exception(f"Failed to fetch {main.THEMES_URL}: 403 Client Error")
+
+    monkeypatch.setattr(main, "extract_themes", fail)
+    with pytest.raises(SystemExit) as exit_info:
+        main.run_streaming()
+    assert exit_info.value.code == 1
+    assert _lines(capsys) == [{"type": "summary", "complete": False, "themes": 0, "failed": [], "tickers": 0,
+                               "error": f"Failed to fetch {main.THEMES_URL}: 403 Client Error"}]
+
+
+@pytest.mark.parametrize("stop, error", [
+    (lambda: os.kill(os.getpid(), signal.SIGTERM), "terminated by SIGTERM"),
+    (_interrupt, "KeyboardInterrupt"),
+])
+def test_a_stopped_run_still_reports_what_it_finished(monkeypatch, capsys, stop, error):
+    def scrape(url):
+        if url.endswith("robotics"):
+            stop()
+        return _scrape(url)
+
+    monkeypatch.setattr(main, "extract_themes", lambda: THEMES)
+    monkeypatch.setattr(main, "extract_tickers_from_theme", scrape)
+    handler = signal.getsignal(signal.SIGTERM)
+    with pytest.raises(SystemExit) as exit_info:
+        main.run_streaming()
+    assert exit_info.value.code == 1
+    assert signal.getsignal(signal.SIGTERM) is handler
+
+    lines = _lines(capsys)
+    assert [line["type"] for line in lines] == ["theme", "summary"]
+    assert lines[1] == {"type": "summary", "complete": False, "themes": 1, "failed": [], "tickers": 3, "error": error}